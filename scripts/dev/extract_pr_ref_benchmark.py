@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for ``check_pr_merge.extract_pr_ref``.
+
+Times the hook's parsing step over a corpus of realistic agent Bash
+commands and prints per-call latency in microseconds, grouped by the
+path each command takes: rejected by the prefilter, lexed without a
+match, or matched. Network and cache lookups are not involved.
+
+Usage:
+    uv run python scripts/dev/extract_pr_ref_benchmark.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import sys
+import timeit
+
+from standard_tooling.bin.check_pr_merge import _mentions_gh_pr, extract_pr_ref
+
+_CORPUS = (
+    "ls -la",
+    "git status --short",
+    "git diff --stat HEAD~1",
+    "git log --oneline -20",
+    "uv run pytest -q tests/standard_tooling/test_git.py",
+    "uv run ruff check src tests && uv run ruff format --check src tests",
+    "cd /workspace/repo && grep -rn 'def main' src | head -20",
+    "find . -name '*.py' -not -path './.venv/*' | xargs wc -l | sort -n | tail",
+    'python -c "import sys; print(sys.version)"',
+    "cat <<'EOF' > /tmp/notes.md\n# Plan\n\n1. Fix the bug\n2. Open a PR\nEOF",
+    "docker ps --format '{{.Names}}' | grep dev-python",
+    "st-commit --type fix --message 'handle empty config' --agent claude",
+    "gh issue list --label bug --limit 20",
+    "gh pr list --state open --json number,title",
+    "gh pr view 412 --json headRefName,state",
+    "gh pr checks 412 --watch",
+    "git push -u origin feature/412-cache && gh pr create --fill",
+    'echo "$(gh pr view 412 --json url -q .url)"',
+    "gh pr merge 412 --squash --delete-branch",
+    "gh pr merge --repo owner/repo https://github.com/owner/repo/pull/412",
+    "cd repo && (git fetch && gh pr review --approve 412 --body 'LGTM; ship it')",
+    "GH_TOKEN=$TOKEN gh pr merge 412 --auto --squash > /tmp/merge.log 2>&1",
+    "bash <<'EOF'\nset -e\ngh pr merge 412 --squash\nEOF",
+)
+
+
+def _path(command: str) -> str:
+    if not _mentions_gh_pr(command):
+        return "prefilter reject"
+    try:
+        extract_pr_ref(command)
+    except ValueError:
+        return "lexed, no match"
+    return "match"
+
+
+def _call(command: str) -> None:
+    with contextlib.suppress(ValueError):
+        extract_pr_ref(command)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="Calls per command")
+    args = parser.parse_args(argv)
+
+    groups: dict[str, list[float]] = {}
+    for command in _CORPUS:
+        seconds = min(
+            timeit.repeat(lambda c=command: _call(c), number=args.number, repeat=3)  # type: ignore[misc]
+        )
+        groups.setdefault(_path(command), []).append(seconds / args.number * 1e6)
+
+    print(f"{'path':<18} {'commands':>8} {'mean us':>9} {'max us':>8}")
+    for path, samples in groups.items():
+        mean = sum(samples) / len(samples)
+        print(f"{path:<18} {len(samples):>8} {mean:>9.2f} {max(samples):>8.2f}")
+    everything = [us for samples in groups.values() for us in samples]
+    print(f"{'all':<18} {len(everything):>8} {sum(everything) / len(everything):>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
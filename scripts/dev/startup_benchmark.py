@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Startup benchmark for every st-* console script.
+
+For each module behind a ``[project.scripts]`` entry point, starts a
+fresh interpreter ``--runs`` times and reports the best cumulative
+``python -X importtime`` figure for the module and the best cold wall
+time of ``python -c "import <module>"``. Exits 1 when a module's import
+time exceeds its budget so CI catches startup regressions.
+
+Hook-critical modules (run by agent hooks on every Bash call) get the
+tighter ``--hook-budget-ms``. They are measured even when a console
+script reaches them through the daemon client rather than directly.
+
+Usage:
+    uv run python scripts/dev/startup_benchmark.py [--runs N]
+        [--budget-ms MS] [--hook-budget-ms MS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+import tomllib
+from pathlib import Path
+
+_PYPROJECT = Path(__file__).resolve().parents[2] / "pyproject.toml"
+
+_HOOK_CRITICAL = frozenset(
+    {"standard_tooling.lib.daemon_client", "standard_tooling.bin.check_pr_merge"}
+)
+
+
+def _entry_point_modules() -> dict[str, list[str]]:
+    """Map each entry-point module to the console scripts that use it."""
+    with _PYPROJECT.open("rb") as f:
+        scripts: dict[str, str] = tomllib.load(f)["project"]["scripts"]
+    modules: dict[str, list[str]] = {}
+    for name, target in scripts.items():
+        modules.setdefault(target.split(":")[0], []).append(name)
+    for module in _HOOK_CRITICAL:
+        modules.setdefault(module, ["(inline)"])
+    return modules
+
+
+def _import_us(module: str) -> int:
+    """Cumulative microseconds ``-X importtime`` reports for *module*."""
+    result = subprocess.run(  # noqa: S603
+        (sys.executable, "-X", "importtime", "-c", f"import {module}"),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stderr.splitlines():
+        _, _, fields = line.partition("import time:")
+        parts = [p.strip() for p in fields.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    msg = f"{module} missing from -X importtime output"
+    raise RuntimeError(msg)
+
+
+def _wall_ms(module: str) -> float:
+    start = time.perf_counter()
+    subprocess.run((sys.executable, "-c", f"import {module}"), check=True)  # noqa: S603
+    return (time.perf_counter() - start) * 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Samples per module (best kept)")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Import budget")
+    parser.add_argument(
+        "--hook-budget-ms", type=float, default=40.0, help="Import budget for hook-critical tools"
+    )
+    args = parser.parse_args(argv)
+
+    over: list[str] = []
+    print(f"{'module':<52} {'import ms':>10} {'wall ms':>9} {'budget':>7}")
+    for module, names in sorted(_entry_point_modules().items()):
+        import_ms = min(_import_us(module) for _ in range(args.runs)) / 1000
+        wall_ms = min(_wall_ms(module) for _ in range(args.runs))
+        budget = args.hook_budget_ms if module in _HOOK_CRITICAL else args.budget_ms
+        flag = "" if import_ms <= budget else "  OVER"
+        print(f"{module:<52} {import_ms:>10.1f} {wall_ms:>9.1f} {budget:>7.0f}{flag}")
+        if flag:
+            over.append(f"{module} ({', '.join(names)}): {import_ms:.1f} ms > {budget:.0f} ms")
+
+    if over:
+        print("\nERROR: startup budget exceeded:", file=sys.stderr)
+        for line in over:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,14 +14,20 @@ from __future__ import annotations
 
 import argparse
 import re
-import shlex
-import subprocess
 import sys
 
-from standard_tooling.lib import github
 from standard_tooling.lib.release import is_release_branch
+from standard_tooling.lib.shell import split_commands
 
-_CHAIN_RE = re.compile(r"\s*(?:&&|\|\||[;|])\s*")
+# A PR's head branch never changes once opened, so answers are kept for
+# a day; failed lookups are remembered briefly so a retrying hook does
+# not hammer the API.
+_BRANCH_TTL_SECS = 24 * 60 * 60
+_FAILURE_TTL_SECS = 60
+
+# Removed before the prefilter's substring test so that quoting such as
+# g"h" or p\r cannot hide the words from it.
+_QUOTING_RE = re.compile(r"['\"\\\n]")
 
 _DENY_MESSAGE = (
     "Blocked: agents may not merge non-release PRs. The pr-workflow\n"
@@ -77,44 +83,45 @@ def extract_pr_ref(command: str) -> tuple[str, str | None]:
     Returns (pr_ref, repo) where repo is None if --repo was not specified.
     Raises ValueError if no gh pr merge/review --approve is found.
     """
-    segments = _CHAIN_RE.split(command)
+    if _mentions_gh_pr(command):
+        for tokens in split_commands(command):
+            result = _extract_from_tokens(tokens)
+            if result is not None:
+                return result
 
-    for segment in segments:
-        segment = segment.strip()
-        if not segment:
-            continue
+    raise ValueError(f"No gh pr merge or gh pr review --approve found in: {command}")
 
-        try:
-            tokens = shlex.split(segment)
-        except ValueError:
-            continue
 
-        result = _extract_from_tokens(tokens)
-        if result is not None:
-            return result
+def _mentions_gh_pr(command: str) -> bool:
+    """Fast reject: False when *command* cannot contain ``gh`` and ``pr`` words.
 
-    raise ValueError(f"No gh pr merge or gh pr review --approve found in: {command}")
+    Almost every command the hook sees fails this test, which costs a
+    couple of substring scans instead of a full lex.
+    """
+    if "gh" in command and "pr" in command:
+        return True
+    if _QUOTING_RE.search(command) is None:
+        return False
+    unquoted = _QUOTING_RE.sub("", command)
+    return "gh" in unquoted and "pr" in unquoted
 
 
 def _extract_from_tokens(tokens: list[str]) -> tuple[str, str | None] | None:
-    """Extract PR ref from a tokenized command segment."""
-    try:
-        gh_idx = tokens.index("gh")
-    except ValueError:
-        return None
+    """Extract PR ref from the words of one simple command."""
+    for gh_idx, token in enumerate(tokens):
+        if token.rpartition("/")[2] != "gh":
+            continue
 
-    rest = tokens[gh_idx + 1 :]
-    if len(rest) < 2 or rest[0] != "pr":
-        return None
+        rest = tokens[gh_idx + 1 :]
+        if len(rest) < 2 or rest[0] != "pr":
+            continue
 
-    subcommand = rest[1]
+        subcommand = rest[1]
 
-    if subcommand == "merge":
-        return _parse_args(rest[2:], _GH_MERGE_FLAGS)
-    elif subcommand == "review":
-        if "--approve" not in rest[2:]:
-            return None
-        return _parse_args(rest[2:], _GH_REVIEW_FLAGS)
+        if subcommand == "merge":
+            return _parse_args(rest[2:], _GH_MERGE_FLAGS)
+        elif subcommand == "review" and "--approve" in rest[2:]:
+            return _parse_args(rest[2:], _GH_REVIEW_FLAGS)
 
     return None
 
@@ -147,12 +154,71 @@ def _parse_args(args: list[str], known_flags: frozenset[str]) -> tuple[str, str
     return (pr_ref, repo)
 
 
+class _UnresolvedError(Exception):
+    """The PR's head branch could not be determined."""
+
+
+def _head_branch(pr_ref: str, repo: str | None, *, use_cache: bool) -> str:
+    """Return the PR's head branch, from the on-disk cache when possible.
+
+    Cache keys are ``<scope>#<pr_ref>``: the ``--repo`` value, nothing
+    for a full PR URL, else the local repository's git dir (what ``gh``
+    would resolve a bare number against).
+    """
+    from pathlib import Path
+
+    from standard_tooling.lib.cache import TtlCache
+
+    if repo:
+        scope = repo
+    elif "/pull/" in pr_ref:
+        scope = ""
+    else:
+        from standard_tooling.lib.git import RefReader
+
+        reader = RefReader.discover(Path.cwd())
+        scope = str(reader.common_dir if reader else Path.cwd())
+    key = f"{scope}#{pr_ref}"
+    cache = TtlCache("pr-head-branches")
+
+    if use_cache:
+        hit = cache.get(key)
+        if isinstance(hit, dict) and "branch" in hit:
+            return str(hit["branch"])
+        if isinstance(hit, dict) and "error" in hit:
+            raise _UnresolvedError(f"{hit['error']} (cached)")
+
+    import subprocess
+
+    from standard_tooling.lib import github
+
+    api_args = ["pr", "view", pr_ref]
+    if repo:
+        api_args.extend(["--repo", repo])
+    api_args.extend(["--json", "headRefName", "--jq", ".headRefName"])
+    try:
+        branch = github.read_output(*api_args)
+    except subprocess.CalledProcessError as exc:
+        detail = str(getattr(exc, "stderr", None) or exc).strip()
+        if use_cache:
+            cache.put(key, {"error": detail}, _FAILURE_TTL_SECS)
+        raise _UnresolvedError(detail) from exc
+    if use_cache:
+        cache.put(key, {"branch": branch}, _BRANCH_TTL_SECS)
+    return branch
+
+
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(
         description="Check whether a PR merge/approval targets a release-workflow branch.",
     )
     parser.add_argument("command", help="Raw Bash command string to check")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always ask GitHub; do not read or update the PR branch cache",
+    )
     return parser.parse_args(argv)
 
 
@@ -164,16 +230,13 @@ def main(argv: list[str] | None = None) -> int:
     except ValueError:
         return 0
 
+    # _head_branch imports the cache, git and gh helpers lazily: the hook
+    # runs this tool on every agent Bash call, almost all of which stop above.
     try:
-        api_args = ["pr", "view", pr_ref]
-        if repo:
-            api_args.extend(["--repo", repo])
-        api_args.extend(["--json", "headRefName", "--jq", ".headRefName"])
-        branch = github.read_output(*api_args)
-    except subprocess.CalledProcessError as exc:
-        detail = getattr(exc, "stderr", None) or str(exc)
+        branch = _head_branch(pr_ref, repo, use_cache=not args.no_cache)
+    except _UnresolvedError as exc:
         print(
-            f"Could not resolve PR branch: {detail}",
+            f"Could not resolve PR branch: {exc}",
             file=sys.stderr,
         )
         return 2
@@ -13,10 +13,13 @@ from __future__ import annotations
 import argparse
 import re
 import sys
-import tempfile
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from standard_tooling.lib import config, git
+from standard_tooling.lib import config, context, git
+
+if TYPE_CHECKING:
+    from standard_tooling.lib.context import RepoContext
 
 ALLOWED_TYPES = ("feat", "fix", "docs", "style", "refactor", "test", "chore", "ci", "build")
 
@@ -70,12 +73,13 @@ def _reject(reason: str, *hints: str) -> int:
     return 1
 
 
-def _validate_commit_context(root: Path, branching_model: str) -> int:
+def _validate_commit_context(ctx: RepoContext, branching_model: str) -> int:
     """Run the five branch / context checks before any commit.
 
     Returns 0 on success, 1 on rejection (with diagnostic on stderr).
     """
-    current_branch = git.current_branch()
+    root = ctx.root
+    current_branch = ctx.branch
 
     # Check 1: detached HEAD
     if current_branch == "HEAD":
@@ -127,7 +131,7 @@ def _validate_commit_context(root: Path, branching_model: str) -> int:
     if (
         _WORKTREE_SCOPED_RE.search(current_branch)
         and (root / _WORKTREES_DIRNAME).is_dir()
-        and git.is_main_worktree()
+        and ctx.is_main_worktree
     ):
         return _reject(
             "ERROR: feature-branch commits from the main worktree are forbidden "
@@ -147,10 +151,10 @@ def _validate_commit_context(root: Path, branching_model: str) -> int:
 
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv)
-    root = git.repo_root()
+    ctx = context.current()
 
     try:
-        st_config = config.read_config(root)
+        st_config = ctx.config
         branching_model = st_config.project.branching_model
     except FileNotFoundError:
         st_config = None
@@ -159,7 +163,7 @@ def main(argv: list[str] | None = None) -> int:
         print(f"ERROR: {exc}", file=sys.stderr)
         return 1
 
-    rc = _validate_commit_context(root, branching_model)
+    rc = _validate_commit_context(ctx, branching_model)
     if rc != 0:
         return rc
 
@@ -183,6 +187,8 @@ def main(argv: list[str] | None = None) -> int:
         subject = f"{subject}({args.scope})"
     subject = f"{subject}: {args.message}"
 
+    import tempfile
+
     with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
         f.write(f"{subject}\n")
         if args.body:
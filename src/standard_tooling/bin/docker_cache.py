@@ -1,32 +1,41 @@
-"""Manage per-branch cached Docker images with standard-tooling pre-installed.
+"""Manage cached Docker images with standard-tooling pre-installed.
 
 Subcommands:
 
     build      Build (or refresh) the cached image for the current branch
-    clean      Remove the cached image for the current branch
+    clean      Release the current branch's cached image, removing it if
+               no other branch uses it (or with --force)
     status     Show cache state for the current branch
     clean-all  Remove all cached images managed by st-docker-cache
+    gc         Evict least-recently-used cached images over an age or disk budget
 """
 
 from __future__ import annotations
 
 import argparse
-import subprocess
 import sys
+import time
 
 from standard_tooling.lib import git
 from standard_tooling.lib.docker import (
     assert_docker_available,
     default_image,
     detect_language,
+    image_id,
+    list_images,
+    remove_images,
 )
 from standard_tooling.lib.docker_cache import (
+    branch_alias,
     cache_image_tag,
+    cache_key,
     cache_sensitive_files,
-    compute_cache_hash,
+    collect_garbage,
     ensure_cached_image,
     find_cached_image,
+    is_cached_tag,
 )
+from standard_tooling.lib.image_index import ImageIndex, format_size, parse_age, parse_size
 
 
 def _cmd_build(_args: argparse.Namespace) -> int:
@@ -40,20 +49,31 @@ def _cmd_build(_args: argparse.Namespace) -> int:
     return 0
 
 
-def _cmd_clean(_args: argparse.Namespace) -> int:
+def _cmd_clean(args: argparse.Namespace) -> int:
     repo_root = git.repo_root()
     lang = detect_language(repo_root)
     base = default_image(lang, fallback=True)
-    branch = git.current_branch()
-    existing = find_cached_image(base, branch)
+    alias = branch_alias(repo_root, git.current_branch())
+    existing = find_cached_image(base, alias)
     if existing is None:
         print("No cached image for this branch.")
         return 0
-    subprocess.run(  # noqa: S603
-        ["docker", "rmi", existing[0]],  # noqa: S607
-        capture_output=True,
-    )
-    print(f"Removed: {existing[0]}")
+    tag = existing[0]
+    index = ImageIndex()
+    index.drop_alias(alias)
+    # Images are shared by content; other branches may still run this one.
+    record = index.records().get(tag)
+    others = record.aliases if record is not None else []
+    if others and not args.force:
+        print(f"Released {tag}; still used by {', '.join(others)}.")
+        print("Pass --force to remove it anyway.")
+        return 0
+    error = remove_images([tag]).get(tag)
+    if error is not None:
+        print(f"Failed to remove {tag}: {error}", file=sys.stderr)
+        return 1
+    index.forget([tag])
+    print(f"Removed: {tag}")
     return 0
 
 
@@ -61,62 +81,89 @@ def _cmd_status(_args: argparse.Namespace) -> int:
     repo_root = git.repo_root()
     lang = detect_language(repo_root)
     base = default_image(lang, fallback=True)
-    branch = git.current_branch()
-    existing = find_cached_image(base, branch)
+    existing = find_cached_image(base, branch_alias(repo_root, git.current_branch()))
+    current_key = None
+    if cache_sensitive_files(repo_root, lang):
+        current_key = cache_key(repo_root, lang, image_id(base) or "")
     if existing is None:
         print("No cached image for this branch.")
-        files = cache_sensitive_files(repo_root, lang)
-        if files:
-            current_hash = compute_cache_hash(files)
-            expected = cache_image_tag(base, branch, current_hash)
-            print(f"Expected tag: {expected}")
+        if current_key is not None:
+            print(f"Expected tag: {cache_image_tag(base, current_key)}")
         return 0
     print(f"Cached image: {existing[0]}")
-    print(f"Hash:         {existing[1]}")
-    files = cache_sensitive_files(repo_root, lang)
-    if files:
-        current_hash = compute_cache_hash(files)
-        if current_hash == existing[1]:
+    print(f"Key:          {existing[1]}")
+    if current_key is not None:
+        if current_key == existing[1]:
             print("Status:       current")
         else:
-            print(f"Status:       stale (current hash: {current_hash})")
+            print(f"Status:       stale (current key: {current_key})")
     return 0
 
 
 def _cmd_clean_all(_args: argparse.Namespace) -> int:
-    result = subprocess.run(  # noqa: S603
-        ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],  # noqa: S607
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
+    images = list_images()
+    if images is None:
         print("Failed to list Docker images.", file=sys.stderr)
         return 1
 
-    removed = 0
-    for line in result.stdout.splitlines():
-        if "--" in line.split(":")[-1]:
-            subprocess.run(  # noqa: S603
-                ["docker", "rmi", line],  # noqa: S607
-                capture_output=True,
-            )
-            removed += 1
+    index = ImageIndex()
+    known = index.records()
+    tags = [image.ref for image in images if image.ref in known or is_cached_tag(image.ref)]
+    failed = remove_images(tags)
+    removed = [tag for tag in tags if tag not in failed]
+    index.forget(removed)
 
-    print(f"Removed {removed} cached image(s).")
+    print(f"Removed {len(removed)} cached image(s).")
+    return 0
+
+
+def _cmd_gc(args: argparse.Namespace) -> int:
+    evicted = collect_garbage(max_size=args.max_size, max_age=args.max_age, dry_run=args.dry_run)
+    if evicted is None:
+        print("Failed to list Docker images.", file=sys.stderr)
+        return 1
+    verb = "Would remove" if args.dry_run else "Removed"
+    now = time.time()
+    for record in evicted:
+        days = (now - record.last_used) / 86400
+        print(f"{verb}: {record.tag} ({format_size(record.size)}, last used {days:.1f}d ago)")
+    freed = format_size(sum(r.size for r in evicted))
+    print(f"{verb} {len(evicted)} cached image(s), {freed}.")
     return 0
 
 
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(
         prog="st-docker-cache",
-        description="Manage per-branch cached Docker images.",
+        description="Manage cached Docker images.",
     )
     sub = parser.add_subparsers(dest="command")
 
     sub.add_parser("build", help="Build or refresh the cached image")
-    sub.add_parser("clean", help="Remove cached image for current branch")
+    clean = sub.add_parser("clean", help="Remove cached image for current branch")
+    clean.add_argument(
+        "--force",
+        action="store_true",
+        help="remove the image even if other branches still use it",
+    )
     sub.add_parser("status", help="Show cache state for current branch")
     sub.add_parser("clean-all", help="Remove all cached images")
+    gc = sub.add_parser("gc", help="Evict least-recently-used cached images")
+    gc.add_argument(
+        "--max-size",
+        type=parse_size,
+        default="20G",
+        help="disk budget for cached images, e.g. 20G or 500MB (default: 20G)",
+    )
+    gc.add_argument(
+        "--max-age",
+        type=parse_age,
+        default="14d",
+        help="remove images unused for longer than this, e.g. 14d or 12h (default: 14d)",
+    )
+    gc.add_argument(
+        "--dry-run", action="store_true", help="list what would be removed without removing it"
+    )
 
     args = parser.parse_args(argv)
     if args.command is None:
@@ -128,6 +175,7 @@ def main(argv: list[str] | None = None) -> int:
         "clean": _cmd_clean,
         "status": _cmd_status,
         "clean-all": _cmd_clean_all,
+        "gc": _cmd_gc,
     }
     return dispatch[args.command](args)
 
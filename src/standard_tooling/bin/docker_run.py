@@ -11,7 +11,7 @@ from __future__ import annotations
 import os
 import sys
 
-from standard_tooling.lib import git
+from standard_tooling.lib import context
 from standard_tooling.lib.docker import (
     assert_docker_available,
     build_docker_args,
@@ -36,6 +36,8 @@ environment variables:
   DOCKER_DEV_IMAGE        override the auto-detected container image
   DOCKER_NETWORK          join a Docker network (e.g. for integration tests)
   ST_DOCKER_INSTALL_TAG   override the standard-tooling version tag from standard-tooling.toml
+  ST_DOCKER_CACHE_REGISTRY  share cached images through this registry prefix
+  ST_DOCKER_CACHE_PUSH    set to 0 to only pull from the cache registry, never push
 
 examples:
   st-docker-run -- uv run st-validate-local
@@ -72,7 +74,7 @@ def main(argv: list[str] | None = None) -> int:
         )
         return 1
 
-    repo_root = git.repo_root()
+    repo_root = context.current().root
     lang = detect_language(repo_root)
 
     env_image = os.environ.get("DOCKER_DEV_IMAGE")
@@ -4,18 +4,66 @@ Supports three modes:
 
 1. **Single-label** — create/update one label in one repo.
 2. **Sync** — provision every label from the canonical registry into a repo.
-3. **Project** — discover repos via a GitHub Project and sync each one.
+3. **Project** — discover repos via a GitHub Project and sync them,
+   ``--jobs`` at a time, ending with a per-repo summary table.
+
+Sync reads a repository's labels once, diffs them against the registry
+and sends only the creates, updates and deletes that are needed,
+through the REST label endpoints (the GraphQL label mutations sit
+behind a schema preview). A repo that is already in sync costs a
+single read.
 """
 
 from __future__ import annotations
 
 import argparse
+import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 from standard_tooling.lib import github
-from standard_tooling.lib.github import list_project_repos
+from standard_tooling.lib.github import iter_project_repos
 from standard_tooling.lib.labels import load_labels
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+_LABELS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    labels(first: 100, after: $cursor) {
+      nodes { name color description }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+# Rate-limit back-off for project mode: GitHub asks clients hitting a
+# secondary limit to wait at least a minute before retrying.
+_RATE_LIMIT_BASE_SECS = 60.0
+_RATE_LIMIT_MAX_SECS = 600.0
+_RATE_LIMIT_ATTEMPTS = 4
+
+
+@dataclass
+class SyncResult:
+    """What :func:`sync_repo` changed in one repository."""
+
+    repo: str
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changes(self) -> int:
+        return len(self.created) + len(self.updated) + len(self.deleted)
+
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     """Parse command-line arguments."""
@@ -37,10 +85,18 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     # Project mode
     parser.add_argument("--owner", help="GitHub owner (project mode)")
     parser.add_argument("--project", help="GitHub Project number (project mode)")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Repos to sync concurrently in project mode (default: 4)",
+    )
 
     args = parser.parse_args(argv)
 
     # Validation
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
     if args.owner or args.project:
         if not (args.owner and args.project and args.sync):
             parser.error("--owner and --project require each other and --sync")
@@ -56,32 +112,206 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
 
 def _ensure_single(repo: str, name: str, color: str | None, description: str | None) -> None:
     """Create or update a single label."""
-    cmd: list[str] = ["label", "create", name, "--repo", repo, "--force"]
-    if color:
-        cmd.extend(["--color", color])
-    if description:
-        cmd.extend(["--description", description])
-    github.run(*cmd)
+    github.create_label(repo, name, color=color, description=description)
     print(f"  {name}")
 
 
-def _delete_label(repo: str, name: str) -> None:
-    """Delete a label, ignoring errors if it doesn't exist."""
-    try:
-        github.run("label", "delete", name, "--repo", repo, "--yes")
-        print(f"  deleted {name}")
-    except Exception:  # noqa: BLE001, S110
-        pass  # label didn't exist — nothing to do
+def _fetch_labels(repo: str) -> dict[str, dict[str, Any]]:
+    """Return the repository's labels keyed by lower-cased name."""
+    owner, name = repo.split("/", 1)
+    labels: dict[str, dict[str, Any]] = {}
+    cursor: str | None = None
+    while True:
+        data = github.graphql(_LABELS_QUERY, owner=owner, name=name, cursor=cursor)
+        page = data["repository"]["labels"]
+        for node in page["nodes"]:
+            labels[node["name"].lower()] = node
+        if not page["pageInfo"]["hasNextPage"]:
+            return labels
+        cursor = page["pageInfo"]["endCursor"]
+
 
+def plan_sync(
+    existing: dict[str, dict[str, Any]], registry: dict[str, Any]
+) -> tuple[list[tuple[str, str, dict[str, str]]], int]:
+    """Diff *existing* labels against *registry*.
 
-def sync_repo(repo: str) -> None:
-    """Provision all canonical labels and delete deprecated ones."""
-    registry = load_labels()
-    print(f"Syncing labels for {repo}:")
+    Returns ``(ops, unchanged)`` where each op is ``(kind, target, wanted)``:
+    *kind* is ``create``, ``update`` or ``delete``, *target* is the label's
+    name as it stands on GitHub (the new name for a create) and *wanted*
+    holds the registry's name, color and description (empty for a delete).
+    Label names compare case-insensitively, as on GitHub; a label that
+    differs only in case, color or description is updated in place.
+    """
+    ops: list[tuple[str, str, dict[str, str]]] = []
+    unchanged = 0
     for label in registry["labels"]:
-        _ensure_single(repo, label["name"], label["color"], label["description"])
+        wanted = {
+            "name": label["name"],
+            "color": label["color"].lower(),
+            "description": label["description"],
+        }
+        current = existing.get(label["name"].lower())
+        if current is None:
+            ops.append(("create", label["name"], wanted))
+        elif (
+            current["name"] != wanted["name"]
+            or current["color"].lower() != wanted["color"]
+            or (current["description"] or "") != wanted["description"]
+        ):
+            ops.append(("update", current["name"], wanted))
+        else:
+            unchanged += 1
     for name in registry.get("delete", []):
-        _delete_label(repo, name)
+        current = existing.get(name.lower())
+        if current is not None:
+            ops.append(("delete", current["name"], {}))
+    return ops, unchanged
+
+
+def _apply(repo: str, ops: list[tuple[str, str, dict[str, str]]]) -> None:
+    """Send each op in *ops* to *repo*'s REST label endpoints."""
+    for kind, target, wanted in ops:
+        if kind == "create":
+            github.create_label(
+                repo, target, color=wanted["color"], description=wanted["description"]
+            )
+        elif kind == "update":
+            github.update_label(
+                repo,
+                target,
+                new_name=wanted["name"],
+                color=wanted["color"],
+                description=wanted["description"],
+            )
+        else:
+            github.delete_label(repo, target)
+
+
+def sync_repo(repo: str, *, log: Callable[[str], None] = print) -> SyncResult:
+    """Provision all canonical labels and delete deprecated ones.
+
+    Progress lines go to *log*; project mode passes a buffer so
+    concurrent repos do not interleave.
+    """
+    log(f"Syncing labels for {repo}:")
+    ops, unchanged = plan_sync(_fetch_labels(repo), load_labels())
+    _apply(repo, ops)
+
+    result = SyncResult(repo=repo, unchanged=unchanged)
+    verbs = {"create": "created", "update": "updated", "delete": "deleted"}
+    for kind, target, wanted in ops:
+        name = wanted.get("name", target)
+        getattr(result, verbs[kind]).append(name)
+        log(f"  {verbs[kind]} {name}")
+    log(
+        f"  {len(result.created)} created, {len(result.updated)} updated, "
+        f"{len(result.deleted)} deleted, {result.unchanged} unchanged"
+    )
+    return result
+
+
+@dataclass
+class _RepoOutcome:
+    repo: str
+    seconds: float
+    result: SyncResult | None
+    error: str | None
+    log: list[str]
+
+
+class _Throttle:
+    """Back-off shared by all workers: one rate-limited repo pauses them all."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+        self._strikes = 0
+
+    def wait(self) -> None:
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def backoff(self) -> float:
+        """Register a rate-limit hit and return the pause it imposes."""
+        with self._lock:
+            delay = min(_RATE_LIMIT_BASE_SECS * 2.0**self._strikes, _RATE_LIMIT_MAX_SECS)
+            self._strikes += 1
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            return delay
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self._strikes = 0
+
+
+def _sync_buffered(repo: str, throttle: _Throttle) -> _RepoOutcome:
+    """Sync *repo*, retrying after rate limits, with its output buffered."""
+    lines: list[str] = []
+    start = time.monotonic()
+    attempt = 1
+    while True:
+        throttle.wait()
+        try:
+            result = sync_repo(repo, log=lines.append)
+        except subprocess.CalledProcessError as exc:
+            error = (str(exc.stderr or "").strip() or str(exc)).splitlines()[-1]
+            if not github.is_rate_limited(exc) or attempt == _RATE_LIMIT_ATTEMPTS:
+                lines.append(f"  ERROR: {error}")
+                return _RepoOutcome(repo, time.monotonic() - start, None, error, lines)
+            # Sync is diff-based, so retrying the whole repo is safe.
+            lines.append(f"  rate limited; pausing {throttle.backoff():.0f}s before retrying")
+            attempt += 1
+        except Exception as exc:  # noqa: BLE001
+            # Anything else (an unexpected API answer, a bug) fails this repo only.
+            error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            lines.append(f"  ERROR: {error}")
+            return _RepoOutcome(repo, time.monotonic() - start, None, error, lines)
+        else:
+            throttle.succeeded()
+            return _RepoOutcome(repo, time.monotonic() - start, result, None, lines)
+
+
+def _sync_project(repos: Iterable[str], jobs: int) -> list[_RepoOutcome]:
+    """Sync *repos* on up to *jobs* threads; print each repo's log as it finishes.
+
+    Repos are submitted as *repos* yields them, so syncing starts while
+    discovery is still paging.
+    """
+    throttle = _Throttle()
+    order: list[str] = []
+    outcomes: dict[str, _RepoOutcome] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = []
+        for repo in repos:
+            order.append(repo)
+            futures.append(pool.submit(_sync_buffered, repo, throttle))
+        for future in as_completed(futures):
+            outcome = future.result()
+            outcomes[outcome.repo] = outcome
+            print("\n".join(outcome.log), flush=True)
+    return [outcomes[repo] for repo in order]
+
+
+def _print_summary(outcomes: list[_RepoOutcome]) -> None:
+    width = max([len("Repo"), *(len(o.repo) for o in outcomes)])
+    print(
+        f"{'Repo':<{width}}  {'Time':>6}  {'Created':>7}  {'Updated':>7}  "
+        f"{'Deleted':>7}  {'Unchanged':>9}  Status"
+    )
+    for o in outcomes:
+        if o.result is None:
+            counts = f"{'-':>7}  {'-':>7}  {'-':>7}  {'-':>9}"
+            status = f"failed: {o.error}"
+        else:
+            r = o.result
+            counts = (
+                f"{len(r.created):>7}  {len(r.updated):>7}  {len(r.deleted):>7}  {r.unchanged:>9}"
+            )
+            status = "ok"
+        print(f"{o.repo:<{width}}  {o.seconds:>5.1f}s  {counts}  {status}")
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -89,10 +319,15 @@ def main(argv: list[str] | None = None) -> int:
 
     if args.owner and args.project:
         # Project mode: discover repos, sync each
-        repos = list_project_repos(args.owner, args.project)
-        print(f"Found {len(repos)} repos in project {args.project}")
-        for repo in repos:
-            sync_repo(repo)
+        try:
+            outcomes = _sync_project(iter_project_repos(args.owner, args.project), args.jobs)
+        except subprocess.CalledProcessError as exc:
+            print(f"ERROR: {(exc.stderr or str(exc)).strip()}", file=sys.stderr)
+            return 1
+        print(f"\nSynced {len(outcomes)} repos in project {args.project}")
+        _print_summary(outcomes)
+        if any(o.error for o in outcomes):
+            return 1
     elif args.sync:
         # Sync mode: single repo
         sync_repo(args.repo)
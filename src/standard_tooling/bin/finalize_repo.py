@@ -10,13 +10,12 @@ workflow run on the target branch and fails if it did not succeed
 from __future__ import annotations
 
 import argparse
-import json
 import subprocess
 import sys
 from pathlib import Path
 
-from standard_tooling.lib import config, git
-from standard_tooling.lib.docker_cache import clean_branch_images
+from standard_tooling.lib import config, context, git, github
+from standard_tooling.lib.docker_cache import release_branch_image
 
 _DOCS_WORKFLOW_NAME = "Documentation"
 
@@ -89,34 +88,13 @@ def _check_docs_workflow_status(target_branch: str) -> str | None:
     Returns None when:
       - no Documentation workflow exists in the repo
       - the latest run succeeded or is still in progress
-      - the JSON response is malformed (defensive)
+      - the response is malformed (defensive)
     """
-    result = subprocess.run(  # noqa: S603
-        [  # noqa: S607
-            "gh",
-            "run",
-            "list",
-            "--workflow",
-            _DOCS_WORKFLOW_NAME,
-            "--branch",
-            target_branch,
-            "--limit",
-            "1",
-            "--json",
-            "conclusion,databaseId,headSha,createdAt,url",
-        ],
-        check=False,
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
-        # gh failed (no workflow, no auth, network issue) — defensive
-        # silence rather than turning every finalize into a warning.
-        return None
-    stdout = result.stdout or ""
     try:
-        runs = json.loads(stdout) if stdout.strip() else []
-    except json.JSONDecodeError:
+        runs = github.list_runs(workflow=_DOCS_WORKFLOW_NAME, branch=target_branch, limit=1)
+    except (subprocess.CalledProcessError, ValueError, KeyError):
+        # No workflow, no auth, network issue or a garbled answer —
+        # defensive silence rather than turning every finalize into a warning.
         return None
     if not runs:
         return None
@@ -135,9 +113,10 @@ def _check_docs_workflow_status(target_branch: str) -> str | None:
 
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv)
+    ctx = context.current()
 
-    if not git.is_main_worktree():
-        main_root = git.main_worktree_root()
+    if not ctx.is_main_worktree:
+        main_root = ctx.main_worktree_root
         print(
             f"ERROR: st-finalize-repo must be run from the main worktree at {main_root},\n"
             "  not from a secondary worktree. The script removes worktrees during cleanup\n"
@@ -146,10 +125,10 @@ def main(argv: list[str] | None = None) -> int:
         )
         return 1
 
-    root = git.repo_root()
+    root = ctx.root
 
     try:
-        st_config = config.read_config(root)
+        st_config = ctx.config
         model = st_config.project.branching_model
     except FileNotFoundError:
         model = ""
@@ -164,8 +143,7 @@ def main(argv: list[str] | None = None) -> int:
         print("WARNING: branching_model not found; protecting develop and main.", file=sys.stderr)
         eternal.update(("develop", "main"))
 
-    current = git.current_branch()
-    if current != args.target_branch:
+    if ctx.branch != args.target_branch:
         print(f"Switching to {args.target_branch}...")
         _run(["checkout", args.target_branch], dry_run=args.dry_run)
     else:
@@ -174,6 +152,8 @@ def main(argv: list[str] | None = None) -> int:
     print(f"Pulling latest from origin/{args.target_branch}...")
     _run(["fetch", "--tags", "--force", "origin", args.target_branch], dry_run=args.dry_run)
     _run(["pull", "--ff-only", "origin", args.target_branch], dry_run=args.dry_run)
+    # checkout / pull moved HEAD; nothing below may trust the snapshot.
+    context.invalidate()
 
     print("Checking for merged local branches...")
     deleted: list[str] = []
@@ -200,10 +180,9 @@ def main(argv: list[str] | None = None) -> int:
         print(f"  Deleting merged branch: {branch}")
         _run(["branch", "-D", branch], dry_run=args.dry_run)
         deleted.append(branch)
-        if not args.dry_run:
-            removed = clean_branch_images(branch)
-            if removed:
-                print(f"  Cleaned {removed} cached Docker image(s) for {branch}")
+        # Only the alias goes: the image may serve other branches; gc reclaims it.
+        if not args.dry_run and release_branch_image(root, branch):
+            print(f"  Released cached Docker image for {branch}")
 
     print("Pruning stale remote-tracking references...")
     if args.dry_run:
@@ -237,8 +216,7 @@ def main(argv: list[str] | None = None) -> int:
     if not args.dry_run:
         print()
         print("Running post-finalization validation via st-docker-run...")
-        repo_root = Path(git.repo_root())
-        if (repo_root / "pyproject.toml").is_file():
+        if (root / "pyproject.toml").is_file():
             cmd: tuple[str, ...] = ("st-docker-run", "--", "uv", "run", "st-validate-local")
         else:
             cmd = ("st-docker-run", "--", "st-validate-local")
@@ -6,12 +6,29 @@ exit code. The caller is responsible for deciding what to do with a failure.
 Designed for release-workflow PRs where the agent is both author and
 reviewer and there is no human to gate the merge. For normal PRs, leave
 them to manual merge.
+
+Given several PRs (on the command line or via ``--from-file``), all of
+them are watched at once from one process and each is merged as soon as
+it is green and every PR it depends on (``--after``) has merged. A PR
+whose dependency fails is left unmerged. ``--summary`` writes the
+per-PR time-to-green and time-to-merge as JSON; with ``--summary -`` the
+JSON is all that goes to stdout, and progress goes to stderr.
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
+import json
+import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
 
 from standard_tooling.lib import github
 from standard_tooling.lib.release import is_release_branch
@@ -22,45 +39,228 @@ _STRATEGIES = ("merge", "squash", "rebase")
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(
-        description="Wait for a PR's checks to pass, then merge it.",
+        description="Wait for PRs' checks to pass, then merge them.",
+    )
+    parser.add_argument("prs", nargs="*", metavar="pr", help="PR URL or number")
+    parser.add_argument(
+        "--from-file",
+        type=Path,
+        help="Read PRs from a file, one per line: '<pr> [after <pr> ...]'",
+    )
+    parser.add_argument(
+        "--after",
+        action="append",
+        default=[],
+        metavar="PR=DEP",
+        help="Merge PR only after DEP has merged (repeatable)",
     )
-    parser.add_argument("pr", help="PR URL or number")
     parser.add_argument(
         "--strategy",
         choices=_STRATEGIES,
         default="merge",
         help="Merge strategy (default: merge)",
     )
-    return parser.parse_args(argv)
-
+    parser.add_argument(
+        "--summary",
+        metavar="PATH",
+        help=(
+            "Write a JSON summary of time-to-green and time-to-merge "
+            "('-' for stdout, moving progress to stderr)"
+        ),
+    )
+    args = parser.parse_args(argv)
+    if not args.prs and args.from_file is None:
+        parser.error("give at least one PR or --from-file")
+    return args
 
-def main(argv: list[str] | None = None) -> int:
-    args = parse_args(argv)
 
-    branch = github.read_output(
-        "pr",
-        "view",
-        args.pr,
-        "--json",
-        "headRefName",
-        "--jq",
-        ".headRefName",
+def _release_branch_error(pr: str) -> str | None:
+    """Return why *pr* may not be merged by this tool, or None if it may."""
+    branch = github.pr_view(pr, "headRefName")["headRefName"]
+    if is_release_branch(branch):
+        return None
+    return (
+        f"st-merge-when-green is only for release-workflow PRs. "
+        f"Branch '{branch}' does not start with release/*."
     )
-    if not is_release_branch(branch):
-        print(
-            f"Error: st-merge-when-green is only for release-workflow PRs. "
-            f"Branch '{branch}' does not start with release/*.",
-            file=sys.stderr,
-        )
+
+
+def _merge_one(pr: str, strategy: str) -> int:
+    error = _release_branch_error(pr)
+    if error is not None:
+        print(f"Error: {error}", file=sys.stderr)
         return 1
 
-    print(f"Waiting for checks to pass on {args.pr}...")
-    github.wait_for_checks(args.pr)
-    print(f"Checks passed. Merging with --{args.strategy}...")
-    github.merge(args.pr, strategy=args.strategy)
+    print(f"Waiting for checks to pass on {pr}...")
+    github.wait_for_checks(pr, on_transition=github.print_transition)
+    print(f"Checks passed. Merging with --{strategy}...")
+    github.merge(pr, strategy=strategy)
     print("Merged.")
     return 0
 
 
+# -- multi-PR scheduler ---------------------------------------------------------
+
+
+@dataclass
+class _Watch:
+    pr: str
+    depends_on: list[str] = field(default_factory=list)
+    status: str = "pending"
+    error: str | None = None
+    green_secs: float | None = None
+    merged_secs: float | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "pr": self.pr,
+            "status": self.status,
+            "depends_on": self.depends_on,
+            "time_to_green": self.green_secs,
+            "time_to_merge": self.merged_secs,
+            "error": self.error,
+        }
+
+
+def _read_pr_file(path: Path) -> list[tuple[str, list[str]]]:
+    """Parse a PR list file: ``<pr> [after <pr> ...]`` per line, ``#`` comments."""
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        words = line.partition("#")[0].split()
+        if not words:
+            continue
+        if len(words) > 1 and words[1] != "after":
+            msg = f"{path}: expected '<pr> [after <pr> ...]', got: {line.strip()}"
+            raise ValueError(msg)
+        entries.append((words[0], words[2:]))
+    return entries
+
+
+def _plan(args: argparse.Namespace) -> dict[str, _Watch]:
+    """Build the watch list, checking that dependencies exist and do not cycle."""
+    entries: list[tuple[str, list[str]]] = [(pr, []) for pr in args.prs]
+    if args.from_file is not None:
+        entries.extend(_read_pr_file(args.from_file))
+    watches: dict[str, _Watch] = {}
+    for pr, deps in entries:
+        watches.setdefault(pr, _Watch(pr)).depends_on.extend(deps)
+    for spec in args.after:
+        pr, sep, dep = spec.partition("=")
+        if not sep or pr not in watches:
+            msg = f"--after {spec}: expected PR=DEP with PR in the list"
+            raise ValueError(msg)
+        watches[pr].depends_on.append(dep)
+
+    for watch in watches.values():
+        for dep in watch.depends_on:
+            if dep not in watches:
+                msg = f"{watch.pr} depends on {dep}, which is not in the list"
+                raise ValueError(msg)
+
+    # Depth-first walk; a PR met again while still on the stack is a cycle.
+    visiting: set[str] = set()
+    finished: set[str] = set()
+
+    def visit(pr: str) -> None:
+        if pr in finished:
+            return
+        if pr in visiting:
+            msg = f"dependency cycle through {pr}"
+            raise ValueError(msg)
+        visiting.add(pr)
+        for dep in watches[pr].depends_on:
+            visit(dep)
+        visiting.discard(pr)
+        finished.add(pr)
+
+    for pr in watches:
+        visit(pr)
+    return watches
+
+
+def _watch(watch: _Watch, watches: dict[str, _Watch], strategy: str, start: float) -> None:
+    """Wait for one PR to go green and its dependencies to merge, then merge it."""
+    pr = watch.pr
+    try:
+        watch.error = _release_branch_error(pr)
+        if watch.error is not None:
+            watch.status = "rejected"
+            return
+        print(f"{pr}: waiting for checks...", flush=True)
+        github.wait_for_checks(
+            pr, on_transition=functools.partial(github.print_transition, prefix=f"{pr}: ")
+        )
+        watch.green_secs = round(time.monotonic() - start, 1)
+        for dep in watch.depends_on:
+            if watches[dep].status == "pending":
+                print(f"{pr}: green, waiting for {dep} to merge...", flush=True)
+            watches[dep].done.wait()
+            if watches[dep].status != "merged":
+                watch.status = "blocked"
+                watch.error = f"dependency {dep} was not merged"
+                return
+        print(f"{pr}: merging with --{strategy}...", flush=True)
+        github.merge(pr, strategy=strategy)
+        watch.merged_secs = round(time.monotonic() - start, 1)
+        watch.status = "merged"
+        print(f"{pr}: merged.", flush=True)
+    except subprocess.CalledProcessError as exc:
+        watch.status = "failed"
+        watch.error = (exc.stderr or str(exc)).strip()
+    except Exception as exc:  # noqa: BLE001
+        # Anything else (an unexpected API answer, a bug) fails this PR only;
+        # its dependents see it unmerged and are blocked rather than hung.
+        watch.status = "failed"
+        watch.error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+    finally:
+        watch.done.set()
+
+
+def _print_summary(watches: list[_Watch]) -> None:
+    width = max([len("PR"), *(len(w.pr) for w in watches)])
+    print(f"{'PR':<{width}}  {'Green':>7}  {'Merged':>7}  Status")
+    for w in watches:
+        green = "-" if w.green_secs is None else f"{w.green_secs:.1f}s"
+        merged = "-" if w.merged_secs is None else f"{w.merged_secs:.1f}s"
+        status = w.status if w.error is None else f"{w.status}: {w.error}"
+        print(f"{w.pr:<{width}}  {green:>7}  {merged:>7}  {status}")
+
+
+def _merge_many(args: argparse.Namespace) -> int:
+    try:
+        watches = _plan(args)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 2
+
+    # With the JSON summary on stdout, progress and the table go to stderr
+    # so stdout stays machine-readable.
+    to_stdout = args.summary == "-"
+    with contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext():
+        start = time.monotonic()
+        # One thread per PR: each spends nearly all its time asleep between polls.
+        with ThreadPoolExecutor(max_workers=len(watches)) as pool:
+            for watch in watches.values():
+                pool.submit(_watch, watch, watches, args.strategy, start)
+        ordered = list(watches.values())
+        print()
+        _print_summary(ordered)
+    if args.summary is not None:
+        text = json.dumps({"prs": [w.as_dict() for w in ordered]}, indent=2) + "\n"
+        if to_stdout:
+            sys.stdout.write(text)
+        else:
+            Path(args.summary).write_text(text, encoding="utf-8")
+    return 0 if all(w.status == "merged" for w in ordered) else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if len(args.prs) == 1 and args.from_file is None and not args.after and not args.summary:
+        return _merge_one(args.prs[0], args.strategy)
+    return _merge_many(args)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -8,7 +8,6 @@ from __future__ import annotations
 import argparse
 import re
 import sys
-import tempfile
 from pathlib import Path
 
 from standard_tooling.lib import git, github
@@ -93,6 +92,8 @@ def main(argv: list[str] | None = None) -> int:
     print(f"Pushing branch '{branch}' to origin...")
     git.run("push", "-u", "origin", branch)
 
+    import tempfile
+
     with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
         f.write(pr_body)
         tmp_path = f.name
@@ -4,17 +4,67 @@ Reads primary_language from standard-tooling.toml, then runs:
   1. validate-local-common   (always)
   2. validate-local-<lang>   (if primary_language is set and script exists)
   3. validate-local-custom   (if exists -- repo-specific escape hatch)
+
+The common validator is independent of the others, so it runs
+concurrently with them (see ``lib/scheduler``), each one's output
+printed as a prefixed block when it finishes. The custom validator runs
+after the language validator, since it may build on what that one
+produced or share its build directories. The first failure stops the
+others. ``--serial`` runs them
+one at a time with live output instead.
+
+A passing run is recorded against the content of the working tree, the
+validators and the tool versions (see ``lib/validation_cache``); when
+all of them match a recorded pass the validators are not rerun.
+``--no-cache`` always runs them.
+
+``--changed-since REF`` scopes the run to what a pull request against
+REF would change. The changed files are computed once and handed to
+every validator (see ``lib/changed_files``); those that can narrow
+their work to them do, and whole-repo checks run only when their inputs
+changed. A scoped pass is not recorded, since it does not vouch for the
+whole tree.
 """
 
 from __future__ import annotations
 
+import argparse
+import contextlib
 import os
 import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
-
-from standard_tooling.lib import config, git
+from typing import TYPE_CHECKING
+
+from standard_tooling.lib import changed_files, config, context, git, scheduler, validation_cache
+
+if TYPE_CHECKING:
+    from standard_tooling.lib.context import RepoContext
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Run the repository's local validators (inside the dev container).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Run the validators even if this tree has already passed",
+    )
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Run validators one at a time with live output (for debugging)",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Validate only what changed since the merge base with REF (e.g. origin/develop)",
+    )
+    return parser.parse_args(argv)
 
 
 def _find_validator(name: str, scripts_bin: Path) -> str | None:
@@ -33,21 +83,21 @@ def _find_validator(name: str, scripts_bin: Path) -> str | None:
     return None
 
 
-def _run_validator(name: str, scripts_bin: Path) -> bool:
-    """Run a validator script. Return True on success, True (skip) if not found."""
-    path = _find_validator(name, scripts_bin)
-    if path is None:
-        return True
-    print(f"Running: {path}")
-    result = subprocess.run((path,), check=False)  # noqa: S603
-    return result.returncode == 0
+def _run_key(ctx: RepoContext, validators: list[str | None]) -> tuple[str, str] | None:
+    """Return ``(tree, key)`` identifying this run, or None if it cannot be cached."""
+    try:
+        return validation_cache.run_key(ctx, validators)
+    except (subprocess.CalledProcessError, OSError) as exc:
+        print(f"Note: result cache unavailable ({exc}); running all validators.")
+        return None
 
 
 def _in_dev_container() -> bool:
     return Path("/.dockerenv").exists() or bool(os.environ.get("ST_IN_DEV_CONTAINER"))
 
 
-def main(argv: list[str] | None = None) -> int:  # noqa: ARG001
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
     if not _in_dev_container():
         print(
             "ERROR: st-validate-local must run inside a dev container.\n"
@@ -56,11 +106,11 @@ def main(argv: list[str] | None = None) -> int:  # noqa: ARG001
         )
         return 1
 
-    root = git.repo_root()
-    scripts_bin = root / "scripts" / "bin"
+    ctx = context.current()
+    scripts_bin = ctx.root / "scripts" / "bin"
 
     try:
-        st_config = config.read_config(root)
+        st_config = ctx.config
         primary_language = st_config.project.primary_language
     except FileNotFoundError:
         primary_language = ""
@@ -68,25 +118,61 @@ def main(argv: list[str] | None = None) -> int:  # noqa: ARG001
         print(f"ERROR: {exc}", file=sys.stderr)
         return 1
 
+    changed: list[str] | None = None
+    if args.changed_since:
+        try:
+            changed = git.changed_files(ctx.root, args.changed_since)
+        except subprocess.CalledProcessError as exc:
+            detail = (exc.stderr or b"").decode(errors="replace").strip()
+            print(f"ERROR: cannot diff against {args.changed_since}: {detail}", file=sys.stderr)
+            return 1
+
     print("=" * 40)
     print("st-validate-local")
     print(f"primary_language: {primary_language or '<not set>'}")
+    if changed is not None:
+        print(f"changed since {args.changed_since}: {len(changed)} file(s)")
     print("=" * 40)
     print()
 
-    if not _run_validator("validate-local-common", scripts_bin):
-        return 1
-
+    lang_validator = None
     if primary_language and primary_language != "none":
+        lang_validator = f"validate-local-{primary_language}"
+    names = ["validate-local-common", lang_validator, "validate-local-custom"]
+    validators = {name: _find_validator(name, scripts_bin) for name in names if name}
+    # The custom validator follows the language one; common runs alongside both.
+    after: dict[str, tuple[str, ...]] = {}
+    if lang_validator and validators[lang_validator]:
+        after["validate-local-custom"] = (lang_validator,)
+
+    run_key = None if args.no_cache else _run_key(ctx, list(validators.values()))
+    if run_key is not None:
+        tree, key = run_key
+        record = validation_cache.recorded_pass(ctx, key)
+        if record is not None:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["passed_at"]))
+            print(f"Tree {tree[:12]} already passed at {when}; skipping (--no-cache reruns).")
+            print()
+            print("=" * 40)
+            print("st-validate-local: all checks passed (cached)")
+            print("=" * 40)
+            return 0
+
+    with contextlib.ExitStack() as stack:
+        env = None if changed is None else stack.enter_context(changed_files.exported(changed))
+        steps = [
+            scheduler.Step(name, (path,), after=after.get(name, ()), env=env)
+            for name, path in validators.items()
+            if path
+        ]
+        results = scheduler.run_steps(steps, serial=args.serial)
+    if not all(result.ok for result in results):
         print()
-        if not _run_validator(f"validate-local-{primary_language}", scripts_bin):
-            return 1
+        print(f"st-validate-local: {scheduler.summary_line(results)}", file=sys.stderr)
+        return 1
 
-    custom = _find_validator("validate-local-custom", scripts_bin)
-    if custom is not None:
-        print()
-        if not _run_validator("validate-local-custom", scripts_bin):
-            return 1
+    if run_key is not None and changed is None:
+        validation_cache.record_pass(ctx, run_key[1], run_key[0])
 
     print()
     print("=" * 40)
@@ -6,126 +6,323 @@ Runs inside the dev container via ``st-docker-run``:
      the bundled canonical config
   3. shellcheck on all shell scripts under ``scripts/``
   4. yamllint on YAML files under ``.github/`` and ``docs/`` (issue #302)
+
+The four checks are independent, so they run concurrently through
+``lib/scheduler``. shellcheck and yamllint check each file on its own,
+so their file lists are also split into contiguous shards run side by
+side. Each step's output is printed as a prefixed block in the order
+above, whichever finishes first. Every check runs to completion; the
+exit code is that of the first failing check in the order above, as
+when they ran one after another.
+
+Files are selected from one ``git ls-files`` listing (tracked files plus
+untracked ones that are not ignored, or tracked only with
+``--tracked-only``), so ignored build output is never walked.
+
+The linters only see files they have not already judged: each file's
+result is recorded per linter version and configuration (see
+``lib/lint_cache``), and a recorded file's diagnostics are replayed
+instead. The linters print one ``path:line...`` diagnostic per line so
+output can be attributed to files; output that cannot be attributed
+leaves its files unrecorded. ``--no-cache`` lints every file.
+
+Under ``st-validate-local --changed-since`` (``ST_CHANGED_FILES`` set,
+see ``lib/changed_files``) each linter sees only the changed files,
+or all of its files when its configuration changed, and repo-profile
+runs only when ``standard-tooling.toml`` or ``README.md`` changed.
 """
 
 from __future__ import annotations
 
-import subprocess
+import argparse
+import math
+import os
 import sys
-from importlib.resources import files
+from dataclasses import dataclass, field
+from importlib.resources import files as package_files
+from pathlib import Path, PurePosixPath
 from typing import TYPE_CHECKING
 
-from standard_tooling.bin import repo_profile_cli
-from standard_tooling.lib import git
+from standard_tooling.lib import changed_files, context, git, lint_cache, scheduler
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from collections.abc import Callable, Iterable, Sequence
 
+# What repo-profile reads; it is skipped in a scoped run that changed neither.
+_PROFILE_INPUTS = frozenset({"standard-tooling.toml", "README.md"})
 
-def _find_shell_files(repo_root: Path) -> list[str]:
-    """Discover shell files under scripts/."""
-    scripts_dir = repo_root / "scripts"
-    if not scripts_dir.is_dir():
-        return []
+# Fewer files than this per shard and process start-up outweighs the split.
+_MIN_SHARD_FILES = 8
 
-    found: list[str] = []
-    for path in scripts_dir.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix == ".sh" or "git-hooks" in path.parts or "bin" in path.parts:
-            found.append(str(path))
-    return sorted(found)
 
+def _existing(repo_root: Path, candidates: Iterable[str]) -> list[str]:
+    """Return the absolute paths of *candidates* that are files, sorted.
 
-def _find_markdown_files(repo_root: Path) -> list[str]:
-    """Discover published markdown files: docs/site/**/*.md and README.md."""
-    found: list[str] = []
+    ``git ls-files`` lists tracked files deleted from the working tree,
+    and nested repositories as directories; only candidates are stat-ed.
+    """
+    return sorted(str(repo_root / rel) for rel in candidates if (repo_root / rel).is_file())
 
-    site_dir = repo_root / "docs" / "site"
-    if site_dir.is_dir():
-        for path in site_dir.rglob("*.md"):
-            found.append(str(path))
 
-    readme = repo_root / "README.md"
-    if readme.is_file():
-        found.append(str(readme))
+def _find_shell_files(repo_root: Path, listed: Sequence[str]) -> list[str]:
+    """Select shell files under scripts/ from the *listed* repo files."""
+    found = []
+    for rel in listed:
+        parts = PurePosixPath(rel).parts
+        if parts[0] != "scripts":
+            continue
+        if rel.endswith(".sh") or "git-hooks" in parts or "bin" in parts:
+            found.append(rel)
+    return _existing(repo_root, found)
+
 
-    return sorted(found)
+def _find_markdown_files(repo_root: Path, listed: Sequence[str]) -> list[str]:
+    """Select published markdown files: docs/site/**/*.md and README.md."""
+    return _existing(
+        repo_root,
+        (
+            rel
+            for rel in listed
+            if rel == "README.md" or (rel.startswith("docs/site/") and rel.endswith(".md"))
+        ),
+    )
 
 
 _YAML_EXTS = frozenset({".yml", ".yaml"})
 
 
-def _find_yaml_files(repo_root: Path) -> list[str]:
-    """Discover YAML files we care about: repo-root config
+def _find_yaml_files(repo_root: Path, listed: Sequence[str]) -> list[str]:
+    """Select the YAML files we care about: repo-root config
     (.markdownlint.yaml etc.), `.github/` tree (workflows, issue
     templates), and `docs/site/mkdocs.yml`. The yamllint config lives
     at the repo root (`.yamllint`).
 
     Vendored paths (`.worktrees`, `.venv`, `.venv-host`,
-    `node_modules`) are excluded by construction — discovery only
-    walks the listed locations, never venv/worktree subtrees.
+    `node_modules`) are excluded by construction — only the listed
+    locations are selected, never venv/worktree subtrees.
     """
-    found: list[str] = []
-
-    # Repo-root level YAML config files (e.g., .markdownlint.yaml).
-    for path in repo_root.iterdir():
-        if path.is_file() and path.suffix in _YAML_EXTS:
-            found.append(str(path))
-
-    # .github/ tree (workflows, issue templates, etc.).
-    github_dir = repo_root / ".github"
-    if github_dir.is_dir():
-        for path in github_dir.rglob("*"):
-            if path.is_file() and path.suffix in _YAML_EXTS:
-                found.append(str(path))
-
-    # docs/site/mkdocs.yml.
-    mkdocs = repo_root / "docs" / "site" / "mkdocs.yml"
-    if mkdocs.is_file():
-        found.append(str(mkdocs))
-
-    return sorted(set(found))
-
-
-def main(argv: list[str] | None = None) -> int:  # noqa: ARG001
-    repo_root = git.repo_root()
-
-    print("Running: repo-profile")
-    rc = repo_profile_cli.main()
-    if rc != 0:
-        return rc
-
-    md_files = _find_markdown_files(repo_root)
-    if md_files:
-        print(f"Running: markdownlint ({len(md_files)} files)")
-        config = files("standard_tooling.configs") / "markdownlint.yaml"
-        cmd: list[str] = ["markdownlint", "--config", str(config), *md_files]
-        result = subprocess.run(cmd, check=False)  # noqa: S603, S607
-        if result.returncode != 0:
-            return result.returncode
-
-    shell_files = _find_shell_files(repo_root)
-    if shell_files:
-        print(f"Running: shellcheck ({len(shell_files)} files)")
-        result = subprocess.run(  # noqa: S603
-            ["shellcheck", *shell_files],  # noqa: S607
-            check=False,
-        )
-        if result.returncode != 0:
-            return result.returncode
-
-    yaml_files = _find_yaml_files(repo_root)
-    if yaml_files:
-        print(f"Running: yamllint ({len(yaml_files)} files)")
-        result = subprocess.run(  # noqa: S603
-            ["yamllint", *yaml_files],  # noqa: S607
-            check=False,
+    found = []
+    for rel in listed:
+        path = PurePosixPath(rel)
+        if path.suffix not in _YAML_EXTS:
+            continue
+        if len(path.parts) == 1 or path.parts[0] == ".github" or rel == "docs/site/mkdocs.yml":
+            found.append(rel)
+    return _existing(repo_root, found)
+
+
+@dataclass(frozen=True)
+class _Linter:
+    """How to run one per-file linter and read its diagnostics."""
+
+    name: str
+    argv: tuple[str, ...]
+    # Files whose content changes the linter's verdicts.
+    configs: tuple[Path, ...]
+    sharded: bool
+    # Whether a diagnostic line makes the linter fail (not just warn).
+    failing: Callable[[str], bool] = lambda _line: True
+
+
+@dataclass
+class _Check:
+    """One linter's work for this run."""
+
+    linter: _Linter
+    cache: lint_cache.LintCache | None = None
+    recorded: dict[str, lint_cache.FileResult] = field(default_factory=dict)
+    steps: list[tuple[scheduler.Step, list[str]]] = field(default_factory=list)
+
+
+def _shellcheckrcs(repo_root: Path, files: Iterable[str]) -> tuple[Path, ...]:
+    """Return the ``.shellcheckrc`` paths shellcheck may read for *files*.
+
+    shellcheck takes the nearest one in a script's directory or its
+    parents, so every directory from each file's up to *repo_root* has a
+    candidate, whether or not it exists yet.
+    """
+    dirs = {repo_root}
+    for path in files:
+        parent = Path(path).parent
+        while parent != repo_root and parent.is_relative_to(repo_root):
+            dirs.add(parent)
+            parent = parent.parent
+    return tuple(sorted(d / ".shellcheckrc" for d in dirs))
+
+
+def _linters(repo_root: Path, listed: Sequence[str]) -> list[tuple[_Linter, list[str]]]:
+    """Return each linter with the files it should check."""
+    shell_files = _find_shell_files(repo_root, listed)
+    markdownlint_config = Path(str(package_files("standard_tooling.configs") / "markdownlint.yaml"))
+    return [
+        (
+            _Linter(
+                "markdownlint",
+                ("markdownlint", "--config", str(markdownlint_config)),
+                (markdownlint_config,),
+                sharded=False,
+            ),
+            _find_markdown_files(repo_root, listed),
+        ),
+        (
+            _Linter(
+                "shellcheck",
+                ("shellcheck", "--format", "gcc"),
+                _shellcheckrcs(repo_root, shell_files),
+                sharded=True,
+            ),
+            shell_files,
+        ),
+        (
+            _Linter(
+                "yamllint",
+                ("yamllint", "--format", "parsable"),
+                tuple(
+                    repo_root / name for name in (".yamllint", ".yamllint.yaml", ".yamllint.yml")
+                ),
+                sharded=True,
+                failing=lambda line: "[error]" in line,
+            ),
+            _find_yaml_files(repo_root, listed),
+        ),
+    ]
+
+
+def _shards(files: list[str], jobs: int) -> list[list[str]]:
+    """Split *files* into at most *jobs* contiguous, near-equal shards."""
+    count = max(1, min(jobs, math.ceil(len(files) / _MIN_SHARD_FILES)))
+    size = math.ceil(len(files) / count)
+    return [files[i : i + size] for i in range(0, len(files), size)]
+
+
+def _scope(linter: _Linter, files: list[str], scoped: set[str]) -> list[str]:
+    """Narrow *files* to the changed ones in *scoped* unless the linter's config changed."""
+    if any(str(config) in scoped for config in linter.configs):
+        return files
+    return [path for path in files if path in scoped]
+
+
+def _plan(linter: _Linter, files: list[str], cache_dir: Path | None, jobs: int) -> _Check:
+    """Look *files* up in the lint cache and build steps for the rest."""
+    check = _Check(linter)
+    if cache_dir is not None:
+        version = lint_cache.tool_version(cache_dir, linter.name)
+        if version is not None:
+            config = lint_cache.config_digest(linter.configs)
+            check.cache = lint_cache.LintCache(cache_dir, linter.name, version, config)
+            check.recorded, files = check.cache.lookup(files)
+    if check.recorded:
+        print(f"{linter.name}: {len(check.recorded)} unchanged file(s) not relinted")
+    if not files:
+        return check
+    shards = _shards(files, jobs) if linter.sharded else [files]
+    for n, shard in enumerate(shards, start=1):
+        name = linter.name if len(shards) == 1 else f"{linter.name} {n}/{len(shards)}"
+        check.steps.append((scheduler.Step(name, (*linter.argv, *shard)), shard))
+    return check
+
+
+def _attribute(output: str, files: list[str]) -> dict[str, list[str]] | None:
+    """Group *output* lines by the file they start with; None if any line does not."""
+    by_file: dict[str, list[str]] = {path: [] for path in files}
+    for line in output.splitlines():
+        path = next((p for p in files if line.startswith(f"{p}:")), None)
+        if path is None:
+            if line.strip():
+                return None
+            continue
+        by_file[path].append(line)
+    return by_file
+
+
+def _settle(check: _Check, results: dict[str, scheduler.StepResult]) -> int:
+    """Record what this run learnt and return the check's exit code."""
+    rc = 0
+    learnt: dict[str, lint_cache.FileResult] = {}
+    for step, shard in check.steps:
+        result = results[step.name]
+        if not result.ok and rc == 0:
+            rc = result.returncode or 1
+        # Exit code 1 means "problems found"; anything else is a crash or a kill.
+        if result.returncode not in (0, 1):
+            continue
+        by_file = _attribute(result.output, shard)
+        if by_file is None:
+            continue
+        fails = {path: any(map(check.linter.failing, lines)) for path, lines in by_file.items()}
+        if not result.ok and not any(fails.values()):
+            continue  # failed, but not because of anything we can pin on a file
+        for path, lines in by_file.items():
+            learnt[path] = lint_cache.FileResult(fails[path] and not result.ok, tuple(lines))
+    if check.cache is not None and learnt:
+        check.cache.record(learnt)
+    if rc == 0 and any(r.failed for r in check.recorded.values()):
+        rc = 1
+    return rc
+
+
+def _replay(check: _Check) -> None:
+    for result in check.recorded.values():
+        for line in result.lines:
+            print(f"[{check.linter.name}, cached] {line}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the common checks: repo profile, markdownlint, shellcheck, yamllint.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Lint every file, ignoring results recorded for unchanged files",
+    )
+    parser.add_argument(
+        "--tracked-only",
+        action="store_true",
+        help="Check only files git tracks, not untracked ones",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    ctx = context.current()
+    jobs = os.cpu_count() or 1
+    cache_dir = None if args.no_cache else ctx.common_dir
+
+    changed = changed_files.from_env()
+    if changed is not None:
+        print(f"Scoped to {len(changed)} changed file(s).")
+
+    steps = []
+    if changed is None or changed & _PROFILE_INPUTS:
+        steps.append(
+            scheduler.Step(
+                "repo-profile",
+                (sys.executable, "-m", "standard_tooling.bin.repo_profile_cli"),
+                cwd=ctx.root,
+            )
         )
-        if result.returncode != 0:
-            return result.returncode
+    else:
+        print("repo-profile: standard-tooling.toml and README.md unchanged; skipped.")
+    listed = git.list_files(ctx.root, untracked=not args.tracked_only)
+    checks = []
+    for linter, files in _linters(ctx.root, listed):
+        if changed is not None:
+            files = _scope(linter, files, {str(ctx.root / rel) for rel in changed})
+        if files:
+            checks.append(_plan(linter, files, cache_dir, jobs))
+    for check in checks:
+        _replay(check)
+        steps.extend(step for step, _ in check.steps)
 
-    return 0
+    results = {
+        r.step.name: r for r in scheduler.run_steps(steps, jobs=jobs, fail_fast=False, ordered=True)
+    }
+    profile = results.get("repo-profile")
+    codes = [0 if profile is None or profile.ok else profile.returncode or 1]
+    codes.extend(_settle(check, results) for check in checks)
+    return next((rc for rc in codes if rc != 0), 0)
 
 
 if __name__ == "__main__":
@@ -3,20 +3,42 @@
 Delegates to the repository's ``scripts/dev/{lint,typecheck,test,audit}.sh``
 scripts.  A single module serves all four language variants — the language
 is determined from the entry point name or the ``--language`` argument.
+
+The scripts share the repository's build environment (``uv sync``'s
+virtualenv, ``target/`` and the like), so they run one at a time
+through ``lib/scheduler`` with each one's output printed as a prefixed
+block; running them side by side would race on that state. By default
+(``--keep-going``) every script runs even if another fails;
+``--fail-fast`` stops the rest at the first failure. ``--serial`` shows
+their output live instead.
+
+A table of each script's outcome, wall time and CPU time ends the run;
+``--report PATH`` also writes it as JSON for trending across CI runs.
+
+Under ``st-validate-local --changed-since`` (see ``lib/changed_files``)
+a script that contains the marker ``st-validate-local: accepts-files``
+is run from the repository root with the changed files as arguments,
+and skipped when nothing changed. Other scripts check the whole
+repository as usual.
 """
 
 from __future__ import annotations
 
 import argparse
+import datetime
+import json
 import os
-import subprocess
 import sys
+import time
 from pathlib import Path
 
-from standard_tooling.lib import git
+from standard_tooling.lib import changed_files, git, scheduler
 
 _SCRIPTS = ("lint.sh", "typecheck.sh", "test.sh", "audit.sh")
 
+# A script carrying this marker takes the changed files as arguments.
+_ACCEPTS_FILES_MARKER = b"st-validate-local: accepts-files"
+
 _ENTRY_POINT_LANGUAGES = {
     "st-validate-local-python": "python",
     "st-validate-local-rust": "rust",
@@ -39,7 +61,57 @@ def _detect_language(argv: list[str] | None) -> str:
     return str(_ENTRY_POINT_LANGUAGES.get(prog, ""))
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments; unknown arguments are ignored."""
+    parser = argparse.ArgumentParser(
+        description="Run the repository's scripts/dev lint, typecheck, test and audit scripts.",
+    )
+    parser.add_argument("--language", default="", help="Language (default: from entry point)")
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Show each script's output live instead of as a block (for debugging)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--fail-fast",
+        dest="fail_fast",
+        action="store_true",
+        help="Stop the remaining scripts at the first failure",
+    )
+    mode.add_argument(
+        "--keep-going",
+        dest="fail_fast",
+        action="store_false",
+        help="Run every script even after a failure (default)",
+    )
+    parser.add_argument("--report", type=Path, help="Write per-script timings as JSON")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+def _accepts_files(script: Path) -> bool:
+    """Return True if *script* declares that it takes file arguments."""
+    with script.open("rb") as handle:
+        return _ACCEPTS_FILES_MARKER in handle.read(4096)
+
+
+def _write_report(
+    path: Path, language: str, fail_fast: bool, wall: float, results: list[scheduler.StepResult]
+) -> None:
+    report = {
+        "language": language,
+        "mode": "fail-fast" if fail_fast else "keep-going",
+        "finished_at": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "wall_seconds": round(wall, 3),
+        "passed": all(result.ok for result in results),
+        "steps": [result.as_dict() for result in results],
+    }
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
 def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
     language = _detect_language(argv)
     if not language:
         print(
@@ -49,17 +121,29 @@ def main(argv: list[str] | None = None) -> int:
         return 1
 
     repo_root = git.repo_root()
-    failed = 0
-
+    changed = changed_files.from_env()
+    steps = []
     for script in _SCRIPTS:
         target = repo_root / "scripts" / "dev" / script
-        if target.is_file() and os.access(target, os.X_OK):
-            print(f"Running: scripts/dev/{script}")
-            result = subprocess.run((str(target),), check=False)  # noqa: S603
-            if result.returncode != 0:
-                failed = 1
-
-    return failed
+        if not (target.is_file() and os.access(target, os.X_OK)):
+            continue
+        name = f"scripts/dev/{script}"
+        if changed is None or not _accepts_files(target):
+            steps.append(scheduler.Step(name, (str(target),)))
+        elif changed:
+            steps.append(scheduler.Step(name, (str(target), *sorted(changed)), cwd=repo_root))
+        else:
+            print(f"{name}: no changed files; skipped.")
+
+    start = time.monotonic()
+    results = scheduler.run_steps(steps, jobs=1, serial=args.serial, fail_fast=args.fail_fast)
+    wall = time.monotonic() - start
+    if results:
+        print()
+        scheduler.print_summary(results)
+    if args.report is not None:
+        _write_report(args.report, language, args.fail_fast, wall, results)
+    return 0 if all(result.ok for result in results) else 1
 
 
 if __name__ == "__main__":
@@ -25,7 +25,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv)
     print(f"Waiting for checks to pass on {args.pr}...")
-    github.wait_for_checks(args.pr)
+    github.wait_for_checks(args.pr, on_transition=github.print_transition)
     print("All checks passed.")
     return 0
 
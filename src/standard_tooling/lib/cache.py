@@ -0,0 +1,87 @@
+"""Small on-disk TTL cache for answers fetched from GitHub and past results.
+
+Each named cache is one JSON file under ``$XDG_CACHE_HOME/standard-tooling``
+(``~/.cache/standard-tooling`` by default) mapping string keys to JSON
+values with an absolute expiry time. Reads need nothing beyond ``json``,
+so a hit costs no subprocess and no network. Writes replace the file
+atomically; concurrent writers may drop each other's newest entry, which
+only costs a refetch. An unreadable or corrupt file reads as empty.
+A cache built with ``max_entries`` evicts its oldest entries beyond
+that count on every write. ``get_many`` and ``put_many`` read or write
+many entries for the cost of one.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+
+def cache_dir() -> Path:
+    """Return the directory holding standard-tooling's cache files."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "standard-tooling"
+
+
+class TtlCache:
+    """A named JSON file of expiring entries."""
+
+    def __init__(
+        self, name: str, directory: Path | None = None, *, max_entries: int | None = None
+    ) -> None:
+        self.path = (directory or cache_dir()) / f"{name}.json"
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Any:
+        """Return the live value stored under *key*, or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Return the live values stored under any of *keys*, by key."""
+        now = time.time()
+        stored = self._load()
+        found: dict[str, Any] = {}
+        for key in keys:
+            entry = stored.get(key)
+            if isinstance(entry, dict) and entry.get("expires", 0) > now:
+                found[key] = entry.get("value")
+        return found
+
+    def put(self, key: str, value: object, ttl: float) -> None:
+        """Store *value* under *key* for *ttl* seconds; expired entries are dropped."""
+        self.put_many({key: value}, ttl)
+
+    def put_many(self, values: Mapping[str, object], ttl: float) -> None:
+        """Store each of *values* under its key for *ttl* seconds, in one write."""
+        now = time.time()
+        entries = {
+            k: v
+            for k, v in self._load().items()
+            if isinstance(v, dict) and v.get("expires", 0) > now
+        }
+        for key, value in values.items():
+            entries[key] = {"value": value, "expires": now + ttl, "stored": now}
+        if self.max_entries is not None and len(entries) > self.max_entries:
+            # Oldest writes go first; entries from before "stored" count as oldest.
+            newest = sorted(entries, key=lambda k: entries[k].get("stored", 0))
+            entries = {k: entries[k] for k in newest[-self.max_entries :]}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(entries), encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
@@ -0,0 +1,42 @@
+"""Hand the changed-file set of ``st-validate-local --changed-since`` to validators.
+
+``st-validate-local`` computes the set once (see ``git.changed_files``)
+and writes it, NUL-separated and relative to the repository root, to a
+temporary file named by ``ST_CHANGED_FILES`` in each validator's
+environment. Validators that can narrow their work read it with
+:func:`from_env`; the rest ignore it and check the whole repository.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+ENV_VAR = "ST_CHANGED_FILES"
+
+
+@contextlib.contextmanager
+def exported(files: Sequence[str]) -> Iterator[dict[str, str]]:
+    """Write *files* to a temporary list; yield the environment naming it."""
+    fd, name = tempfile.mkstemp(prefix="st-changed-files-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write("\0".join(files).encode("utf-8", errors="surrogateescape"))
+        yield {ENV_VAR: name}
+    finally:
+        Path(name).unlink(missing_ok=True)
+
+
+def from_env() -> frozenset[str] | None:
+    """Return the changed files named by ``ST_CHANGED_FILES``, or None if unset."""
+    name = os.environ.get(ENV_VAR)
+    if not name:
+        return None
+    raw = Path(name).read_bytes().decode("utf-8", errors="surrogateescape")
+    return frozenset(path for path in raw.split("\0") if path)
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import os
 import re
-import tomllib
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
@@ -54,6 +53,8 @@ class StConfig:
 
 def read_config(repo_root: Path) -> StConfig:
     """Parse, validate, and return ``standard-tooling.toml``."""
+    import tomllib
+
     config_path = repo_root / CONFIG_FILE
     if not config_path.is_file():
         msg = f"{CONFIG_FILE} not found at {repo_root}"
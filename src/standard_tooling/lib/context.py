@@ -0,0 +1,74 @@
+"""Per-process snapshot of the repository an st-* tool is running in."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from standard_tooling.lib import git
+from standard_tooling.lib.config import StConfig, read_config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@dataclass(frozen=True)
+class RepoContext:
+    """Repository facts every st-* entry point needs, gathered once.
+
+    ``config`` is parsed on first access and raises exactly what
+    :func:`read_config` raises, so callers keep their existing
+    ``FileNotFoundError`` / ``ConfigError`` handling.
+    """
+
+    root: Path
+    git_dir: Path
+    common_dir: Path
+    branch: str
+    head_sha: str | None
+
+    @property
+    def is_main_worktree(self) -> bool:
+        """True when the git-dir is the common dir (see ``git.is_main_worktree``)."""
+        return self.git_dir == self.common_dir
+
+    @property
+    def main_worktree_root(self) -> Path:
+        """Root directory of the main worktree."""
+        return self.common_dir.parent
+
+    @cached_property
+    def config(self) -> StConfig:
+        """The parsed ``standard-tooling.toml`` at :attr:`root`."""
+        return read_config(self.root)
+
+
+_current: RepoContext | None = None
+
+
+def current() -> RepoContext:
+    """Return the process-wide snapshot, capturing it on first use.
+
+    Capturing costs one batched ``rev-parse`` for the layout, one for the
+    branch, and one ``cat-file`` lookup for HEAD (all via the git session).
+    """
+    global _current
+    if _current is None:
+        session = git.session()
+        layout = session.layout()
+        _current = RepoContext(
+            root=layout.toplevel,
+            git_dir=layout.git_dir,
+            common_dir=layout.common_dir,
+            branch=session.branch(),
+            head_sha=session.resolve("HEAD"),
+        )
+    return _current
+
+
+def invalidate() -> None:
+    """Drop the snapshot; call after a mutating operation such as ``checkout``."""
+    global _current
+    _current = None
+    git.invalidate()
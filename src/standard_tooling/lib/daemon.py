@@ -0,0 +1,164 @@
+"""Long-running server behind :mod:`standard_tooling.lib.daemon_client`.
+
+Opt-in via ``ST_DAEMON=1``. The client spawns one daemon per repository
+(socket in the common git dir) and every later ``st-check-pr-merge`` /
+``st-commit`` call is served by this already-warm process instead of a
+fresh interpreter. The daemon exits after ``ST_DAEMON_IDLE_SECS``
+(default 600) without a request.
+
+Each request is served in a child forked from the daemon, so a long
+``st-commit`` (hooks, validation) does not hold up the
+``st-check-pr-merge`` calls made meanwhile, and no request can leak
+working directory, environment or descriptors into the next. The child
+adopts the caller's stdio descriptors, working directory, environment
+and argv and runs the tool's ``main``. The git session and repo snapshot
+are recaptured per request (from disk, without spawning git) because the
+user may have switched branches or committed between calls; what the
+fork inherits is the imported package.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from typing import TYPE_CHECKING
+
+from standard_tooling.bin import check_pr_merge, commit
+from standard_tooling.lib import context, git
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+IDLE_ENV_VAR = "ST_DAEMON_IDLE_SECS"
+DEFAULT_IDLE_SECS = 600.0
+
+_TOOLS: dict[str, Callable[[list[str] | None], int]] = {
+    "check-pr-merge": check_pr_merge.main,
+    "commit": commit.main,
+}
+
+
+class _Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    idle = False
+
+    def handle_timeout(self) -> None:
+        super().handle_timeout()
+        self.idle = True
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    request: socket.socket
+
+    def handle(self) -> None:
+        _, fds, _, _ = socket.recv_fds(self.request, 1, 3)
+        try:
+            line = self.request.makefile("rb").readline()
+            if len(fds) != 3 or not line:
+                return
+            rc = serve_request(json.loads(line), fds)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        self.request.sendall(json.dumps({"rc": rc}).encode() + b"\n")
+
+
+def serve_request(request: dict[str, object], fds: list[int]) -> int:
+    """Run one forwarded tool call with the caller's stdio *fds*."""
+    tool = _TOOLS.get(str(request["tool"]))
+    argv = [str(a) for a in request["argv"]]  # type: ignore[attr-defined]
+    env = {str(k): str(v) for k, v in request["env"].items()}  # type: ignore[attr-defined]
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = [os.dup(n) for n in range(3)]
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()  # noqa: PTH109
+    saved_argv = sys.argv
+    try:
+        for n, fd in enumerate(fds):
+            os.dup2(fd, n)
+        os.chdir(str(request["cwd"]))
+        os.environ.clear()
+        os.environ.update(env)
+        sys.argv = [str(request["prog"]), *argv]
+        git.close_session()
+        context.invalidate()
+        if tool is None:
+            print(f"ERROR: st daemon does not serve {request['tool']!r}.", file=sys.stderr)
+            return 2
+        return _call(tool, argv)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for n, fd in enumerate(saved_fds):
+            os.dup2(fd, n)
+            os.close(fd)
+        sys.argv = saved_argv
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+
+
+def _call(tool: Callable[[list[str] | None], int], argv: list[str]) -> int:
+    try:
+        return tool(argv)
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        print(exc.code, file=sys.stderr)
+        return 1
+    except Exception:  # noqa: BLE001
+        traceback.print_exc()
+        return 1
+
+
+def serve(path: str, idle_timeout: float = DEFAULT_IDLE_SECS) -> None:
+    """Serve requests on *path* until idle for *idle_timeout* seconds.
+
+    Returns immediately when another daemon already answers on *path*.
+    The socket is created owner-only: the daemon runs commands with
+    whatever environment a client hands it.
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            pass
+        else:
+            return
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)  # noqa: PTH108
+
+    old_umask = os.umask(0o177)
+    try:
+        server = _Server(path, _Handler)
+    finally:
+        os.umask(old_umask)
+    with server:
+        server.timeout = idle_timeout
+        while not server.idle:
+            server.handle_request()
+            server.collect_children()
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)  # noqa: PTH108
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        print("usage: python -m standard_tooling.lib.daemon SOCKET", file=sys.stderr)
+        return 2
+    sys.stdout.reconfigure(line_buffering=True)  # type: ignore[union-attr]
+    sys.stderr.reconfigure(line_buffering=True)  # type: ignore[union-attr]
+    serve(args[0], float(os.environ.get(IDLE_ENV_VAR, DEFAULT_IDLE_SECS)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Thin client for the optional st daemon.
+
+``st-check-pr-merge`` and ``st-commit`` run on every agent Bash call and
+every commit, so their console scripts enter here. With ``ST_DAEMON=1``
+the request is forwarded over a Unix domain socket to a long-running
+daemon (:mod:`standard_tooling.lib.daemon`) that already has the
+package imported; the daemon is spawned on first use and exits after
+sitting idle. The caller's stdin/stdout/stderr are handed to the daemon
+with ``SCM_RIGHTS``, so output — including from child ``git`` processes —
+lands exactly where it would have.
+
+Without ``ST_DAEMON=1``, or when the daemon cannot be reached or
+started, the tool runs in-process exactly as before.
+
+This module is imported on every invocation: it deliberately sticks to
+``os``/``sys`` at import time and finds the git directory with
+``os.path`` rather than importing :mod:`standard_tooling.lib.git`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import socket
+
+ENV_VAR = "ST_DAEMON"
+TOOLS = ("check-pr-merge", "commit")
+
+_SPAWN_WAIT_SECS = 3.0
+# sockaddr_un.sun_path is 108 bytes on Linux, 104 on macOS.
+_MAX_SOCKET_PATH = 100
+
+
+def check_pr_merge() -> int:
+    """Console-script entry point for ``st-check-pr-merge``."""
+    return _dispatch("check-pr-merge")
+
+
+def commit() -> int:
+    """Console-script entry point for ``st-commit``."""
+    return _dispatch("commit")
+
+
+def run_inline(tool: str, argv: list[str] | None = None) -> int:
+    """Run *tool* in this process."""
+    if tool == "commit":
+        from standard_tooling.bin.commit import main
+    else:
+        from standard_tooling.bin.check_pr_merge import main
+    return main(argv)
+
+
+def socket_path(start: str) -> str | None:
+    """Return the daemon socket for the repository containing *start*.
+
+    The socket lives in the repository's common git dir, so every
+    worktree shares one daemon. Its name carries a key derived from
+    this installation, so an upgraded package never talks to a daemon
+    still running the old code. Returns None outside a repository or
+    when the path would not fit in ``sockaddr_un``.
+    """
+    directory = start
+    while True:
+        marker = os.path.join(directory, ".git")
+        if os.path.isdir(marker) or os.path.isfile(marker):
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+    git_dir = marker
+    if os.path.isfile(marker):
+        with open(marker, encoding="utf-8") as f:
+            content = f.read().strip()
+        if not content.startswith("gitdir:"):
+            return None
+        git_dir = os.path.join(directory, content.removeprefix("gitdir:").strip())
+    commondir = os.path.join(git_dir, "commondir")
+    if os.path.isfile(commondir):
+        with open(commondir, encoding="utf-8") as f:
+            git_dir = os.path.join(git_dir, f.read().strip())
+
+    path = os.path.join(os.path.realpath(git_dir), f"st-daemon-{_install_key()}.sock")
+    return path if len(path.encode()) <= _MAX_SOCKET_PATH else None
+
+
+def _install_key() -> str:
+    import zlib
+
+    stamp = f"{os.path.dirname(__file__)}:{os.stat(__file__).st_mtime_ns}"
+    return format(zlib.crc32(stamp.encode()), "08x")
+
+
+def _dispatch(tool: str) -> int:
+    if os.environ.get(ENV_VAR) == "1":
+        rc = _via_daemon(tool, sys.argv[1:])
+        if rc is not None:
+            return rc
+    return run_inline(tool)
+
+
+def _via_daemon(tool: str, argv: list[str]) -> int | None:
+    """Forward the call to the daemon; None when it cannot be reached."""
+    import json
+    import socket
+
+    path = socket_path(os.getcwd())
+    if path is None:
+        return None
+    sock = _connect(path)
+    if sock is None:
+        _spawn(path)
+        sock = _connect(path, wait=_SPAWN_WAIT_SECS)
+        if sock is None:
+            return None
+
+    request = {
+        "tool": tool,
+        "argv": argv,
+        "prog": os.path.basename(sys.argv[0]),
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+    }
+    with sock:
+        socket.send_fds(sock, [b"\0"], [0, 1, 2])
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        reply = sock.makefile("rb").readline()
+    if not reply:
+        # The request was delivered, so re-running it in-process could
+        # repeat its side effects (a commit). Report instead.
+        print("ERROR: st daemon closed the connection mid-request.", file=sys.stderr)
+        return 1
+    rc: int = json.loads(reply)["rc"]
+    return rc
+
+
+def _connect(path: str, *, wait: float = 0.0) -> socket.socket | None:
+    import socket
+    import time
+
+    deadline = time.monotonic() + wait
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+        else:
+            return sock
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.02)
+
+
+def _spawn(path: str) -> None:
+    import contextlib
+    import subprocess
+
+    with contextlib.suppress(OSError):
+        subprocess.Popen(  # noqa: S603
+            (sys.executable, "-m", "standard_tooling.lib.daemon", path),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
@@ -1,11 +1,31 @@
-"""Shared Docker container logic for st-docker-* commands."""
+"""Shared Docker container logic for st-docker-* commands.
+
+The daemon check and image listing, inspection and removal go through the
+Engine API client in :mod:`standard_tooling.lib.docker_api` when the
+daemon's local socket is available, and through the ``docker`` CLI
+otherwise. If the socket cannot be reached the process falls back to
+the CLI for good.
+"""
 
 from __future__ import annotations
 
 import os
+import re
 import subprocess
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from standard_tooling.lib.git import gitdir_pointer
+from standard_tooling.lib.http_pool import ClientSlot
+from standard_tooling.lib.image_index import parse_size
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from standard_tooling.lib.docker_api import Client, Image
 
 _GHCR = "ghcr.io/wphillipmoore"
 
@@ -28,6 +48,30 @@ _DEFAULT_TEST_COMMANDS: dict[str, str] = {
 _FALLBACK_IMAGE = f"{_GHCR}/dev-base:latest"
 
 
+def _load_engine() -> Client | None:
+    from standard_tooling.lib.docker_api import Client
+
+    return Client.from_env()
+
+
+_engine: ClientSlot[Client] = ClientSlot(_load_engine)
+
+
+def engine() -> Client | None:
+    """Return the process-wide Engine API client, or None to use the CLI."""
+    return _engine.get()
+
+
+def reset_engine() -> None:
+    """Close the API client; the next call rebuilds it from the environment."""
+    _engine.reset()
+
+
+def _engine_unreachable() -> None:
+    """Drop the API client after a connection failure; the CLI takes over."""
+    _engine.unreachable()
+
+
 def detect_language(repo_root: Path) -> str:
     """Detect the project language from repo contents."""
     if (repo_root / "Gemfile").is_file():
@@ -55,6 +99,11 @@ def default_image(lang: str, *, fallback: bool = False) -> str:
     return image
 
 
+def default_images() -> list[str]:
+    """Return every default dev image, the dev-base fallback included."""
+    return [*_DEFAULT_IMAGES.values(), _FALLBACK_IMAGE]
+
+
 def worktree_parent_gitdir(repo_root: Path) -> Path | None:
     """Return the parent repo's ``.git`` directory if *repo_root* is a worktree.
 
@@ -71,14 +120,8 @@ def worktree_parent_gitdir(repo_root: Path) -> Path | None:
     marker = repo_root / ".git"
     if not marker.is_file():
         return None
-    try:
-        content = marker.read_text(encoding="utf-8").strip()
-    except OSError:
-        return None
-    if not content.startswith("gitdir:"):
-        return None
-    gitdir = Path(content.removeprefix("gitdir:").strip())
-    if gitdir.parent.name != "worktrees":
+    gitdir = gitdir_pointer(marker)
+    if gitdir is None or gitdir.parent.name != "worktrees":
         return None
     return gitdir.parent.parent
 
@@ -145,6 +188,16 @@ def build_docker_args(
 
 def assert_docker_available() -> None:
     """Exit with an error if the Docker daemon is not reachable."""
+    client = engine()
+    if client is not None:
+        try:
+            client.ping()
+        except OSError:
+            _engine_unreachable()
+        except subprocess.CalledProcessError:
+            _docker_unavailable()
+        else:
+            return
     try:
         result = subprocess.run(
             ["docker", "version"],  # noqa: S603, S607
@@ -164,3 +217,111 @@ def _docker_unavailable() -> None:
         file=sys.stderr,
     )
     sys.exit(1)
+
+
+def _parse_created(text: str, default: float) -> float:
+    """Parse ``docker images`` ``CreatedAt`` (``2026-01-02 15:04:05 +0000 UTC``)."""
+    try:
+        return datetime.strptime(text[:25], "%Y-%m-%d %H:%M:%S %z").timestamp()
+    except ValueError:
+        return default
+
+
+def list_images(reference: str | None = None, *, shared_size: bool = False) -> list[Image] | None:
+    """Return local tagged images, one per tag, or None if Docker cannot list them.
+
+    *reference* (``repo:tag-prefix*``) narrows the list on the daemon's
+    side. *shared_size* asks the API for each image's shared size (see
+    :meth:`docker_api.Client.images`); the CLI cannot report it. Over the
+    CLI, creation times and sizes are parsed from its human-readable
+    columns; unparsable ones read as now and 0.
+    """
+    client = engine()
+    if client is not None:
+        try:
+            return client.images(reference, shared_size=shared_size)
+        except OSError:
+            _engine_unreachable()
+        except subprocess.CalledProcessError:
+            return None
+    cmd = ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}\t{{.CreatedAt}}\t{{.Size}}"]
+    if reference:
+        cmd += ["--filter", f"reference={reference}"]
+    result = subprocess.run(cmd, capture_output=True, text=True)  # noqa: S603
+    if result.returncode != 0:
+        return None
+    from standard_tooling.lib.docker_api import Image
+
+    now = time.time()
+    images = []
+    for line in (result.stdout or "").splitlines():
+        ref, _, rest = line.partition("\t")
+        created, _, size = rest.partition("\t")
+        try:
+            size_bytes = parse_size(size)
+        except ValueError:
+            size_bytes = 0
+        images.append(Image(ref, _parse_created(created, now), size_bytes))
+    return images
+
+
+def image_id(ref: str) -> str | None:
+    """Return the content ID of local image *ref*, or None if it is not present."""
+    client = engine()
+    if client is not None:
+        try:
+            return client.image_id(ref)
+        except OSError:
+            _engine_unreachable()
+        except subprocess.CalledProcessError:
+            return None
+    result = subprocess.run(  # noqa: S603
+        ["docker", "image", "inspect", "--format", "{{.Id}}", ref],  # noqa: S607
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return (result.stdout or "").strip() or None
+
+
+def remove_images(refs: Sequence[str]) -> dict[str, str]:
+    """Remove (untag) each of *refs*; return the error for each that could not be.
+
+    Over the API the removals share one connection; the CLI gets all of
+    them in a single ``docker rmi``.
+    """
+    errors: dict[str, str] = {}
+    pending = list(refs)
+    client = engine()
+    while client is not None and pending:
+        ref = pending[0]
+        try:
+            client.remove_image(ref)
+        except OSError:
+            _engine_unreachable()
+            break
+        except subprocess.CalledProcessError as exc:
+            errors[ref] = str(exc.stderr)
+        pending.pop(0)
+    if not pending:
+        return errors
+    result = subprocess.run(  # noqa: S603
+        ["docker", "rmi", *pending],  # noqa: S607
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        stderr = (result.stderr or "").strip()
+        # The CLI reports each failure on its own line; refs it does not name were removed.
+        failed = {ref: _line_naming(ref, stderr) for ref in pending}
+        if not any(failed.values()):
+            failed = dict.fromkeys(pending, stderr or "docker rmi failed")
+        errors.update({ref: msg for ref, msg in failed.items() if msg})
+    return errors
+
+
+def _line_naming(ref: str, text: str) -> str:
+    """Return the first line of *text* that names image *ref* exactly, or ``""``."""
+    pattern = re.compile(rf"{re.escape(ref)}(?![\w.:/-])")
+    return next((line for line in text.splitlines() if pattern.search(line)), "")
@@ -0,0 +1,169 @@
+"""Native Docker Engine API client over the daemon's Unix socket.
+
+Every ``docker`` call starts the CLI, reads its config and opens a new
+connection to the daemon. :class:`Client` speaks the Engine API
+directly with :mod:`http.client` over the socket, reusing keep-alive
+connections between calls through a
+:class:`~standard_tooling.lib.http_pool.ConnectionPool`. :mod:`standard_tooling.lib.docker` hands it
+out for the daemon check and image listing, inspection and removal, and the
+callers fall back to the CLI when there is no local socket or the
+daemon cannot be reached through it.
+
+Only a local Unix socket is used: when ``DOCKER_HOST`` names anything
+else, or ``DOCKER_CONTEXT`` selects a context, the CLI resolves the
+daemon as the user configured it. ``ST_DOCKER_API=0`` turns the client
+off. Error responses surface as ``subprocess.CalledProcessError`` with
+the daemon's message in ``stderr``, as the CLI's failures would.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+import subprocess
+import urllib.parse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from standard_tooling.lib.http_pool import ConnectionPool
+
+ENV_HOST = "DOCKER_HOST"
+ENV_CONTEXT = "DOCKER_CONTEXT"
+ENV_DISABLE = "ST_DOCKER_API"
+
+_DEFAULT_SOCKET = "/var/run/docker.sock"
+_TIMEOUT_SECS = 60.0
+
+
+@dataclass(frozen=True)
+class Image:
+    """One tagged local image: *created* is epoch seconds, *size* is bytes.
+
+    *shared_size* is the part of *size* in layers other images also use,
+    or None where it is unknown.
+    """
+
+    ref: str
+    created: float
+    size: int
+    shared_size: int | None = None
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self._path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class Client:
+    """Engine API client sharing a pool of keep-alive socket connections."""
+
+    def __init__(self, socket_path: str, *, timeout: float = _TIMEOUT_SECS) -> None:
+        self.socket_path = socket_path
+        self._timeout = timeout
+        self._pool = ConnectionPool(self._connect)
+
+    @classmethod
+    def from_env(cls) -> Client | None:
+        """Build a client for the local daemon socket, or None to use the CLI."""
+        if os.environ.get(ENV_DISABLE) == "0" or os.environ.get(ENV_CONTEXT):
+            return None
+        host = os.environ.get(ENV_HOST) or f"unix://{_DEFAULT_SOCKET}"
+        if not host.startswith("unix://"):
+            return None
+        path = host.removeprefix("unix://")
+        return cls(path) if Path(path).exists() else None
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        self._pool.close()
+
+    # -- transport ------------------------------------------------------------
+
+    def _connect(self) -> http.client.HTTPConnection:
+        return _UnixConnection(self.socket_path, self._timeout)
+
+    def request(self, method: str, path: str, query: dict[str, str] | None = None) -> Any:
+        """Send one request and return its decoded JSON body (None if empty).
+
+        Raises ``CalledProcessError`` on an error status; connection
+        failures propagate as ``OSError``.
+        """
+        if query:
+            path = f"{path}?{urllib.parse.urlencode(query)}"
+        status, _, raw = self._pool.send(method, path, headers={"User-Agent": "standard-tooling"})
+
+        text = raw.decode("utf-8", errors="replace")
+        try:
+            data = json.loads(text) if text.strip() else None
+        except ValueError:
+            data = text  # /_ping answers with plain "OK"
+        if status >= 400:
+            message = data.get("message", text) if isinstance(data, dict) else text
+            raise subprocess.CalledProcessError(
+                1,
+                ("docker", "api", method, path),
+                output=text,
+                stderr=f"Error response from daemon: {message.strip()}",
+            )
+        return data
+
+    # -- API calls ------------------------------------------------------------
+
+    def ping(self) -> None:
+        """Raise unless the daemon answers."""
+        self.request("GET", "/_ping")
+
+    def images(self, reference: str | None = None, *, shared_size: bool = False) -> list[Image]:
+        """Return local tagged images, one per tag.
+
+        *reference* (``repo:tag-prefix*``) is matched by the daemon, as
+        ``docker images --filter reference=...`` does. With *shared_size*
+        the daemon also works out each image's shared size, as ``docker
+        system df -v`` does; daemons too old for that leave it None.
+        """
+        query = {}
+        if reference:
+            query["filters"] = json.dumps({"reference": [reference]})
+        if shared_size:
+            query["shared-size"] = "1"
+        images = []
+        for entry in self.request("GET", "/images/json", query or None) or []:
+            shared = int(entry.get("SharedSize", -1)) if shared_size else -1
+            for ref in entry.get("RepoTags") or []:
+                if ref != "<none>:<none>":
+                    images.append(
+                        Image(
+                            ref,
+                            float(entry["Created"]),
+                            int(entry["Size"]),
+                            shared if shared >= 0 else None,
+                        )
+                    )
+        return images
+
+    def image_id(self, ref: str) -> str:
+        """Return the content ID (``sha256:...``) of local image *ref*."""
+        return str(self.request("GET", f"{_image_path(ref)}/json")["Id"])
+
+    def remove_image(self, ref: str) -> None:
+        """Untag *ref*, deleting the image once no tag is left (``docker rmi``)."""
+        self.request("DELETE", _image_path(ref))
+
+
+def _image_path(ref: str) -> str:
+    # The daemon routes /images/{name:.*}, so the name's slashes stay as they are.
+    return f"/images/{urllib.parse.quote(ref, safe='/:@')}"
@@ -1,16 +1,57 @@
-"""Per-branch Docker image caching with standard-tooling pre-installed."""
+"""Docker image caching with standard-tooling pre-installed.
+
+A cached image is keyed by what goes into it, not by the branch that
+asked for it: the repository's dependency lockfiles, the base image's
+content ID and the standard-tooling install tag (see :func:`cache_key`).
+Branches with the same dependencies share one image, so a new branch
+off ``develop`` starts with a hit.
+
+Images are built with BuildKit from a generated Dockerfile (see
+:func:`_dockerfile`) that keeps the dependency warmup and the
+standard-tooling install in separate layers, so a rebuild after either
+changes reuses the other from the build cache.
+
+Every cached tag handed out, built or pulled is stamped in the local
+:class:`~standard_tooling.lib.image_index.ImageIndex` under the
+branch's alias. Deleting a branch drops only its alias;
+:func:`collect_garbage` evicts images, least recently used first.
+
+Cached images live in the local daemon. Setting ``ST_DOCKER_CACHE_REGISTRY``
+to a registry repository prefix (``ghcr.io/acme/st-cache``, or
+``localhost:5000/st-cache`` for a local ``registry:2``) adds a shared
+tier: on a local miss the image for the current content key is pulled
+from there before falling back to a build, and a freshly built image is
+pushed there so other machines can pull it. ``ST_DOCKER_CACHE_PUSH=0``
+keeps the tier pull-only, for machines without push credentials.
+Registry failures never fail the caller; they fall back to building, or
+leave the image local.
+"""
 
 from __future__ import annotations
 
-import hashlib
+import os
 import re
 import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
 from typing import TYPE_CHECKING
 
-from standard_tooling.lib.config import st_install_tag
+from standard_tooling.lib.config import ConfigError, st_install_tag
+from standard_tooling.lib.docker import (
+    default_images,
+    image_id,
+    list_images,
+    remove_images,
+    worktree_parent_gitdir,
+)
+from standard_tooling.lib.image_index import ImageIndex, ImageRecord
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from collections.abc import Mapping
+
+    from standard_tooling.lib.docker_api import Image
 
 _ST_GIT_URL = "https://github.com/wphillipmoore/standard-tooling"
 
@@ -23,6 +64,19 @@ _CACHE_FILES: dict[str, list[str]] = {
 }
 _DEFAULT_CACHE_FILES = ["standard-tooling.toml"]
 
+# Where the install stage puts standard-tooling, its venv and any Python uv fetches.
+_TOOLING_DIR = "/opt/standard-tooling"
+# Left out of the build context: the warmup never reads them, and leaving
+# standard-tooling.toml out keeps an install-tag bump from invalidating the
+# warmup layer.
+_CONTEXT_EXCLUDES = (".git", ".venv", "target", "node_modules", "standard-tooling.toml")
+
+# A cached image's tag: the base image's tag, then the cache hash (see cache_image_tag).
+_CACHED_TAG_RE = re.compile(r".+--[0-9a-f]{8}")
+
+ENV_REGISTRY = "ST_DOCKER_CACHE_REGISTRY"
+ENV_PUSH = "ST_DOCKER_CACHE_PUSH"
+
 _WARMUP_COMMANDS: dict[str, str] = {
     "python": "uv sync --group dev",
     "ruby": "bundle install --jobs 4",
@@ -31,6 +85,13 @@ _WARMUP_COMMANDS: dict[str, str] = {
     "java": "./mvnw dependency:resolve",
 }
 
+# Image environment for warmups whose build output would otherwise land in
+# the bind-mounted /workspace and be discarded with it. Set with ENV so the
+# containers later run from the image build into the same warmed directory.
+_WARMUP_ENV: dict[str, dict[str, str]] = {
+    "rust": {"CARGO_TARGET_DIR": "/opt/cache/target"},
+}
+
 
 def cache_sensitive_files(repo_root: Path, lang: str) -> list[Path]:
     """Return paths of cache-sensitive files that exist in *repo_root*."""
@@ -40,6 +101,8 @@ def cache_sensitive_files(repo_root: Path, lang: str) -> list[Path]:
 
 def compute_cache_hash(files: list[Path], *, salt: str = "") -> str:
     """SHA-256 over sorted file contents plus optional salt, first 8 hex chars."""
+    import hashlib
+
     h = hashlib.sha256()
     for f in sorted(files):
         h.update(f.read_bytes())
@@ -48,41 +111,167 @@ def compute_cache_hash(files: list[Path], *, salt: str = "") -> str:
     return h.hexdigest()[:8]
 
 
-def _sanitize_branch(branch: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9._-]", "-", branch)
+def _repo_name(repo_root: Path) -> str:
+    """Return the repository's name, the same from any of its worktrees."""
+    parent_gitdir = worktree_parent_gitdir(repo_root)
+    return parent_gitdir.parent.name if parent_gitdir is not None else repo_root.name
+
+
+def branch_alias(repo_root: Path, branch: str) -> str:
+    """Return the index alias for *branch* of the repository at *repo_root*."""
+    return f"{_repo_name(repo_root)}:{branch}"
+
+
+def _install_tag(repo_root: Path, lang: str) -> str:
+    """Return the standard-tooling tag the image installs ("" if none)."""
+    if lang == "python":
+        return ""  # installed from the dev group, so uv.lock covers it
+    try:
+        return st_install_tag(repo_root)
+    except (FileNotFoundError, ConfigError, KeyError):
+        return ""
+
+
+def cache_key(repo_root: Path, lang: str, base_id: str) -> str:
+    """Return the content key for a cached image of the repo at *repo_root*.
+
+    Covers the dependency lockfiles, the base image's content ID
+    *base_id* and the standard-tooling install tag, salted with the
+    repository name since some warmups build the repo's own code.
+    ``standard-tooling.toml`` counts only through its install tag.
+    """
+    files = [f for f in cache_sensitive_files(repo_root, lang) if f.name != "standard-tooling.toml"]
+    salt = "\n".join([_repo_name(repo_root), base_id, _install_tag(repo_root, lang)])
+    return compute_cache_hash(files, salt=salt)
+
+
+def _base_image_id(base_image: str) -> str:
+    """Return *base_image*'s content ID, pulling it if needed ("" if unavailable)."""
+    found = image_id(base_image)
+    if found is None:
+        subprocess.run(  # noqa: S603
+            ["docker", "pull", "--quiet", base_image],  # noqa: S607
+            capture_output=True,
+        )
+        found = image_id(base_image)
+    return found or ""
 
 
-def cache_image_tag(base_image: str, branch: str, cache_hash: str) -> str:
+def cache_image_tag(base_image: str, cache_hash: str) -> str:
     """Construct the cached image tag."""
     base_tag = base_image.split(":")[-1] if ":" in base_image else "latest"
     base_repo = base_image.split(":")[0]
-    sanitized = _sanitize_branch(branch)
-    return f"{base_repo}:{base_tag}--{sanitized}--{cache_hash}"
+    return f"{base_repo}:{base_tag}--{cache_hash}"
 
 
-def find_cached_image(base_image: str, branch: str) -> tuple[str, str] | None:
-    """Find an existing cached image for *base_image* and *branch*.
+def cache_registry() -> str | None:
+    """Return the registry prefix for shared cache images, or None if unset."""
+    return os.environ.get(ENV_REGISTRY, "").strip().rstrip("/") or None
 
-    Returns ``(full_tag, hash_suffix)`` or ``None``.
-    """
-    sanitized = _sanitize_branch(branch)
+
+def registry_image_tag(registry: str, base_image: str, cache_hash: str) -> str:
+    """Construct the shared registry tag for *base_image* at *cache_hash*."""
     base_tag = base_image.split(":")[-1] if ":" in base_image else "latest"
-    base_repo = base_image.split(":")[0]
-    pattern = f"{base_repo}:{base_tag}--{sanitized}--"
+    base_name = base_image.split(":")[0].rsplit("/", 1)[-1]
+    return f"{registry}/{base_name}:{base_tag}--{cache_hash}"
 
-    result = subprocess.run(  # noqa: S603
-        ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],  # noqa: S607
+
+def _pull_cached_image(remote_tag: str, target_tag: str) -> bool:
+    """Pull *remote_tag* and retag it as *target_tag*; False if unavailable."""
+    print(f"Pulling cached image: {remote_tag}")
+    pulled = subprocess.run(  # noqa: S603
+        ["docker", "pull", "--quiet", remote_tag],  # noqa: S607
         capture_output=True,
         text=True,
     )
-    if result.returncode != 0 or not result.stdout:
+    if pulled.returncode != 0:
+        print(f"  Not in registry ({pulled.stderr.strip() or 'pull failed'}); building.")
+        return False
+    subprocess.run(  # noqa: S603
+        ["docker", "tag", remote_tag, target_tag],  # noqa: S607
+        capture_output=True,
+        check=True,
+    )
+    # Keep only the local name; the layers stay under target_tag.
+    remove_images([remote_tag])
+    print(f"Cached image ready: {target_tag}")
+    return True
+
+
+def _push_cached_image(target_tag: str, remote_tag: str) -> None:
+    """Push *target_tag* to the registry as *remote_tag*, warning on failure."""
+    print(f"Pushing cached image: {remote_tag}")
+    subprocess.run(  # noqa: S603
+        ["docker", "tag", target_tag, remote_tag],  # noqa: S607
+        capture_output=True,
+        check=True,
+    )
+    try:
+        pushed = subprocess.run(  # noqa: S603
+            ["docker", "push", "--quiet", remote_tag],  # noqa: S607
+            capture_output=True,
+            text=True,
+        )
+        if pushed.returncode != 0:
+            print(
+                f"WARNING: could not push {remote_tag}: {pushed.stderr.strip()}",
+                file=sys.stderr,
+            )
+    finally:
+        remove_images([remote_tag])
+
+
+def find_cached_image(base_image: str, alias: str) -> tuple[str, str] | None:
+    """Find the cached image of *base_image* that branch *alias* last used.
+
+    Returns ``(full_tag, cache_key)``, or ``None`` if there is none or it
+    has been removed.
+    """
+    record = ImageIndex().find(alias)
+    if record is None or not record.tag.startswith(cache_image_tag(base_image, "")):
         return None
+    if not list_images(record.tag):
+        return None
+    return (record.tag, record.cache_hash)
 
-    for line in result.stdout.splitlines():
-        if line.startswith(pattern):
-            tag_hash = line[len(pattern) :]
-            return (line, tag_hash)
-    return None
+
+def _dockerfile(lang: str, base_image: str, install_tag: str) -> str:
+    """Return the Dockerfile for a cached image of *base_image*.
+
+    The dependency warmup and the standard-tooling install are separate
+    layers. The install is built in its own stage and copied in with
+    ``COPY --link``, so it does not depend on the layer beneath it: a
+    lockfile change rebuilds only the warmup, and a new install tag only
+    the install. Build output a warmup would write under the bind-mounted
+    ``/workspace`` is redirected into the image (see ``_WARMUP_ENV``).
+    Python repos get standard-tooling from their dev group,
+    so they have no install stage.
+    """
+    warmup = _WARMUP_COMMANDS.get(lang)
+    install = lang != "python"
+    lines: list[str] = []
+    if install:
+        lines += [
+            f"FROM {base_image} AS tooling",
+            # uv's download cache only speeds up the install; keep it out of the image.
+            "RUN --mount=type=cache,id=st-uv,target=/root/.cache/uv,sharing=locked \\",
+            f"    UV_TOOL_DIR={_TOOLING_DIR}/tools UV_TOOL_BIN_DIR={_TOOLING_DIR}/bin \\",
+            f"    UV_PYTHON_INSTALL_DIR={_TOOLING_DIR}/python UV_LINK_MODE=copy \\",
+            f"    uv tool install --quiet 'standard-tooling @ git+{_ST_GIT_URL}@{install_tag}'",
+            "",
+        ]
+    lines += [f"FROM {base_image}", "WORKDIR /workspace"]
+    if warmup:
+        # The warmup sees the repo as the old bind mount did; its writes to
+        # /workspace are discarded, the caches it fills elsewhere are kept.
+        lines += [f'ENV {key}="{value}"' for key, value in _WARMUP_ENV.get(lang, {}).items()]
+        lines.append(f"RUN --mount=type=bind,target=/workspace,rw {warmup}")
+    if install:
+        lines += [
+            f"COPY --link --from=tooling {_TOOLING_DIR} {_TOOLING_DIR}",
+            f'ENV PATH="{_TOOLING_DIR}/bin:${{PATH}}"',
+        ]
+    return "\n".join(lines) + "\n"
 
 
 def _build_cached_image(
@@ -93,61 +282,27 @@ def _build_cached_image(
 ) -> str:
     """Build a cached image with standard-tooling installed."""
     tag = st_install_tag(repo_root)
-    uv_install = f"uv tool install --quiet 'standard-tooling @ git+{_ST_GIT_URL}@{tag}'"
     warmup = _WARMUP_COMMANDS.get(lang)
-    if lang == "python":
-        setup = warmup or ""
-    elif warmup:
-        setup = f"{uv_install} && {warmup}"
-    else:
-        setup = uv_install
 
     print(f"Building cached image: {target_tag}")
     print(f"  Base:    {base_image}")
-    print(f"  Install: standard-tooling@{tag}")
+    if lang != "python":
+        print(f"  Install: standard-tooling@{tag}")
     if warmup:
         print(f"  Warmup:  {warmup}")
 
-    cid_result = subprocess.run(  # noqa: S603
-        [  # noqa: S607
-            "docker",
-            "create",
-            "-v",
-            f"{repo_root}:/workspace",
-            "-w",
-            "/workspace",
-            base_image,
-            "bash",
-            "-c",
-            setup,
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if cid_result.returncode != 0:
-        msg = f"Failed to create container: {cid_result.stderr.strip()}"
-        raise RuntimeError(msg)
-
-    container_id = cid_result.stdout.strip()
-
-    try:
-        run_result = subprocess.run(  # noqa: S603
-            ["docker", "start", "-a", container_id],  # noqa: S607
-        )
-        if run_result.returncode != 0:
-            msg = "Cache build failed"
-            raise RuntimeError(msg)
-
-        subprocess.run(  # noqa: S603
-            ["docker", "commit", container_id, target_tag],  # noqa: S607
-            capture_output=True,
-            check=True,
-        )
-    finally:
-        subprocess.run(  # noqa: S603
-            ["docker", "rm", container_id],  # noqa: S607
-            capture_output=True,
+    with tempfile.TemporaryDirectory(prefix="st-docker-cache-") as tmp:
+        dockerfile = Path(tmp) / "Dockerfile"
+        dockerfile.write_text(_dockerfile(lang, base_image, tag))
+        # BuildKit reads <Dockerfile>.dockerignore beside a Dockerfile given with -f.
+        Path(f"{dockerfile}.dockerignore").write_text("\n".join(_CONTEXT_EXCLUDES) + "\n")
+        result = subprocess.run(  # noqa: S603
+            ["docker", "build", "--tag", target_tag, "--file", str(dockerfile), str(repo_root)],  # noqa: S607
+            env={**os.environ, "DOCKER_BUILDKIT": "1"},
         )
+    if result.returncode != 0:
+        msg = "Cache build failed"
+        raise RuntimeError(msg)
 
     print(f"Cached image ready: {target_tag}")
     return target_tag
@@ -162,49 +317,120 @@ def ensure_cached_image(
 
     Returns *base_image* unchanged if no cache-sensitive files are found.
     """
-    files = cache_sensitive_files(repo_root, lang)
-    if not files:
+    if not cache_sensitive_files(repo_root, lang):
         return base_image
 
     from standard_tooling.lib import git as _git
 
-    branch = _git.current_branch()
-    current_hash = compute_cache_hash(files, salt=repo_root.name)
-    existing = find_cached_image(base_image, branch)
+    alias = branch_alias(repo_root, _git.current_branch())
+    key = cache_key(repo_root, lang, _base_image_id(base_image))
+    target_tag = cache_image_tag(base_image, key)
+    index = ImageIndex()
 
-    if existing is not None:
-        existing_tag, existing_hash = existing
-        if existing_hash == current_hash:
-            return existing_tag
-        # Stale cache — remove it.
-        subprocess.run(  # noqa: S603
-            ["docker", "rmi", existing_tag],  # noqa: S607
-            capture_output=True,
-        )
+    # An image another branch built from the same inputs is as good as our own.
+    if list_images(target_tag):
+        index.touch(target_tag, cache_hash=key, alias=alias)
+        return target_tag
 
-    target_tag = cache_image_tag(base_image, branch, current_hash)
-    return _build_cached_image(repo_root, lang, base_image, target_tag)
+    registry = cache_registry()
+    if registry is None:
+        _build_cached_image(repo_root, lang, base_image, target_tag)
+    else:
+        remote_tag = registry_image_tag(registry, base_image, key)
+        if not _pull_cached_image(remote_tag, target_tag):
+            _build_cached_image(repo_root, lang, base_image, target_tag)
+            if os.environ.get(ENV_PUSH) != "0":
+                _push_cached_image(target_tag, remote_tag)
+    index.touch(target_tag, cache_hash=key, alias=alias)
+    return target_tag
 
 
-def clean_branch_images(branch: str) -> int:
-    """Remove all cached images for *branch*. Returns count removed."""
-    sanitized = _sanitize_branch(branch)
-    pattern = f"--{sanitized}--"
+def release_branch_image(repo_root: Path, branch: str) -> bool:
+    """Drop *branch*'s alias; its image stays for other branches until ``gc``.
 
-    result = subprocess.run(  # noqa: S603
-        ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],  # noqa: S607
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0 or not result.stdout:
-        return 0
-
-    removed = 0
-    for line in result.stdout.splitlines():
-        if pattern in line:
-            subprocess.run(  # noqa: S603
-                ["docker", "rmi", line],  # noqa: S607
-                capture_output=True,
-            )
-            removed += 1
+    Returns whether the branch had one.
+    """
+    return ImageIndex().drop_alias(branch_alias(repo_root, branch))
+
+
+def is_cached_tag(ref: str) -> bool:
+    """Return whether image reference *ref* names a cached image.
+
+    Only a default dev image's repository tagged with a cache hash
+    counts, so images of the user's own whose tags merely contain ``--``
+    are never collected.
+    """
+    repo, _, tag = ref.rpartition(":")
+    if repo not in {image.rpartition(":")[0] for image in default_images()}:
+        return False
+    return _CACHED_TAG_RE.fullmatch(tag) is not None
+
+
+def _unique_size(image: Image, sizes: Mapping[str, int]) -> int:
+    """Return the bytes removing cached *image* would free.
+
+    Cached images share their base image's layers, so adding up full
+    sizes would count those once per image. Where the daemon reports the
+    shared part it is left out; over the CLI the base image's size, from
+    *sizes* by ref, stands in for it.
+    """
+    if image.shared_size is not None:
+        return max(image.size - image.shared_size, 0)
+    base = image.ref.rsplit("--", 1)[0]
+    return max(image.size - sizes.get(base, 0), 0)
+
+
+def collect_garbage(
+    *, max_size: int | None, max_age: float | None, dry_run: bool = False
+) -> list[ImageRecord] | None:
+    """Remove cached images unused for *max_age* seconds, then LRU ones over *max_size* bytes.
+
+    Cached images the index does not know yet (built before it existed)
+    are adopted with their creation time as last use; other images are
+    left alone unless the index lists them (see :func:`is_cached_tag`). The budget
+    counts only what each image does not share with others (see
+    :func:`_unique_size`), which is what removing it frees. Returns the
+    removed images (those that would be, with *dry_run*), or None if
+    Docker cannot list images. Images Docker refuses to remove, say
+    because a container uses them, are reported and kept.
+    """
+    images = list_images(shared_size=True)
+    if images is None:
+        return None
+
+    sizes = {image.ref: image.size for image in images}
+    index = ImageIndex()
+    known = index.records()
+    now = time.time()
+    live: dict[str, ImageRecord] = {}
+    for image in images:
+        if image.ref not in known and not is_cached_tag(image.ref):
+            continue
+        record = known.get(image.ref)
+        if record is None:
+            cache_hash = image.ref.rsplit("--", 1)[-1]
+            record = ImageRecord(image.ref, cache_hash, image.created, image.created)
+        if image.size:  # an unknown size keeps the indexed one
+            record.size = _unique_size(image, sizes)
+        live[image.ref] = record
+
+    by_use = sorted(live.values(), key=lambda r: r.last_used)
+    evict = [r for r in by_use if max_age is not None and now - r.last_used > max_age]
+    total = sum(r.size for r in by_use if r not in evict)
+    for record in by_use:
+        if max_size is None or total <= max_size:
+            break
+        if record not in evict:
+            evict.append(record)
+            total -= record.size
+    if dry_run:
+        return evict
+
+    failed = remove_images([r.tag for r in evict])
+    for tag, error in failed.items():
+        print(f"WARNING: could not remove {tag}: {error}", file=sys.stderr)
+    removed = [r for r in evict if r.tag not in failed]
+    for record in removed:
+        del live[record.tag]
+    index.write(live)
     return removed
@@ -2,9 +2,19 @@
 
 from __future__ import annotations
 
+import atexit
+import contextlib
 import os
+import re
+import shutil
 import subprocess
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from typing import IO
 
 # Env-var contract with `.githooks/pre-commit`. Any internal caller
 # that runs `git commit` via this helper is by definition an
@@ -13,6 +23,333 @@ from pathlib import Path
 _GATE_ENV_VAR = "ST_COMMIT_CONTEXT"
 _GATE_ENABLED_VALUE = "1"
 
+_LAYOUT_ARGS = ("rev-parse", "--show-toplevel", "--absolute-git-dir", "--git-common-dir")
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Where the current worktree and its repository live on disk."""
+
+    toplevel: Path
+    git_dir: Path
+    common_dir: Path
+
+
+_OID_RE = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+_HEXISH_RE = re.compile(r"[0-9a-f]{4,64}")
+_PLAIN_REF_RE = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_./-]*")
+_PER_WORKTREE_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+_GIT_ENV_OVERRIDES = ("GIT_DIR", "GIT_WORK_TREE", "GIT_COMMON_DIR")
+_SYMREF_DEPTH = 5
+
+
+class _UnresolvableError(Exception):
+    """The on-disk layout holds something RefReader does not model."""
+
+
+def gitdir_pointer(marker: Path) -> Path | None:
+    """Return the git-dir a ``.git`` *file* points at, or None if unreadable.
+
+    Worktrees and submodules use a one-line ``gitdir: <path>`` file
+    instead of a ``.git`` directory; relative paths are relative to the
+    file's own directory.
+    """
+    try:
+        content = marker.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    return marker.parent / content.removeprefix("gitdir:").strip()
+
+
+class RefReader:
+    """Answer HEAD and ref lookups by reading the git directory directly.
+
+    Handles symbolic and detached HEAD, loose refs, ``packed-refs``
+    (parsed once per reader) and linked worktrees, whose ``commondir``
+    file points at the shared refs. Anything else — reftable storage,
+    revision expressions, abbreviated object ids, ambiguous short
+    names — raises ``_UnresolvableError`` so :class:`GitSession` can ask git.
+    """
+
+    def __init__(self, toplevel: Path, git_dir: Path, common_dir: Path) -> None:
+        self.toplevel = toplevel
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self._packed: dict[str, str] | None = None
+
+    @classmethod
+    def discover(cls, start: Path) -> RefReader | None:
+        """Find the repository containing *start*; None when git must be asked."""
+        if any(name in os.environ for name in _GIT_ENV_OVERRIDES):
+            return None
+        for directory in (start, *start.parents):
+            marker = directory / ".git"
+            if marker.is_dir():
+                git_dir: Path | None = marker
+            elif marker.is_file():
+                git_dir = gitdir_pointer(marker)
+            else:
+                continue
+            if git_dir is None or not (git_dir / "HEAD").is_file():
+                return None
+            common_dir = git_dir
+            commondir_file = git_dir / "commondir"
+            if commondir_file.is_file():
+                common_dir = git_dir / commondir_file.read_text(encoding="utf-8").strip()
+            if (common_dir / "reftable").exists():
+                return None
+            return cls(directory, git_dir.resolve(), common_dir.resolve())
+        return None
+
+    def branch(self) -> str:
+        """Return what ``git rev-parse --abbrev-ref HEAD`` would print."""
+        head = self._read(self.git_dir / "HEAD")
+        if _OID_RE.fullmatch(head):
+            return "HEAD"
+        target = head.removeprefix("ref: ")
+        if target == head or not target.startswith("refs/heads/"):
+            raise _UnresolvableError(head)
+        if self._ref(target) is None:
+            # Unborn branch: git reports the error in its own words.
+            raise _UnresolvableError(target)
+        name = target.removeprefix("refs/heads/")
+        shadows = (name, f"refs/{name}", f"refs/tags/{name}", f"refs/remotes/{name}")
+        if any(self._ref(ref) is not None for ref in shadows):
+            raise _UnresolvableError(name)
+        return name
+
+    def resolve(self, rev: str) -> str | None:
+        """Return the object id *rev* names, or None when no such ref exists."""
+        if (
+            not _PLAIN_REF_RE.fullmatch(rev)
+            or _HEXISH_RE.fullmatch(rev)
+            or ".." in rev
+            or rev.endswith((".", "/", ".lock"))
+        ):
+            raise _UnresolvableError(rev)
+        if rev == "HEAD" or rev.startswith("refs/"):
+            candidates: tuple[str, ...] = (rev,)
+        else:
+            # git's short-name rules (see git-rev-parse(1) "SPECIFYING REVISIONS").
+            candidates = (
+                rev,
+                f"refs/{rev}",
+                f"refs/tags/{rev}",
+                f"refs/heads/{rev}",
+                f"refs/remotes/{rev}",
+                f"refs/remotes/{rev}/HEAD",
+            )
+        for ref in candidates:
+            oid = self._ref(ref)
+            if oid is not None:
+                return oid
+        return None
+
+    def _ref(self, name: str, depth: int = 0) -> str | None:
+        if depth > _SYMREF_DEPTH:
+            raise _UnresolvableError(name)
+        per_worktree = "/" not in name or name.startswith(_PER_WORKTREE_PREFIXES)
+        loose = (self.git_dir if per_worktree else self.common_dir) / name
+        if not loose.is_file():
+            return self._packed_refs().get(name)
+        content = self._read(loose)
+        if _OID_RE.fullmatch(content):
+            return content
+        if content.startswith("ref: "):
+            return self._ref(content.removeprefix("ref: "), depth + 1)
+        raise _UnresolvableError(name)
+
+    def _packed_refs(self) -> dict[str, str]:
+        if self._packed is None:
+            self._packed = {}
+            packed = self.common_dir / "packed-refs"
+            if packed.is_file():
+                for line in packed.read_text(encoding="utf-8").splitlines():
+                    if line.startswith(("#", "^")):
+                        continue
+                    oid, _, name = line.partition(" ")
+                    self._packed[name] = oid
+        return self._packed
+
+    @staticmethod
+    def _read(path: Path) -> str:
+        try:
+            return path.read_text(encoding="utf-8").strip()
+        except OSError as exc:
+            raise _UnresolvableError(str(path)) from exc
+
+
+class GitSession:
+    """Serve read-only git queries without forking git once per query.
+
+    Layout, branch and ref lookups are first answered by a
+    :class:`RefReader` straight from the git directory, without spawning
+    anything. Whatever it cannot answer falls back to git: the layout
+    comes from a single batched ``git rev-parse``, and revision lookups
+    go through one long-lived ``git cat-file --batch-check`` process.
+    If that process cannot be started, or dies mid-session, each lookup
+    falls back to a plain ``git rev-parse --verify`` subprocess.
+
+    Answers are cached until :meth:`invalidate` — :func:`run` calls it
+    after every mutating command, so callers never see a stale branch
+    after a ``checkout``.
+    """
+
+    def __init__(self, cwd: Path | None = None) -> None:
+        self.cwd = cwd if cwd is not None else Path.cwd()
+        self._layout: Layout | None = None
+        self._branch: str | None = None
+        self._resolved: dict[str, str | None] = {}
+        self._batch: subprocess.Popen[str] | None = None
+        self._batch_broken = False
+        self._reader: RefReader | None = None
+        self._reader_checked = False
+
+    def __enter__(self) -> GitSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def layout(self) -> Layout:
+        """Return toplevel, git-dir and common-dir from one ``rev-parse``."""
+        reader = self._direct()
+        if self._layout is None and reader is not None:
+            self._layout = Layout(reader.toplevel, reader.git_dir, reader.common_dir)
+        if self._layout is None:
+            toplevel, git_dir, common_dir = read_output(*_LAYOUT_ARGS).splitlines()
+            self._layout = Layout(
+                toplevel=Path(toplevel),
+                git_dir=Path(git_dir).resolve(),
+                common_dir=(self.cwd / common_dir).resolve(),
+            )
+        return self._layout
+
+    def branch(self) -> str:
+        """Return the current branch name (``HEAD`` when detached)."""
+        reader = self._direct()
+        if self._branch is None and reader is not None:
+            with contextlib.suppress(_UnresolvableError):
+                self._branch = reader.branch()
+        if self._branch is None:
+            self._branch = read_output("rev-parse", "--abbrev-ref", "HEAD")
+        return self._branch
+
+    def resolve(self, rev: str) -> str | None:
+        """Return the object id *rev* names, or None when it does not resolve."""
+        if rev not in self._resolved:
+            self._resolved[rev] = self._lookup(rev)
+        return self._resolved[rev]
+
+    def invalidate(self) -> None:
+        """Forget every cached answer; the batch process is kept running."""
+        self._layout = None
+        self._branch = None
+        self._resolved.clear()
+        self._reader = None
+        self._reader_checked = False
+
+    def close(self) -> None:
+        """Stop the batch process, if one was started."""
+        if self._batch is not None:
+            cast("IO[str]", self._batch.stdin).close()
+            self._batch.wait()
+            self._batch = None
+
+    def _direct(self) -> RefReader | None:
+        if not self._reader_checked:
+            self._reader = RefReader.discover(self.cwd)
+            self._reader_checked = True
+        return self._reader
+
+    def _lookup(self, rev: str) -> str | None:
+        reader = self._direct()
+        if reader is not None:
+            try:
+                return reader.resolve(rev)
+            except _UnresolvableError:
+                pass
+        line = self._batch_query(rev)
+        if line is not None:
+            oid, _, kind = line.partition(" ")
+            return None if kind in ("missing", "ambiguous") else oid
+        result = subprocess.run(  # noqa: S603
+            ("git", "rev-parse", "--verify", "--quiet", rev),  # noqa: S607
+            check=False,
+            text=True,
+            capture_output=True,
+            cwd=self.cwd,
+        )
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _batch_query(self, rev: str) -> str | None:
+        """Ask the batch process about *rev*; None when it cannot answer."""
+        if self._batch is None and not self._batch_broken:
+            try:
+                self._batch = subprocess.Popen(
+                    ("git", "cat-file", "--batch-check"),  # noqa: S607
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    cwd=self.cwd,
+                )
+            except OSError:
+                self._batch_broken = True
+        if self._batch is None or "\n" in rev:
+            return None
+        stdin = cast("IO[str]", self._batch.stdin)
+        stdout = cast("IO[str]", self._batch.stdout)
+        try:
+            stdin.write(f"{rev}\n")
+            stdin.flush()
+            line = stdout.readline()
+        except OSError:
+            line = ""
+        if not line:
+            # The batch process died; answer this and every later
+            # lookup one subprocess at a time.
+            self._batch_broken = True
+            self._batch = None
+            return None
+        return line.rstrip("\n")
+
+
+_session: GitSession | None = None
+
+
+def session() -> GitSession:
+    """Return the process-wide session for the current working directory.
+
+    A new session replaces the old one when the process has changed
+    directory since the last query.
+    """
+    global _session
+    cwd = Path.cwd()
+    if _session is None or _session.cwd != cwd:
+        close_session()
+        _session = GitSession(cwd)
+    return _session
+
+
+def close_session() -> None:
+    """Close and discard the process-wide session."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+atexit.register(close_session)
+
+
+def invalidate() -> None:
+    """Drop the process-wide session's cached answers, if it has any."""
+    if _session is not None:
+        _session.invalidate()
+
 
 def run(*args: str) -> None:
     """Run a git command and raise on failure.
@@ -22,11 +359,17 @@ def run(*args: str) -> None:
     repository's pre-commit gate admits the commit. This makes the
     env-var contract a property of the helper rather than something
     every internal caller has to remember (issue #295).
+
+    Every command run through here is treated as mutating: the
+    process-wide session's cached answers are dropped afterwards.
     """
     env = None
     if args and args[0] == "commit":
         env = {**os.environ, _GATE_ENV_VAR: _GATE_ENABLED_VALUE}
-    subprocess.run(("git", *args), check=True, env=env)  # noqa: S603, S607
+    try:
+        subprocess.run(("git", *args), check=True, env=env)  # noqa: S603, S607
+    finally:
+        invalidate()
 
 
 def read_output(*args: str) -> str:
@@ -40,9 +383,90 @@ def read_output(*args: str) -> str:
     return result.stdout.strip()
 
 
+def worktree_tree(root: Path, git_dir: Path) -> str:
+    """Return the tree id of the working tree as ``git add -A`` would stage it.
+
+    Tracked changes and untracked, non-ignored files are included. The
+    staging happens in a scratch copy of the index, so the real index is
+    left alone; the blobs and trees written to the object store are
+    ordinary loose objects that ``git gc`` reclaims.
+    """
+    fd, name = tempfile.mkstemp(prefix="st-index-", dir=git_dir)
+    os.close(fd)
+    scratch = Path(name)
+    try:
+        index = git_dir / "index"
+        if index.is_file():
+            shutil.copyfile(index, scratch)
+        else:
+            scratch.unlink()  # git refuses an empty index file
+        env = {**os.environ, "GIT_INDEX_FILE": name}
+        for args in (("add", "-A"), ("write-tree",)):
+            result = subprocess.run(  # noqa: S603
+                ("git", *args),  # noqa: S607
+                cwd=root,
+                env=env,
+                check=True,
+                text=True,
+                capture_output=True,
+            )
+        return result.stdout.strip()
+    finally:
+        scratch.unlink(missing_ok=True)
+
+
+def list_files(root: Path, *, untracked: bool = True) -> list[str]:
+    """Return the files under *root* that git knows about, relative to it.
+
+    One ``git ls-files -z`` call: tracked files, plus untracked files
+    that are not ignored when *untracked* is set. Ignored build output
+    is never walked. Tracked files deleted from the working tree are
+    still listed, so callers that open files should expect some to be
+    missing.
+    """
+    args = ["ls-files", "-z", "--cached"]
+    if untracked:
+        args += ["--others", "--exclude-standard"]
+    result = subprocess.run(  # noqa: S603
+        ("git", *args),  # noqa: S607
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+    names = result.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+    # Unmerged paths are listed once per conflict stage.
+    return sorted({name for name in names if name})
+
+
+def changed_files(root: Path, since: str) -> list[str]:
+    """Return the files under *root* changed since *since*, relative to it.
+
+    The changes are those a pull request from the working tree against
+    *since* would show: everything committed, staged or edited since the
+    merge base of *since* and ``HEAD``, plus untracked files that are not
+    ignored. Deleted files are left out. Raises
+    ``subprocess.CalledProcessError`` if *since* does not resolve.
+    """
+
+    def lines(*args: str) -> list[str]:
+        result = subprocess.run(  # noqa: S603
+            ("git", *args),  # noqa: S607
+            cwd=root,
+            check=True,
+            capture_output=True,
+        )
+        return result.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+
+    base = lines("merge-base", since, "HEAD")[0].strip()
+    names = lines("diff", "-z", "--name-only", "--no-renames", "--diff-filter=d", base, "--")
+    names += lines("ls-files", "-z", "--others", "--exclude-standard")
+    # Untracked nested repositories are listed as directories.
+    return sorted({name for name in names if name and not name.endswith("/")})
+
+
 def repo_root() -> Path:
     """Return the repository root directory."""
-    return Path(read_output("rev-parse", "--show-toplevel"))
+    return session().layout().toplevel
 
 
 def is_main_worktree() -> bool:
@@ -53,20 +477,18 @@ def is_main_worktree() -> bool:
     ``.git`` itself — ``--git-dir`` and ``--git-common-dir`` are equal
     only for the main worktree.
     """
-    git_dir = Path(read_output("rev-parse", "--git-dir")).resolve()
-    common_dir = Path(read_output("rev-parse", "--git-common-dir")).resolve()
-    return git_dir == common_dir
+    layout = session().layout()
+    return layout.git_dir == layout.common_dir
 
 
 def main_worktree_root() -> Path:
     """Return the root directory of the main worktree."""
-    common_dir = Path(read_output("rev-parse", "--git-common-dir")).resolve()
-    return common_dir.parent
+    return session().layout().common_dir.parent
 
 
 def current_branch() -> str:
     """Return the current branch name."""
-    return read_output("rev-parse", "--abbrev-ref", "HEAD")
+    return session().branch()
 
 
 def has_staged_changes() -> bool:
@@ -80,11 +502,7 @@ def has_staged_changes() -> bool:
 
 def ref_exists(ref: str) -> bool:
     """Return True if a git ref exists."""
-    result = subprocess.run(  # noqa: S603
-        ("git", "rev-parse", "--verify", "--quiet", ref),  # noqa: S607
-        check=False,
-    )
-    return result.returncode == 0
+    return session().resolve(ref) is not None
 
 
 def merged_branches(target: str) -> list[str]:
@@ -1,13 +1,101 @@
-"""GitHub CLI (``gh``) subprocess wrappers."""
+"""GitHub CLI (``gh``) subprocess wrappers.
+
+API calls (``graphql``, ``pr_view``, check polling, ``create_label``,
+``list_runs``) go through the native keep-alive client in
+:mod:`standard_tooling.lib.github_http` when ``GH_TOKEN`` is set, and
+through ``gh`` otherwise. If the API cannot be reached, or its answer
+cannot be read, the process falls back to ``gh`` for good.
+"""
 
 from __future__ import annotations
 
+import json
+import random
+import re
 import subprocess
 import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from standard_tooling.lib.http_pool import ClientSlot
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from standard_tooling.lib.github_http import Client
 
 _NO_CHECKS_PHRASE = "no checks reported"
 _POLL_INTERVAL_SECS = 5
 _POLL_TIMEOUT_SECS = 60
+_MAX_POLL_INTERVAL_SECS = 60
+_BACKOFF_FACTOR = 1.5
+_JITTER = 0.2
+_FAILING_CONCLUSIONS = frozenset(
+    {"failure", "cancelled", "timed_out", "action_required", "startup_failure", "stale", "error"}
+)
+_PROJECT_REPOS_TTL_SECS = 10 * 60
+
+# Last ETag, body and next page per REST endpoint, for conditional polling.
+_etags: dict[str, tuple[str, Any, str | None]] = {}
+# The ``rel="next"`` URL of a paginated answer's ``Link`` header.
+_LINK_NEXT_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+# ``https://github.com/o/r.git``, ``git@github.com:o/r`` and ``ssh://git@github.com/o/r``.
+_REMOTE_URL_RE = re.compile(r"github\.com[:/]([^/]+/[^/]+?)(?:\.git)?/?$")
+# ``gh run list --json`` fields the native client reports.
+_RUN_FIELDS = (
+    "databaseId",
+    "name",
+    "status",
+    "conclusion",
+    "headBranch",
+    "headSha",
+    "createdAt",
+    "url",
+)
+_PR_URL_RE = re.compile(r"^https://github\.com/([^/]+/[^/]+)/pull/(\d+)/?$")
+# ``gh pr view --json`` fields the native client can answer.
+_HTTP_PR_FIELDS = frozenset({"number", "url", "state", "headRefName", "headRefOid", "baseRefName"})
+
+_PROJECT_REPOS_QUERY = """
+query($owner: String!, $number: Int!, $cursor: String) {
+  repositoryOwner(login: $owner) {
+    ... on ProjectV2Owner {
+      projectV2(number: $number) {
+        repositories(first: 100, after: $cursor) {
+          nodes { nameWithOwner }
+          pageInfo { hasNextPage endCursor }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _load_http_client() -> Client | None:
+    from standard_tooling.lib.github_http import Client
+
+    return Client.from_env()
+
+
+_http: ClientSlot[Client] = ClientSlot(_load_http_client)
+
+
+def http_client() -> Client | None:
+    """Return the process-wide native API client, or None to use ``gh``."""
+    return _http.get()
+
+
+def reset_http_client() -> None:
+    """Close the native client; the next call rebuilds it from the environment."""
+    _http.reset()
+
+
+def _http_unreachable() -> None:
+    """Drop the native client after a connection failure; ``gh`` takes over."""
+    _http.unreachable()
 
 
 def run(*args: str) -> None:
@@ -26,44 +114,368 @@ def read_output(*args: str) -> str:
     return result.stdout.strip()
 
 
+def graphql(query: str, **variables: Any) -> dict[str, Any]:
+    """Run a GraphQL request and return its ``data``.
+
+    The request goes through the native client when there is one, and
+    through ``gh api graphql`` otherwise, with the body handed to ``gh``
+    on stdin as JSON. Either way variables may be any JSON value (input
+    objects included) and never need escaping into the query. GraphQL
+    errors surface as ``subprocess.CalledProcessError``.
+    """
+    client = http_client()
+    if client is not None:
+        try:
+            return client.graphql(query, variables)
+        except OSError:
+            _http_unreachable()
+    result = subprocess.run(  # noqa: S603
+        ("gh", "api", "graphql", "--input", "-"),  # noqa: S607
+        input=json.dumps({"query": query, "variables": variables}),
+        check=True,
+        text=True,
+        capture_output=True,
+    )
+    data: dict[str, Any] = json.loads(result.stdout)["data"]
+    return data
+
+
+def is_rate_limited(exc: subprocess.CalledProcessError) -> bool:
+    """Return True if a failed ``gh`` call was rejected by a GitHub rate limit.
+
+    Covers both the primary limit and the secondary (abuse) limits that
+    bursts of concurrent requests trigger.
+    """
+    return "rate limit" in str(exc.stderr or "").lower()
+
+
 def create_pr(*, base: str, title: str, body_file: str) -> str:
     """Create a pull request and return its URL."""
     return read_output("pr", "create", "--base", base, "--title", title, "--body-file", body_file)
 
 
-def _checks_registered(pr: str) -> bool:
-    """Return True if at least one check is registered on ``pr``."""
-    result = subprocess.run(  # noqa: S603
-        ("gh", "pr", "checks", pr),  # noqa: S607
-        capture_output=True,
-        text=True,
+def pr_view(pr: str, *fields: str) -> dict[str, Any]:
+    """Return ``gh pr view --json`` *fields* for a PR URL or number."""
+    client = http_client()
+    match = _PR_URL_RE.match(pr)
+    if client is not None and match and _HTTP_PR_FIELDS.issuperset(fields):
+        try:
+            data = client.pull_request(match[1], int(match[2]))
+        except OSError:
+            _http_unreachable()
+        else:
+            return {field: data[field] for field in fields}
+    result: dict[str, Any] = json.loads(read_output("pr", "view", pr, "--json", ",".join(fields)))
+    return result
+
+
+def create_label(
+    repo: str, name: str, *, color: str | None = None, description: str | None = None
+) -> None:
+    """Create a label, or update it in place if it already exists."""
+    client = http_client()
+    if client is not None:
+        try:
+            client.create_label(repo, name, color=color, description=description)
+        except OSError:
+            _http_unreachable()
+        else:
+            return
+    cmd: list[str] = ["label", "create", name, "--repo", repo, "--force"]
+    if color:
+        cmd.extend(["--color", color])
+    if description:
+        cmd.extend(["--description", description])
+    run(*cmd)
+
+
+def update_label(
+    repo: str,
+    name: str,
+    *,
+    new_name: str | None = None,
+    color: str | None = None,
+    description: str | None = None,
+) -> None:
+    """Rename or recolor the existing label *name*, or change its description."""
+    client = http_client()
+    if client is not None:
+        try:
+            client.update_label(repo, name, new_name=new_name, color=color, description=description)
+        except OSError:
+            _http_unreachable()
+        else:
+            return
+    cmd: list[str] = ["label", "edit", name, "--repo", repo]
+    if new_name is not None:
+        cmd.extend(["--name", new_name])
+    if color is not None:
+        cmd.extend(["--color", color])
+    if description is not None:
+        cmd.extend(["--description", description])
+    run(*cmd)
+
+
+def delete_label(repo: str, name: str) -> None:
+    """Delete the label *name* from *repo*."""
+    client = http_client()
+    if client is not None:
+        try:
+            client.delete_label(repo, name)
+        except OSError:
+            _http_unreachable()
+        else:
+            return
+    run("label", "delete", name, "--repo", repo, "--yes")
+
+
+def _origin_repo() -> str | None:
+    """Return ``owner/repo`` for the ``origin`` remote if it is on GitHub."""
+    from standard_tooling.lib import git
+
+    try:
+        url = git.read_output("remote", "get-url", "origin")
+    except subprocess.CalledProcessError:
+        return None
+    match = _REMOTE_URL_RE.search(url)
+    return match[1] if match else None
+
+
+def list_runs(
+    repo: str | None = None,
+    *,
+    branch: str | None = None,
+    workflow: str | None = None,
+    limit: int = 20,
+) -> list[dict[str, Any]]:
+    """Return recent workflow runs, newest first, as ``gh run list --json`` reports them.
+
+    *repo* defaults to the current repository's ``origin``, and
+    *workflow* (a workflow's name or file name) narrows the runs to one
+    workflow.
+    """
+    client = http_client()
+    native_repo = repo or (_origin_repo() if client is not None else None)
+    if client is not None and native_repo is not None:
+        try:
+            return client.list_runs(native_repo, branch=branch, workflow=workflow, limit=limit)
+        except OSError:
+            _http_unreachable()
+    cmd = ["run", "list", "--limit", str(limit)]
+    if repo:
+        cmd.extend(["--repo", repo])
+    if branch:
+        cmd.extend(["--branch", branch])
+    if workflow:
+        cmd.extend(["--workflow", workflow])
+    cmd.extend(["--json", ",".join(_RUN_FIELDS)])
+    runs: list[dict[str, Any]] = json.loads(read_output(*cmd))
+    return runs
+
+
+@dataclass(frozen=True)
+class CheckState:
+    """One check run or commit status on a PR's head commit."""
+
+    name: str
+    status: str
+    conclusion: str | None
+
+    @property
+    def bucket(self) -> str:
+        """Collapse to ``gh pr checks`` buckets: pass, fail or pending."""
+        if self.status != "completed":
+            return "pending"
+        return "fail" if self.conclusion in _FAILING_CONCLUSIONS else "pass"
+
+
+def print_transition(old: CheckState | None, new: CheckState, *, prefix: str = "") -> None:
+    """``on_transition`` callback that prints each check's bucket changes.
+
+    ``prefix`` goes before the check name, to tell apart the output of
+    several PRs watched at once.
+    """
+    if old is None or old.bucket != new.bucket:
+        print(f"  {prefix}{new.name}: {new.bucket}", flush=True)
+
+
+def _next_endpoint(link: str) -> str | None:
+    """Return the endpoint of the next page a ``Link`` header names, or None."""
+    match = _LINK_NEXT_RE.search(link)
+    if match is None:
+        return None
+    url = urllib.parse.urlsplit(match[1])
+    # GitHub Enterprise Server serves the REST API under /api/v3.
+    endpoint = url.path.removeprefix("/api/v3").lstrip("/")
+    return f"{endpoint}?{url.query}" if url.query else endpoint
+
+
+def _get_page(endpoint: str) -> tuple[Any, bool, str | None]:
+    """GET a REST *endpoint* via ``gh api``, revalidating with its last ETag.
+
+    Returns ``(body, changed, next)``, where *next* is the endpoint of
+    the following page, if any. A 304 answer replays the cached body
+    and, per GitHub's docs, does not count against the rate limit.
+    """
+    cached = _etags.get(endpoint)
+    client = http_client()
+    if client is not None:
+        try:
+            resp = client.get(f"/{endpoint}", etag=cached[0] if cached else None)
+        except OSError:
+            _http_unreachable()
+        else:
+            if resp.status == 304 and cached is not None:
+                return cached[1], False, cached[2]
+            following = _next_endpoint(resp.headers.get("link", ""))
+            if "etag" in resp.headers:
+                _etags[endpoint] = (resp.headers["etag"], resp.data, following)
+            return resp.data, True, following
+
+    args = ["gh", "api", "--include", endpoint]
+    if cached is not None:
+        args.extend(["-H", f"If-None-Match: {cached[0]}"])
+    # gh exits non-zero on a 304, so the status line decides, not the exit code.
+    result = subprocess.run(args, capture_output=True, text=True)  # noqa: S603
+    head, _, body = result.stdout.replace("\r\n", "\n").partition("\n\n")
+    lines = head.splitlines()
+    status = lines[0].split()[1] if lines and lines[0].startswith("HTTP/") else ""
+    if status == "304" and cached is not None:
+        return cached[1], False, cached[2]
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, args, output=result.stdout, stderr=result.stderr
+        )
+    data = json.loads(body)
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    following = _next_endpoint(headers.get("link", ""))
+    if "etag" in headers:
+        _etags[endpoint] = (headers["etag"], data, following)
+    return data, True, following
+
+
+def _get_all_pages(endpoint: str, key: str) -> tuple[list[Any], bool]:
+    """Return the *key* lists of every page of *endpoint*, following ``Link``.
+
+    Each page is revalidated on its own, so *changed* is False only if
+    none of them changed.
+    """
+    items: list[Any] = []
+    changed = False
+    following: str | None = endpoint
+    while following is not None:
+        data, page_changed, following = _get_page(following)
+        items.extend(data[key])
+        changed = changed or page_changed
+    return items, changed
+
+
+def _head_sha(repo: str, number: int) -> str:
+    """Return the PR's current head commit, revalidating its last answer."""
+    pull, _, _ = _get_page(f"repos/{repo}/pulls/{number}")
+    sha: str = pull["head"]["sha"]
+    return sha
+
+
+def _check_states(repo: str, sha: str) -> tuple[dict[str, CheckState], bool]:
+    """Return the checks on *sha*, and whether either source changed.
+
+    Check runs are keyed by their ID, since two workflows can each have
+    a job of the same name; commit statuses by context, which GitHub
+    already reduces to the latest status per context.
+    """
+    runs, runs_changed = _get_all_pages(
+        f"repos/{repo}/commits/{sha}/check-runs?per_page=100", "check_runs"
     )
-    return _NO_CHECKS_PHRASE not in (result.stdout + result.stderr)
+    statuses, statuses_changed = _get_all_pages(
+        f"repos/{repo}/commits/{sha}/status?per_page=100", "statuses"
+    )
+    states = {
+        f"run {run['id']}": CheckState(run["name"], run["status"], run["conclusion"])
+        for run in runs
+    }
+    for status in statuses:
+        done = status["state"] != "pending"
+        states[f"status {status['context']}"] = CheckState(
+            status["context"],
+            "completed" if done else "pending",
+            status["state"] if done else None,
+        )
+    return states, runs_changed or statuses_changed
 
 
 def wait_for_checks(
     pr: str,
     *,
-    poll_interval: int = _POLL_INTERVAL_SECS,
-    poll_timeout: int = _POLL_TIMEOUT_SECS,
+    poll_interval: float = _POLL_INTERVAL_SECS,
+    poll_timeout: float = _POLL_TIMEOUT_SECS,
+    max_interval: float = _MAX_POLL_INTERVAL_SECS,
+    on_transition: Callable[[CheckState | None, CheckState], None] | None = None,
 ) -> None:
-    """Block until all required checks on ``pr`` complete; fail fast on the first red.
+    """Block until all checks on ``pr`` complete; fail fast on the first red.
+
+    Polls the head commit's check runs and commit statuses with
+    conditional requests, so a poll that finds nothing new is free
+    against the rate limit. The wait starts at ``poll_interval`` seconds,
+    grows by half after every unchanged poll up to ``max_interval``,
+    drops back whenever a check changes state, and is jittered so many
+    watchers do not poll in lockstep. ``on_transition(old, new)`` is
+    called for every check whose state changed (``old`` is None for a
+    newly registered check).
+
+    The PR's head commit is looked up again on every poll (a free
+    conditional request while it stays put), so a push during the wait
+    switches to the new commit's checks instead of passing on stale ones.
 
-    Polls internally when no checks have registered yet (the window between
-    git push and GitHub registering the checks run). Polls every
-    ``poll_interval`` seconds for up to ``poll_timeout`` seconds before
-    falling through to the blocking watch.
+    Waits up to ``poll_timeout`` seconds for the first check to register
+    (the window between git push and GitHub registering the checks run),
+    counted afresh from each new head commit.
 
     Surfaces the failure via ``subprocess.CalledProcessError`` — callers are
     responsible for deciding how to react (the release-workflow convention is
     to stop and surface; do not retry).
     """
-    deadline = time.monotonic() + poll_timeout
-    while not _checks_registered(pr):
-        if time.monotonic() >= deadline:
-            break
-        time.sleep(poll_interval)
-    run("pr", "checks", pr, "--watch", "--fail-fast")
+    view = pr_view(pr, "url", "number")
+    repo, number = "/".join(view["url"].split("/")[3:5]), int(view["number"])
+    cmd = ("gh", "pr", "checks", pr)
+
+    sha = None
+    previous: dict[str, CheckState] = {}
+    interval = poll_interval
+    deadline = 0.0
+    while True:
+        head = _head_sha(repo, number)
+        if head != sha:
+            # A new head commit brings its own checks; forget the old ones.
+            sha, previous = head, {}
+            deadline = time.monotonic() + poll_timeout
+        states, changed = _check_states(repo, sha)
+        transitioned = False
+        for key, state in states.items():
+            if previous.get(key) != state:
+                transitioned = True
+                if on_transition is not None:
+                    on_transition(previous.get(key), state)
+        previous = states
+
+        failed = sorted(s.name for s in states.values() if s.bucket == "fail")
+        if failed:
+            msg = f"Checks failed on {pr}: {', '.join(failed)}"
+            raise subprocess.CalledProcessError(1, cmd, stderr=msg)
+        if states and all(s.bucket == "pass" for s in states.values()):
+            return
+        if not states and time.monotonic() >= deadline:
+            msg = f"{_NO_CHECKS_PHRASE} on {pr}"
+            raise subprocess.CalledProcessError(1, cmd, stderr=msg)
+
+        if transitioned or changed:
+            interval = poll_interval
+        else:
+            interval = min(interval * _BACKOFF_FACTOR, max_interval)
+        time.sleep(interval * random.uniform(1 - _JITTER, 1 + _JITTER))  # noqa: S311
 
 
 def merge(pr: str, *, strategy: str) -> None:
@@ -78,22 +490,52 @@ def merge(pr: str, *, strategy: str) -> None:
     run("pr", "merge", f"--{strategy}", pr)
 
 
+def iter_project_repos(owner: str, project: str) -> Iterator[str]:
+    """Yield the repos linked to a GitHub Project, as result pages arrive.
+
+    Pages through the project's own ``repositories`` connection rather
+    than listing every repo the owner has, so nothing is truncated and
+    only linked repos are transferred. Works for organization and user
+    owners. A complete listing is cached for ``_PROJECT_REPOS_TTL_SECS``
+    per (owner, project); a cached listing is yielded without any request.
+    An empty listing is not cached, so linking the first repo shows up at
+    once.
+
+    Raises ``subprocess.CalledProcessError`` if the owner or project does
+    not exist (or the token cannot see it).
+    """
+    from standard_tooling.lib.cache import TtlCache
+
+    cache = TtlCache("project-repos")
+    key = f"{owner}#{project}"
+    cached = cache.get(key)
+    if isinstance(cached, list):
+        yield from cached
+        return
+
+    repos: list[str] = []
+    cursor: str | None = None
+    while True:
+        data = graphql(_PROJECT_REPOS_QUERY, owner=owner, number=int(project), cursor=cursor)
+        project_node = (data["repositoryOwner"] or {}).get("projectV2")
+        if project_node is None:
+            raise subprocess.CalledProcessError(
+                1,
+                ("gh", "api", "graphql"),
+                stderr=f"Could not resolve to a ProjectV2 with the number {project} for {owner}.",
+            )
+        page = project_node["repositories"]
+        for node in page["nodes"]:
+            if node and node["nameWithOwner"] not in repos:
+                repos.append(node["nameWithOwner"])
+                yield node["nameWithOwner"]
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        cursor = page["pageInfo"]["endCursor"]
+    if repos:
+        cache.put(key, repos, _PROJECT_REPOS_TTL_SECS)
+
+
 def list_project_repos(owner: str, project: str) -> list[str]:
     """Return sorted, unique repos linked to a GitHub Project."""
-    jq_filter = (
-        f".[] | select(.projectsV2.Nodes | length > 0) "
-        f"| select(.projectsV2.Nodes[].number == {project}) "
-        f"| .nameWithOwner"
-    )
-    output = read_output(
-        "repo",
-        "list",
-        owner,
-        "--json",
-        "nameWithOwner,projectsV2",
-        "--limit",
-        "100",
-        "--jq",
-        jq_filter,
-    )
-    return sorted({r for r in output.splitlines() if r})
+    return sorted(iter_project_repos(owner, project))
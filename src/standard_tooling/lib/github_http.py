@@ -0,0 +1,275 @@
+"""Native GitHub API client over pooled keep-alive connections.
+
+Every ``gh`` call re-reads its config, resolves the host and opens a
+fresh TLS connection. :class:`Client` talks to the REST and GraphQL
+APIs directly with :mod:`http.client`, keeping connections open in a
+:class:`~standard_tooling.lib.http_pool.ConnectionPool` shared between
+calls and threads. :mod:`standard_tooling.lib.github`
+uses it when ``GH_TOKEN`` (or ``GITHUB_TOKEN``) is set, and falls back
+to ``gh`` when there is no token or the API cannot be reached.
+
+Failures surface as ``subprocess.CalledProcessError``, with the API's
+message in ``stderr``, so callers handle both transports the same way.
+The ``a``-prefixed coroutines run calls from asyncio code on worker
+threads, so many requests can be awaited together over the pool.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import subprocess
+import urllib.parse
+from dataclasses import dataclass
+from typing import Any
+
+from standard_tooling.lib.http_pool import ConnectionPool
+
+ENV_TOKENS = ("GH_TOKEN", "GITHUB_TOKEN")
+ENV_API_URL = "ST_GITHUB_API_URL"
+ENV_DISABLE = "ST_GITHUB_HTTP"
+ENV_GH_HOST = "GH_HOST"
+
+_DEFAULT_API_URL = "https://api.github.com"
+_TIMEOUT_SECS = 30.0
+_API_VERSION = "2022-11-28"
+
+
+@dataclass(frozen=True)
+class Response:
+    """A decoded API response; header names are lower-cased."""
+
+    status: int
+    headers: dict[str, str]
+    data: Any
+
+
+class Client:
+    """GitHub API client sharing a pool of keep-alive connections."""
+
+    def __init__(
+        self, token: str, base_url: str = _DEFAULT_API_URL, *, timeout: float = _TIMEOUT_SECS
+    ) -> None:
+        url = urllib.parse.urlsplit(base_url)
+        self._https = url.scheme == "https"
+        self._host = url.netloc
+        self._prefix = url.path.rstrip("/")
+        self._timeout = timeout
+        self._headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "standard-tooling",
+            "X-GitHub-Api-Version": _API_VERSION,
+        }
+        self._pool = ConnectionPool(self._connect)
+
+    @classmethod
+    def from_env(cls) -> Client | None:
+        """Build a client from the environment, or None if there is no token.
+
+        ``ST_GITHUB_HTTP=0`` turns the native client off; ``ST_GITHUB_API_URL``
+        points it at another API root. Without the latter, a ``GH_HOST``
+        other than ``github.com`` (GitHub Enterprise) also returns None, so
+        ``gh`` talks to that host with its own credentials rather than the
+        token going to ``api.github.com``.
+        """
+        if os.environ.get(ENV_DISABLE) == "0":
+            return None
+        api_url = os.environ.get(ENV_API_URL)
+        if api_url is None and os.environ.get(ENV_GH_HOST, "github.com").lower() != "github.com":
+            return None
+        token = next((os.environ[name] for name in ENV_TOKENS if os.environ.get(name)), None)
+        if token is None:
+            return None
+        return cls(token, api_url or _DEFAULT_API_URL)
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        self._pool.close()
+
+    # -- transport ------------------------------------------------------------
+
+    def _connect(self) -> http.client.HTTPConnection:
+        factory = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return factory(self._host, timeout=self._timeout)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Any = None,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """Send one request; raise ``CalledProcessError`` on an error status.
+
+        ``path`` is relative to the API root (``/repos/o/r``). A ``304``
+        is returned, not raised, for conditional requests. Connection
+        failures and unreadable responses propagate as ``OSError``.
+        """
+        payload = None if body is None else json.dumps(body).encode()
+        merged = {**self._headers, **(headers or {})}
+        if payload is not None:
+            merged["Content-Type"] = "application/json"
+        status, resp_headers, raw = self._pool.send(
+            method, self._prefix + path, body=payload, headers=merged
+        )
+
+        text = raw.decode("utf-8", errors="replace")
+        try:
+            data = json.loads(text) if text.strip() else None
+        except ValueError:
+            data = None  # an HTML error page from a proxy, say
+        if status >= 400:
+            message = data.get("message", text) if isinstance(data, dict) else text
+            raise subprocess.CalledProcessError(
+                1,
+                ("gh", "api", "-X", method, path),
+                output=text,
+                stderr=f"HTTP {status}: {message}",
+            )
+        return Response(status, resp_headers, data)
+
+    # -- API calls ------------------------------------------------------------
+
+    def graphql(self, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        """Run a GraphQL request and return its ``data``, as ``gh api graphql`` does."""
+        result = self.request("POST", "/graphql", {"query": query, "variables": variables}).data
+        if result.get("errors"):
+            messages = "; ".join(e.get("message", "") for e in result["errors"])
+            raise subprocess.CalledProcessError(
+                1,
+                ("gh", "api", "graphql"),
+                output=json.dumps(result),
+                stderr=f"GraphQL: {messages}",
+            )
+        data: dict[str, Any] = result["data"]
+        return data
+
+    def get(self, path: str, *, etag: str | None = None) -> Response:
+        """GET *path*, revalidating with *etag* if given (``304`` when unchanged)."""
+        return self.request("GET", path, headers={"If-None-Match": etag} if etag else None)
+
+    def pull_request(self, repo: str, number: int) -> dict[str, Any]:
+        """Return a PR with the ``gh pr view --json`` field names this repo uses."""
+        pr = self.get(f"/repos/{repo}/pulls/{number}").data
+        return {
+            "number": pr["number"],
+            "url": pr["html_url"],
+            "state": pr["state"].upper(),
+            "headRefName": pr["head"]["ref"],
+            "headRefOid": pr["head"]["sha"],
+            "baseRefName": pr["base"]["ref"],
+        }
+
+    def create_label(
+        self, repo: str, name: str, *, color: str | None = None, description: str | None = None
+    ) -> None:
+        """Create a label, or update it if it exists (``gh label create --force``)."""
+        fields: dict[str, str] = {}
+        if color:
+            fields["color"] = color
+        if description:
+            fields["description"] = description
+        try:
+            self.request("POST", f"/repos/{repo}/labels", {"name": name, **fields})
+        except subprocess.CalledProcessError as exc:
+            if not str(exc.stderr).startswith("HTTP 422"):
+                raise
+            quoted = urllib.parse.quote(name, safe="")
+            self.request("PATCH", f"/repos/{repo}/labels/{quoted}", fields)
+
+    def update_label(
+        self,
+        repo: str,
+        name: str,
+        *,
+        new_name: str | None = None,
+        color: str | None = None,
+        description: str | None = None,
+    ) -> None:
+        """Rename or recolor the label *name* (``gh label edit``)."""
+        fields = {
+            key: value
+            for key, value in (
+                ("new_name", new_name),
+                ("color", color),
+                ("description", description),
+            )
+            if value is not None
+        }
+        quoted = urllib.parse.quote(name, safe="")
+        self.request("PATCH", f"/repos/{repo}/labels/{quoted}", fields)
+
+    def delete_label(self, repo: str, name: str) -> None:
+        """Delete the label *name* (``gh label delete --yes``)."""
+        quoted = urllib.parse.quote(name, safe="")
+        self.request("DELETE", f"/repos/{repo}/labels/{quoted}")
+
+    def _workflow_id(self, repo: str, workflow: str) -> int:
+        """Resolve a workflow name or file name to its ID, as ``gh`` does."""
+        workflows = self.get(f"/repos/{repo}/actions/workflows?per_page=100").data
+        for entry in workflows["workflows"]:
+            if workflow in (entry["name"], entry["path"].rsplit("/", 1)[-1]):
+                return int(entry["id"])
+        raise subprocess.CalledProcessError(
+            1,
+            ("gh", "run", "list", "--workflow", workflow),
+            stderr=f"could not find any workflows named {workflow}",
+        )
+
+    def list_runs(
+        self,
+        repo: str,
+        *,
+        branch: str | None = None,
+        workflow: str | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Return recent workflow runs with ``gh run list --json`` field names.
+
+        *workflow* is a workflow's name or file name, as ``gh run list
+        --workflow`` takes it.
+        """
+        query = {"per_page": str(limit)}
+        if branch:
+            query["branch"] = branch
+        path = f"/repos/{repo}/actions"
+        if workflow:
+            path += f"/workflows/{self._workflow_id(repo, workflow)}"
+        runs = self.get(f"{path}/runs?{urllib.parse.urlencode(query)}").data
+        return [
+            {
+                "databaseId": run["id"],
+                "name": run["name"],
+                "status": run["status"],
+                "conclusion": run["conclusion"],
+                "headBranch": run["head_branch"],
+                "headSha": run["head_sha"],
+                "createdAt": run["created_at"],
+                "url": run["html_url"],
+            }
+            for run in runs["workflow_runs"][:limit]
+        ]
+
+    # -- asyncio --------------------------------------------------------------
+
+    async def arequest(
+        self,
+        method: str,
+        path: str,
+        body: Any = None,
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """Coroutine form of :meth:`request`, run on a worker thread."""
+        import asyncio
+
+        return await asyncio.to_thread(self.request, method, path, body, headers=headers)
+
+    async def agraphql(self, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        """Coroutine form of :meth:`graphql`, run on a worker thread."""
+        import asyncio
+
+        return await asyncio.to_thread(self.graphql, query, variables)
@@ -0,0 +1,141 @@
+"""Keep-alive connection pooling shared by the native API clients.
+
+:mod:`standard_tooling.lib.github_http` and
+:mod:`standard_tooling.lib.docker_api` talk HTTP with :mod:`http.client`
+over a :class:`ConnectionPool`, which hands idle keep-alive connections
+between calls and threads. Their callers in :mod:`~standard_tooling.lib.github`
+and :mod:`~standard_tooling.lib.docker` each hold one process-wide client
+in a :class:`ClientSlot`, which builds it on first use and drops it for
+good once the service proves unreachable, leaving the CLI to take over.
+
+This module stays light to import: :mod:`http.client` (which pulls in
+:mod:`ssl` and :mod:`email`) is loaded only when a request is sent, so
+the console scripts that merely might call an API do not pay for it at
+startup.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    import http.client
+    from collections.abc import Callable, Mapping
+
+    class _Closeable(Protocol):
+        def close(self) -> None: ...
+
+
+class ClientSlot[C: _Closeable]:
+    """A process-wide native client, or None where the CLI is used instead."""
+
+    def __init__(self, load: Callable[[], C | None]) -> None:
+        self._load = load
+        self._client: C | None = None
+        self._loaded = False
+
+    def get(self) -> C | None:
+        """Return the client, building it on first use."""
+        if not self._loaded:
+            self._client = self._load()
+            self._loaded = True
+        return self._client
+
+    def set(self, client: C | None) -> None:
+        """Use *client* from now on instead of building one."""
+        self.reset()
+        self._client, self._loaded = client, True
+
+    def reset(self) -> None:
+        """Close the client; the next :meth:`get` builds it again."""
+        if self._client is not None:
+            self._client.close()
+        self._client, self._loaded = None, False
+
+    def unreachable(self) -> None:
+        """Drop the client after a connection failure; the CLI takes over for good."""
+        self.set(None)
+
+
+# Methods safe to send twice: only these are retried on a stale connection.
+_RETRYABLE_METHODS = frozenset({"GET", "HEAD"})
+
+
+class ConnectionPool:
+    """Idle keep-alive connections, opened with *connect* when none is free."""
+
+    def __init__(self, connect: Callable[[], http.client.HTTPConnection]) -> None:
+        self._connect = connect
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection (reused=True) or open a new one."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.append(conn)
+
+    @staticmethod
+    def _exchange(
+        conn: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: bytes | None,
+        headers: Mapping[str, str],
+    ) -> tuple[int, dict[str, str], bytes]:
+        conn.request(method, path, body=body, headers=dict(headers))
+        resp = conn.getresponse()
+        # Read the whole body so the connection can carry the next request.
+        raw = resp.read()
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, raw
+
+    def send(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Send one request; return its status, lower-cased headers and body.
+
+        A GET or HEAD on a reused connection the server has closed since
+        its last request is retried once on a new one; other methods are
+        not, since the server may have acted on them already. Connection
+        failures propagate as ``OSError``, a garbled or truncated
+        response (``http.client.HTTPException``) as ``ConnectionError``.
+        """
+        import http.client
+
+        # Errors from reusing a keep-alive connection the server has since closed.
+        stale = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+        conn, reused = self._acquire()
+        try:
+            try:
+                result = self._exchange(conn, method, path, body, headers or {})
+            except stale:
+                if not reused or method not in _RETRYABLE_METHODS:
+                    raise
+                conn.close()
+                conn = self._connect()
+                result = self._exchange(conn, method, path, body, headers or {})
+        except BaseException as exc:
+            conn.close()
+            if isinstance(exc, http.client.HTTPException) and not isinstance(exc, OSError):
+                raise ConnectionError(f"{method} {path}: {exc!r}") from exc
+            raise
+        self._release(conn)
+        return result
@@ -0,0 +1,153 @@
+"""Local index of the cached dev images ``st-docker-cache`` manages.
+
+Docker records when an image was created but not when it was last run,
+so :func:`docker_cache.ensure_cached_image` keeps that here: each cached
+tag with its content hash, creation time, the last time it was handed
+out, and the branches using it. Cached images are keyed by content
+alone, so several branches can share one; each branch is an alias
+(``<repo>:<branch>``) on the one record it currently uses.
+``st-docker-cache gc`` evicts least-recently-used images first from it,
+and stores the sizes it reads from ``docker images``.
+
+The index is ``docker-images.json`` under :func:`cache.cache_dir`, so one
+index covers every repository using the local daemon. Writes replace
+the file atomically; as with :class:`cache.TtlCache`, concurrent writers
+may drop each other's newest update, which at worst makes an image look
+older than it is. An unreadable or corrupt file reads as empty.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
+
+from standard_tooling.lib.cache import cache_dir
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+
+_INDEX_NAME = "docker-images.json"
+
+_SIZE_SCALES = {"kb": 10**3, "mb": 10**6, "gb": 10**9, "tb": 10**12}
+_SIZE_UNITS = {"": 1, "b": 1, **_SIZE_SCALES, **{u[0]: n for u, n in _SIZE_SCALES.items()}}
+_AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+@dataclass
+class ImageRecord:
+    """One cached image; times are epoch seconds.
+
+    *size* is the bytes removing the image would free, those it does not
+    share with other images (0 if unknown).
+    """
+
+    tag: str
+    cache_hash: str
+    created: float
+    last_used: float
+    size: int = 0
+    aliases: list[str] = field(default_factory=list)
+
+
+class ImageIndex:
+    """The JSON file of :class:`ImageRecord` entries, keyed by tag."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or cache_dir() / _INDEX_NAME
+
+    def records(self) -> dict[str, ImageRecord]:
+        """Return every indexed image by tag."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        records: dict[str, ImageRecord] = {}
+        for tag, entry in data.items():
+            try:
+                records[tag] = ImageRecord(tag=tag, **entry)
+            except TypeError:
+                continue  # written by another version; gc re-adopts the image
+        return records
+
+    def write(self, records: Mapping[str, ImageRecord]) -> None:
+        """Replace the index with *records*."""
+        data = {
+            tag: {k: v for k, v in asdict(r).items() if k != "tag"} for tag, r in records.items()
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+    def touch(self, tag: str, *, cache_hash: str, alias: str) -> None:
+        """Record that *alias* just used *tag*, adding the image if it is new.
+
+        The alias moves here from whichever image it named before.
+        """
+        now = time.time()
+        records = self.records()
+        for record in records.values():
+            if alias in record.aliases:
+                record.aliases.remove(alias)
+        record = records.setdefault(tag, ImageRecord(tag, cache_hash, now, now))
+        record.last_used = now
+        record.aliases.append(alias)
+        self.write(records)
+
+    def find(self, alias: str) -> ImageRecord | None:
+        """Return the image *alias* names, or None."""
+        return next((r for r in self.records().values() if alias in r.aliases), None)
+
+    def drop_alias(self, alias: str) -> bool:
+        """Remove *alias*, leaving its image for ``gc``; False if it was not set."""
+        records = self.records()
+        for record in records.values():
+            if alias in record.aliases:
+                record.aliases.remove(alias)
+                self.write(records)
+                return True
+        return False
+
+    def forget(self, tags: Iterable[str]) -> None:
+        """Drop *tags* from the index."""
+        records = self.records()
+        dropped = [records.pop(tag) for tag in tags if tag in records]
+        if dropped:
+            self.write(records)
+
+
+def _parse(text: str, units: Mapping[str, int], kind: str) -> float:
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*", text)
+    if match is None or match.group(2).lower() not in units:
+        msg = f"invalid {kind}: {text!r}"
+        raise ValueError(msg)
+    return float(match.group(1)) * units[match.group(2).lower()]
+
+
+def parse_size(text: str) -> int:
+    """Parse ``20G``, ``512MB`` or ``1.5GB`` (decimal units, as Docker reports) to bytes."""
+    return int(_parse(text, _SIZE_UNITS, "size"))
+
+
+def parse_age(text: str) -> float:
+    """Parse ``14d``, ``12h``, ``2w``, ``30m`` or ``90s`` to seconds."""
+    return _parse(text, _AGE_UNITS, "age")
+
+
+def format_size(size: int) -> str:
+    """Return *size* bytes in Docker's style, e.g. ``1.2GB``."""
+    for unit in ("TB", "GB", "MB", "kB"):
+        scale = _SIZE_SCALES[unit.lower()]
+        if size >= scale:
+            return f"{size / scale:.1f}{unit}"
+    return f"{size}B"
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import json
-from importlib import resources
 from typing import Any
 
 
@@ -15,6 +14,8 @@ def load_labels() -> dict[str, Any]:
     * ``labels`` — list of dicts with *name*, *color*, and *description*.
     * ``delete`` — list of label names to remove.
     """
+    from importlib import resources
+
     ref = resources.files("standard_tooling.data").joinpath("labels.json")
     text = ref.read_text(encoding="utf-8")
     data: dict[str, Any] = json.loads(text)
@@ -0,0 +1,137 @@
+"""Per-file record of linter results for the common container checks.
+
+A file's result is keyed by the linter, the linter's version, the
+content of the configuration it reads, and the file's own path and
+content. A file whose key was recorded is not linted again: its
+recorded diagnostics are replayed and its recorded pass or failure
+counts towards the exit code as if the linter had just run.
+
+Results are kept in ``st-lint.json`` in the repository's common git
+dir, next to the record of passing ``st-validate-local`` runs (see
+:mod:`validation_cache`). Linter versions are asked for once per
+installed binary (its resolved path, size and modification time) and
+remembered in the same file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from standard_tooling.lib.cache import TtlCache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+_CACHE_NAME = "st-lint"
+_MAX_ENTRIES = 20_000
+_TTL_SECS = 30 * 24 * 60 * 60
+# Bump to invalidate every recorded result after a change in what the key covers.
+_KEY_VERSION = "1"
+
+
+@dataclass(frozen=True)
+class FileResult:
+    """A linter's verdict on one file and the diagnostics it printed for it."""
+
+    failed: bool
+    lines: tuple[str, ...] = ()
+
+
+def _cache(directory: Path) -> TtlCache:
+    return TtlCache(_CACHE_NAME, directory, max_entries=_MAX_ENTRIES)
+
+
+def tool_version(directory: Path, tool: str, flag: str = "--version") -> str | None:
+    """Return *tool*'s ``--version`` output, or None if it cannot be run.
+
+    *flag* replaces ``--version`` for tools that spell it otherwise
+    (``go version``).
+    """
+    found = shutil.which(tool)
+    if found is None:
+        return None
+    binary = Path(found).resolve()
+    try:
+        stat = binary.stat()
+    except OSError:
+        return None
+    cache = _cache(directory)
+    key = f"version {binary} {flag} {stat.st_size} {stat.st_mtime_ns}"
+    version = cache.get(key)
+    if isinstance(version, str):
+        return version
+    try:
+        result = subprocess.run(  # noqa: S603
+            [found, flag], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    version = result.stdout.strip()
+    cache.put(key, version, _TTL_SECS)
+    return version
+
+
+def config_digest(paths: Iterable[Path]) -> str:
+    """Return a digest of which of *paths* exist and what they contain."""
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            content = path.read_bytes()
+        except OSError:
+            continue
+        digest.update(f"{path}\n{len(content)}\n".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def _file_keys(linter: str, version: str, config: str, files: Sequence[str]) -> dict[str, str]:
+    """Map each readable file in *files* to its cache key."""
+    keys: dict[str, str] = {}
+    for path in files:
+        try:
+            content = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        except OSError:
+            continue
+        parts = [_KEY_VERSION, linter, version, config, path, content]
+        keys[path] = hashlib.sha256("\n".join(parts).encode()).hexdigest()
+    return keys
+
+
+class LintCache:
+    """Recorded results of one linter, at one version and configuration."""
+
+    def __init__(self, directory: Path, linter: str, version: str, config: str) -> None:
+        self._cache = _cache(directory)
+        self._linter = linter
+        self._identity = (version, config)
+
+    def lookup(self, files: Sequence[str]) -> tuple[dict[str, FileResult], list[str]]:
+        """Split *files* into recorded results and the files still to lint."""
+        keys = _file_keys(self._linter, *self._identity, files)
+        stored = self._cache.get_many(keys.values())
+        hits: dict[str, FileResult] = {}
+        misses: list[str] = []
+        for path in files:
+            entry = stored.get(keys.get(path, ""))
+            if isinstance(entry, dict):
+                hits[path] = FileResult(bool(entry.get("failed")), tuple(entry.get("lines", ())))
+            else:
+                misses.append(path)
+        return hits, misses
+
+    def record(self, results: dict[str, FileResult]) -> None:
+        """Remember each file's result under its current content."""
+        keys = _file_keys(self._linter, *self._identity, list(results))
+        self._cache.put_many(
+            {
+                keys[path]: {"failed": result.failed, "lines": list(result.lines)}
+                for path, result in results.items()
+                if path in keys
+            },
+            _TTL_SECS,
+        )
@@ -0,0 +1,287 @@
+"""Run validation steps concurrently, respecting declared dependencies.
+
+Each :class:`Step` is an external command. Steps whose dependencies
+have passed run side by side, at most ``jobs`` at a time (the CPU count
+by default). Every step is its own process; the scheduler's threads
+only wait on them. A step's stdout and stderr are captured together
+and printed in one block, each line prefixed with the step name, when
+the step finishes, so concurrent output never interleaves.
+
+With ``fail_fast`` the first failure stops the run: steps not yet
+started are skipped and running ones are terminated (their whole
+process group, so scripts do not leave children behind). Without it,
+only steps that depend on a failed step are skipped.
+
+``ordered=True`` holds each finished step's block until every step
+declared before it has been printed, so the output reads the same on
+every run however the steps raced.
+
+``serial=True`` runs one step at a time in declaration order with
+output streamed straight to the terminal, which is the easiest mode
+to debug a step in. Serial steps stay in the terminal's process group,
+so they can be interactive and receive Ctrl-C themselves.
+
+An interrupt (Ctrl-C) or any other error in the scheduler stops every
+running step before it propagates, so no validator outlives the run.
+
+Every result carries the step's wall time and CPU time (user plus
+system, including the processes the step waited for), as reported by
+``wait4``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+    from pathlib import Path
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+
+
+@dataclass(frozen=True)
+class Step:
+    """One command to run; ``after`` names the steps it depends on.
+
+    ``env`` adds to (or overrides) the environment the command inherits.
+    """
+
+    name: str
+    argv: tuple[str, ...]
+    after: tuple[str, ...] = ()
+    cwd: Path | None = None
+    env: Mapping[str, str] | None = None
+
+
+@dataclass
+class StepResult:
+    """What happened to a step."""
+
+    step: Step
+    status: str
+    returncode: int | None = None
+    seconds: float = 0.0
+    output: str = ""
+    cpu_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == PASSED
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result's name, outcome and timings for a JSON report."""
+        return {
+            "name": self.step.name,
+            "status": self.status,
+            "returncode": self.returncode,
+            "wall_seconds": round(self.seconds, 3),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+        }
+
+
+def _check_graph(steps: Sequence[Step]) -> None:
+    """Raise ValueError for duplicate names, unknown dependencies or cycles."""
+    names = [s.name for s in steps]
+    if len(set(names)) != len(names):
+        msg = f"duplicate step names in {names}"
+        raise ValueError(msg)
+    by_name = {s.name: s for s in steps}
+    for step in steps:
+        for dep in step.after:
+            if dep not in by_name:
+                msg = f"step {step.name} depends on unknown step {dep}"
+                raise ValueError(msg)
+    # Kahn's algorithm: anything left after peeling off ready steps is a cycle.
+    remaining = {s.name: set(s.after) for s in steps}
+    while True:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            break
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    if remaining:
+        msg = f"dependency cycle among steps {sorted(remaining)}"
+        raise ValueError(msg)
+
+
+class _Runner:
+    """Runs steps, capturing their output as process-group leaders.
+
+    Captured steps are detached from the terminal into their own
+    session, so they can be stopped as a unit; streamed ones stay in
+    the foreground process group.
+    """
+
+    def __init__(self, *, capture: bool) -> None:
+        self.capture = capture
+        self._procs: dict[str, subprocess.Popen[bytes]] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def run(self, step: Step) -> StepResult:
+        start = time.monotonic()
+        with self._lock:
+            if self._stopping:
+                return StepResult(step, CANCELLED)
+            try:
+                proc = subprocess.Popen(  # noqa: S603
+                    step.argv,
+                    cwd=step.cwd,
+                    env={**os.environ, **step.env} if step.env else None,
+                    stdout=subprocess.PIPE if self.capture else None,
+                    stderr=subprocess.STDOUT if self.capture else None,
+                    start_new_session=self.capture,
+                )
+            except OSError as exc:
+                return StepResult(step, FAILED, None, 0.0, f"{exc}\n")
+            self._procs[step.name] = proc
+        raw = proc.stdout.read() if proc.stdout is not None else b""
+        if proc.stdout is not None:
+            proc.stdout.close()
+        # wait4 rather than Popen.wait: it also reports the step's CPU usage.
+        _, wait_status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = returncode = os.waitstatus_to_exitcode(wait_status)
+        with self._lock:
+            del self._procs[step.name]
+            stopped = self._stopping
+        seconds = time.monotonic() - start
+        cpu = usage.ru_utime + usage.ru_stime
+        output = raw.decode("utf-8", errors="replace")
+        if returncode == 0:
+            return StepResult(step, PASSED, 0, seconds, output, cpu)
+        status = CANCELLED if stopped and returncode < 0 else FAILED
+        return StepResult(step, status, returncode, seconds, output, cpu)
+
+    def stop(self) -> None:
+        """Terminate every running step and refuse to start new ones."""
+        with self._lock:
+            self._stopping = True
+            procs = list(self._procs.values())
+        for proc in procs:
+            with contextlib.suppress(ProcessLookupError):
+                if self.capture:
+                    os.killpg(proc.pid, signal.SIGTERM)
+                else:
+                    proc.send_signal(signal.SIGTERM)
+
+
+def _report(result: StepResult, *, prefixed: bool) -> None:
+    if prefixed:
+        for line in result.output.splitlines():
+            print(f"[{result.step.name}] {line}")
+    if result.status == PASSED:
+        return
+    detail = "" if result.returncode is None else f" (exit {result.returncode})"
+    print(f"[{result.step.name}] {result.status}{detail}", flush=True)
+
+
+def run_steps(
+    steps: Sequence[Step],
+    *,
+    jobs: int | None = None,
+    serial: bool = False,
+    fail_fast: bool = True,
+    ordered: bool = False,
+) -> list[StepResult]:
+    """Run *steps* and return their results in declaration order.
+
+    Raises ValueError if the steps' dependencies do not form a DAG.
+    """
+    _check_graph(steps)
+    if serial:
+        jobs = 1
+    elif jobs is None:
+        jobs = os.cpu_count() or 1
+    runner = _Runner(capture=not serial)
+    results: dict[str, StepResult] = {}
+    pending = list(steps)
+    running: dict[Future[StepResult], Step] = {}
+    stopped = False
+    # With ``ordered``, results wait here until the steps before them are reported.
+    held: dict[str, StepResult] = {}
+    next_report = 0
+
+    def report(result: StepResult) -> None:
+        if not ordered:
+            _report(result, prefixed=not serial)
+            return
+        held[result.step.name] = result
+        flush()
+
+    def flush() -> None:
+        nonlocal next_report
+        while next_report < len(steps):
+            name = steps[next_report].name
+            if name not in results:
+                break
+            if name in held:
+                _report(held.pop(name), prefixed=not serial)
+            next_report += 1
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        try:
+            while pending or running:
+                for step in list(pending):
+                    if stopped:
+                        results[step.name] = StepResult(step, SKIPPED)
+                        pending.remove(step)
+                        continue
+                    deps = [results.get(dep) for dep in step.after]
+                    if any(dep is not None and not dep.ok for dep in deps):
+                        results[step.name] = StepResult(step, SKIPPED)
+                        pending.remove(step)
+                        report(results[step.name])
+                    elif all(dep is not None for dep in deps) and len(running) < jobs:
+                        print(f"Running: {step.name}", flush=True)
+                        running[pool.submit(runner.run, step)] = step
+                        pending.remove(step)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    result = future.result()
+                    results[result.step.name] = result
+                    report(result)
+                    if not result.ok and fail_fast and not stopped:
+                        stopped = True
+                        runner.stop()
+        except BaseException:
+            # Ctrl-C included: stop the steps before the pool waits on them.
+            runner.stop()
+            raise
+    flush()
+
+    return [results[s.name] for s in steps]
+
+
+def summary_line(results: Sequence[StepResult]) -> str:
+    """Return e.g. ``3 passed, 1 failed, 1 skipped`` for *results*."""
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    order = (PASSED, FAILED, CANCELLED, SKIPPED)
+    return ", ".join(f"{counts[s]} {s}" for s in order if s in counts)
+
+
+def print_summary(results: Sequence[StepResult]) -> None:
+    """Print a table of each step's outcome, wall time and CPU time."""
+    width = max([len("Step"), *(len(r.step.name) for r in results)])
+    print(f"{'Step':<{width}}  {'Status':<10}  {'Wall':>7}  {'CPU':>7}")
+    for r in results:
+        status = r.status if r.returncode in (None, 0) else f"{r.status} ({r.returncode})"
+        print(f"{r.step.name:<{width}}  {status:<10}  {r.seconds:>6.1f}s  {r.cpu_seconds:>6.1f}s")
@@ -0,0 +1,298 @@
+"""Single-pass splitter for shell command lines.
+
+:func:`split_commands` turns a Bash command string into its simple
+commands, each a list of words with quotes removed, the way the shell
+itself would see them. It is built for policy hooks that must find
+every command a string will run, so it errs towards finding more:
+
+- ``&&``, ``||``, ``;``, ``|``, ``&``, newlines and ``( ... )`` end a
+  command; operators inside quotes do not.
+- ``$( ... )``, backticks and ``<( ... )`` / ``>( ... )`` are split
+  recursively and their commands reported; the enclosing word keeps the
+  raw substitution text.
+- Redirection targets (``> out``, ``2>&1``) are dropped from the words.
+- Heredoc bodies are data, except when a shell on the same line may
+  read them (``bash <<EOF``, ``cat <<EOF | sh``), where they are split
+  as commands. The same goes for here-strings and for the argument of
+  ``sh -c`` / ``bash -c`` and ``eval``.
+- A here-string or heredoc read by ``xargs`` (``xargs gh pr merge <<<
+  26``, also behind ``env`` or ``command``) becomes arguments: its words
+  are added to the end of the ``xargs`` command's words.
+- A command with an unterminated quote or substitution is discarded,
+  as the shell would refuse to run it.
+
+It does not expand variables, globs, aliases or functions.
+"""
+
+from __future__ import annotations
+
+_SHELLS = frozenset({"sh", "bash", "zsh", "dash", "ksh"})
+_MAX_DEPTH = 8
+
+
+class _UnterminatedError(Exception):
+    """Input ended inside a quote or substitution."""
+
+
+def split_commands(source: str) -> list[list[str]]:
+    """Return the simple commands in *source*, each as a list of words."""
+    return _Lexer(source, 0).split()
+
+
+def _basename(word: str) -> str:
+    return word.rpartition("/")[2]
+
+
+class _Lexer:
+    def __init__(self, src: str, depth: int, start: int = 0) -> None:
+        self.src = src
+        self.depth = depth
+        self.i = start
+        self.commands: list[list[str]] = []
+        self.words: list[str] = []
+        self.word: list[str] | None = None
+        self.broken = False
+        # Next word is a redirection target: "file" (dropped) or "here"
+        # (a here-string, split when the command is a shell).
+        self.target: str | None = None
+        # Pending heredocs: (delimiter, strip_tabs, index of the first
+        # command that may consume the body).
+        self.heredocs: list[tuple[str, bool, int]] = []
+        # Here-string text of the current command, for ``xargs`` to read.
+        self.here: list[str] = []
+
+    # -- driver ---------------------------------------------------------------
+
+    def split(self) -> list[list[str]]:
+        self._run(nested=False)
+        return self.commands
+
+    def _run(self, *, nested: bool) -> None:
+        """Lex until end of input, or the ``)`` closing a substitution."""
+        src = self.src
+        parens = 0
+        while self.i < len(src):
+            c = src[self.i]
+            if c in " \t":
+                self._end_word()
+                self.i += 1
+            elif c == "\n":
+                self._end_command()
+                self.i += 1
+                self._read_heredocs()
+            elif c == "#" and self.word is None:
+                end = src.find("\n", self.i)
+                self.i = len(src) if end < 0 else end
+            elif c == "&" and src.startswith(">", self.i + 1):
+                self.i += 1
+                self._redirect()
+            elif c in "<>" and not src.startswith("(", self.i + 1):
+                self._redirect()
+            elif c == "(":
+                self._end_command()
+                parens += 1
+                self.i += 1
+            elif c == ")":
+                self._end_command()
+                self.i += 1
+                if parens == 0 and nested:
+                    return
+                parens = max(parens - 1, 0)
+            elif c in ";&|":
+                self._end_command()
+                self.i += 2 if src[self.i : self.i + 2] in ("&&", "||", ";;", "|&") else 1
+            else:
+                try:
+                    if c in "<>" and src.startswith("(", self.i + 1):
+                        self._append_substitution(self.i + 2)
+                    else:
+                        self._word_char(c, quoted=False)
+                except _UnterminatedError:
+                    self.broken = True
+                    self.i = len(src)
+        if nested:
+            raise _UnterminatedError
+        self._end_command()
+
+    # -- words ----------------------------------------------------------------
+
+    def _append(self, text: str) -> None:
+        if self.word is None:
+            self.word = []
+        self.word.append(text)
+
+    def _word_char(self, c: str, *, quoted: bool) -> None:
+        src = self.src
+        if c == "\\":
+            nxt = src[self.i + 1 : self.i + 2]
+            if nxt == "\n":
+                self.i += 2
+                return
+            if quoted and nxt not in ('"', "\\", "$", "`"):
+                self._append(c)
+                self.i += 1
+                return
+            self._append(nxt)
+            self.i += 2
+        elif c == "'" and not quoted:
+            end = src.find("'", self.i + 1)
+            if end < 0:
+                raise _UnterminatedError
+            self._append(src[self.i + 1 : end])
+            self.i = end + 1
+        elif c == '"' and not quoted:
+            self._append("")
+            self.i += 1
+            while True:
+                if self.i >= len(src):
+                    raise _UnterminatedError
+                q = src[self.i]
+                if q == '"':
+                    self.i += 1
+                    return
+                self._word_char(q, quoted=True)
+        elif c == "$" and src.startswith("(", self.i + 1):
+            self._append_substitution(self.i + 2)
+        elif c == "$" and src.startswith("{", self.i + 1):
+            end = src.find("}", self.i)
+            if end < 0:
+                raise _UnterminatedError
+            self._append(src[self.i : end + 1])
+            self.i = end + 1
+        elif c == "`":
+            self._append_backticks()
+        else:
+            self._append(c)
+            self.i += 1
+
+    def _append_substitution(self, body_start: int) -> None:
+        """Split ``$( ... )``-style text starting at *body_start*."""
+        start = self.i
+        inner = _Lexer(self.src, self.depth + 1, body_start)
+        inner._run(nested=True)
+        self.commands.extend(inner.commands)
+        self._append(self.src[start : inner.i])
+        self.i = inner.i
+
+    def _append_backticks(self) -> None:
+        src = self.src
+        end = self.i + 1
+        while end < len(src) and src[end] != "`":
+            end += 2 if src[end] == "\\" else 1
+        if end >= len(src):
+            raise _UnterminatedError
+        body = src[self.i + 1 : end].replace("\\`", "`")
+        self._split_nested(body)
+        self._append(src[self.i : end + 1])
+        self.i = end + 1
+
+    def _end_word(self) -> None:
+        if self.word is None:
+            return
+        word = "".join(self.word)
+        self.word = None
+        target, self.target = self.target, None
+        if target is None:
+            self.words.append(word)
+        elif target == "here" and self._is_shell(self.words):
+            self._split_nested(word)
+        elif target == "here":
+            self.here.append(word)
+
+    def _redirect(self) -> None:
+        """Consume a redirection operator; its target word is not an argument."""
+        src = self.src
+        if self.word is not None and "".join(self.word).isdigit():
+            self.word = None
+        else:
+            self._end_word()
+        if src.startswith("<<<", self.i):
+            self.i += 3
+            self.target = "here"
+        elif src.startswith("<<", self.i):
+            strip_tabs = src.startswith("<<-", self.i)
+            self.i += 3 if strip_tabs else 2
+            self._heredoc_delimiter(strip_tabs)
+        else:
+            self.i += 1
+            if src[self.i : self.i + 1] in (">", "&", "|"):
+                self.i += 1
+            self.target = "file"
+
+    # -- heredocs -------------------------------------------------------------
+
+    def _heredoc_delimiter(self, strip_tabs: bool) -> None:
+        src = self.src
+        while self.i < len(src) and src[self.i] in " \t":
+            self.i += 1
+        start = self.i
+        while self.i < len(src) and src[self.i] not in " \t\n;&|<>()":
+            self.i += 1
+        delimiter = src[start : self.i]
+        for quote in ("'", '"', "\\"):
+            delimiter = delimiter.replace(quote, "")
+        self.heredocs.append((delimiter, strip_tabs, len(self.commands)))
+
+    def _read_heredocs(self) -> None:
+        pending, self.heredocs = self.heredocs, []
+        src = self.src
+        for delimiter, strip_tabs, first in pending:
+            body: list[str] = []
+            while self.i < len(src):
+                end = src.find("\n", self.i)
+                end = len(src) if end < 0 else end
+                line = src[self.i : end]
+                self.i = end + 1
+                if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                    break
+                body.append(line)
+            # The body is data unless a shell on its line can read it
+            # (``bash <<EOF``, ``cat <<EOF | sh``).
+            if any(self._is_shell(words) for words in self.commands[first:]):
+                self._split_nested("\n".join(body))
+            else:
+                self._feed_xargs(self.commands[first:], "\n".join(body))
+
+    # -- commands -------------------------------------------------------------
+
+    def _end_command(self) -> None:
+        self._end_word()
+        words, self.words = self.words, []
+        here, self.here = self.here, []
+        self.target = None
+        if self.broken or not words:
+            return
+        self.commands.append(words)
+        self._feed_xargs([words], "\n".join(here))
+        self._split_command_arguments(words)
+
+    def _split_command_arguments(self, words: list[str]) -> None:
+        """Split the command text given to ``sh -c`` or ``eval``."""
+        for idx, word in enumerate(words):
+            name = _basename(word)
+            if name == "eval":
+                self._split_nested(" ".join(words[idx + 1 :]))
+                return
+            if name in _SHELLS:
+                for pos in range(idx + 1, len(words) - 1):
+                    flag = words[pos]
+                    if flag.startswith("-") and not flag.startswith("--") and "c" in flag:
+                        self._split_nested(words[pos + 1])
+                        return
+                return
+
+    @staticmethod
+    def _is_shell(words: list[str]) -> bool:
+        return any(_basename(w) in _SHELLS for w in words)
+
+    @staticmethod
+    def _feed_xargs(commands: list[list[str]], stdin: str) -> None:
+        """Add *stdin*'s words to the first of *commands* run through ``xargs``."""
+        for words in commands:
+            if any(_basename(w) == "xargs" for w in words):
+                words.extend(stdin.split())
+                return
+
+    def _split_nested(self, text: str) -> None:
+        if self.depth < _MAX_DEPTH:
+            self.commands.extend(_Lexer(text, self.depth + 1).split())
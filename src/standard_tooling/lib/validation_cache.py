@@ -0,0 +1,107 @@
+"""Content-addressed record of passing ``st-validate-local`` runs.
+
+A run is identified by the tree the validators would see (the working
+tree as ``git add -A`` would stage it, see :func:`git.worktree_tree`),
+the validators themselves (path and script content), the versions of
+standard-tooling and Python running them, and the versions of the
+linters and language toolchains the dev image provides (markdownlint,
+shellcheck, yamllint; rustc, go, java, node and the like), so a new
+image invalidates the passes the old one recorded. Everything else
+the validators depend on (lockfiles, tool configuration, ``scripts/bin``)
+is part of the tree. When every part matches a recorded pass, the run
+can be skipped.
+
+Passes are kept in ``st-validate-local.json`` in the repository's common
+git dir, which the dev container sees through its bind mount and all
+worktrees share. Only the newest ``_MAX_ENTRIES`` passes are kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import platform
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from standard_tooling.lib import git, lint_cache
+from standard_tooling.lib.cache import TtlCache
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from standard_tooling.lib.context import RepoContext
+
+_CACHE_NAME = "st-validate-local"
+_MAX_ENTRIES = 64
+_TTL_SECS = 30 * 24 * 60 * 60
+# Bump to invalidate every recorded pass after a change in what the key covers.
+_KEY_VERSION = "3"
+# Tools that come with the dev image rather than the repository's lockfiles,
+# with the argument that prints their version. Each image has only its own
+# language's toolchain; the others are recorded as missing.
+_IMAGE_TOOLS = (
+    ("markdownlint", "--version"),
+    ("shellcheck", "--version"),
+    ("yamllint", "--version"),
+    ("uv", "--version"),
+    ("ruby", "--version"),
+    ("bundle", "--version"),
+    ("go", "version"),
+    ("rustc", "--version"),
+    ("cargo", "--version"),
+    ("java", "--version"),
+    ("mvn", "--version"),
+    ("node", "--version"),
+)
+
+
+def _tool_versions(ctx: RepoContext) -> str:
+    try:
+        tooling = metadata.version("standard-tooling")
+    except metadata.PackageNotFoundError:
+        tooling = "unknown"
+    versions = [f"standard-tooling {tooling}", f"python {platform.python_version()}"]
+    for tool, flag in _IMAGE_TOOLS:
+        # Asked once per installed binary; see lint_cache.tool_version.
+        version = lint_cache.tool_version(ctx.common_dir, tool, flag)
+        versions.append(f"{tool} {version or 'missing'}")
+    return "; ".join(versions)
+
+
+def _validator_identity(path: str | None) -> str:
+    if path is None:
+        return "-"
+    try:
+        digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        digest = "unreadable"
+    return f"{path} {digest}"
+
+
+def run_key(ctx: RepoContext, validators: Sequence[str | None]) -> tuple[str, str]:
+    """Return ``(tree, key)`` for validating the current working tree.
+
+    *validators* are the resolved validator paths, None for any that is
+    absent. Raises ``subprocess.CalledProcessError`` or ``OSError`` if
+    git cannot describe the tree.
+    """
+    tree = git.worktree_tree(ctx.root, ctx.git_dir)
+    parts = [_KEY_VERSION, tree, _tool_versions(ctx), *map(_validator_identity, validators)]
+    return tree, hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _cache(ctx: RepoContext) -> TtlCache:
+    return TtlCache(_CACHE_NAME, ctx.common_dir, max_entries=_MAX_ENTRIES)
+
+
+def recorded_pass(ctx: RepoContext, key: str) -> dict[str, Any] | None:
+    """Return the record of a passing run under *key*, or None."""
+    entry = _cache(ctx).get(key)
+    return entry if isinstance(entry, dict) else None
+
+
+def record_pass(ctx: RepoContext, key: str, tree: str) -> None:
+    """Remember that the run identified by *key* passed."""
+    _cache(ctx).put(key, {"tree": tree, "passed_at": time.time()}, _TTL_SECS)
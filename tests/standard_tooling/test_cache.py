@@ -0,0 +1,76 @@
+"""Tests for standard_tooling.lib.cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from standard_tooling.lib.cache import TtlCache, cache_dir
+
+_MOD = "standard_tooling.lib.cache"
+
+
+def test_cache_dir_honours_xdg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache_dir() == tmp_path / "standard-tooling"
+
+
+def test_cache_dir_defaults_to_home(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    assert cache_dir() == Path.home() / ".cache" / "standard-tooling"
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    cache = TtlCache("things", tmp_path)
+    cache.put("a", {"x": 1}, 60)
+    assert TtlCache("things", tmp_path).get("a") == {"x": 1}
+    assert cache.get("b") is None
+
+
+def test_expired_entry_misses_and_is_pruned(tmp_path: Path) -> None:
+    cache = TtlCache("things", tmp_path)
+    with patch(f"{_MOD}.time.time", return_value=1000.0):
+        cache.put("old", "v", 10)
+    with patch(f"{_MOD}.time.time", return_value=2000.0):
+        assert cache.get("old") is None
+        cache.put("new", "w", 10)
+    stored = json.loads((tmp_path / "things.json").read_text())
+    assert set(stored) == {"new"}
+
+
+@pytest.mark.parametrize("content", ["{not json", "[1, 2]", '{"a": "bare"}'])
+def test_malformed_file_reads_as_empty(tmp_path: Path, content: str) -> None:
+    (tmp_path / "things.json").write_text(content)
+    cache = TtlCache("things", tmp_path)
+    assert cache.get("a") is None
+    cache.put("b", 1, 60)
+    assert cache.get("b") == 1
+
+
+def test_unwritable_directory_is_ignored(tmp_path: Path) -> None:
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = TtlCache("things", blocker / "sub")
+    cache.put("a", 1, 60)
+    assert cache.get("a") is None
+
+
+def test_max_entries_evicts_oldest_writes(tmp_path: Path) -> None:
+    cache = TtlCache("things", tmp_path, max_entries=2)
+    for i, key in enumerate(["a", "b", "c", "b", "d"]):
+        with patch(f"{_MOD}.time.time", return_value=1000.0 + i):
+            cache.put(key, i, 60)
+    with patch(f"{_MOD}.time.time", return_value=1010.0):
+        assert [cache.get(k) for k in "abcd"] == [None, 3, None, 4]
+
+
+def test_many_round_trip_in_one_write(tmp_path: Path) -> None:
+    cache = TtlCache("things", tmp_path)
+    cache.put("a", 0, 60)
+    with patch.object(TtlCache, "_load", wraps=cache._load) as load:
+        cache.put_many({"b": 1, "c": 2}, 60)
+        assert cache.get_many(["a", "c", "z"]) == {"a": 0, "c": 2}
+    assert load.call_count == 2
@@ -0,0 +1,31 @@
+"""Tests for standard_tooling.lib.changed_files."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from standard_tooling.lib import changed_files
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_exported_round_trips_through_the_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    files = ["a.py", "docs/with space.md", "caf\N{LATIN SMALL LETTER E WITH ACUTE}.txt"]
+    with changed_files.exported(files) as env:
+        monkeypatch.setenv(changed_files.ENV_VAR, env[changed_files.ENV_VAR])
+        assert changed_files.from_env() == frozenset(files)
+        listing = Path(env[changed_files.ENV_VAR])
+    assert not listing.exists()
+
+
+def test_empty_set(monkeypatch: pytest.MonkeyPatch) -> None:
+    with changed_files.exported([]) as env:
+        monkeypatch.setenv(changed_files.ENV_VAR, env[changed_files.ENV_VAR])
+        assert changed_files.from_env() == frozenset()
+
+
+def test_unset(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(changed_files.ENV_VAR, raising=False)
+    assert changed_files.from_env() is None
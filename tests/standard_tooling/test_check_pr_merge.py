@@ -2,16 +2,27 @@
 
 from __future__ import annotations
 
+import os
 import subprocess
+import sys
+from typing import TYPE_CHECKING
 from unittest.mock import patch
 
 import pytest
 
 from standard_tooling.bin.check_pr_merge import extract_pr_ref, main
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 _MOD = "standard_tooling.bin.check_pr_merge"
 
 
+@pytest.fixture(autouse=True)
+def _private_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
 class TestExtractPrRef:
     """Tests for extract_pr_ref (Task 2)."""
 
@@ -85,6 +96,66 @@ class TestExtractPrRef:
         with pytest.raises(ValueError):
             extract_pr_ref("gh pr merge --squash")
 
+    def test_operators_inside_quotes(self) -> None:
+        ref, _ = extract_pr_ref('gh pr merge --body "done; ship && go" 42')
+        assert ref == "42"
+
+    def test_command_substitution(self) -> None:
+        ref, _ = extract_pr_ref('echo "$(gh pr merge 42)"')
+        assert ref == "42"
+
+    def test_subshell(self) -> None:
+        ref, _ = extract_pr_ref("(cd repo && gh pr merge 42)")
+        assert ref == "42"
+
+    def test_env_prefix_and_redirect(self) -> None:
+        ref, _ = extract_pr_ref("GH_TOKEN=x gh pr merge 42 > log.txt 2>&1")
+        assert ref == "42"
+
+    def test_absolute_gh_path(self) -> None:
+        ref, _ = extract_pr_ref("/usr/local/bin/gh pr merge 42")
+        assert ref == "42"
+
+    def test_quoted_gh_word(self) -> None:
+        ref, _ = extract_pr_ref('g"h" p\\r merge 42')
+        assert ref == "42"
+
+    def test_heredoc_body_is_data(self) -> None:
+        with pytest.raises(ValueError):
+            extract_pr_ref("cat <<EOF > notes.md\nRun gh pr merge 42 later.\nEOF")
+
+    def test_heredoc_fed_to_shell(self) -> None:
+        ref, _ = extract_pr_ref("bash <<'EOF'\ngh pr merge 42\nEOF")
+        assert ref == "42"
+
+    @pytest.mark.parametrize(
+        "command",
+        [
+            "xargs gh pr merge <<< 26",
+            "env GH_REPO=o/r command xargs -n1 gh pr merge --squash <<< '26'",
+            "xargs -I{} gh pr merge {} <<EOF\n26\nEOF",
+        ],
+    )
+    def test_ref_read_by_xargs(self, command: str) -> None:
+        ref, _ = extract_pr_ref(command)
+        assert ref == "26"
+
+    def test_gh_word_not_followed_by_pr(self) -> None:
+        ref, _ = extract_pr_ref("sudo -u gh gh pr merge 42")
+        assert ref == "42"
+
+    def test_later_gh_in_same_command(self) -> None:
+        ref, _ = extract_pr_ref("gh pr list && sudo gh pr merge 42")
+        assert ref == "42"
+
+    def test_prefilter_rejects_unrelated_commands(self) -> None:
+        with (
+            patch(f"{_MOD}.split_commands") as split,
+            pytest.raises(ValueError),
+        ):
+            extract_pr_ref("git status --short")
+        split.assert_not_called()
+
 
 class TestMain:
     """End-to-end tests for main() (Task 3)."""
@@ -93,7 +164,7 @@ class TestMain:
     def _mock_branch(branch: str):
         """Return a context manager that mocks gh pr view to return a branch."""
         return patch(
-            f"{_MOD}.github.read_output",
+            "standard_tooling.lib.github.read_output",
             return_value=branch,
         )
 
@@ -141,7 +212,7 @@ class TestMain:
 
     def test_api_failure(self, capsys: pytest.CaptureFixture[str]) -> None:
         err = subprocess.CalledProcessError(returncode=1, cmd=["gh"], stderr="API error")
-        with patch(f"{_MOD}.github.read_output", side_effect=err):
+        with patch("standard_tooling.lib.github.read_output", side_effect=err):
             rc = main(["gh pr merge 42"])
         assert rc == 2
         assert "API error" in capsys.readouterr().err or "Could not" in capsys.readouterr().err
@@ -179,3 +250,117 @@ class TestMain:
     def test_no_match(self) -> None:
         rc = main(["gh issue list"])
         assert rc == 0
+
+    def test_branch_lookup_cached_on_disk(self) -> None:
+        with self._mock_branch("feature/1-x") as mock:
+            assert main(["gh pr merge 42"]) == 1
+            assert main(["gh pr review --approve 42"]) == 1
+        mock.assert_called_once()
+
+    def test_cache_keyed_by_repo(self) -> None:
+        with self._mock_branch("feature/1-x") as mock:
+            main(["gh pr merge 42"])
+            main(["gh pr merge --repo o/r 42"])
+            main(["gh pr merge --repo o/r 42"])
+        assert mock.call_count == 2
+
+    def test_cache_keys_url_without_local_repo(self) -> None:
+        url = "https://github.com/o/r/pull/364"
+        with (
+            self._mock_branch("release/2.0.0") as mock,
+            patch("standard_tooling.lib.git.RefReader.discover") as discover,
+        ):
+            main([f"gh pr merge {url}"])
+            main([f"gh pr merge {url}"])
+        mock.assert_called_once()
+        discover.assert_not_called()
+
+    def test_bare_number_outside_repository(self) -> None:
+        with (
+            self._mock_branch("feature/1-x") as mock,
+            patch("standard_tooling.lib.git.RefReader.discover", return_value=None),
+        ):
+            main(["gh pr merge 42"])
+            main(["gh pr merge 42"])
+        mock.assert_called_once()
+
+    def test_cache_expires(self) -> None:
+        with self._mock_branch("feature/1-x") as mock:
+            main(["gh pr merge 42"])
+            with patch("standard_tooling.lib.cache.time.time", return_value=1e12):
+                main(["gh pr merge 42"])
+        assert mock.call_count == 2
+
+    def test_no_cache_flag_always_asks(self) -> None:
+        with self._mock_branch("feature/1-x") as mock:
+            main(["gh pr merge 42"])
+            main(["--no-cache", "gh pr merge 42"])
+        assert mock.call_count == 2
+
+    def test_no_cache_flag_does_not_write(self, tmp_path: Path) -> None:
+        with self._mock_branch("feature/1-x"):
+            main(["--no-cache", "gh pr merge 42"])
+        assert not (tmp_path / "cache").exists()
+
+    def test_failure_cached_briefly(self, capsys: pytest.CaptureFixture[str]) -> None:
+        err = subprocess.CalledProcessError(returncode=1, cmd=["gh"], stderr="not found\n")
+        with patch("standard_tooling.lib.github.read_output", side_effect=err) as mock:
+            assert main(["gh pr merge 42"]) == 2
+            assert main(["gh pr merge 42"]) == 2
+        mock.assert_called_once()
+        assert "not found (cached)" in capsys.readouterr().err
+
+    def test_failure_not_cached_with_no_cache(self) -> None:
+        err = subprocess.CalledProcessError(returncode=1, cmd=["gh"], stderr="API error")
+        with patch("standard_tooling.lib.github.read_output", side_effect=err):
+            assert main(["--no-cache", "gh pr merge 42"]) == 2
+        with self._mock_branch("release/1.0.0"):
+            assert main(["gh pr merge 42"]) == 0
+
+
+def test_hook_path_imports_only_what_it_uses() -> None:
+    """The no-match path must not pay for subprocess or the gh wrappers.
+
+    Runs in a fresh interpreter so modules imported by other tests do
+    not mask a regression.
+    """
+    probe = (
+        "import sys\n"
+        f"from {_MOD} import main\n"
+        "assert main(['ls -la']) == 0\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        (sys.executable, "-c", probe),
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    loaded = set(result.stdout.split())
+    assert not loaded & {"subprocess", "standard_tooling.lib.github", "json", "tomllib"}
+
+
+def test_cache_hit_does_not_import_gh_wrappers(tmp_path: Path) -> None:
+    """A cached answer is served without subprocess calls or lib.github."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(sys.path),
+        "XDG_CACHE_HOME": str(tmp_path),
+    }
+    probe = (
+        "import sys\n"
+        "from standard_tooling.lib.cache import TtlCache\n"
+        "TtlCache('pr-head-branches').put('o/r#7', {'branch': 'release/1.0.0'}, 60)\n"
+        f"from {_MOD} import main\n"
+        "assert main(['gh pr merge --repo o/r 7']) == 0\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        (sys.executable, "-c", probe),
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert "standard_tooling.lib.github" not in result.stdout.split()
@@ -10,6 +10,7 @@ from unittest.mock import patch
 import pytest
 
 from standard_tooling.bin.commit import _validate_commit_context, main, parse_args
+from standard_tooling.lib.context import RepoContext
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
@@ -32,6 +33,18 @@ standard-tooling = "v1.4"
 """
 
 
+def _repo_context(tmp_path: Path, branch: str, *, is_main_worktree: bool = False) -> RepoContext:
+    common_dir = tmp_path / ".git"
+    git_dir = common_dir if is_main_worktree else common_dir / "worktrees" / "x"
+    return RepoContext(
+        root=tmp_path,
+        git_dir=git_dir,
+        common_dir=common_dir,
+        branch=branch,
+        head_sha=None,
+    )
+
+
 @contextlib.contextmanager
 def _commit_environment(
     tmp_path: Path,
@@ -56,13 +69,9 @@ def _commit_environment(
             _TEST_TOML_TEMPLATE.format(branching_model=branching_model)
         )
 
+    ctx = _repo_context(tmp_path, branch, is_main_worktree=is_main_worktree)
     with (
-        patch("standard_tooling.bin.commit.git.current_branch", return_value=branch),
-        patch("standard_tooling.bin.commit.git.repo_root", return_value=tmp_path),
-        patch(
-            "standard_tooling.bin.commit.git.is_main_worktree",
-            return_value=is_main_worktree,
-        ),
+        patch("standard_tooling.bin.commit.context.current", return_value=ctx),
         patch(
             "standard_tooling.bin.commit.git.has_staged_changes",
             return_value=has_staged,
@@ -169,9 +178,9 @@ def test_main_with_scope_and_body(tmp_path: Path) -> None:
 
 def test_main_config_error(tmp_path: Path) -> None:
     (tmp_path / "standard-tooling.toml").write_text("[invalid\n")
-    with (
-        patch("standard_tooling.bin.commit.git.current_branch", return_value="feature/42-test"),
-        patch("standard_tooling.bin.commit.git.repo_root", return_value=tmp_path),
+    with patch(
+        "standard_tooling.bin.commit.context.current",
+        return_value=_repo_context(tmp_path, "feature/42-test"),
     ):
         result = main(_DEFAULT_ARGS)
     assert result == 1
@@ -179,9 +188,10 @@ def test_main_config_error(tmp_path: Path) -> None:
 
 def test_main_missing_config(tmp_path: Path) -> None:
     with (
-        patch("standard_tooling.bin.commit.git.current_branch", return_value="feature/42-test"),
-        patch("standard_tooling.bin.commit.git.repo_root", return_value=tmp_path),
-        patch("standard_tooling.bin.commit.git.is_main_worktree", return_value=False),
+        patch(
+            "standard_tooling.bin.commit.context.current",
+            return_value=_repo_context(tmp_path, "feature/42-test"),
+        ),
         patch("standard_tooling.bin.commit.git.has_staged_changes", return_value=True),
     ):
         result = main(_DEFAULT_ARGS)
@@ -259,18 +269,15 @@ def test_validate_admits_promotion_for_application_promotion(tmp_path: Path) ->
 
 
 def test_validate_rejects_unknown_branching_model(tmp_path: Path) -> None:
-    with patch("standard_tooling.bin.commit.git.current_branch", return_value="feature/42-thing"):
-        assert _validate_commit_context(tmp_path, "bogus-model") == 1
+    assert _validate_commit_context(_repo_context(tmp_path, "feature/42-thing"), "bogus-model") == 1
 
 
 def test_validate_falls_back_when_no_config(tmp_path: Path) -> None:
-    with patch("standard_tooling.bin.commit.git.current_branch", return_value="feature/42-test"):
-        assert _validate_commit_context(tmp_path, "") == 0
+    assert _validate_commit_context(_repo_context(tmp_path, "feature/42-test"), "") == 0
 
 
 def test_validate_fallback_rejects_hotfix(tmp_path: Path) -> None:
-    with patch("standard_tooling.bin.commit.git.current_branch", return_value="hotfix/42-urgent"):
-        assert _validate_commit_context(tmp_path, "") == 1
+    assert _validate_commit_context(_repo_context(tmp_path, "hotfix/42-urgent"), "") == 1
 
 
 # Check 4: issue number in branch name
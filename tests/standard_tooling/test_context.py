@@ -0,0 +1,112 @@
+"""Tests for standard_tooling.lib.context."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+from standard_tooling.lib import context, git
+from standard_tooling.lib.config import ConfigError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_LAYOUT = "/repo\n/repo/.git/worktrees/x\n/repo/.git"
+
+_TOML = """\
+[project]
+repository-type = "library"
+versioning-scheme = "semver"
+branching-model = "library-release"
+release-model = "tagged-release"
+primary-language = "python"
+
+[dependencies]
+standard-tooling = "v1.4"
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fresh_context() -> Iterator[None]:
+    git.close_session()
+    context._current = None
+    with patch("standard_tooling.lib.git.RefReader.discover", return_value=None):
+        yield
+    context._current = None
+    git.close_session()
+
+
+def _ctx(root: Path, *, main: bool = True) -> context.RepoContext:
+    common_dir = root / ".git"
+    return context.RepoContext(
+        root=root,
+        git_dir=common_dir if main else common_dir / "worktrees" / "x",
+        common_dir=common_dir,
+        branch="develop",
+        head_sha=None,
+    )
+
+
+def test_current_gathers_snapshot_once() -> None:
+    with (
+        patch("standard_tooling.lib.git.read_output", side_effect=[_LAYOUT, "feature/1-x"]) as rd,
+        patch("standard_tooling.lib.git.GitSession.resolve", return_value="abc123") as resolve,
+    ):
+        ctx = context.current()
+        assert context.current() is ctx
+    assert rd.call_count == 2
+    resolve.assert_called_once_with("HEAD")
+    assert ctx.root == Path("/repo")
+    assert ctx.branch == "feature/1-x"
+    assert ctx.head_sha == "abc123"
+    assert ctx.is_main_worktree is False
+    assert ctx.main_worktree_root == Path("/repo")
+
+
+def test_invalidate_forces_recapture() -> None:
+    with (
+        patch(
+            "standard_tooling.lib.git.read_output",
+            side_effect=[_LAYOUT, "feature/1-x", _LAYOUT, "develop"],
+        ),
+        patch("standard_tooling.lib.git.GitSession.resolve", return_value=None),
+    ):
+        first = context.current()
+        context.invalidate()
+        second = context.current()
+    assert first.branch == "feature/1-x"
+    assert second.branch == "develop"
+
+
+def test_invalidate_without_session_is_noop() -> None:
+    context.invalidate()
+    assert context._current is None
+
+
+def test_main_worktree_properties(tmp_path: Path) -> None:
+    ctx = _ctx(tmp_path)
+    assert ctx.is_main_worktree is True
+    assert ctx.main_worktree_root == tmp_path
+
+
+def test_config_is_parsed_once(tmp_path: Path) -> None:
+    (tmp_path / "standard-tooling.toml").write_text(_TOML)
+    ctx = _ctx(tmp_path)
+    with patch("standard_tooling.lib.context.read_config", wraps=context.read_config) as mock:
+        assert ctx.config.project.branching_model == "library-release"
+        assert ctx.config is ctx.config
+    mock.assert_called_once_with(tmp_path)
+
+
+def test_config_missing_raises_file_not_found(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        _ = _ctx(tmp_path).config
+
+
+def test_config_invalid_raises_config_error(tmp_path: Path) -> None:
+    (tmp_path / "standard-tooling.toml").write_text("[invalid\n")
+    with pytest.raises(ConfigError):
+        _ = _ctx(tmp_path).config
@@ -0,0 +1,288 @@
+"""Tests for standard_tooling.lib.daemon."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from standard_tooling.lib import daemon, daemon_client
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+_MOD = "standard_tooling.lib.daemon"
+
+
+@pytest.fixture
+def pipe_fds() -> Iterator[tuple[list[int], int]]:
+    """Caller stdio for serve_request: /dev/null in, a pipe for out and err."""
+    read_end, write_end = os.pipe()
+    null = os.open(os.devnull, os.O_RDONLY)
+    yield [null, write_end, write_end], read_end
+    os.close(null)
+    os.close(read_end)
+
+
+def _drain(fds: list[int], read_end: int) -> str:
+    os.close(fds[1])
+    with os.fdopen(os.dup(read_end), encoding="utf-8") as f:
+        return f.read()
+
+
+def _request(tool: str, argv: list[str], cwd: Path) -> dict[str, object]:
+    return {
+        "tool": tool,
+        "argv": argv,
+        "prog": "st-fake",
+        "cwd": str(cwd),
+        "env": {**os.environ, "ST_FAKE": "yes"},
+    }
+
+
+def test_serve_request_adopts_caller_state(tmp_path: Path, pipe_fds: tuple[list[int], int]) -> None:
+    fds, read_end = pipe_fds
+    seen: dict[str, object] = {}
+
+    def tool(argv: list[str] | None) -> int:
+        seen.update(argv=argv, cwd=str(Path.cwd()), env=os.environ.get("ST_FAKE"), prog=sys.argv[0])
+        # Descriptor-level writes, as a child git process would make.
+        os.write(1, b"out from the daemon\n")
+        os.write(2, b"err from the daemon\n")
+        return 4
+
+    cwd_before = Path.cwd()
+    with patch.dict(daemon._TOOLS, {"fake": tool}):
+        rc = daemon.serve_request(_request("fake", ["-x"], tmp_path), fds)
+
+    assert rc == 4
+    assert seen == {"argv": ["-x"], "cwd": str(tmp_path), "env": "yes", "prog": "st-fake"}
+    assert _drain(fds, read_end) == "out from the daemon\nerr from the daemon\n"
+    assert Path.cwd() == cwd_before
+    assert "ST_FAKE" not in os.environ
+
+
+def test_serve_request_recaptures_repo_state(
+    tmp_path: Path, pipe_fds: tuple[list[int], int]
+) -> None:
+    fds, _ = pipe_fds
+    with (
+        patch.dict(daemon._TOOLS, {"fake": lambda argv: 0}),
+        patch(f"{_MOD}.git.close_session") as close,
+        patch(f"{_MOD}.context.invalidate") as invalidate,
+    ):
+        daemon.serve_request(_request("fake", [], tmp_path), fds)
+    close.assert_called_once()
+    invalidate.assert_called_once()
+
+
+def test_serve_request_unknown_tool(
+    tmp_path: Path, pipe_fds: tuple[list[int], int], capsys: pytest.CaptureFixture[str]
+) -> None:
+    fds, _ = pipe_fds
+    assert daemon.serve_request(_request("rm", [], tmp_path), fds) == 2
+    assert "does not serve 'rm'" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    ("exc", "expected"),
+    [
+        (SystemExit(None), 0),
+        (SystemExit(0), 0),
+        (SystemExit(2), 2),
+        (SystemExit("fatal"), 1),
+        (RuntimeError("boom"), 1),
+    ],
+)
+def test_call_maps_exits(
+    exc: BaseException, expected: int, capsys: pytest.CaptureFixture[str]
+) -> None:
+    def tool(argv: list[str] | None) -> int:
+        raise exc
+
+    assert daemon._call(tool, []) == expected
+
+
+def test_call_reports_crash(capsys: pytest.CaptureFixture[str]) -> None:
+    def tool(argv: list[str] | None) -> int:
+        raise RuntimeError("boom")
+
+    daemon._call(tool, [])
+    assert "RuntimeError: boom" in capsys.readouterr().err
+
+
+# -- serve ---------------------------------------------------------------------
+
+
+# The daemon forks per request; here it runs on a thread of the test process.
+_FORK_IN_THREAD = pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+
+
+def _start(path: str, idle: float = 5.0) -> threading.Thread:
+    thread = threading.Thread(target=daemon.serve, args=(path, idle), daemon=True)
+    thread.start()
+    assert daemon_client._connect(path, wait=2.0) is not None
+    return thread
+
+
+def _recording_tool(log: Path) -> Callable[[list[str] | None], int]:
+    """A tool that appends its argv to *log*: it runs in a forked child."""
+
+    def tool(argv: list[str] | None) -> int:
+        with log.open("a", encoding="utf-8") as f:
+            f.write(f"{argv}\n")
+        return 1
+
+    return tool
+
+
+@_FORK_IN_THREAD
+def test_serve_answers_client_and_exits_when_idle(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+    log = tmp_path / "calls"
+
+    with (
+        patch.dict(daemon._TOOLS, {"check-pr-merge": _recording_tool(log)}),
+        patch(f"{_MOD}.git.close_session"),
+        patch(f"{_MOD}.context.invalidate"),
+    ):
+        thread = _start(path, idle=0.3)
+        assert Path(path).stat().st_mode & 0o777 == 0o600
+        with patch(f"{daemon_client.__name__}.socket_path", return_value=path):
+            assert daemon_client._via_daemon("check-pr-merge", ["gh pr merge 1"]) == 1
+        thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert log.read_text() == "['gh pr merge 1']\n"
+    assert not Path(path).exists()
+
+
+@_FORK_IN_THREAD
+def test_serve_answers_while_a_long_request_runs(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+    release = tmp_path / "release"
+
+    def slow_commit(argv: list[str] | None) -> int:
+        deadline = time.monotonic() + 10
+        while not release.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return 0
+
+    with (
+        patch.dict(
+            daemon._TOOLS,
+            {"commit": slow_commit, "check-pr-merge": _recording_tool(tmp_path / "calls")},
+        ),
+        patch(f"{_MOD}.git.close_session"),
+        patch(f"{_MOD}.context.invalidate"),
+        patch(f"{daemon_client.__name__}.socket_path", return_value=path),
+    ):
+        thread = _start(path, idle=0.5)
+        commit_rc: list[int | None] = []
+        committer = threading.Thread(
+            target=lambda: commit_rc.append(daemon_client._via_daemon("commit", []))
+        )
+        committer.start()
+        # Answered while the commit is still waiting to be released.
+        assert daemon_client._via_daemon("check-pr-merge", ["gh pr merge 1"]) == 1
+        assert committer.is_alive()
+        release.touch()
+        committer.join(timeout=5)
+        thread.join(timeout=5)
+
+    assert commit_rc == [0]
+    assert not thread.is_alive()
+
+
+def test_handler_serves_one_request(tmp_path: Path) -> None:
+    server_end, client_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    request = _request("fake", ["-x"], tmp_path)
+    with server_end, client_end:
+        socket.send_fds(client_end, [b"\0"], [0, 1, 2])
+        client_end.sendall(json.dumps(request).encode() + b"\n")
+        with patch(f"{_MOD}.serve_request", return_value=3) as serve_request:
+            daemon._Handler(server_end, "", MagicMock())
+        assert json.loads(client_end.makefile("rb").readline()) == {"rc": 3}
+    assert serve_request.call_args.args[0] == request
+
+
+def test_handler_drops_a_request_without_a_line() -> None:
+    server_end, client_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    with server_end, client_end:
+        socket.send_fds(client_end, [b"\0"], [0, 1, 2])
+        client_end.shutdown(socket.SHUT_WR)
+        with patch(f"{_MOD}.serve_request") as serve_request:
+            daemon._Handler(server_end, "", MagicMock())
+        server_end.shutdown(socket.SHUT_WR)
+        assert client_end.makefile("rb").readline() == b""
+    serve_request.assert_not_called()
+
+
+@_FORK_IN_THREAD
+def test_serve_ignores_incomplete_request(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+    thread = _start(path, idle=0.3)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        socket.send_fds(sock, [b"\0"], [0])
+        sock.shutdown(socket.SHUT_WR)
+        assert sock.makefile("rb").readline() == b""
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_serve_defers_to_live_daemon(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(path)
+        listener.listen()
+        with patch(f"{_MOD}._Server") as server:
+            daemon.serve(path)
+        server.assert_not_called()
+
+
+@_FORK_IN_THREAD
+def test_serve_replaces_stale_socket(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as dead:
+        dead.bind(path)
+    thread = _start(path, idle=0.3)
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_serve_tolerates_socket_already_removed(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+
+    def remove_and_idle(self: daemon._Server) -> None:
+        Path(path).unlink()
+        self.idle = True
+
+    with patch.object(daemon._Server, "handle_request", remove_and_idle):
+        daemon.serve(path)
+
+
+# -- main ----------------------------------------------------------------------
+
+
+def test_main_usage(capsys: pytest.CaptureFixture[str]) -> None:
+    assert daemon.main([]) == 2
+    assert "usage" in capsys.readouterr().err
+
+
+def test_main_serves(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ST_DAEMON_IDLE_SECS", "7")
+    monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(io.BytesIO()))
+    monkeypatch.setattr(sys, "stderr", io.TextIOWrapper(io.BytesIO()))
+    with patch(f"{_MOD}.serve") as serve:
+        assert daemon.main(["/repo/.git/st.sock"]) == 0
+    serve.assert_called_once_with("/repo/.git/st.sock", 7.0)
@@ -0,0 +1,228 @@
+"""Tests for standard_tooling.lib.daemon_client."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+from standard_tooling.lib import daemon_client
+
+if TYPE_CHECKING:
+    import pytest
+
+_MOD = "standard_tooling.lib.daemon_client"
+
+
+def _sock_name() -> str:
+    return f"st-daemon-{daemon_client._install_key()}.sock"
+
+
+# -- socket_path ---------------------------------------------------------------
+
+
+def test_socket_path_main_checkout(tmp_path: Path) -> None:
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "src").mkdir()
+    expected = str((tmp_path / ".git").resolve() / _sock_name())
+    assert daemon_client.socket_path(str(tmp_path / "src")) == expected
+
+
+def test_socket_path_worktree_uses_common_dir(tmp_path: Path) -> None:
+    common = tmp_path / "main" / ".git"
+    (common / "worktrees" / "wt").mkdir(parents=True)
+    (common / "worktrees" / "wt" / "commondir").write_text("../..\n")
+    wt = tmp_path / "wt"
+    wt.mkdir()
+    (wt / ".git").write_text(f"gitdir: {common / 'worktrees' / 'wt'}\n")
+    expected = str(common.resolve() / _sock_name())
+    assert daemon_client.socket_path(str(wt)) == expected
+
+
+def test_socket_path_bad_pointer(tmp_path: Path) -> None:
+    (tmp_path / ".git").write_text("not a pointer\n")
+    assert daemon_client.socket_path(str(tmp_path)) is None
+
+
+def test_socket_path_outside_repository() -> None:
+    assert daemon_client.socket_path("/") is None
+
+
+def test_socket_path_too_long(tmp_path: Path) -> None:
+    deep = tmp_path / ("x" * 120)
+    (deep / ".git").mkdir(parents=True)
+    assert daemon_client.socket_path(str(deep)) is None
+
+
+def test_install_key_is_stable() -> None:
+    assert daemon_client._install_key() == daemon_client._install_key()
+
+
+# -- dispatch ------------------------------------------------------------------
+
+
+def test_run_inline_commit() -> None:
+    with patch("standard_tooling.bin.commit.main", return_value=0) as main:
+        assert daemon_client.run_inline("commit", ["--help"]) == 0
+    main.assert_called_once_with(["--help"])
+
+
+def test_check_pr_merge_without_opt_in_runs_inline(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ST_DAEMON", raising=False)
+    with (
+        patch(f"{_MOD}._via_daemon") as via,
+        patch("standard_tooling.bin.check_pr_merge.main", return_value=0) as main,
+    ):
+        assert daemon_client.check_pr_merge() == 0
+    via.assert_not_called()
+    main.assert_called_once_with(None)
+
+
+def test_commit_uses_daemon_when_opted_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ST_DAEMON", "1")
+    monkeypatch.setattr(sys, "argv", ["st-commit", "--type", "feat"])
+    with (
+        patch(f"{_MOD}._via_daemon", return_value=3) as via,
+        patch("standard_tooling.bin.commit.main") as main,
+    ):
+        assert daemon_client.commit() == 3
+    via.assert_called_once_with("commit", ["--type", "feat"])
+    main.assert_not_called()
+
+
+def test_unreachable_daemon_falls_back_inline(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ST_DAEMON", "1")
+    with (
+        patch(f"{_MOD}._via_daemon", return_value=None),
+        patch("standard_tooling.bin.commit.main", return_value=0) as main,
+    ):
+        assert daemon_client.commit() == 0
+    main.assert_called_once()
+
+
+# -- _via_daemon ---------------------------------------------------------------
+
+
+def test_via_daemon_outside_repository() -> None:
+    with patch(f"{_MOD}.socket_path", return_value=None):
+        assert daemon_client._via_daemon("commit", []) is None
+
+
+def test_via_daemon_spawns_then_gives_up(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+    with (
+        patch(f"{_MOD}.socket_path", return_value=path),
+        patch(f"{_MOD}._connect", return_value=None) as connect,
+        patch(f"{_MOD}._spawn") as spawn,
+    ):
+        assert daemon_client._via_daemon("commit", []) is None
+    spawn.assert_called_once_with(path)
+    assert connect.call_count == 2
+
+
+def _fake_daemon(reply: bytes | None) -> tuple[socket.socket, list[dict[str, object]]]:
+    """One end of a socketpair served by a thread acting as the daemon."""
+    client, server = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    seen: list[dict[str, object]] = []
+
+    def serve() -> None:
+        with server:
+            _, fds, _, _ = socket.recv_fds(server, 1, 3)
+            for fd in fds:
+                os.close(fd)
+            seen.append(json.loads(server.makefile("rb").readline()))
+            if reply is not None:
+                server.sendall(reply)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return client, seen
+
+
+def test_via_daemon_round_trip(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sys, "argv", ["/usr/bin/st-check-pr-merge", "gh pr merge 1"])
+    sock, seen = _fake_daemon(b'{"rc": 1}\n')
+    with (
+        patch(f"{_MOD}.socket_path", return_value="/unused"),
+        patch(f"{_MOD}._connect", return_value=sock),
+    ):
+        assert daemon_client._via_daemon("check-pr-merge", ["gh pr merge 1"]) == 1
+    (request,) = seen
+    assert request["tool"] == "check-pr-merge"
+    assert request["argv"] == ["gh pr merge 1"]
+    assert request["prog"] == "st-check-pr-merge"
+    assert request["cwd"] == str(Path.cwd())
+    assert request["env"] == dict(os.environ)
+
+
+def test_via_daemon_connection_lost(capsys: pytest.CaptureFixture[str]) -> None:
+    sock, _ = _fake_daemon(None)
+    with (
+        patch(f"{_MOD}.socket_path", return_value="/unused"),
+        patch(f"{_MOD}._connect", side_effect=[None, sock]),
+        patch(f"{_MOD}._spawn"),
+    ):
+        assert daemon_client._via_daemon("commit", []) == 1
+    assert "closed the connection" in capsys.readouterr().err
+
+
+# -- _connect / _spawn ---------------------------------------------------------
+
+
+def test_connect_times_out(tmp_path: Path) -> None:
+    assert daemon_client._connect(str(tmp_path / "none.sock"), wait=0.05) is None
+
+
+def test_connect_succeeds(tmp_path: Path) -> None:
+    path = str(tmp_path / "s.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(path)
+        listener.listen()
+        sock = daemon_client._connect(path)
+        assert sock is not None
+        sock.close()
+
+
+def test_spawn_detaches_daemon() -> None:
+    with patch("subprocess.Popen") as popen:
+        daemon_client._spawn("/repo/.git/st.sock")
+    args, kwargs = popen.call_args
+    assert args[0] == (sys.executable, "-m", "standard_tooling.lib.daemon", "/repo/.git/st.sock")
+    assert kwargs["start_new_session"] is True
+
+
+def test_spawn_failure_is_ignored() -> None:
+    with patch("subprocess.Popen", side_effect=OSError("no python")):
+        daemon_client._spawn("/repo/.git/st.sock")
+
+
+def test_end_to_end_spawns_and_reuses_daemon(tmp_path: Path) -> None:
+    """The real client starts a real daemon, which then serves the next call."""
+    subprocess.run(("git", "init", "-q", str(tmp_path)), check=True)  # noqa: S603, S607
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(sys.path),
+        "ST_DAEMON": "1",
+        "ST_DAEMON_IDLE_SECS": "2",
+    }
+    run = (
+        "import sys\n"
+        "from standard_tooling.lib import daemon_client\n"
+        "sys.argv = ['st-check-pr-merge', 'ls -la']\n"
+        "sys.exit(daemon_client.check_pr_merge())\n"
+    )
+    for _ in range(2):
+        subprocess.run(  # noqa: S603
+            (sys.executable, "-c", run), check=True, cwd=tmp_path, env=env
+        )
+    path = daemon_client.socket_path(str(tmp_path))
+    assert path is not None
+    sock = daemon_client._connect(path)
+    assert sock is not None
+    sock.close()
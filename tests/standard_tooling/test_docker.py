@@ -8,18 +8,48 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from standard_tooling.lib import docker
 from standard_tooling.lib.docker import (
     _FALLBACK_IMAGE,
     assert_docker_available,
     build_docker_args,
     default_image,
     detect_language,
+    list_images,
+    remove_images,
     worktree_parent_gitdir,
 )
+from standard_tooling.lib.docker_api import Image
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
+_MOD = "standard_tooling.lib.docker"
+
+
+@pytest.fixture(autouse=True)
+def _cli_transport(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Keep tests on the CLI path whatever daemon socket the machine has."""
+    monkeypatch.setenv("ST_DOCKER_API", "0")
+    docker.reset_engine()
+    yield
+    docker.reset_engine()
+
+
+@pytest.fixture
+def native() -> MagicMock:
+    """Install a mock Engine API client in place of the CLI."""
+    client = MagicMock()
+    docker._engine.set(client)
+    return client
+
+
+def _daemon_error(message: str) -> subprocess.CalledProcessError:
+    return subprocess.CalledProcessError(
+        1, "docker", stderr=f"Error response from daemon: {message}"
+    )
+
 
 # -- detect_language ----------------------------------------------------------
 
@@ -327,3 +357,153 @@ def test_build_docker_args_pull_never_omits_pull_flag(tmp_path: Path) -> None:
         args = build_docker_args(tmp_path, "img:1", ["cmd"], pull_policy="never")
     assert "--pull=always" not in args
     assert not any(a.startswith("--pull=") for a in args)
+
+
+# -- Engine API transport -----------------------------------------------------
+
+
+def test_engine_is_built_once_from_env(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    assert docker.engine() is None
+    sock = tmp_path / "docker.sock"
+    sock.touch()
+    monkeypatch.delenv("ST_DOCKER_API")
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{sock}")
+    assert docker.engine() is None  # cached until reset
+    docker.reset_engine()
+    client = docker.engine()
+    assert client is not None
+    assert docker.engine() is client
+
+
+def test_assert_docker_available_pings_the_daemon(native: MagicMock) -> None:
+    with patch(f"{_MOD}.subprocess.run") as run:
+        assert_docker_available()
+    native.ping.assert_called_once()
+    run.assert_not_called()
+
+
+def test_assert_docker_available_daemon_error(native: MagicMock) -> None:
+    native.ping.side_effect = _daemon_error("starting")
+    with pytest.raises(SystemExit):
+        assert_docker_available()
+
+
+def test_unreachable_socket_falls_back_to_the_cli_for_good(native: MagicMock) -> None:
+    native.ping.side_effect = OSError("connection refused")
+    with patch(f"{_MOD}.subprocess.run", return_value=MagicMock(returncode=0)) as run:
+        assert_docker_available()
+        assert_docker_available()
+    native.ping.assert_called_once()
+    native.close.assert_called_once()
+    assert run.call_count == 2
+    assert docker.engine() is None
+
+
+# -- list_images --------------------------------------------------------------
+
+
+def test_list_images_uses_the_api(native: MagicMock) -> None:
+    native.images.return_value = [Image("img:1--main--abc", 1.0, 2)]
+    assert list_images("img:1--main--*") == [Image("img:1--main--abc", 1.0, 2)]
+    native.images.assert_called_once_with("img:1--main--*", shared_size=False)
+    list_images(shared_size=True)
+    native.images.assert_called_with(None, shared_size=True)
+
+
+def test_list_images_api_error(native: MagicMock) -> None:
+    native.images.side_effect = _daemon_error("boom")
+    assert list_images() is None
+
+
+def test_list_images_cli(native: MagicMock) -> None:
+    native.images.side_effect = OSError("gone")
+    stdout = (
+        "img:1--main--abc\t2027-01-15 08:00:00 +0000 UTC\t1.5GB\nimg:1--dev--def\tsometime\t?\n"
+    )
+    with (
+        patch(f"{_MOD}.subprocess.run", return_value=MagicMock(returncode=0, stdout=stdout)) as run,
+        patch(f"{_MOD}.time.time", return_value=5.0),
+    ):
+        images = list_images("img:1--*")
+    assert images == [
+        Image("img:1--main--abc", 1_800_000_000.0, 1_500_000_000),
+        Image("img:1--dev--def", 5.0, 0),
+    ]
+    assert run.call_args[0][0][-2:] == ["--filter", "reference=img:1--*"]
+
+
+def test_list_images_cli_failure() -> None:
+    with patch(f"{_MOD}.subprocess.run", return_value=MagicMock(returncode=1, stdout="")):
+        assert list_images() is None
+
+
+# -- image_id -----------------------------------------------------------------
+
+
+def test_image_id_uses_the_api(native: MagicMock) -> None:
+    native.image_id.return_value = "sha256:abc"
+    assert docker.image_id("img:1") == "sha256:abc"
+    native.image_id.side_effect = _daemon_error("No such image: img:1")
+    assert docker.image_id("img:1") is None
+
+
+def test_image_id_cli(native: MagicMock) -> None:
+    native.image_id.side_effect = OSError("gone")
+    done = MagicMock(returncode=0, stdout="sha256:abc\n")
+    with patch(f"{_MOD}.subprocess.run", return_value=done) as run:
+        assert docker.image_id("img:1") == "sha256:abc"
+    assert run.call_args[0][0] == ["docker", "image", "inspect", "--format", "{{.Id}}", "img:1"]
+
+
+@pytest.mark.parametrize(("returncode", "stdout"), [(1, ""), (0, "")])
+def test_image_id_cli_missing(returncode: int, stdout: str) -> None:
+    done = MagicMock(returncode=returncode, stdout=stdout)
+    with patch(f"{_MOD}.subprocess.run", return_value=done):
+        assert docker.image_id("img:1") is None
+
+
+# -- remove_images ------------------------------------------------------------
+
+
+def test_remove_images_over_the_api(native: MagicMock) -> None:
+    native.remove_image.side_effect = [None, _daemon_error("conflict: in use")]
+    with patch(f"{_MOD}.subprocess.run") as run:
+        assert remove_images(["a:1", "b:1"]) == {
+            "b:1": "Error response from daemon: conflict: in use"
+        }
+    run.assert_not_called()
+
+
+def test_remove_images_finishes_on_the_cli(native: MagicMock) -> None:
+    native.remove_image.side_effect = [None, OSError("gone")]
+    with patch(f"{_MOD}.subprocess.run", return_value=MagicMock(returncode=0)) as run:
+        assert remove_images(["a:1", "b:1", "c:1"]) == {}
+    run.assert_called_once_with(["docker", "rmi", "b:1", "c:1"], capture_output=True, text=True)
+
+
+def test_remove_images_attributes_cli_errors() -> None:
+    stderr = (
+        'Error response from daemon: conflict: unable to remove repository reference "img:1" '
+        "(must force)\n"
+        "Error response from daemon: No such image: img:1--x\n"
+    )
+    with patch(f"{_MOD}.subprocess.run", return_value=MagicMock(returncode=1, stderr=stderr)):
+        errors = remove_images(["img:1", "img:1--x", "img:2"])
+    assert errors == {
+        "img:1": stderr.splitlines()[0],
+        "img:1--x": stderr.splitlines()[1],
+    }
+
+
+@pytest.mark.parametrize(
+    ("stderr", "message"), [("daemon down\n", "daemon down"), ("", "docker rmi failed")]
+)
+def test_remove_images_unattributed_cli_failure(stderr: str, message: str) -> None:
+    with patch(f"{_MOD}.subprocess.run", return_value=MagicMock(returncode=1, stderr=stderr)):
+        assert remove_images(["a:1", "b:1"]) == {"a:1": message, "b:1": message}
+
+
+def test_remove_nothing() -> None:
+    with patch(f"{_MOD}.subprocess.run") as run:
+        assert remove_images([]) == {}
+    run.assert_not_called()
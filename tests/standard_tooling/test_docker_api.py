@@ -0,0 +1,223 @@
+"""Tests for standard_tooling.lib.docker_api against a fake daemon socket."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import socketserver
+import subprocess
+import tempfile
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from standard_tooling.lib.docker_api import Client, Image
+from standard_tooling.lib.http_pool import ConnectionPool
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@dataclass
+class FakeDaemon:
+    """Routes ``(method, path)`` to ``(status, body)`` and records requests."""
+
+    socket_path: str
+    routes: dict[tuple[str, str], tuple[int, Any]] = field(default_factory=dict)
+    requests: list[tuple[str, str, dict[str, Any]]] = field(default_factory=list)
+    connections: int = 0
+    # Drop the connection after this many responses without saying so.
+    drop_after: int | None = None
+
+    def route(self, method: str, path: str, body: Any, status: int = 200) -> None:
+        self.routes[(method, path)] = (status, body)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.fake.connections += 1
+
+    def _handle(self) -> None:
+        fake = self.server.fake
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path)
+        fake.requests.append((self.command, path, urllib.parse.parse_qs(url.query)))
+        status, body = fake.routes.get(
+            (self.command, path), (404, {"message": f"page not found: {path}"})
+        )
+        payload = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        if fake.drop_after is not None and len(fake.requests) >= fake.drop_after:
+            self.close_connection = True
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_DELETE = _handle  # noqa: N815
+
+    def address_string(self) -> str:
+        return "docker.sock"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    fake: FakeDaemon
+
+
+@pytest.fixture
+def fake_daemon() -> Iterator[FakeDaemon]:
+    # Unix socket paths are length-limited, so keep this one short.
+    with tempfile.TemporaryDirectory(prefix="st-") as tmp:
+        path = f"{tmp}/docker.sock"
+        server = _Server(path, _Handler)
+        server.fake = FakeDaemon(path)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        yield server.fake
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client(fake_daemon: FakeDaemon) -> Iterator[Client]:
+    c = Client(fake_daemon.socket_path)
+    yield c
+    c.close()
+
+
+def test_ping_reuses_the_connection(client: Client, fake_daemon: FakeDaemon) -> None:
+    fake_daemon.route("GET", "/_ping", "OK")
+    client.ping()
+    client.ping()
+    assert fake_daemon.connections == 1
+
+
+def test_images_filters_by_reference(client: Client, fake_daemon: FakeDaemon) -> None:
+    fake_daemon.route(
+        "GET",
+        "/images/json",
+        [
+            {"RepoTags": ["r/dev-go:1.26--main--abc", "r/alias:x"], "Created": 1700, "Size": 42},
+            {"RepoTags": ["<none>:<none>"], "Created": 1, "Size": 1},
+            {"RepoTags": None, "Created": 1, "Size": 1},
+        ],
+    )
+    assert client.images("r/dev-go:1.26--main--*") == [
+        Image("r/dev-go:1.26--main--abc", 1700.0, 42),
+        Image("r/alias:x", 1700.0, 42),
+    ]
+    _, _, query = fake_daemon.requests[0]
+    assert json.loads(query["filters"][0]) == {"reference": ["r/dev-go:1.26--main--*"]}
+    client.images()
+    assert fake_daemon.requests[1][2] == {}
+
+
+def test_images_with_shared_size(client: Client, fake_daemon: FakeDaemon) -> None:
+    fake_daemon.route(
+        "GET",
+        "/images/json",
+        [
+            {"RepoTags": ["r/dev-go:1.26--abc"], "Created": 1, "Size": 42, "SharedSize": 40},
+            # Daemons before API 1.42 do not work it out.
+            {"RepoTags": ["r/dev-go:1.26--def"], "Created": 1, "Size": 42, "SharedSize": -1},
+        ],
+    )
+    assert client.images(shared_size=True) == [
+        Image("r/dev-go:1.26--abc", 1.0, 42, 40),
+        Image("r/dev-go:1.26--def", 1.0, 42, None),
+    ]
+    assert fake_daemon.requests[0][2] == {"shared-size": ["1"]}
+
+
+def test_image_id(client: Client, fake_daemon: FakeDaemon) -> None:
+    fake_daemon.route("GET", "/images/ghcr.io/r/dev-go:1.26/json", {"Id": "sha256:abc"})
+    assert client.image_id("ghcr.io/r/dev-go:1.26") == "sha256:abc"
+
+
+def test_remove_image(client: Client, fake_daemon: FakeDaemon) -> None:
+    fake_daemon.route("DELETE", "/images/ghcr.io/r/dev-go:1.26--a b", [{"Untagged": "x"}])
+    with patch.object(ConnectionPool, "_exchange", wraps=client._pool._exchange) as send:
+        client.remove_image("ghcr.io/r/dev-go:1.26--a b")
+    assert send.call_args[0][1:3] == ("DELETE", "/images/ghcr.io/r/dev-go:1.26--a%20b")
+
+
+@pytest.mark.parametrize(
+    ("body", "stderr"),
+    [
+        ({"message": "conflict: image is being used\n"}, "conflict: image is being used"),
+        ("bad gateway", "bad gateway"),
+    ],
+)
+def test_error_status_raises_like_the_cli(
+    client: Client, fake_daemon: FakeDaemon, body: Any, stderr: str
+) -> None:
+    fake_daemon.route("DELETE", "/images/img:1", body, status=409)
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        client.remove_image("img:1")
+    assert excinfo.value.stderr == f"Error response from daemon: {stderr}"
+    assert excinfo.value.cmd == ("docker", "api", "DELETE", "/images/img:1")
+
+
+def test_retries_a_dropped_keepalive_connection(client: Client, fake_daemon: FakeDaemon) -> None:
+    fake_daemon.route("GET", "/_ping", "OK")
+    fake_daemon.drop_after = 1
+    client.ping()
+    fake_daemon.drop_after = None
+    client.ping()
+    assert fake_daemon.connections == 2
+
+
+def test_does_not_retry_a_fresh_connection(client: Client) -> None:
+    with (
+        pytest.raises(http.client.RemoteDisconnected),
+        patch.object(
+            ConnectionPool, "_exchange", side_effect=http.client.RemoteDisconnected("bye")
+        ) as send,
+    ):
+        client.ping()
+    assert send.call_count == 1
+
+
+def test_missing_socket_raises_oserror(tmp_path: Path) -> None:
+    client = Client(str(tmp_path / "gone.sock"))
+    with pytest.raises(OSError, match="No such file"):
+        client.ping()
+    assert client._pool._idle == []
+
+
+@pytest.mark.parametrize(
+    ("env", "expected"),
+    [
+        ({}, "{sock}"),
+        ({"DOCKER_HOST": "unix://{sock}"}, "{sock}"),
+        ({"DOCKER_HOST": "unix:///nonexistent/docker.sock"}, None),
+        ({"DOCKER_HOST": "tcp://10.0.0.1:2375"}, None),
+        ({"DOCKER_CONTEXT": "remote"}, None),
+        ({"ST_DOCKER_API": "0"}, None),
+    ],
+)
+def test_from_env(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, env: dict[str, str], expected: str | None
+) -> None:
+    sock = tmp_path / "docker.sock"
+    sock.touch()
+    for name in ("DOCKER_HOST", "DOCKER_CONTEXT", "ST_DOCKER_API"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value.format(sock=sock))
+    with patch("standard_tooling.lib.docker_api._DEFAULT_SOCKET", str(sock)):
+        client = Client.from_env()
+    assert (client and client.socket_path) == (expected and expected.format(sock=sock))
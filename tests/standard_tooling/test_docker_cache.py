@@ -2,24 +2,34 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import fnmatch
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from standard_tooling.lib import docker
+from standard_tooling.lib.docker_api import Image
 from standard_tooling.lib.docker_cache import (
     _build_cached_image,
-    _sanitize_branch,
+    branch_alias,
     cache_image_tag,
+    cache_key,
+    cache_registry,
     cache_sensitive_files,
-    clean_branch_images,
+    collect_garbage,
     compute_cache_hash,
     ensure_cached_image,
     find_cached_image,
+    is_cached_tag,
+    registry_image_tag,
+    release_branch_image,
 )
+from standard_tooling.lib.image_index import ImageIndex, ImageRecord
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from collections.abc import Iterator
 
 _VALID_TOML = """\
 [project]
@@ -34,6 +44,16 @@ standard-tooling = "v1.4"
 """
 
 
+@pytest.fixture(autouse=True)
+def _isolated_index(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[None]:
+    """Keep the image index in tmp_path and Docker calls on the (mocked) CLI."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.setenv("ST_DOCKER_API", "0")
+    docker.reset_engine()
+    yield
+    docker.reset_engine()
+
+
 # -- cache_sensitive_files ----------------------------------------------------
 
 
@@ -94,284 +114,190 @@ def test_hash_is_8_chars(tmp_path: Path) -> None:
     assert len(h) == 8
 
 
-# -- _sanitize_branch ---------------------------------------------------------
-
-
-def test_sanitize_branch_slashes() -> None:
-    assert _sanitize_branch("feature/362-decouple") == "feature-362-decouple"
-
-
-def test_sanitize_branch_special_chars() -> None:
-    assert _sanitize_branch("fix/a@b#c") == "fix-a-b-c"
-
-
 # -- cache_image_tag ----------------------------------------------------------
 
 
 def test_cache_image_tag_format() -> None:
-    tag = cache_image_tag(
-        "ghcr.io/wphillipmoore/dev-go:1.26",
-        "feature/42-thing",
-        "abcd1234",
-    )
-    assert tag == "ghcr.io/wphillipmoore/dev-go:1.26--feature-42-thing--abcd1234"
-
-
-# -- find_cached_image --------------------------------------------------------
-
-
-def test_find_cached_image_hit() -> None:
-    docker_output = (
-        "ghcr.io/wphillipmoore/dev-go:1.26--feature-42-thing--abcd1234\n"
-        "ghcr.io/wphillipmoore/dev-python:3.14\n"
-    )
-    mock_result = MagicMock(returncode=0, stdout=docker_output)
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=mock_result):
-        result = find_cached_image("ghcr.io/wphillipmoore/dev-go:1.26", "feature/42-thing")
-    assert result is not None
-    assert result[0] == "ghcr.io/wphillipmoore/dev-go:1.26--feature-42-thing--abcd1234"
-    assert result[1] == "abcd1234"
-
+    tag = cache_image_tag("ghcr.io/wphillipmoore/dev-go:1.26", "abcd1234")
+    assert tag == "ghcr.io/wphillipmoore/dev-go:1.26--abcd1234"
+    assert cache_image_tag("dev-base", "abcd1234") == "dev-base:latest--abcd1234"
 
-def test_find_cached_image_miss() -> None:
-    docker_output = "ghcr.io/wphillipmoore/dev-python:3.14\n"
-    mock_result = MagicMock(returncode=0, stdout=docker_output)
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=mock_result):
-        result = find_cached_image("ghcr.io/wphillipmoore/dev-go:1.26", "feature/42-thing")
-    assert result is None
 
+# -- cache_key ----------------------------------------------------------------
 
-def test_find_cached_image_docker_error() -> None:
-    mock_result = MagicMock(returncode=1, stdout="")
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=mock_result):
-        assert find_cached_image("img:1", "branch") is None
 
+def _worktree(main: Path, name: str) -> Path:
+    """Lay out a linked worktree of the repo at *main* under ``.worktrees/``."""
+    (main / ".git" / "worktrees" / name).mkdir(parents=True)
+    tree = main / ".worktrees" / name
+    tree.mkdir(parents=True)
+    (tree / ".git").write_text(f"gitdir: {main}/.git/worktrees/{name}\n")
+    return tree
 
-# -- ensure_cached_image ------------------------------------------------------
 
+def test_branch_alias_names_the_main_worktree(tmp_path: Path) -> None:
+    main = tmp_path / "repo"
+    assert branch_alias(main, "develop") == "repo:develop"
+    assert branch_alias(_worktree(main, "issue-42"), "feature/42") == "repo:feature/42"
 
-def test_ensure_returns_base_for_python(tmp_path: Path) -> None:
-    assert ensure_cached_image(tmp_path, "python", "img:1") == "img:1"
 
+def test_cache_key_inputs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ST_DOCKER_INSTALL_TAG", raising=False)
+    main = tmp_path / "repo"
+    main.mkdir()
+    (main / "go.sum").write_text("sum\n")
+    (main / "standard-tooling.toml").write_text(_VALID_TOML)
+    key = cache_key(main, "go", "sha256:base")
 
-def test_ensure_returns_base_when_no_files(tmp_path: Path) -> None:
-    with patch("standard_tooling.lib.git.current_branch", return_value="feature/42"):
-        assert ensure_cached_image(tmp_path, "go", "img:1") == "img:1"
+    tree = _worktree(main, "issue-42")
+    (tree / "go.sum").write_text("sum\n")
+    # Only the install tag counts from standard-tooling.toml.
+    (tree / "standard-tooling.toml").write_text(_VALID_TOML + "# edited\n")
+    assert cache_key(tree, "go", "sha256:base") == key
+    assert cache_key(main, "go", "sha256:other") != key
+    monkeypatch.setenv("ST_DOCKER_INSTALL_TAG", "v1.5")
+    assert cache_key(main, "go", "sha256:base") != key
 
 
-def test_ensure_returns_existing_cache_on_hash_match(tmp_path: Path) -> None:
+def test_cache_key_without_install_tag(tmp_path: Path) -> None:
+    (tmp_path / "go.sum").write_text("sum\n")
+    no_config = cache_key(tmp_path, "go", "sha256:base")
+    (tmp_path / "standard-tooling.toml").write_text("not toml [")
+    assert cache_key(tmp_path, "go", "sha256:base") == no_config
+    # Python installs standard-tooling from uv.lock, so the tag is not part of its key.
+    (tmp_path / "uv.lock").write_text("lock\n")
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    cached_tag = "ghcr.io/r/dev-go:1.26--feature-42--"
-    files = cache_sensitive_files(tmp_path, "go")
-    expected_hash = compute_cache_hash(files, salt=tmp_path.name)
-    full_tag = cached_tag + expected_hash
-
-    with (
-        patch("standard_tooling.lib.git.current_branch") as mock_branch,
-        patch(
-            "standard_tooling.lib.docker_cache.find_cached_image",
-            return_value=(full_tag, expected_hash),
-        ),
-    ):
-        mock_branch.return_value = "feature/42"
-        result = ensure_cached_image(tmp_path, "go", "ghcr.io/r/dev-go:1.26")
-    assert result == full_tag
+    python = cache_key(tmp_path, "python", "sha256:base")
+    (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML.replace("v1.4", "v1.5"))
+    assert cache_key(tmp_path, "python", "sha256:base") == python
 
 
-def test_ensure_rebuilds_on_hash_mismatch(tmp_path: Path) -> None:
-    (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    stale_tag = "ghcr.io/r/dev-go:1.26--feature-42--oldold00"
-    new_tag = "ghcr.io/r/dev-go:1.26--feature-42--"
-
-    with (
-        patch("standard_tooling.lib.git.current_branch") as mock_branch,
-        patch(
-            "standard_tooling.lib.docker_cache.find_cached_image",
-            return_value=(stale_tag, "oldold00"),
-        ),
-        patch("standard_tooling.lib.docker_cache.subprocess.run") as mock_run,
-        patch(
-            "standard_tooling.lib.docker_cache._build_cached_image",
-        ) as mock_build,
-    ):
-        mock_branch.return_value = "feature/42"
-        files = cache_sensitive_files(tmp_path, "go")
-        expected_hash = compute_cache_hash(files)
-        expected_tag = new_tag + expected_hash
-        mock_build.return_value = expected_tag
+# -- find_cached_image --------------------------------------------------------
 
-        result = ensure_cached_image(tmp_path, "go", "ghcr.io/r/dev-go:1.26")
-    assert result == expected_tag
-    # Stale image should have been removed.
-    mock_run.assert_called_once()
-    assert stale_tag in mock_run.call_args[0][0]
 
+def test_find_cached_image() -> None:
+    tag = "ghcr.io/r/dev-go:1.26--abcd1234"
+    ImageIndex().touch(tag, cache_hash="abcd1234", alias="repo:feature/42")
+    listing = MagicMock(returncode=0, stdout=f"{tag}\n")
+    with patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=listing) as run:
+        assert find_cached_image("ghcr.io/r/dev-go:1.26", "repo:feature/42") == (tag, "abcd1234")
+        assert find_cached_image("ghcr.io/r/dev-go:1.26", "repo:develop") is None
+        assert find_cached_image("ghcr.io/r/dev-rust:1.93", "repo:feature/42") is None
+    assert run.call_args[0][0][-2:] == ["--filter", f"reference={tag}"]
 
-def test_ensure_builds_on_cache_miss(tmp_path: Path) -> None:
-    (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
 
-    with (
-        patch("standard_tooling.lib.git.current_branch") as mock_branch,
-        patch(
-            "standard_tooling.lib.docker_cache.find_cached_image",
-            return_value=None,
-        ),
-        patch(
-            "standard_tooling.lib.docker_cache._build_cached_image",
-            return_value="new:tag",
-        ) as mock_build,
-    ):
-        mock_branch.return_value = "feature/42"
-        result = ensure_cached_image(tmp_path, "go", "ghcr.io/r/dev-go:1.26")
-    assert result == "new:tag"
-    mock_build.assert_called_once()
+@pytest.mark.parametrize("listing", [MagicMock(returncode=0, stdout=""), MagicMock(returncode=1)])
+def test_find_cached_image_removed(listing: MagicMock) -> None:
+    ImageIndex().touch("img:1--abcd1234", cache_hash="abcd1234", alias="repo:main")
+    with patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=listing):
+        assert find_cached_image("img:1", "repo:main") is None
 
 
-# -- clean_branch_images ------------------------------------------------------
+# -- release_branch_image -----------------------------------------------------
 
 
-def test_clean_branch_images_removes_matching() -> None:
-    docker_output = (
-        "ghcr.io/r/dev-go:1.26--feature-42-thing--abcd1234\n"
-        "ghcr.io/r/dev-base:latest--feature-42-thing--efgh5678\n"
-        "ghcr.io/r/dev-python:3.14\n"
-    )
-    mock_result = MagicMock(returncode=0, stdout=docker_output)
-    calls = []
+def test_release_branch_image_keeps_the_image(tmp_path: Path) -> None:
+    index = ImageIndex()
+    index.touch("img:1--abcd1234", cache_hash="abcd1234", alias=f"{tmp_path.name}:develop")
+    index.touch("img:1--abcd1234", cache_hash="abcd1234", alias=f"{tmp_path.name}:feature/42")
+    with patch("standard_tooling.lib.docker_cache.subprocess.run") as run:
+        assert release_branch_image(tmp_path, "feature/42") is True
+        assert release_branch_image(tmp_path, "feature/42") is False
+    run.assert_not_called()
+    assert index.records()["img:1--abcd1234"].aliases == [f"{tmp_path.name}:develop"]
 
-    def capture_run(cmd, **kwargs):  # noqa: ANN001, ANN003
-        calls.append(cmd)
-        return mock_result
 
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=capture_run):
-        removed = clean_branch_images("feature/42-thing")
-    assert removed == 2
+# -- _build_cached_image ------------------------------------------------------
 
 
-def test_clean_branch_images_none_found() -> None:
-    mock_result = MagicMock(returncode=0, stdout="ghcr.io/r/dev-python:3.14\n")
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=mock_result):
-        assert clean_branch_images("feature/99-other") == 0
+class _FakeBuild:
+    """Stands in for ``docker build``, keeping the Dockerfile and ignore file it was given."""
 
+    def __init__(self, returncode: int = 0) -> None:
+        self.returncode = returncode
+        self.cmd: list[str] = []
+        self.env: dict[str, str] = {}
+        self.dockerfile = ""
+        self.dockerignore = ""
 
-def test_clean_branch_images_docker_error() -> None:
-    mock_result = MagicMock(returncode=1, stdout="")
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=mock_result):
-        assert clean_branch_images("feature/42") == 0
+    def __call__(self, cmd: list[str], **kwargs: Any) -> MagicMock:
+        self.cmd, self.env = cmd, kwargs["env"]
+        dockerfile = Path(cmd[cmd.index("--file") + 1])
+        self.dockerfile = dockerfile.read_text()
+        self.dockerignore = Path(f"{dockerfile}.dockerignore").read_text()
+        return MagicMock(returncode=self.returncode)
 
 
-# -- _build_cached_image ------------------------------------------------------
+def _build(repo_root: Path, lang: str, build: _FakeBuild) -> str:
+    with patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=build):
+        return _build_cached_image(repo_root, lang, "img:1", "img:1--branch--hash")
 
 
-def test_build_cached_image_success(tmp_path: Path) -> None:
-    (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    create_result = MagicMock(returncode=0, stdout="abc123\n")
-    start_result = MagicMock(returncode=0)
-    commit_result = MagicMock(returncode=0)
-    rm_result = MagicMock(returncode=0)
-
-    calls: list[list[str]] = []
-
-    def mock_run(cmd, **_kwargs):  # noqa: ANN001, ANN003
-        calls.append(cmd)
-        if cmd[1] == "create":
-            return create_result
-        if cmd[1] == "start":
-            return start_result
-        if cmd[1] == "commit":
-            return commit_result
-        if cmd[1] == "rm":
-            return rm_result
-        return MagicMock(returncode=0)
-
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=mock_run):
-        result = _build_cached_image(tmp_path, "go", "img:1", "img:1--branch--hash")
-    assert result == "img:1--branch--hash"
-
-
-def test_build_cached_image_create_fails(tmp_path: Path) -> None:
+def test_build_cached_image_success(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    create_result = MagicMock(returncode=1, stderr="no space")
-    with (
-        patch("standard_tooling.lib.docker_cache.subprocess.run", return_value=create_result),
-        pytest.raises(RuntimeError, match="Failed to create container"),
-    ):
-        _build_cached_image(tmp_path, "go", "img:1", "img:1--branch--hash")
+    build = _FakeBuild()
+    assert _build(tmp_path, "go", build) == "img:1--branch--hash"
+    assert build.cmd[:4] == ["docker", "build", "--tag", "img:1--branch--hash"]
+    assert build.cmd[-1] == str(tmp_path)
+    assert build.env["DOCKER_BUILDKIT"] == "1"
+    out = capsys.readouterr().out
+    assert "Install: standard-tooling@v1.4" in out
+    assert "Warmup:  go mod download && go build ./..." in out
 
 
-def test_build_cached_image_start_fails(tmp_path: Path) -> None:
+def test_build_cached_image_layers(tmp_path: Path) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    create_result = MagicMock(returncode=0, stdout="abc123\n")
-    start_result = MagicMock(returncode=1)
-    rm_result = MagicMock(returncode=0)
-
-    def mock_run(cmd, **_kwargs):  # noqa: ANN001, ANN003
-        if cmd[1] == "create":
-            return create_result
-        if cmd[1] == "start":
-            return start_result
-        return rm_result
-
-    with (
-        patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=mock_run),
-        pytest.raises(RuntimeError, match="Cache build failed"),
-    ):
-        _build_cached_image(tmp_path, "go", "img:1", "img:1--branch--hash")
-
-
-def test_build_cached_image_warmup_printed(
-    tmp_path: Path, capsys: pytest.CaptureFixture[str]
-) -> None:
+    build = _FakeBuild()
+    _build(tmp_path, "go", build)
+    lines = build.dockerfile.splitlines()
+    # The install is its own stage, copied in last with --link so it does not
+    # depend on the warmup layer, and the warmup layer does not depend on it.
+    assert lines[0] == "FROM img:1 AS tooling"
+    assert "--mount=type=cache,id=st-uv,target=/root/.cache/uv" in lines[1]
+    assert lines[4].endswith("@v1.4'")
+    assert lines[6:] == [
+        "FROM img:1",
+        "WORKDIR /workspace",
+        "RUN --mount=type=bind,target=/workspace,rw go mod download && go build ./...",
+        "COPY --link --from=tooling /opt/standard-tooling /opt/standard-tooling",
+        'ENV PATH="/opt/standard-tooling/bin:${PATH}"',
+    ]
+    assert build.dockerignore.splitlines() == [
+        ".git",
+        ".venv",
+        "target",
+        "node_modules",
+        "standard-tooling.toml",
+    ]
+
+
+def test_build_cached_image_fails(tmp_path: Path) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    create_result = MagicMock(returncode=0, stdout="abc123\n")
-    ok = MagicMock(returncode=0)
-
-    def mock_run(cmd, **_kwargs):  # noqa: ANN001, ANN003
-        if cmd[1] == "create":
-            return create_result
-        return ok
-
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=mock_run):
-        _build_cached_image(tmp_path, "go", "img:1", "img:1--branch--hash")
-    out = capsys.readouterr().out
-    assert "Warmup:" in out
+    with pytest.raises(RuntimeError, match="Cache build failed"):
+        _build(tmp_path, "go", _FakeBuild(returncode=1))
 
 
 def test_build_cached_image_no_warmup_for_unknown_lang(
     tmp_path: Path, capsys: pytest.CaptureFixture[str]
 ) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    create_result = MagicMock(returncode=0, stdout="abc123\n")
-    ok = MagicMock(returncode=0)
+    build = _FakeBuild()
+    _build(tmp_path, "unknown", build)
+    assert "Warmup:" not in capsys.readouterr().out
+    assert "uv tool install" in build.dockerfile
+    assert "--mount=type=bind" not in build.dockerfile
 
-    def mock_run(cmd, **_kwargs):  # noqa: ANN001, ANN003
-        if cmd[1] == "create":
-            return create_result
-        return ok
-
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=mock_run):
-        _build_cached_image(tmp_path, "unknown", "img:1", "img:1--branch--hash")
-    out = capsys.readouterr().out
-    assert "Warmup:" not in out
 
-
-def test_build_cached_image_uses_uv_tool_install(tmp_path: Path) -> None:
+def test_build_cached_image_keeps_rust_build_output(tmp_path: Path) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    create_result = MagicMock(returncode=0, stdout="abc123\n")
-    ok = MagicMock(returncode=0)
-    create_cmd: list[str] = []
-
-    def mock_run(cmd, **_kwargs):  # noqa: ANN001, ANN003
-        if cmd[1] == "create":
-            create_cmd.extend(cmd)
-            return create_result
-        return ok
-
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=mock_run):
-        _build_cached_image(tmp_path, "go", "img:1", "img:1--branch--hash")
-    setup_cmd = create_cmd[-1]
-    assert "uv tool install" in setup_cmd
-    assert "pip install" not in setup_cmd
+    build = _FakeBuild()
+    _build(tmp_path, "rust", build)
+    lines = build.dockerfile.splitlines()
+    # target/ under the bind mount would be thrown away with it.
+    warmup = lines.index(
+        "RUN --mount=type=bind,target=/workspace,rw cargo fetch && cargo build --lib"
+    )
+    assert lines[warmup - 1] == 'ENV CARGO_TARGET_DIR="/opt/cache/target"'
 
 
 # -- compute_cache_hash salt --------------------------------------------------
@@ -401,63 +327,468 @@ def test_compute_cache_hash_no_salt_matches_empty_salt(tmp_path: Path) -> None:
 # -- Python caching -----------------------------------------------------------
 
 
-def test_ensure_python_builds_cached_image(tmp_path: Path) -> None:
-    (tmp_path / "uv.lock").write_text("lock\n")
+def test_build_cached_image_python_skips_uv_install(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
+    build = _FakeBuild()
+    _build(tmp_path, "python", build)
+    assert build.dockerfile == (
+        "FROM img:1\n"
+        "WORKDIR /workspace\n"
+        "RUN --mount=type=bind,target=/workspace,rw uv sync --group dev\n"
+    )
+    assert "Install:" not in capsys.readouterr().out
+
+
+# -- ensure_cached_image ------------------------------------------------------
 
+_BASE = "ghcr.io/r/dev-go:1.26"
+
+
+class _FakeDocker:
+    """Stands in for one machine's ``docker`` CLI and a shared ``registry:2``.
+
+    Called as ``subprocess.run``; *registry* maps pushed references to
+    image ids and may be shared between instances (machines). The base
+    image is local unless *base* is False, when it can only be pulled
+    if *registry* has it.
+    """
+
+    def __init__(
+        self, registry: dict[str, str], *, push_error: str = "", base: bool = True
+    ) -> None:
+        self.images: dict[str, str] = {_BASE: "sha256:go-1"} if base else {}
+        self.registry = registry
+        self.push_error = push_error
+        self.verbs: list[str] = []
+
+    def __call__(self, cmd: list[str], **_kwargs: object) -> MagicMock:
+        verb, args = cmd[1], cmd[2:]
+        self.verbs.append(verb)
+        if verb == "images":
+            pattern = args[-1].removeprefix("reference=") if "--filter" in args else "*"
+            refs = [t for t in self.images if fnmatch.fnmatchcase(t, pattern)]
+            return MagicMock(returncode=0, stdout="".join(f"{t}\n" for t in refs))
+        if verb == "image":
+            found = self.images.get(args[-1])
+            return MagicMock(returncode=0 if found else 1, stdout=f"{found or ''}\n")
+        if verb == "build":
+            self.images[args[args.index("--tag") + 1]] = f"built-{len(self.verbs)}"
+        elif verb == "tag":
+            self.images[args[1]] = self.images[args[0]]
+        elif verb == "rmi":
+            for ref in args:
+                self.images.pop(ref, None)
+        elif verb == "pull":
+            if args[-1] not in self.registry:
+                return MagicMock(returncode=1, stderr="manifest unknown\n")
+            self.images[args[-1]] = self.registry[args[-1]]
+        elif verb == "push":
+            if self.push_error:
+                return MagicMock(returncode=1, stderr=f"{self.push_error}\n")
+            self.registry[args[-1]] = self.images[args[-1]]
+        return MagicMock(returncode=0, stdout="", stderr="")
+
+    def cached(self) -> list[str]:
+        return [t for t in self.images if t != _BASE]
+
+
+def _ensure_on(
+    machine: _FakeDocker, repo_root: Path, *, branch: str = "feature/42", lang: str = "go"
+) -> str:
     with (
-        patch("standard_tooling.lib.git.current_branch", return_value="develop"),
-        patch("standard_tooling.lib.docker_cache.find_cached_image", return_value=None),
-        patch(
-            "standard_tooling.lib.docker_cache._build_cached_image",
-            return_value="img:1--develop--hash",
-        ) as mock_build,
+        patch("standard_tooling.lib.git.current_branch", return_value=branch),
+        patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=machine),
     ):
-        result = ensure_cached_image(tmp_path, "python", "img:1")
-    mock_build.assert_called_once()
-    assert result != "img:1"
+        return ensure_cached_image(repo_root, lang, _BASE)
 
 
-def test_build_cached_image_python_skips_uv_install(tmp_path: Path) -> None:
-    (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    create_result = MagicMock(returncode=0, stdout="abc123\n")
-    ok = MagicMock(returncode=0)
-    create_cmd: list[str] = []
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.delenv("ST_DOCKER_CACHE_REGISTRY", raising=False)
+    monkeypatch.delenv("ST_DOCKER_INSTALL_TAG", raising=False)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "standard-tooling.toml").write_text(_VALID_TOML)
+    (repo / "go.sum").write_text("sum\n")
+    return repo
+
+
+def test_ensure_returns_base_for_python(tmp_path: Path) -> None:
+    assert ensure_cached_image(tmp_path, "python", "img:1") == "img:1"
+
+
+def test_ensure_returns_base_when_no_files(tmp_path: Path) -> None:
+    with patch("standard_tooling.lib.git.current_branch", return_value="feature/42"):
+        assert ensure_cached_image(tmp_path, "go", "img:1") == "img:1"
+
+
+def test_ensure_builds_on_cache_miss(repo: Path) -> None:
+    machine = _FakeDocker({})
+    built = _ensure_on(machine, repo)
+    assert built == cache_image_tag(_BASE, cache_key(repo, "go", "sha256:go-1"))
+    assert machine.cached() == [built]
+    assert "pull" not in machine.verbs
 
-    def mock_run(cmd, **_kwargs):  # noqa: ANN001, ANN003
-        if cmd[1] == "create":
-            create_cmd.extend(cmd)
-            return create_result
-        return ok
 
-    with patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=mock_run):
-        _build_cached_image(tmp_path, "python", "img:1", "img:1--branch--hash")
-    setup_cmd = create_cmd[-1]
-    assert "uv tool install" not in setup_cmd
-    assert "uv sync" in setup_cmd
+def test_ensure_new_branch_reuses_the_image(repo: Path) -> None:
+    machine = _FakeDocker({})
+    built = _ensure_on(machine, repo, branch="develop")
+    machine.verbs.clear()
+    tree = _worktree(repo, "issue-43")
+    for name in ("standard-tooling.toml", "go.sum"):
+        (tree / name).write_bytes((repo / name).read_bytes())
+    assert _ensure_on(machine, tree, branch="feature/43") == built
+    assert "build" not in machine.verbs
+    assert ImageIndex().records()[built].aliases == ["repo:develop", "repo:feature/43"]
+
+
+def test_ensure_changed_dependencies_move_the_alias(repo: Path) -> None:
+    machine = _FakeDocker({})
+    old = _ensure_on(machine, repo)
+    (repo / "go.sum").write_text("changed\n")
+    new = _ensure_on(machine, repo)
+    assert new != old
+    # The old image may still serve other branches; gc reclaims it.
+    assert machine.cached() == [old, new]
+    records = ImageIndex().records()
+    assert (records[old].aliases, records[new].aliases) == ([], ["repo:feature/42"])
+
+
+def test_ensure_rebuilds_for_a_new_base_image(repo: Path) -> None:
+    machine = _FakeDocker({})
+    old = _ensure_on(machine, repo)
+    machine.images[_BASE] = "sha256:go-2"
+    assert _ensure_on(machine, repo) != old
+
+
+def test_ensure_pulls_a_missing_base_image(repo: Path) -> None:
+    machine = _FakeDocker({_BASE: "sha256:go-1"}, base=False)
+    built = _ensure_on(machine, repo)
+    assert machine.images[_BASE] == "sha256:go-1"
+    assert built == cache_image_tag(_BASE, cache_key(repo, "go", "sha256:go-1"))
+
+
+def test_ensure_builds_without_the_base_image(repo: Path) -> None:
+    machine = _FakeDocker({}, base=False)
+    built = _ensure_on(machine, repo)
+    assert built == cache_image_tag(_BASE, cache_key(repo, "go", ""))
+
+
+def test_ensure_python_builds_cached_image(repo: Path) -> None:
+    (repo / "uv.lock").write_text("lock\n")
+    machine = _FakeDocker({})
+    built = _ensure_on(machine, repo, lang="python")
+    assert built != _BASE
+    assert machine.cached() == [built]
 
 
 def test_ensure_repo_name_included_in_hash(tmp_path: Path) -> None:
-    repo_a = tmp_path / "repo-alpha"
-    repo_b = tmp_path / "repo-beta"
-    repo_a.mkdir()
-    repo_b.mkdir()
-    (repo_a / "standard-tooling.toml").write_text(_VALID_TOML)
-    (repo_b / "standard-tooling.toml").write_text(_VALID_TOML)
+    machine = _FakeDocker({})
+    built = []
+    for name in ("repo-alpha", "repo-beta"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "standard-tooling.toml").write_text(_VALID_TOML)
+        built.append(_ensure_on(machine, tmp_path / name, branch="develop"))
+    assert built[0] != built[1], "repos with identical files must get distinct image tags"
+
+
+def test_ensure_stamps_the_index(repo: Path) -> None:
+    machine = _FakeDocker({})
+    built = _ensure_on(machine, repo)
+    (record,) = ImageIndex().records().values()
+    assert (record.tag, record.aliases) == (built, ["repo:feature/42"])
+    assert built.endswith(f"--{record.cache_hash}")
+    first_use = record.last_used
+
+    _ensure_on(machine, repo)
+    assert ImageIndex().records()[built].last_used >= first_use
+
+
+# -- Registry tier ------------------------------------------------------------
+
 
-    built_tags: list[str] = []
+@pytest.fixture
+def registry_repo(repo: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("ST_DOCKER_CACHE_REGISTRY", "localhost:5000/st-cache/")
+    monkeypatch.delenv("ST_DOCKER_CACHE_PUSH", raising=False)
+    return repo
 
-    def capture_build(repo_root, lang, base_image, target_tag) -> str:  # noqa: ANN001
-        built_tags.append(target_tag)
-        return target_tag
 
+def test_cache_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ST_DOCKER_CACHE_REGISTRY", raising=False)
+    assert cache_registry() is None
+    monkeypatch.setenv("ST_DOCKER_CACHE_REGISTRY", " ")
+    assert cache_registry() is None
+    monkeypatch.setenv("ST_DOCKER_CACHE_REGISTRY", "ghcr.io/acme/st-cache/")
+    assert cache_registry() == "ghcr.io/acme/st-cache"
+
+
+def test_registry_image_tag() -> None:
+    assert (
+        registry_image_tag("localhost:5000/c", "ghcr.io/r/dev-go:1.26", "abcd1234")
+        == "localhost:5000/c/dev-go:1.26--abcd1234"
+    )
+    assert registry_image_tag("reg/c", "dev-base", "abcd1234") == "reg/c/dev-base:latest--abcd1234"
+
+
+def test_registry_shares_builds_between_machines(
+    registry_repo: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    registry: dict[str, str] = {}
+    first, second = _FakeDocker(registry), _FakeDocker(registry)
+
+    built = _ensure_on(first, registry_repo)
+    current_hash = built.rsplit("--", 1)[1]
+    remote = f"localhost:5000/st-cache/dev-go:1.26--{current_hash}"
+    assert built == f"{_BASE}--{current_hash}"
+    assert list(registry) == [remote]
+    assert first.cached() == [built]
+
+    assert _ensure_on(second, registry_repo, branch="develop") == built
+    assert "build" not in second.verbs
+    assert second.cached() == [built]
+    assert second.images[built] == registry[remote]
+    out = capsys.readouterr().out
+    assert f"Pushing cached image: {remote}" in out
+    assert "Not in registry (manifest unknown); building." in out
+
+
+def test_registry_pull_only(registry_repo: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ST_DOCKER_CACHE_PUSH", "0")
+    machine = _FakeDocker({})
+    _ensure_on(machine, registry_repo)
+    assert "build" in machine.verbs
+    assert "push" not in machine.verbs
+
+
+def test_registry_push_failure_only_warns(
+    registry_repo: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    machine = _FakeDocker({}, push_error="denied: requested access to the resource is denied")
+    built = _ensure_on(machine, registry_repo)
+    assert machine.cached() == [built]
+    assert "WARNING: could not push" in capsys.readouterr().err
+
+
+def test_registry_unset_never_pulls(registry_repo: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ST_DOCKER_CACHE_REGISTRY")
+    machine = _FakeDocker({})
+    _ensure_on(machine, registry_repo)
+    assert "pull" not in machine.verbs
+    assert "push" not in machine.verbs
+
+
+def test_registry_not_consulted_on_local_hit(registry_repo: Path) -> None:
+    machine = _FakeDocker({})
+    built = _ensure_on(machine, registry_repo)
+    machine.verbs.clear()
+    assert _ensure_on(machine, registry_repo) == built
+    assert machine.verbs == ["image", "images"]
+
+
+# -- gc -----------------------------------------------------------------------
+
+
+_DAY = 86400.0
+_NOW = 1_800_000_000.0
+
+
+class _FakeDaemon:
+    """Answers ``docker images`` from *listing* and ``docker rmi``, refusing *in_use*."""
+
+    def __init__(self, listing: list[str], *, in_use: tuple[str, ...] = ()) -> None:
+        self.listing = listing
+        self.in_use = in_use
+        self.removed: list[str] = []
+
+    def __call__(self, cmd: list[str], **_kwargs: object) -> MagicMock:
+        if cmd[1] == "images":
+            return MagicMock(returncode=0, stdout="".join(f"{line}\n" for line in self.listing))
+        refused = [ref for ref in cmd[2:] if ref in self.in_use]
+        self.removed += [ref for ref in cmd[2:] if ref not in refused]
+        stderr = "".join(
+            f'Error response from daemon: conflict: "{ref}" is in use\n' for ref in refused
+        )
+        return MagicMock(returncode=1 if refused else 0, stderr=stderr)
+
+
+@pytest.fixture
+def gc_daemon() -> _FakeDaemon:
+    index = ImageIndex()
+    index.write(
+        {
+            "r/dev-go:1.26--main--aaaa0000": ImageRecord(
+                "r/dev-go:1.26--main--aaaa0000", "aaaa0000", _NOW - 30 * _DAY, _NOW - _DAY
+            ),
+            "r/dev-go:1.26--old--bbbb0000": ImageRecord(
+                "r/dev-go:1.26--old--bbbb0000",
+                "bbbb0000",
+                _NOW - 40 * _DAY,
+                _NOW - 20 * _DAY,
+            ),
+            "r/dev-go:1.26--current--dddd0000": ImageRecord(
+                "r/dev-go:1.26--current--dddd0000", "dddd0000", _NOW, _NOW
+            ),
+            "r/dev-go:1.26--gone--eeee0000": ImageRecord(
+                "r/dev-go:1.26--gone--eeee0000", "eeee0000", _NOW, _NOW
+            ),
+        }
+    )
+    three_days_ago = "2027-01-12 08:00:00 +0000 UTC"  # _NOW is 2027-01-15 08:00:00 UTC
+    return _FakeDaemon(
+        [
+            "r/dev-go:1.26--main--aaaa0000\t2026-12-16 08:00:00 +0000 UTC\t5GB",
+            "r/dev-go:1.26--old--bbbb0000\t2026-12-06 08:00:00 +0000 UTC\t4GB",
+            f"ghcr.io/wphillipmoore/dev-rust:1.93--cccc0000\t{three_days_ago}\t8GB",
+            "r/dev-go:1.26--current--dddd0000\t2027-01-15 08:00:00 +0000 UTC\t10GB",
+            "r/dev-python:3.14\t2027-01-01 08:00:00 +0000 UTC\t1GB",
+        ]
+    )
+
+
+def _gc(daemon: _FakeDaemon, **kwargs: Any) -> list[ImageRecord] | None:
     with (
-        patch("standard_tooling.lib.git.current_branch", return_value="develop"),
-        patch("standard_tooling.lib.docker_cache.find_cached_image", return_value=None),
-        patch("standard_tooling.lib.docker_cache._build_cached_image", side_effect=capture_build),
+        patch("standard_tooling.lib.docker_cache.subprocess.run", side_effect=daemon),
+        patch("standard_tooling.lib.docker_cache.time.time", return_value=_NOW),
     ):
-        ensure_cached_image(repo_a, "go", "img:1")
-        ensure_cached_image(repo_b, "go", "img:1")
+        return collect_garbage(**kwargs)
+
+
+def test_gc_evicts_expired_then_least_recently_used(gc_daemon: _FakeDaemon) -> None:
+    evicted = _gc(gc_daemon, max_size=20 * 10**9, max_age=14 * _DAY)
+    assert evicted is not None
+    # old is past max-age; then feature-7 (adopted, last used when created,
+    # three days ago) goes before main (used yesterday) to fit 5 + 10 GB.
+    assert (
+        [r.tag for r in evicted]
+        == gc_daemon.removed
+        == [
+            "r/dev-go:1.26--old--bbbb0000",
+            "ghcr.io/wphillipmoore/dev-rust:1.93--cccc0000",
+        ]
+    )
+    assert evicted[1] == ImageRecord(
+        "ghcr.io/wphillipmoore/dev-rust:1.93--cccc0000",
+        "cccc0000",
+        _NOW - 3 * _DAY,
+        _NOW - 3 * _DAY,
+        8 * 10**9,
+    )
+    # The index now holds just the surviving images, with their sizes.
+    assert {t: r.size for t, r in ImageIndex().records().items()} == {
+        "r/dev-go:1.26--main--aaaa0000": 5 * 10**9,
+        "r/dev-go:1.26--current--dddd0000": 10 * 10**9,
+    }
+
+
+def test_gc_without_limits_only_reconciles(gc_daemon: _FakeDaemon) -> None:
+    assert _gc(gc_daemon, max_size=None, max_age=None) == []
+    assert len(ImageIndex().records()) == 4
+
+
+def test_gc_dry_run_changes_nothing(gc_daemon: _FakeDaemon) -> None:
+    before = ImageIndex().records()
+    evicted = _gc(gc_daemon, max_size=0, max_age=None, dry_run=True)
+    assert evicted is not None
+    assert len(evicted) == 4
+    assert gc_daemon.removed == []
+    assert ImageIndex().records() == before
+
+
+def test_gc_keeps_images_in_use(gc_daemon: _FakeDaemon, capsys: pytest.CaptureFixture[str]) -> None:
+    gc_daemon.in_use = ("r/dev-go:1.26--old--bbbb0000",)
+    evicted = _gc(gc_daemon, max_size=None, max_age=14 * _DAY)
+    assert evicted == []
+    assert "r/dev-go:1.26--old--bbbb0000" in ImageIndex().records()
+    assert (
+        "could not remove r/dev-go:1.26--old--bbbb0000: Error response from daemon: conflict"
+        in capsys.readouterr().err
+    )
+
+
+def test_gc_budgets_without_the_shared_base_image() -> None:
+    # Over the CLI the base image's size stands in for the shared layers:
+    # 2 GB of each cached image is its own, so both fit a 5 GB budget.
+    daemon = _FakeDaemon(
+        [
+            "ghcr.io/wphillipmoore/dev-go:1.26\t2027-01-01 08:00:00 +0000 UTC\t3GB",
+            "ghcr.io/wphillipmoore/dev-go:1.26--aaaa0000\t2027-01-14 08:00:00 +0000 UTC\t5GB",
+            "ghcr.io/wphillipmoore/dev-go:1.26--bbbb0000\t2027-01-15 08:00:00 +0000 UTC\t5GB",
+        ]
+    )
+    assert _gc(daemon, max_size=5 * 10**9, max_age=None) == []
+    assert {r.size for r in ImageIndex().records().values()} == {2 * 10**9}
+    assert _gc(daemon, max_size=3 * 10**9, max_age=None) == [
+        ImageRecord(
+            "ghcr.io/wphillipmoore/dev-go:1.26--aaaa0000",
+            "aaaa0000",
+            _NOW - _DAY,
+            _NOW - _DAY,
+            2 * 10**9,
+        )
+    ]
+
+
+def test_gc_budgets_on_the_daemons_shared_size() -> None:
+    images = [
+        Image("ghcr.io/wphillipmoore/dev-go:1.26--aaaa0000", _NOW, 5 * 10**9, 4 * 10**9),
+        Image("ghcr.io/wphillipmoore/dev-go:1.26--bbbb0000", _NOW, 5 * 10**9, 6 * 10**9),
+    ]
+    with patch("standard_tooling.lib.docker_cache.list_images", return_value=images) as listing:
+        assert collect_garbage(max_size=None, max_age=None) == []
+    listing.assert_called_once_with(shared_size=True)
+    assert {t: r.size for t, r in ImageIndex().records().items()} == {
+        "ghcr.io/wphillipmoore/dev-go:1.26--aaaa0000": 10**9,
+        "ghcr.io/wphillipmoore/dev-go:1.26--bbbb0000": 0,
+    }
+
+
+def test_gc_leaves_unrelated_images_alone() -> None:
+    daemon = _FakeDaemon(
+        [
+            "myapp:build--cafe0000\t2026-01-01 08:00:00 +0000 UTC\t1GB",
+            "ghcr.io/wphillipmoore/dev-go:1.26--nightly\t2026-01-01 08:00:00 +0000 UTC\t1GB",
+            "ghcr.io/other/dev-go:1.26--cafe0000\t2026-01-01 08:00:00 +0000 UTC\t1GB",
+            "ghcr.io/wphillipmoore/dev-go:1.26--cafe0000\t2026-01-01 08:00:00 +0000 UTC\t1GB",
+        ]
+    )
+    evicted = _gc(daemon, max_size=None, max_age=14 * _DAY)
+    assert evicted is not None
+    assert (
+        [r.tag for r in evicted]
+        == daemon.removed
+        == ["ghcr.io/wphillipmoore/dev-go:1.26--cafe0000"]
+    )
 
-    assert len(built_tags) == 2
-    assert built_tags[0] != built_tags[1], "repos with identical files must get distinct image tags"
+
+@pytest.mark.parametrize(
+    ("ref", "cached"),
+    [
+        ("ghcr.io/wphillipmoore/dev-go:1.26--abcd1234", True),
+        ("ghcr.io/wphillipmoore/dev-base:latest--abcd1234", True),
+        ("ghcr.io/wphillipmoore/dev-go:1.26", False),
+        ("ghcr.io/wphillipmoore/dev-go:1.26--ABCD1234", False),
+        ("ghcr.io/wphillipmoore/dev-go:1.26--abcd12345", False),
+        ("localhost:5000/dev-go:1.26--abcd1234", False),
+        ("myapp:build--abcd1234", False),
+    ],
+)
+def test_is_cached_tag(ref: str, cached: bool) -> None:
+    assert is_cached_tag(ref) is cached
+
+
+def test_gc_tolerates_odd_listings() -> None:
+    daemon = _FakeDaemon(["ghcr.io/wphillipmoore/dev-go:1.26--aaaa0000\tsometime\t?"])
+    evicted = _gc(daemon, max_size=None, max_age=None)
+    assert evicted == []
+    (record,) = ImageIndex().records().values()
+    assert (record.last_used, record.size) == (_NOW, 0)
+
+
+def test_gc_docker_error() -> None:
+    with patch(
+        "standard_tooling.lib.docker_cache.subprocess.run", return_value=MagicMock(returncode=1)
+    ):
+        assert collect_garbage(max_size=None, max_age=None) is None
@@ -5,13 +5,17 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from standard_tooling.bin.docker_cache import main
+from standard_tooling.lib import docker
+from standard_tooling.lib.docker_cache import cache_image_tag, cache_key
+from standard_tooling.lib.image_index import ImageIndex, ImageRecord
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
-    import pytest
-
 _VALID_TOML = """\
 [project]
 repository-type = "library"
@@ -25,6 +29,16 @@ standard-tooling = "v1.4"
 """
 
 
+@pytest.fixture(autouse=True)
+def _isolated_index(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[None]:
+    """Keep the image index in tmp_path and Docker calls on the (mocked) CLI."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.setenv("ST_DOCKER_API", "0")
+    docker.reset_engine()
+    yield
+    docker.reset_engine()
+
+
 # -- no subcommand ------------------------------------------------------------
 
 
@@ -58,13 +72,16 @@ def test_status_no_cache(tmp_path: Path, capsys: pytest.CaptureFixture[str]) ->
 
 
 def test_status_with_cache(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
-    cached = ("img:1.26--feature-42--abcd1234", "abcd1234")
+    cached = ("img:1.26--abcd1234", "abcd1234")
     with (
         patch("standard_tooling.bin.docker_cache.git.repo_root", return_value=tmp_path),
         patch("standard_tooling.bin.docker_cache.git.current_branch", return_value="feature/42"),
-        patch("standard_tooling.bin.docker_cache.find_cached_image", return_value=cached),
+        patch("standard_tooling.bin.docker_cache.find_cached_image", return_value=cached) as find,
     ):
         assert main(["status"]) == 0
+    find.assert_called_once_with(
+        "ghcr.io/wphillipmoore/dev-base:latest", f"{tmp_path.name}:feature/42"
+    )
     out = capsys.readouterr().out
     assert "abcd1234" in out
 
@@ -85,16 +102,66 @@ def test_clean_no_cache(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> N
 # -- clean-all subcommand -----------------------------------------------------
 
 
-def test_clean_removes_existing(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
-    cached = ("img:1.26--feature-42--abcd1234", "abcd1234")
+_TAG = "ghcr.io/wphillipmoore/dev-base:latest--abcd1234"
+
+
+def _clean(tmp_path: Path, *argv: str, rmi_stderr: str = "") -> tuple[int, MagicMock]:
+    """Run ``clean`` on branch feature/42 of a repo named after *tmp_path*."""
+    rmi = MagicMock(returncode=1 if rmi_stderr else 0, stderr=rmi_stderr)
     with (
         patch("standard_tooling.bin.docker_cache.git.repo_root", return_value=tmp_path),
         patch("standard_tooling.bin.docker_cache.git.current_branch", return_value="feature/42"),
-        patch("standard_tooling.bin.docker_cache.find_cached_image", return_value=cached),
-        patch("standard_tooling.bin.docker_cache.subprocess.run"),
+        patch(
+            "standard_tooling.bin.docker_cache.find_cached_image",
+            return_value=(_TAG, "abcd1234"),
+        ),
+        patch("standard_tooling.lib.docker.subprocess.run", return_value=rmi) as run,
     ):
-        assert main(["clean"]) == 0
-    assert "Removed:" in capsys.readouterr().out
+        return main(["clean", *argv]), run
+
+
+def test_clean_removes_an_image_no_other_branch_uses(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    ImageIndex().touch(_TAG, cache_hash="abcd1234", alias=f"{tmp_path.name}:feature/42")
+    rc, run = _clean(tmp_path)
+    assert rc == 0
+    assert run.call_args.args[0] == ["docker", "rmi", _TAG]
+    assert ImageIndex().records() == {}
+    assert f"Removed: {_TAG}" in capsys.readouterr().out
+
+
+def test_clean_keeps_an_image_other_branches_use(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    index = ImageIndex()
+    index.touch(_TAG, cache_hash="abcd1234", alias=f"{tmp_path.name}:feature/42")
+    index.touch(_TAG, cache_hash="abcd1234", alias=f"{tmp_path.name}:develop")
+    rc, run = _clean(tmp_path)
+    assert rc == 0
+    run.assert_not_called()
+    assert index.records()[_TAG].aliases == [f"{tmp_path.name}:develop"]
+    out = capsys.readouterr().out
+    assert f"still used by {tmp_path.name}:develop" in out
+    assert "--force" in out
+
+
+def test_clean_force_removes_a_shared_image(tmp_path: Path) -> None:
+    index = ImageIndex()
+    index.touch(_TAG, cache_hash="abcd1234", alias=f"{tmp_path.name}:feature/42")
+    index.touch(_TAG, cache_hash="abcd1234", alias=f"{tmp_path.name}:develop")
+    rc, run = _clean(tmp_path, "--force")
+    assert rc == 0
+    assert run.call_args.args[0] == ["docker", "rmi", _TAG]
+    assert index.records() == {}
+
+
+def test_clean_reports_a_failed_removal(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    ImageIndex().touch(_TAG, cache_hash="abcd1234", alias=f"{tmp_path.name}:feature/42")
+    rc, _ = _clean(tmp_path, rmi_stderr=f"Error: image {_TAG} is in use by a container")
+    assert rc == 1
+    assert _TAG in ImageIndex().records()
+    assert "is in use by a container" in capsys.readouterr().err
 
 
 def test_build_no_caching(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
@@ -125,6 +192,7 @@ def test_status_no_cache_with_expected_tag(
         patch("standard_tooling.bin.docker_cache.git.repo_root", return_value=tmp_path),
         patch("standard_tooling.bin.docker_cache.git.current_branch", return_value="feature/42"),
         patch("standard_tooling.bin.docker_cache.find_cached_image", return_value=None),
+        patch("standard_tooling.bin.docker_cache.image_id", return_value=None),
         patch("standard_tooling.bin.docker_cache.detect_language", return_value="go"),
         patch(
             "standard_tooling.bin.docker_cache.default_image",
@@ -132,21 +200,19 @@ def test_status_no_cache_with_expected_tag(
         ),
     ):
         assert main(["status"]) == 0
-    out = capsys.readouterr().out
-    assert "Expected tag:" in out
+    expected = cache_image_tag("ghcr.io/r/dev-go:1.26", cache_key(tmp_path, "go", ""))
+    assert f"Expected tag: {expected}" in capsys.readouterr().out
 
 
 def test_status_current(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    from standard_tooling.lib.docker_cache import cache_sensitive_files, compute_cache_hash
-
-    files = cache_sensitive_files(tmp_path, "go")
-    h = compute_cache_hash(files)
-    cached = (f"ghcr.io/r/dev-go:1.26--feature-42--{h}", h)
+    key = cache_key(tmp_path, "go", "sha256:go")
+    cached = (f"ghcr.io/r/dev-go:1.26--{key}", key)
     with (
         patch("standard_tooling.bin.docker_cache.git.repo_root", return_value=tmp_path),
         patch("standard_tooling.bin.docker_cache.git.current_branch", return_value="feature/42"),
         patch("standard_tooling.bin.docker_cache.find_cached_image", return_value=cached),
+        patch("standard_tooling.bin.docker_cache.image_id", return_value="sha256:go"),
         patch("standard_tooling.bin.docker_cache.detect_language", return_value="go"),
         patch(
             "standard_tooling.bin.docker_cache.default_image",
@@ -159,11 +225,12 @@ def test_status_current(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> N
 
 def test_status_stale(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
     (tmp_path / "standard-tooling.toml").write_text(_VALID_TOML)
-    cached = ("ghcr.io/r/dev-go:1.26--feature-42--oldold00", "oldold00")
+    cached = ("ghcr.io/r/dev-go:1.26--oldold00", "oldold00")
     with (
         patch("standard_tooling.bin.docker_cache.git.repo_root", return_value=tmp_path),
         patch("standard_tooling.bin.docker_cache.git.current_branch", return_value="feature/42"),
         patch("standard_tooling.bin.docker_cache.find_cached_image", return_value=cached),
+        patch("standard_tooling.bin.docker_cache.image_id", return_value="sha256:go"),
         patch("standard_tooling.bin.docker_cache.detect_language", return_value="go"),
         patch(
             "standard_tooling.bin.docker_cache.default_image",
@@ -180,14 +247,56 @@ def test_status_stale(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> Non
 def test_clean_all(capsys: pytest.CaptureFixture[str]) -> None:
     mock_result = MagicMock(
         returncode=0,
-        stdout="ghcr.io/r/dev-go:1.26--feat-42--abc\nghcr.io/r/dev-python:3.14\n",
+        stdout=(
+            "ghcr.io/r/dev-go:1.26--feat-42--abc\nghcr.io/r/dev-python:3.14\n"
+            "ghcr.io/wphillipmoore/dev-go:1.26--cafe0000\nmyapp:build--cafe0000\n"
+        ),
     )
-    with patch("standard_tooling.bin.docker_cache.subprocess.run", return_value=mock_result):
+    ImageIndex().touch("ghcr.io/r/dev-go:1.26--feat-42--abc", cache_hash="abc", alias="r:f")
+    with patch("standard_tooling.lib.docker.subprocess.run", return_value=mock_result) as run:
         assert main(["clean-all"]) == 0
-    assert "1 cached image" in capsys.readouterr().out
+    assert "2 cached image" in capsys.readouterr().out
+    assert ImageIndex().records() == {}
+    assert "myapp:build--cafe0000" not in run.call_args_list[-1].args[0]
 
 
 def test_clean_all_docker_error(capsys: pytest.CaptureFixture[str]) -> None:
     mock_result = MagicMock(returncode=1, stdout="")
-    with patch("standard_tooling.bin.docker_cache.subprocess.run", return_value=mock_result):
+    with patch("standard_tooling.lib.docker.subprocess.run", return_value=mock_result):
         assert main(["clean-all"]) == 1
+
+
+# -- gc subcommand ------------------------------------------------------------
+
+
+def test_gc_defaults_and_report(capsys: pytest.CaptureFixture[str]) -> None:
+    evicted = [ImageRecord("r/dev-go:1.26--abc", "abc", 0.0, 1000.0, 4_200_000_000)]
+    with (
+        patch("standard_tooling.bin.docker_cache.collect_garbage", return_value=evicted) as collect,
+        patch("standard_tooling.bin.docker_cache.time.time", return_value=1000.0 + 15 * 86400),
+    ):
+        assert main(["gc"]) == 0
+    collect.assert_called_once_with(max_size=20 * 10**9, max_age=14 * 86400, dry_run=False)
+    assert capsys.readouterr().out.splitlines() == [
+        "Removed: r/dev-go:1.26--abc (4.2GB, last used 15.0d ago)",
+        "Removed 1 cached image(s), 4.2GB.",
+    ]
+
+
+def test_gc_dry_run(capsys: pytest.CaptureFixture[str]) -> None:
+    with patch("standard_tooling.bin.docker_cache.collect_garbage", return_value=[]) as collect:
+        assert main(["gc", "--max-size", "500MB", "--max-age", "2w", "--dry-run"]) == 0
+    collect.assert_called_once_with(max_size=500 * 10**6, max_age=14 * 86400, dry_run=True)
+    assert capsys.readouterr().out == "Would remove 0 cached image(s), 0B.\n"
+
+
+def test_gc_docker_error(capsys: pytest.CaptureFixture[str]) -> None:
+    with patch("standard_tooling.bin.docker_cache.collect_garbage", return_value=None):
+        assert main(["gc"]) == 1
+    assert "Failed to list Docker images." in capsys.readouterr().err
+
+
+def test_gc_rejects_bad_budget(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        main(["gc", "--max-size", "lots"])
+    assert "--max-size" in capsys.readouterr().err
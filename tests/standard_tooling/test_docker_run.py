@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 from unittest.mock import patch
 
 from standard_tooling.bin.docker_run import main
+from standard_tooling.lib.context import RepoContext
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -13,6 +14,16 @@ if TYPE_CHECKING:
     import pytest
 
 
+def _context(root: Path) -> RepoContext:
+    return RepoContext(
+        root=root,
+        git_dir=root / ".git",
+        common_dir=root / ".git",
+        branch="feature/1-x",
+        head_sha=None,
+    )
+
+
 # -- help output --------------------------------------------------------------
 
 
@@ -32,7 +43,7 @@ def test_help_after_separator_not_intercepted(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image") as mock_cache,
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
@@ -48,7 +59,7 @@ def test_help_alone_after_separator_not_intercepted(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image") as mock_cache,
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
@@ -76,7 +87,7 @@ def test_no_command_after_separator() -> None:
 
 def test_missing_gh_token(tmp_path: Path) -> None:
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch.dict("os.environ", {}, clear=True),
     ):
         assert main(["--", "echo", "hi"]) == 1
@@ -88,7 +99,7 @@ def test_missing_gh_token(tmp_path: Path) -> None:
 def test_fallback_image_no_language(tmp_path: Path) -> None:
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image") as mock_cache,
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
@@ -104,7 +115,7 @@ def test_language_detected_image(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
         patch.dict("os.environ", env, clear=True),
@@ -117,7 +128,7 @@ def test_language_detected_image(tmp_path: Path) -> None:
 def test_env_image_override(tmp_path: Path) -> None:
     env = {"GH_TOKEN": "tok", "DOCKER_DEV_IMAGE": "custom:img"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
         patch.dict("os.environ", env, clear=True),
@@ -134,7 +145,7 @@ def test_command_after_separator(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
         patch.dict("os.environ", env, clear=True),
@@ -148,7 +159,7 @@ def test_command_without_separator(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
         patch.dict("os.environ", env, clear=True),
@@ -165,7 +176,7 @@ def test_network_printed(tmp_path: Path, capsys: pytest.CaptureFixture[str]) ->
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok", "DOCKER_NETWORK": "mynet"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.os.execvp"),
         patch.dict("os.environ", env, clear=True),
@@ -181,7 +192,7 @@ def test_argv_none_uses_sys_argv(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
         patch("standard_tooling.bin.docker_run.sys.argv", ["st-docker-run", "--", "echo"]),
@@ -199,7 +210,7 @@ def test_calls_execvp(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
         patch.dict("os.environ", env, clear=True),
@@ -217,7 +228,7 @@ def test_non_python_uses_cached_image(tmp_path: Path) -> None:
     cached = "ghcr.io/wphillipmoore/dev-go:1.26--feature-42--abcd1234"
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image", return_value=cached),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
@@ -233,7 +244,7 @@ def test_non_python_command_not_wrapped(tmp_path: Path) -> None:
     (tmp_path / "go.mod").write_text("module example\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch(
             "standard_tooling.bin.docker_run.ensure_cached_image",
@@ -252,7 +263,7 @@ def test_cached_image_diagnostic(tmp_path: Path, capsys: pytest.CaptureFixture[s
     cached = "ghcr.io/wphillipmoore/dev-go:1.26--feature-42--abcd1234"
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image", return_value=cached),
         patch("standard_tooling.bin.docker_run.os.execvp"),
@@ -271,7 +282,7 @@ def test_cached_image_uses_pull_never(tmp_path: Path) -> None:
     cached = "ghcr.io/wphillipmoore/dev-go:1.26--feature-42--abcd1234"
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image", return_value=cached),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
@@ -287,7 +298,7 @@ def test_registry_image_uses_pull_always(tmp_path: Path) -> None:
     base = "ghcr.io/wphillipmoore/dev-go:1.26"
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image", return_value=base),
         patch("standard_tooling.bin.docker_run.os.execvp") as mock_exec,
@@ -302,7 +313,7 @@ def test_python_routes_through_cache(tmp_path: Path) -> None:
     (tmp_path / "pyproject.toml").write_text("[project]\n")
     env = {"GH_TOKEN": "tok"}
     with (
-        patch("standard_tooling.bin.docker_run.git.repo_root", return_value=tmp_path),
+        patch("standard_tooling.bin.docker_run.context.current", return_value=_context(tmp_path)),
         patch("standard_tooling.bin.docker_run.assert_docker_available"),
         patch("standard_tooling.bin.docker_run.ensure_cached_image") as mock_cache,
         patch("standard_tooling.bin.docker_run.os.execvp"),
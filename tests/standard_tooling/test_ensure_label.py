@@ -2,11 +2,21 @@
 
 from __future__ import annotations
 
-from unittest.mock import patch
+import subprocess
+import time
+from typing import TYPE_CHECKING, Any
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from standard_tooling.bin.ensure_label import main, parse_args
+from standard_tooling.bin import ensure_label
+from standard_tooling.bin.ensure_label import main, parse_args, sync_repo
+from standard_tooling.lib.labels import load_labels
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_MOD = "standard_tooling.bin.ensure_label"
 
 # ---------------------------------------------------------------------------
 # Argument parsing
@@ -71,21 +81,14 @@ def test_parse_args_no_args_fails() -> None:
 
 
 def test_main_single_label() -> None:
-    with patch("standard_tooling.bin.ensure_label.github.run") as mock_run:
+    with patch("standard_tooling.bin.ensure_label.github.create_label") as mock_create:
         result = main(["--repo", "o/r", "--label", "bug"])
     assert result == 0
-    mock_run.assert_called_once_with(
-        "label",
-        "create",
-        "bug",
-        "--repo",
-        "o/r",
-        "--force",
-    )
+    mock_create.assert_called_once_with("o/r", "bug", color=None, description=None)
 
 
 def test_main_single_label_with_color_description() -> None:
-    with patch("standard_tooling.bin.ensure_label.github.run") as mock_run:
+    with patch("standard_tooling.bin.ensure_label.github.create_label") as mock_create:
         result = main(
             [
                 "--repo",
@@ -99,18 +102,7 @@ def test_main_single_label_with_color_description() -> None:
             ]
         )
     assert result == 0
-    mock_run.assert_called_once_with(
-        "label",
-        "create",
-        "feature",
-        "--repo",
-        "o/r",
-        "--force",
-        "--color",
-        "0e8a16",
-        "--description",
-        "New feature",
-    )
+    mock_create.assert_called_once_with("o/r", "feature", color="0e8a16", description="New feature")
 
 
 # ---------------------------------------------------------------------------
@@ -118,43 +110,128 @@ def test_main_single_label_with_color_description() -> None:
 # ---------------------------------------------------------------------------
 
 
-def test_main_sync_provisions_all_labels() -> None:
-    with patch("standard_tooling.bin.ensure_label.github.run") as mock_run:
-        result = main(["--repo", "o/r", "--sync"])
-    assert result == 0
-    # Should have called once per label + once for the delete
-    label_calls = [c for c in mock_run.call_args_list if c.args[1] == "create"]
-    assert len(label_calls) == 10  # 10 labels in the registry
+_REGISTRY = load_labels()
 
 
-def test_main_sync_uses_force_with_color_description() -> None:
-    with patch("standard_tooling.bin.ensure_label.github.run") as mock_run:
-        main(["--repo", "o/r", "--sync"])
-    # Check one representative call has --force, --color, --description
-    first_create = next(c for c in mock_run.call_args_list if c.args[1] == "create")
-    assert "--force" in first_create.args
-    assert "--color" in first_create.args
-    assert "--description" in first_create.args
+def _in_sync() -> list[dict[str, Any]]:
+    return [
+        {"name": lb["name"], "color": lb["color"], "description": lb["description"]}
+        for lb in _REGISTRY["labels"]
+    ]
 
 
-def test_main_sync_deletes_deprecated_labels() -> None:
-    with patch("standard_tooling.bin.ensure_label.github.run") as mock_run:
-        main(["--repo", "o/r", "--sync"])
-    delete_calls = [c for c in mock_run.call_args_list if c.args[1] == "delete"]
-    assert len(delete_calls) == 1
-    assert "enhancement" in delete_calls[0].args
+class _FakeGraphQL:
+    """Stand-in for github.graphql serving one repo's labels in pages."""
 
+    def __init__(self, labels: list[dict[str, Any]], page_size: int = 100) -> None:
+        self.labels = labels
+        self.page_size = page_size
+        self.reads = 0
 
-def test_main_sync_delete_ignores_missing_label() -> None:
-    """Deleting a non-existent label should not raise."""
+    def __call__(self, query: str, **variables: Any) -> dict[str, Any]:
+        assert not query.lstrip().startswith("mutation")
+        self.reads += 1
+        assert (variables["owner"], variables["name"]) == ("o", "r")
+        start = int(variables["cursor"] or 0)
+        end = start + self.page_size
+        return {
+            "repository": {
+                "labels": {
+                    "nodes": self.labels[start:end],
+                    "pageInfo": {"hasNextPage": end < len(self.labels), "endCursor": str(end)},
+                },
+            }
+        }
 
-    def side_effect(*args: str) -> None:
-        if args[1] == "delete":
-            raise RuntimeError("label not found")
 
-    with patch("standard_tooling.bin.ensure_label.github.run", side_effect=side_effect):
+@pytest.fixture
+def writes() -> Iterator[MagicMock]:
+    """Patch the REST label writes; calls are recorded on one parent mock."""
+    parent = MagicMock()
+    with (
+        patch(f"{_MOD}.github.create_label", parent.create),
+        patch(f"{_MOD}.github.update_label", parent.update),
+        patch(f"{_MOD}.github.delete_label", parent.delete),
+    ):
+        yield parent
+
+
+def test_sync_creates_missing_labels(writes: MagicMock, capsys: pytest.CaptureFixture[str]) -> None:
+    fake = _FakeGraphQL([])
+    with patch(f"{_MOD}.github.graphql", side_effect=fake):
         result = main(["--repo", "o/r", "--sync"])
     assert result == 0
+    assert fake.reads == 1
+    first = _REGISTRY["labels"][0]
+    assert writes.mock_calls[0] == call.create(
+        "o/r", first["name"], color=first["color"], description=first["description"]
+    )
+    assert [c[0] for c in writes.mock_calls] == ["create"] * len(_REGISTRY["labels"])
+    assert "10 created, 0 updated, 0 deleted, 0 unchanged" in capsys.readouterr().out
+
+
+def test_sync_idempotent_rerun_is_a_single_read(
+    writes: MagicMock, capsys: pytest.CaptureFixture[str]
+) -> None:
+    labels = _in_sync()
+    labels[0]["color"] = labels[0]["color"].upper()
+    fake = _FakeGraphQL(labels)
+    with patch(f"{_MOD}.github.graphql", side_effect=fake):
+        main(["--repo", "o/r", "--sync"])
+    assert fake.reads == 1
+    assert writes.mock_calls == []
+    assert "0 created, 0 updated, 0 deleted, 10 unchanged" in capsys.readouterr().out
+
+
+def test_sync_updates_drifted_labels_and_deletes_deprecated(
+    writes: MagicMock, capsys: pytest.CaptureFixture[str]
+) -> None:
+    labels = _in_sync()
+    labels[0]["color"] = "000000"
+    labels[1]["description"] = None
+    labels[2]["name"] = labels[2]["name"].upper()
+    labels.append({"name": "Enhancement", "color": "a2eeef", "description": ""})
+    fake = _FakeGraphQL(labels)
+    with patch(f"{_MOD}.github.graphql", side_effect=fake):
+        result = sync_repo("o/r")
+    assert result.updated == [lb["name"] for lb in _REGISTRY["labels"][:3]]
+    assert result.deleted == ["Enhancement"]
+    assert result.created == []
+    assert result.unchanged == 7
+    assert result.changes == 4
+    renamed = _REGISTRY["labels"][2]
+    assert writes.mock_calls == [
+        *(
+            call.update(
+                "o/r",
+                lb["name"],
+                new_name=lb["name"],
+                color=lb["color"],
+                description=lb["description"],
+            )
+            for lb in _REGISTRY["labels"][:2]
+        ),
+        call.update(
+            "o/r",
+            renamed["name"].upper(),
+            new_name=renamed["name"],
+            color=renamed["color"],
+            description=renamed["description"],
+        ),
+        call.delete("o/r", "Enhancement"),
+    ]
+    out = capsys.readouterr().out
+    assert "  deleted Enhancement" in out
+    assert "0 created, 3 updated, 1 deleted, 7 unchanged" in out
+
+
+def test_sync_reads_every_label_page(writes: MagicMock) -> None:
+    fake = _FakeGraphQL(_in_sync(), page_size=4)
+    with patch(f"{_MOD}.github.graphql", side_effect=fake):
+        result = sync_repo("o/r")
+    assert fake.reads == 3
+    assert result.unchanged == 10
+    assert writes.mock_calls == []
 
 
 # ---------------------------------------------------------------------------
@@ -165,11 +242,200 @@ def test_main_sync_delete_ignores_missing_label() -> None:
 def test_main_project_mode_discovers_and_syncs() -> None:
     with (
         patch(
-            "standard_tooling.bin.ensure_label.list_project_repos",
+            "standard_tooling.bin.ensure_label.iter_project_repos",
             return_value=["owner/a", "owner/b"],
         ) as mock_discover,
-        patch("standard_tooling.bin.ensure_label.github.run"),
+        patch(f"{_MOD}.sync_repo", side_effect=_fake_sync({})) as mock_sync,
     ):
         result = main(["--owner", "myorg", "--project", "3", "--sync"])
     assert result == 0
     mock_discover.assert_called_once_with("myorg", "3")
+    assert [c.args[0] for c in mock_sync.call_args_list] == ["owner/a", "owner/b"]
+
+
+def test_parse_args_jobs() -> None:
+    args = parse_args(["--owner", "myorg", "--project", "3", "--sync", "--jobs", "8"])
+    assert args.jobs == 8
+    assert parse_args(["--repo", "o/r", "--sync"]).jobs == 4
+
+
+def test_parse_args_jobs_must_be_positive() -> None:
+    with pytest.raises(SystemExit):
+        parse_args(["--owner", "myorg", "--project", "3", "--sync", "--jobs", "0"])
+
+
+def _fake_sync(changes: dict[str, int]) -> Any:
+    def sync(repo: str, *, log: Any) -> ensure_label.SyncResult:
+        log(f"Syncing labels for {repo}:")
+        return ensure_label.SyncResult(
+            repo=repo, created=["x"] * changes.get(repo, 0), unchanged=10
+        )
+
+    return sync
+
+
+def _rate_limited() -> subprocess.CalledProcessError:
+    return subprocess.CalledProcessError(
+        1, ["gh"], stderr="gh: You have exceeded a secondary rate limit.\n"
+    )
+
+
+def test_project_mode_prints_buffered_logs_and_summary(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    repos = [f"owner/r{n}" for n in range(6)]
+    with (
+        patch(f"{_MOD}.iter_project_repos", return_value=repos),
+        patch(f"{_MOD}.sync_repo", side_effect=_fake_sync({"owner/r2": 3})),
+    ):
+        rc = main(["--owner", "owner", "--project", "3", "--sync", "--jobs", "3"])
+    assert rc == 0
+    out = capsys.readouterr().out
+    assert "Synced 6 repos in project 3" in out
+    for repo in repos:
+        assert f"Syncing labels for {repo}:" in out
+    summary = out[out.index("Repo ") :].splitlines()
+    assert summary[0].split() == [
+        "Repo",
+        "Time",
+        "Created",
+        "Updated",
+        "Deleted",
+        "Unchanged",
+        "Status",
+    ]
+    assert [line.split()[0] for line in summary[1:]] == repos
+    assert summary[3].split()[2:] == ["3", "0", "0", "10", "ok"]
+
+
+def test_project_mode_reports_failed_repo(capsys: pytest.CaptureFixture[str]) -> None:
+    ok = _fake_sync({})
+
+    def sync(repo: str, *, log: Any) -> ensure_label.SyncResult:
+        if repo == "owner/bad":
+            raise subprocess.CalledProcessError(1, ["gh"], stderr="warn\nCould not resolve repo\n")
+        return ok(repo, log=log)
+
+    with (
+        patch(f"{_MOD}.iter_project_repos", return_value=["owner/bad", "owner/good"]),
+        patch(f"{_MOD}.sync_repo", side_effect=sync),
+    ):
+        rc = main(["--owner", "owner", "--project", "3", "--sync"])
+    assert rc == 1
+    out = capsys.readouterr().out
+    assert "  ERROR: Could not resolve repo" in out
+    assert "failed: Could not resolve repo" in out
+
+
+@pytest.mark.parametrize(
+    ("exc", "error"),
+    [
+        (KeyError("labels"), "KeyError: 'labels'"),
+        (ValueError(), "ValueError"),
+    ],
+)
+def test_project_mode_records_unexpected_errors_per_repo(
+    capsys: pytest.CaptureFixture[str], exc: Exception, error: str
+) -> None:
+    ok = _fake_sync({})
+
+    def sync(repo: str, *, log: Any) -> ensure_label.SyncResult:
+        if repo == "owner/bad":
+            raise exc
+        return ok(repo, log=log)
+
+    repos = ["owner/a", "owner/bad", "owner/c"]
+    with (
+        patch(f"{_MOD}.iter_project_repos", return_value=repos),
+        patch(f"{_MOD}.sync_repo", side_effect=sync),
+    ):
+        rc = main(["--owner", "owner", "--project", "3", "--sync", "--jobs", "2"])
+    assert rc == 1
+    out = capsys.readouterr().out
+    assert f"  ERROR: {error}" in out
+    summary = out[out.index("Repo ") :].splitlines()[1:]
+    assert [line.split()[0] for line in summary] == repos
+    assert summary[1].endswith(f"failed: {error}")
+    assert summary[0].endswith("ok")
+    assert summary[2].endswith("ok")
+
+
+def test_project_mode_reports_an_unknown_project(capsys: pytest.CaptureFixture[str]) -> None:
+    err = subprocess.CalledProcessError(1, ["gh"], stderr="Could not resolve to a ProjectV2.")
+    with (
+        patch(f"{_MOD}.iter_project_repos", side_effect=err),
+        patch(f"{_MOD}.sync_repo") as sync,
+    ):
+        assert main(["--owner", "ghost", "--project", "1", "--sync"]) == 1
+    sync.assert_not_called()
+    assert "ERROR: Could not resolve to a ProjectV2." in capsys.readouterr().err
+
+
+def test_project_mode_starts_syncing_before_discovery_finishes() -> None:
+    events: list[str] = []
+
+    def discover(owner: str, project: str) -> Any:
+        for repo in ("owner/a", "owner/b"):
+            events.append(f"found {repo}")
+            yield repo
+            time.sleep(0.05)
+        events.append("done")
+
+    def sync(repo: str, *, log: Any) -> ensure_label.SyncResult:
+        events.append(f"sync {repo}")
+        return ensure_label.SyncResult(repo=repo)
+
+    with (
+        patch(f"{_MOD}.iter_project_repos", side_effect=discover),
+        patch(f"{_MOD}.sync_repo", side_effect=sync),
+    ):
+        main(["--owner", "owner", "--project", "3", "--sync"])
+    assert events.index("sync owner/a") < events.index("done")
+
+
+def test_rate_limit_backs_off_and_retries() -> None:
+    calls: list[str] = []
+    ok = _fake_sync({})
+
+    def sync(repo: str, *, log: Any) -> ensure_label.SyncResult:
+        calls.append(repo)
+        if len(calls) == 1:
+            raise _rate_limited()
+        return ok(repo, log=log)
+
+    throttle = ensure_label._Throttle()
+    with (
+        patch(f"{_MOD}.sync_repo", side_effect=sync),
+        patch(f"{_MOD}.time.sleep") as sleep,
+    ):
+        outcome = ensure_label._sync_buffered("owner/a", throttle)
+    assert outcome.error is None
+    assert calls == ["owner/a", "owner/a"]
+    assert sleep.call_args.args[0] == pytest.approx(60, abs=1)
+    assert "  rate limited; pausing 60s before retrying" in outcome.log
+
+
+def test_rate_limit_gives_up_after_attempts() -> None:
+    throttle = ensure_label._Throttle()
+    with (
+        patch(f"{_MOD}.sync_repo", side_effect=_rate_limited()),
+        patch(f"{_MOD}.time.sleep"),
+    ):
+        outcome = ensure_label._sync_buffered("owner/a", throttle)
+    assert outcome.result is None
+    assert outcome.error == "gh: You have exceeded a secondary rate limit."
+
+
+def test_throttle_backoff_grows_and_resets() -> None:
+    throttle = ensure_label._Throttle()
+    assert [throttle.backoff() for _ in range(6)] == [60, 120, 240, 480, 600, 600]
+    throttle.succeeded()
+    assert throttle.backoff() == 60
+
+
+def test_error_without_stderr_uses_exception_text() -> None:
+    err = subprocess.CalledProcessError(1, ["gh", "api"])
+    with patch(f"{_MOD}.sync_repo", side_effect=err):
+        outcome = ensure_label._sync_buffered("owner/a", ensure_label._Throttle())
+    assert outcome.error is not None
+    assert "returned non-zero exit status 1" in outcome.error
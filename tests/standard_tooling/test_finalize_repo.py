@@ -2,9 +2,8 @@
 
 from __future__ import annotations
 
-import json
-from subprocess import CompletedProcess
-from typing import TYPE_CHECKING
+from subprocess import CalledProcessError, CompletedProcess
+from typing import TYPE_CHECKING, Any
 from unittest.mock import patch
 
 if TYPE_CHECKING:
@@ -18,6 +17,8 @@ from standard_tooling.bin.finalize_repo import (
     main,
     parse_args,
 )
+from standard_tooling.lib import docker
+from standard_tooling.lib.context import RepoContext
 
 _MOD = "standard_tooling.bin.finalize_repo"
 
@@ -25,15 +26,13 @@ if TYPE_CHECKING:
     from collections.abc import Iterator
 
 
-@pytest.fixture(autouse=True)
-def _main_worktree() -> Iterator[None]:
-    """Default every test to running in the main worktree.
-
-    Individual tests can override by patching is_main_worktree directly —
-    the innermost patch wins.
-    """
-    with patch(_MOD + ".git.is_main_worktree", return_value=True):
-        yield
+def _context(root: Path, branch: str = "develop", *, main_root: Path | None = None) -> RepoContext:
+    """Snapshot for *root*; a secondary worktree of *main_root* when given."""
+    common_dir = (main_root or root) / ".git"
+    git_dir = common_dir if main_root is None else common_dir / "worktrees" / "x"
+    return RepoContext(
+        root=root, git_dir=git_dir, common_dir=common_dir, branch=branch, head_sha=None
+    )
 
 
 @pytest.fixture(autouse=True)
@@ -47,6 +46,16 @@ def _clean_working_tree() -> Iterator[None]:
         yield
 
 
+@pytest.fixture(autouse=True)
+def _docker_cli_transport(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[None]:
+    """Keep cached-image cleanup on the (mocked) CLI, away from any real daemon."""
+    monkeypatch.setenv("ST_DOCKER_API", "0")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    docker.reset_engine()
+    yield
+    docker.reset_engine()
+
+
 def test_parse_args_defaults() -> None:
     args = parse_args([])
     assert args.target_branch == "develop"
@@ -66,9 +75,9 @@ def test_main_rejects_secondary_worktree(
     main_root = tmp_path / "main-wt"
     main_root.mkdir()
 
-    with (
-        patch(_MOD + ".git.is_main_worktree", return_value=False),
-        patch(_MOD + ".git.main_worktree_root", return_value=main_root),
+    with patch(
+        _MOD + ".context.current",
+        return_value=_context(tmp_path / "wt", main_root=main_root),
     ):
         result = main([])
 
@@ -93,8 +102,7 @@ def _validation_ok() -> CompletedProcess[bytes]:
 def test_main_library_release(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="feature/x"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "feature/x")),
         patch(_MOD + ".git.run") as mock_run,
         patch(
             "standard_tooling.bin.finalize_repo.git.merged_branches",
@@ -102,7 +110,7 @@ def test_main_library_release(tmp_path: Path) -> None:
         ),
         patch(_MOD + ".git.read_output", return_value=""),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
-        patch(_MOD + ".clean_branch_images", return_value=0),
+        patch(_MOD + ".release_branch_image", return_value=False),
         patch(_MOD + "._check_docs_workflow_status", return_value=None),
     ):
         result = main([])
@@ -114,8 +122,7 @@ def test_main_library_release(tmp_path: Path) -> None:
 def test_main_already_on_target(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
@@ -128,8 +135,7 @@ def test_main_already_on_target(tmp_path: Path) -> None:
 def test_main_dry_run(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="feature/x"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "feature/x")),
         patch(_MOD + ".git.run") as mock_git_run,
         patch(
             "standard_tooling.bin.finalize_repo.git.merged_branches",
@@ -143,8 +149,7 @@ def test_main_dry_run(tmp_path: Path) -> None:
 
 def test_main_no_profile(tmp_path: Path) -> None:
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
@@ -157,7 +162,7 @@ def test_main_no_profile(tmp_path: Path) -> None:
 def test_main_unrecognized_model(tmp_path: Path) -> None:
     _make_profile(tmp_path, "unknown-model")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path)),
     ):
         result = main([])
     assert result == 1
@@ -166,8 +171,7 @@ def test_main_unrecognized_model(tmp_path: Path) -> None:
 def test_main_application_promotion(tmp_path: Path) -> None:
     _make_profile(tmp_path, "application-promotion")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(
             "standard_tooling.bin.finalize_repo.git.merged_branches",
@@ -175,7 +179,7 @@ def test_main_application_promotion(tmp_path: Path) -> None:
         ),
         patch(_MOD + ".git.read_output", return_value=""),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
-        patch(_MOD + ".clean_branch_images", return_value=0),
+        patch(_MOD + ".release_branch_image", return_value=False),
         patch(_MOD + "._check_docs_workflow_status", return_value=None),
     ):
         result = main([])
@@ -185,8 +189,7 @@ def test_main_application_promotion(tmp_path: Path) -> None:
 def test_main_docs_single_branch(tmp_path: Path) -> None:
     _make_profile(tmp_path, "docs-single-branch")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
@@ -199,8 +202,7 @@ def test_main_docs_single_branch(tmp_path: Path) -> None:
 def test_main_no_deleted_branches(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=["develop"]),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
@@ -213,8 +215,7 @@ def test_main_no_deleted_branches(tmp_path: Path) -> None:
 def test_main_validation_fails(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(
@@ -230,8 +231,7 @@ def test_main_validation_fails(tmp_path: Path) -> None:
 def test_main_calls_docker_run(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()) as mock_sub,
@@ -248,8 +248,7 @@ def test_main_docker_run_uses_uv_for_python(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     (tmp_path / "pyproject.toml").write_text("[project]\nname = 'x'\n")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()) as mock_sub,
@@ -264,59 +263,47 @@ def test_main_docker_run_uses_uv_for_python(tmp_path: Path) -> None:
 # -- _check_docs_workflow_status (issue #303) --------------------------------
 
 
-def _gh_run_json(conclusion: str | None) -> str:
-    """Build a single-element gh run list JSON response."""
-    return json.dumps(
-        [
-            {
-                "conclusion": conclusion,
-                "databaseId": 12345,
-                "headSha": "abc123def456",
-                "createdAt": "2026-04-26T18:00:00Z",
-                "url": "https://github.com/owner/repo/actions/runs/12345",
-            }
-        ]
-    )
+def _run(conclusion: str | None) -> list[dict[str, Any]]:
+    """Build a single-element ``github.list_runs`` result."""
+    return [
+        {
+            "conclusion": conclusion,
+            "databaseId": 12345,
+            "headSha": "abc123def456",
+            "createdAt": "2026-04-26T18:00:00Z",
+            "url": "https://github.com/owner/repo/actions/runs/12345",
+        }
+    ]
 
 
-def test_check_docs_workflow_returns_none_when_gh_fails() -> None:
-    with patch(
-        _MOD + ".subprocess.run",
-        return_value=CompletedProcess(args=(), returncode=1, stdout="", stderr="oops"),
-    ):
-        assert _check_docs_workflow_status("develop") is None
-
-
-def test_check_docs_workflow_returns_none_when_no_runs() -> None:
-    with patch(
-        _MOD + ".subprocess.run",
-        return_value=CompletedProcess(args=(), returncode=0, stdout="[]"),
-    ):
+def test_check_docs_workflow_asks_for_the_latest_docs_run() -> None:
+    with patch(_MOD + ".github.list_runs", return_value=[]) as list_runs:
         assert _check_docs_workflow_status("develop") is None
+    list_runs.assert_called_once_with(workflow="Documentation", branch="develop", limit=1)
 
 
-def test_check_docs_workflow_returns_none_on_success() -> None:
-    with patch(
-        _MOD + ".subprocess.run",
-        return_value=CompletedProcess(args=(), returncode=0, stdout=_gh_run_json("success")),
-    ):
+@pytest.mark.parametrize(
+    "error",
+    [
+        CalledProcessError(1, "gh", stderr="could not find any workflows named Documentation"),
+        ValueError("not json"),
+        KeyError("workflow_runs"),
+    ],
+)
+def test_check_docs_workflow_returns_none_when_listing_fails(error: Exception) -> None:
+    with patch(_MOD + ".github.list_runs", side_effect=error):
         assert _check_docs_workflow_status("develop") is None
 
 
-def test_check_docs_workflow_returns_none_on_in_progress() -> None:
-    # gh reports null conclusion (in_progress / queued).
-    with patch(
-        _MOD + ".subprocess.run",
-        return_value=CompletedProcess(args=(), returncode=0, stdout=_gh_run_json(None)),
-    ):
+@pytest.mark.parametrize("conclusion", ["success", None, "skipped"])
+def test_check_docs_workflow_returns_none_unless_failed(conclusion: str | None) -> None:
+    # A null conclusion means the run is in progress or queued.
+    with patch(_MOD + ".github.list_runs", return_value=_run(conclusion)):
         assert _check_docs_workflow_status("develop") is None
 
 
 def test_check_docs_workflow_returns_message_on_failure() -> None:
-    with patch(
-        _MOD + ".subprocess.run",
-        return_value=CompletedProcess(args=(), returncode=0, stdout=_gh_run_json("failure")),
-    ):
+    with patch(_MOD + ".github.list_runs", return_value=_run("failure")):
         msg = _check_docs_workflow_status("develop")
     assert msg is not None
     assert "12345" in msg
@@ -326,30 +313,12 @@ def test_check_docs_workflow_returns_message_on_failure() -> None:
     assert "actions/runs/12345" in msg
 
 
-def test_check_docs_workflow_returns_none_on_malformed_json() -> None:
-    with patch(
-        _MOD + ".subprocess.run",
-        return_value=CompletedProcess(args=(), returncode=0, stdout="not json"),
-    ):
-        assert _check_docs_workflow_status("develop") is None
-
-
-def test_check_docs_workflow_returns_none_on_empty_stdout() -> None:
-    # Defensive: stdout missing entirely (None) shouldn't crash.
-    with patch(
-        _MOD + ".subprocess.run",
-        return_value=CompletedProcess(args=(), returncode=0, stdout=None),
-    ):
-        assert _check_docs_workflow_status("develop") is None
-
-
 def test_main_returns_one_on_docs_failure(
     tmp_path: Path, capsys: pytest.CaptureFixture[str]
 ) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
@@ -370,8 +339,7 @@ def test_main_returns_one_on_docs_failure(
 def test_main_skips_docs_check_on_dry_run(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(
@@ -467,13 +435,12 @@ def test_main_removes_worktree_before_deleting_branch(tmp_path: Path) -> None:
         git_run_calls.append(args)
 
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run", side_effect=mock_git_run),
         patch(_MOD + ".git.merged_branches", return_value=["feature/99-x"]),
         patch(_MOD + ".git.read_output", return_value=porcelain),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
-        patch(_MOD + ".clean_branch_images", return_value=0),
+        patch(_MOD + ".release_branch_image", return_value=False),
         patch(_MOD + "._check_docs_workflow_status", return_value=None),
     ):
         result = main([])
@@ -500,13 +467,12 @@ def test_main_skips_worktree_remove_when_branch_not_in_worktree(tmp_path: Path)
         git_run_calls.append(args)
 
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run", side_effect=mock_git_run),
         patch(_MOD + ".git.merged_branches", return_value=["feature/99-x"]),
         patch(_MOD + ".git.read_output", return_value=porcelain),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
-        patch(_MOD + ".clean_branch_images", return_value=0),
+        patch(_MOD + ".release_branch_image", return_value=False),
         patch(_MOD + "._check_docs_workflow_status", return_value=None),
     ):
         result = main([])
@@ -516,24 +482,23 @@ def test_main_skips_worktree_remove_when_branch_not_in_worktree(tmp_path: Path)
     assert not any(c[:1] == ("worktree",) for c in git_run_calls)
 
 
-def test_main_cleans_docker_cache_on_branch_delete(
+def test_main_releases_docker_cache_on_branch_delete(
     tmp_path: Path, capsys: pytest.CaptureFixture[str]
 ) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=["feature/x"]),
         patch(_MOD + ".git.read_output", return_value=""),
         patch(_MOD + ".subprocess.run", return_value=_validation_ok()),
-        patch(_MOD + ".clean_branch_images", return_value=2) as mock_clean,
+        patch(_MOD + ".release_branch_image", return_value=True) as mock_release,
         patch(_MOD + "._check_docs_workflow_status", return_value=None),
     ):
         result = main([])
     assert result == 0
-    mock_clean.assert_called_once_with("feature/x")
-    assert "Cleaned 2 cached Docker image(s)" in capsys.readouterr().out
+    mock_release.assert_called_once_with(tmp_path, "feature/x")
+    assert "Released cached Docker image for feature/x" in capsys.readouterr().out
 
 
 # -- working-tree cleanliness gate (issue #472) -------------------------------
@@ -548,8 +513,7 @@ def test_main_fails_on_dirty_working_tree(
     _make_profile(tmp_path, "library-release")
     dirty_status = "?? orphan-spec.md\n?? stale-plan.md"
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="develop"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "develop")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".git.working_tree_status", return_value=dirty_status),
@@ -566,8 +530,7 @@ def test_main_fails_on_dirty_working_tree(
 def test_main_skips_dirty_check_on_dry_run(tmp_path: Path) -> None:
     _make_profile(tmp_path, "library-release")
     with (
-        patch(_MOD + ".git.repo_root", return_value=tmp_path),
-        patch(_MOD + ".git.current_branch", return_value="feature/x"),
+        patch(_MOD + ".context.current", return_value=_context(tmp_path, "feature/x")),
         patch(_MOD + ".git.run"),
         patch(_MOD + ".git.merged_branches", return_value=[]),
         patch(_MOD + ".git.working_tree_status", return_value="?? should-not-fail.md"),
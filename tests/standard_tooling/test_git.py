@@ -2,12 +2,56 @@
 
 from __future__ import annotations
 
+import io
 import subprocess
 from pathlib import Path
-from unittest.mock import patch
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 from standard_tooling.lib import git
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture(autouse=True)
+def _fresh_session() -> Iterator[None]:
+    """Give every test its own process-wide session."""
+    git.close_session()
+    yield
+    git.close_session()
+
+
+@pytest.fixture
+def no_direct_reads() -> Iterator[None]:
+    """Force every session query through git itself."""
+    with patch("standard_tooling.lib.git.RefReader.discover", return_value=None):
+        yield
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A real one-commit repository on ``main``, used as the CWD."""
+    for args in (
+        ("init", "--quiet", "--initial-branch=main"),
+        (
+            "-c",
+            "user.name=t",
+            "-c",
+            "user.email=t@example.com",
+            "commit",
+            "-q",
+            "--allow-empty",
+            "-m",
+            "init",
+        ),
+    ):
+        subprocess.run(("git", "-C", str(tmp_path), *args), check=True)  # noqa: S603, S607
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
 
 def _completed(returncode: int = 0, stdout: str = "") -> subprocess.CompletedProcess[str]:
     return subprocess.CompletedProcess(args=[], returncode=returncode, stdout=stdout)
@@ -74,50 +118,115 @@ def test_read_output_returns_stripped_stdout() -> None:
     mock_run.assert_called_once_with(("git", "log"), check=True, text=True, capture_output=True)
 
 
+@pytest.mark.usefixtures("no_direct_reads")
 def test_repo_root_returns_path() -> None:
-    with patch("standard_tooling.lib.git.read_output", return_value="/var/repo"):  # noqa: S108
+    with patch(
+        "standard_tooling.lib.git.read_output",
+        return_value="/var/repo\n/var/repo/.git\n/var/repo/.git",  # noqa: S108
+    ) as mock:
         result = git.repo_root()
-    assert result == Path("/var/repo")
+    assert result == Path("/var/repo")  # noqa: S108
+    mock.assert_called_once_with(
+        "rev-parse", "--show-toplevel", "--absolute-git-dir", "--git-common-dir"
+    )
 
 
+@pytest.mark.usefixtures("no_direct_reads")
 def test_current_branch_returns_name() -> None:
-    with patch("standard_tooling.lib.git.read_output", return_value="feature/test"):
+    with patch("standard_tooling.lib.git.read_output", return_value="feature/test") as mock:
         result = git.current_branch()
     assert result == "feature/test"
+    mock.assert_called_once_with("rev-parse", "--abbrev-ref", "HEAD")
 
 
+@pytest.mark.usefixtures("no_direct_reads")
 def test_is_main_worktree_true() -> None:
     with patch(
         "standard_tooling.lib.git.read_output",
-        side_effect=["/repo/.git", "/repo/.git"],
+        return_value="/repo\n/repo/.git\n/repo/.git",
     ):
         assert git.is_main_worktree() is True
 
 
+@pytest.mark.usefixtures("no_direct_reads")
 def test_is_main_worktree_false() -> None:
     with patch(
         "standard_tooling.lib.git.read_output",
-        side_effect=["/repo/.git/worktrees/feature-x", "/repo/.git"],
+        return_value="/repo/.worktrees/x\n/repo/.git/worktrees/feature-x\n/repo/.git",
     ):
         assert git.is_main_worktree() is False
 
 
+@pytest.mark.usefixtures("no_direct_reads")
 def test_main_worktree_root_from_main() -> None:
     with patch(
         "standard_tooling.lib.git.read_output",
-        return_value="/repo/.git",
+        return_value="/repo\n/repo/.git\n/repo/.git",
     ):
         assert git.main_worktree_root() == Path("/repo")
 
 
+@pytest.mark.usefixtures("no_direct_reads")
 def test_main_worktree_root_from_secondary() -> None:
     with patch(
         "standard_tooling.lib.git.read_output",
-        return_value="/repo/.git",
+        return_value="/repo/.worktrees/x\n/repo/.git/worktrees/x\n/repo/.git",
     ):
         assert git.main_worktree_root() == Path("/repo")
 
 
+@pytest.mark.usefixtures("no_direct_reads")
+def test_main_worktree_root_resolves_relative_common_dir(tmp_path: Path) -> None:
+    """``--git-common-dir`` may be relative to the CWD."""
+    with (
+        patch("standard_tooling.lib.git.Path.cwd", return_value=tmp_path),
+        patch(
+            "standard_tooling.lib.git.read_output",
+            return_value=f"{tmp_path}\n{tmp_path}/.git\n.git",
+        ),
+    ):
+        assert git.main_worktree_root() == tmp_path.resolve()
+        assert git.is_main_worktree() is True
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+def test_layout_queries_share_one_rev_parse() -> None:
+    with patch(
+        "standard_tooling.lib.git.read_output",
+        return_value="/repo\n/repo/.git\n/repo/.git",
+    ) as mock:
+        git.repo_root()
+        git.is_main_worktree()
+        git.main_worktree_root()
+    mock.assert_called_once()
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+def test_run_invalidates_session() -> None:
+    with (
+        patch("standard_tooling.lib.git.read_output", side_effect=["feature/x", "develop"]),
+        patch("standard_tooling.lib.git.subprocess.run", return_value=_completed()),
+    ):
+        assert git.current_branch() == "feature/x"
+        assert git.current_branch() == "feature/x"
+        git.run("checkout", "develop")
+        assert git.current_branch() == "develop"
+
+
+def test_session_replaced_after_chdir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    first = git.session()
+    assert git.session() is first
+    monkeypatch.chdir(tmp_path)
+    second = git.session()
+    assert second is not first
+    assert second.cwd == tmp_path
+
+
+def test_close_session_without_session_is_noop() -> None:
+    git.close_session()
+    git.close_session()
+
+
 def test_has_staged_changes_true() -> None:
     with patch("standard_tooling.lib.git.subprocess.run") as mock_run:
         mock_run.return_value = _completed(returncode=1)
@@ -130,16 +239,93 @@ def test_has_staged_changes_false() -> None:
         assert git.has_staged_changes() is False
 
 
-def test_ref_exists_true() -> None:
-    with patch("standard_tooling.lib.git.subprocess.run") as mock_run:
-        mock_run.return_value = _completed(returncode=0)
+def test_ref_exists_true(repo: Path) -> None:
+    assert git.ref_exists("main") is True
+    assert git.ref_exists("HEAD") is True
+
+
+def test_ref_exists_false(repo: Path) -> None:
+    assert git.ref_exists("nonexistent") is False
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+def test_ref_exists_uses_one_batch_process(repo: Path) -> None:
+    with patch("standard_tooling.lib.git.subprocess.Popen", wraps=subprocess.Popen) as mock_popen:
         assert git.ref_exists("main") is True
+        assert git.ref_exists("HEAD~0") is True
+        assert git.ref_exists("nonexistent") is False
+    mock_popen.assert_called_once()
 
 
-def test_ref_exists_false() -> None:
-    with patch("standard_tooling.lib.git.subprocess.run") as mock_run:
-        mock_run.return_value = _completed(returncode=1)
+def test_resolve_is_memoized(repo: Path) -> None:
+    s = git.session()
+    with patch.object(s, "_lookup", wraps=s._lookup) as mock_lookup:
+        oid = s.resolve("HEAD")
+        assert s.resolve("HEAD") == oid
+    mock_lookup.assert_called_once_with("HEAD")
+    assert oid is not None
+    assert len(oid) == 40
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+def test_ref_exists_falls_back_when_batch_unavailable() -> None:
+    with (
+        patch("standard_tooling.lib.git.subprocess.Popen", side_effect=OSError),
+        patch("standard_tooling.lib.git.subprocess.run") as mock_run,
+    ):
+        mock_run.side_effect = [_completed(stdout="abc123\n"), _completed(returncode=1)]
+        assert git.ref_exists("main") is True
         assert git.ref_exists("nonexistent") is False
+    assert mock_run.call_args.args[0] == ("git", "rev-parse", "--verify", "--quiet", "nonexistent")
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+def test_resolve_falls_back_for_multiline_rev(repo: Path) -> None:
+    assert git.session().resolve("main\nHEAD") is None
+
+
+def _fake_batch(*, stdout: str = "", write_error: bool = False) -> MagicMock:
+    proc = MagicMock()
+    proc.stdin = MagicMock()
+    if write_error:
+        proc.stdin.write.side_effect = BrokenPipeError
+    proc.stdout = io.StringIO(stdout)
+    return proc
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+@pytest.mark.parametrize("write_error", [False, True])
+def test_resolve_falls_back_when_batch_dies(write_error: bool) -> None:
+    with (
+        patch(
+            "standard_tooling.lib.git.subprocess.Popen",
+            return_value=_fake_batch(write_error=write_error),
+        ) as mock_popen,
+        patch("standard_tooling.lib.git.subprocess.run", return_value=_completed(stdout="a1\n")),
+    ):
+        s = git.GitSession()
+        assert s.resolve("main") == "a1"
+        assert s.resolve("develop") == "a1"
+    mock_popen.assert_called_once()
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+def test_resolve_reports_ambiguous_as_missing() -> None:
+    with patch(
+        "standard_tooling.lib.git.subprocess.Popen",
+        return_value=_fake_batch(stdout="abc ambiguous\n"),
+    ):
+        assert git.GitSession().resolve("abc") is None
+
+
+@pytest.mark.usefixtures("no_direct_reads")
+def test_session_context_manager_closes_batch(repo: Path) -> None:
+    with git.GitSession(repo) as s:
+        assert s.resolve("main") is not None
+        batch = s._batch
+        assert batch is not None
+    assert s._batch is None
+    assert batch.returncode == 0
 
 
 def test_merged_branches_returns_list() -> None:
@@ -164,3 +350,292 @@ def test_working_tree_status_returns_porcelain_output() -> None:
 def test_working_tree_status_returns_empty_when_clean() -> None:
     with patch("standard_tooling.lib.git.read_output", return_value=""):
         assert git.working_tree_status() == ""
+
+
+# -- RefReader: direct reads of the git directory ------------------------------
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(  # noqa: S603
+        ("git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args),  # noqa: S607
+        cwd=cwd,
+        check=True,
+        text=True,
+        capture_output=True,
+    )
+    return result.stdout.strip()
+
+
+def _git_verify(cwd: Path, rev: str) -> str | None:
+    result = subprocess.run(  # noqa: S603
+        ("git", "rev-parse", "--verify", "--quiet", rev),  # noqa: S607
+        cwd=cwd,
+        check=False,
+        text=True,
+        capture_output=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _reader(path: Path) -> git.RefReader:
+    reader = git.RefReader.discover(path)
+    assert reader is not None
+    return reader
+
+
+_REVS = (
+    "HEAD",
+    "main",
+    "refs/heads/main",
+    "feature/1-x",
+    "v1",
+    "refs/tags/v1",
+    "origin/main",
+    "origin",
+    "nonexistent",
+    "refs/heads/nonexistent",
+)
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_reader_matches_git(repo: Path, packed: bool) -> None:
+    _git(repo, "branch", "feature/1-x")
+    _git(repo, "tag", "v1")
+    _git(repo, "update-ref", "refs/remotes/origin/main", "HEAD")
+    _git(repo, "symbolic-ref", "refs/remotes/origin/HEAD", "refs/remotes/origin/main")
+    if packed:
+        _git(repo, "pack-refs", "--all")
+    reader = _reader(repo)
+    for rev in _REVS:
+        assert reader.resolve(rev) == _git_verify(repo, rev), rev
+    assert reader.branch() == "main"
+    assert reader.toplevel == repo
+    assert reader.git_dir == reader.common_dir == (repo / ".git").resolve()
+
+
+def test_reader_detached_head(repo: Path) -> None:
+    _git(repo, "checkout", "-q", "--detach")
+    assert _reader(repo).branch() == "HEAD"
+
+
+def test_reader_linked_worktree(repo: Path, tmp_path_factory: pytest.TempPathFactory) -> None:
+    wt = tmp_path_factory.mktemp("wt") / "issue-2-y"
+    _git(repo, "worktree", "add", "-q", str(wt), "-b", "feature/2-y")
+    reader = _reader(wt)
+    assert reader.branch() == "feature/2-y"
+    assert reader.resolve("main") == _git_verify(repo, "main")
+    assert reader.toplevel == wt
+    assert reader.git_dir == Path(_git(wt, "rev-parse", "--absolute-git-dir"))
+    assert reader.common_dir == (repo / ".git").resolve()
+
+
+def test_reader_discovers_from_subdirectory(repo: Path) -> None:
+    sub = repo / "a" / "b"
+    sub.mkdir(parents=True)
+    assert _reader(sub).toplevel == repo
+
+
+def test_reader_per_worktree_ref(repo: Path) -> None:
+    _git(repo, "update-ref", "refs/bisect/bad", "HEAD")
+    assert _reader(repo).resolve("refs/bisect/bad") == _git_verify(repo, "HEAD")
+
+
+def test_reader_unborn_branch(tmp_path: Path) -> None:
+    _git(tmp_path, "init", "-q", "--initial-branch=main")
+    reader = _reader(tmp_path)
+    assert reader.resolve("HEAD") is None
+    with pytest.raises(git._UnresolvableError):
+        reader.branch()
+
+
+def test_reader_defers_ambiguous_branch(repo: Path) -> None:
+    _git(repo, "tag", "main")
+    with pytest.raises(git._UnresolvableError):
+        _reader(repo).branch()
+
+
+@pytest.mark.parametrize(
+    "head",
+    ["ref: refs/remotes/origin/main", "not a ref at all"],
+)
+def test_reader_defers_unusual_head(repo: Path, head: str) -> None:
+    (repo / ".git" / "HEAD").write_text(f"{head}\n")
+    with pytest.raises(git._UnresolvableError):
+        _reader(repo).branch()
+
+
+@pytest.mark.parametrize(
+    "rev",
+    ["HEAD~1", "HEAD^", "main@{1}", "abc123", "a..b", "main.lock", "main/", "-x", "main:f"],
+)
+def test_reader_defers_revision_expressions(repo: Path, rev: str) -> None:
+    with pytest.raises(git._UnresolvableError):
+        _reader(repo).resolve(rev)
+
+
+def test_reader_defers_symref_loop(repo: Path) -> None:
+    heads = repo / ".git" / "refs" / "heads"
+    (heads / "a").write_text("ref: refs/heads/b\n")
+    (heads / "b").write_text("ref: refs/heads/a\n")
+    with pytest.raises(git._UnresolvableError):
+        _reader(repo).resolve("a")
+
+
+def test_reader_defers_garbage_loose_ref(repo: Path) -> None:
+    (repo / ".git" / "refs" / "heads" / "junk").write_text("garbage\n")
+    with pytest.raises(git._UnresolvableError):
+        _reader(repo).resolve("junk")
+
+
+def test_reader_defers_unreadable_file(repo: Path) -> None:
+    reader = _reader(repo)
+    (repo / ".git" / "HEAD").unlink()
+    with pytest.raises(git._UnresolvableError):
+        reader.branch()
+
+
+def test_discover_none_outside_repository(tmp_path: Path) -> None:
+    with patch("standard_tooling.lib.git.Path.is_dir", return_value=False):
+        assert git.RefReader.discover(tmp_path) is None
+
+
+def test_discover_none_with_git_env_override(repo: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+    assert git.RefReader.discover(repo) is None
+
+
+def test_discover_none_for_reftable(repo: Path) -> None:
+    (repo / ".git" / "reftable").mkdir()
+    assert git.RefReader.discover(repo) is None
+
+
+def test_discover_none_without_head(tmp_path: Path) -> None:
+    (tmp_path / ".git").mkdir()
+    assert git.RefReader.discover(tmp_path) is None
+
+
+def test_discover_none_for_bad_pointer(tmp_path: Path) -> None:
+    (tmp_path / ".git").write_text("nonsense\n")
+    assert git.RefReader.discover(tmp_path) is None
+
+
+def test_gitdir_pointer_relative(tmp_path: Path) -> None:
+    marker = tmp_path / ".git"
+    marker.write_text("gitdir: ../main/.git/worktrees/x\n")
+    assert git.gitdir_pointer(marker) == tmp_path / "../main/.git/worktrees/x"
+
+
+def test_session_answers_from_disk_without_spawning(repo: Path) -> None:
+    with (
+        patch("standard_tooling.lib.git.read_output") as mock_read,
+        patch("standard_tooling.lib.git.subprocess.Popen") as mock_popen,
+    ):
+        assert git.repo_root() == repo
+        assert git.is_main_worktree() is True
+        assert git.current_branch() == "main"
+        assert git.ref_exists("main") is True
+        assert git.ref_exists("nonexistent") is False
+    mock_read.assert_not_called()
+    mock_popen.assert_not_called()
+
+
+def test_session_falls_back_when_reader_defers(repo: Path) -> None:
+    _git(repo, "tag", "main")
+    assert git.current_branch() == "heads/main"
+    assert git.ref_exists("HEAD~0") is True
+
+
+def test_current_branch_unborn_raises_like_git(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _git(tmp_path, "init", "-q", "--initial-branch=main")
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(subprocess.CalledProcessError):
+        git.current_branch()
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(  # noqa: S603
+        ("git", "-C", str(repo), *args),  # noqa: S607
+        check=True,
+        text=True,
+        capture_output=True,
+    ).stdout.strip()
+
+
+def test_worktree_tree_covers_unstaged_and_untracked_files(repo: Path) -> None:
+    git_dir = repo / ".git"
+    (repo / ".gitignore").write_text("build/\n")
+    (repo / "a.txt").write_text("one\n")
+    _git(repo, "add", "a.txt")
+    before = git.worktree_tree(repo, git_dir)
+
+    (repo / "build").mkdir()
+    (repo / "build" / "out").write_text("ignored\n")
+    assert git.worktree_tree(repo, git_dir) == before
+
+    (repo / "a.txt").write_text("two\n")
+    modified = git.worktree_tree(repo, git_dir)
+    (repo / "new.txt").write_text("new\n")
+    untracked = git.worktree_tree(repo, git_dir)
+    assert len({before, modified, untracked}) == 3
+
+    assert _git(repo, "diff", "--cached", "--name-only") == "a.txt"
+    assert "new.txt" in _git(repo, "ls-tree", "--name-only", untracked)
+    assert not list(git_dir.glob("st-index-*"))
+
+
+def test_worktree_tree_without_an_index(tmp_path: Path) -> None:
+    _git(tmp_path, "init", "--quiet")
+    (tmp_path / "f").write_text("x\n")
+    tree = git.worktree_tree(tmp_path, tmp_path / ".git")
+    assert _git(tmp_path, "ls-tree", "--name-only", tree) == "f"
+    assert not (tmp_path / ".git" / "index").exists()
+
+
+def test_list_files_tracked_and_untracked(repo: Path) -> None:
+    (repo / ".gitignore").write_text("build/\n")
+    (repo / "docs").mkdir()
+    (repo / "docs" / "a b.md").write_text("x\n")
+    (repo / "build").mkdir()
+    (repo / "build" / "out.md").write_text("ignored\n")
+    _git(repo, "add", ".gitignore")
+    (repo / "new.txt").write_text("new\n")
+    assert git.list_files(repo) == [".gitignore", "docs/a b.md", "new.txt"]
+    assert git.list_files(repo, untracked=False) == [".gitignore"]
+
+
+def test_changed_files_since_merge_base(repo: Path) -> None:
+    for name in ("kept.txt", "edited.txt", "deleted.txt"):
+        (repo / name).write_text("base\n")
+    (repo / ".gitignore").write_text("build/\n")
+    _git(repo, "add", "-A")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@e", "commit", "-qm", "base")
+    _git(repo, "branch", "develop")
+    # develop moves on; its later changes are not ours.
+    _git(repo, "checkout", "-q", "-b", "feature")
+    (repo / "committed.txt").write_text("x\n")
+    _git(repo, "add", "committed.txt")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@e", "commit", "-qm", "feature")
+    _git(repo, "checkout", "-q", "develop")
+    (repo / "upstream.txt").write_text("x\n")
+    _git(repo, "add", "upstream.txt")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@e", "commit", "-qm", "upstream")
+    _git(repo, "checkout", "-q", "feature")
+
+    (repo / "edited.txt").write_text("changed\n")
+    (repo / "deleted.txt").unlink()
+    (repo / "new dir").mkdir()
+    (repo / "new dir" / "untracked.txt").write_text("x\n")
+    (repo / "build").mkdir()
+    (repo / "build" / "out.txt").write_text("ignored\n")
+    assert git.changed_files(repo, "develop") == [
+        "committed.txt",
+        "edited.txt",
+        "new dir/untracked.txt",
+    ]
+
+
+def test_changed_files_unknown_ref(repo: Path) -> None:
+    with pytest.raises(subprocess.CalledProcessError):
+        git.changed_files(repo, "no-such-ref")
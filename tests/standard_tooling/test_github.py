@@ -2,11 +2,37 @@
 
 from __future__ import annotations
 
+import json
 import subprocess
-from unittest.mock import patch
+from typing import TYPE_CHECKING, Any
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 from standard_tooling.lib import github
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def _gh_transport(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Keep tests on the ``gh`` path whatever tokens the environment has."""
+    for name in ("GH_TOKEN", "GITHUB_TOKEN"):
+        monkeypatch.delenv(name, raising=False)
+    github.reset_http_client()
+    yield
+    github.reset_http_client()
+
+
+@pytest.fixture
+def native() -> MagicMock:
+    """Install a mock native client in place of ``gh``."""
+    client = MagicMock()
+    github._http.set(client)
+    return client
+
 
 def _completed(
     returncode: int = 0, stdout: str = "", stderr: str = ""
@@ -30,71 +56,384 @@ def test_read_output_returns_stripped_stdout() -> None:
     )
 
 
+def test_graphql_sends_body_on_stdin() -> None:
+    with patch("standard_tooling.lib.github.subprocess.run") as mock_run:
+        mock_run.return_value = _completed(stdout='{"data": {"viewer": {"login": "me"}}}')
+        data = github.graphql("query($n: Int) { viewer { login } }", n=3, cursor=None)
+    assert data == {"viewer": {"login": "me"}}
+    args, kwargs = mock_run.call_args
+    assert args[0] == ("gh", "api", "graphql", "--input", "-")
+    assert json.loads(kwargs["input"]) == {
+        "query": "query($n: Int) { viewer { login } }",
+        "variables": {"n": 3, "cursor": None},
+    }
+    assert kwargs["check"] is True
+
+
+def test_is_rate_limited() -> None:
+    secondary = subprocess.CalledProcessError(
+        1, ["gh"], stderr="You have exceeded a secondary rate limit"
+    )
+    primary = subprocess.CalledProcessError(1, ["gh"], stderr="API rate limit exceeded for user")
+    other = subprocess.CalledProcessError(1, ["gh"], stderr="Not Found")
+    assert github.is_rate_limited(secondary)
+    assert github.is_rate_limited(primary)
+    assert not github.is_rate_limited(other)
+    assert not github.is_rate_limited(subprocess.CalledProcessError(1, ["gh"]))
+
+
 def test_create_pr_returns_url() -> None:
     with patch("standard_tooling.lib.github.read_output", return_value="https://github.com/pr/1"):
         url = github.create_pr(base="main", title="title", body_file="body.md")
     assert url == "https://github.com/pr/1"
 
 
-def test_wait_for_checks_skips_poll_when_already_registered() -> None:
+_GH = "standard_tooling.lib.github"
+_PR = "https://github.com/o/r/pull/1"
+
+
+def _states(**checks: str) -> dict[str, github.CheckState]:
+    """Build a name -> CheckState map: value is a conclusion or 'pending'."""
+    return {
+        name: github.CheckState(name, "in_progress", None)
+        if value == "pending"
+        else github.CheckState(name, "completed", value)
+        for name, value in checks.items()
+    }
+
+
+@pytest.fixture
+def pr_head() -> Iterator[MagicMock]:
     with (
-        patch("standard_tooling.lib.github._checks_registered", return_value=True),
-        patch("standard_tooling.lib.github.run") as mock_run,
+        patch(f"{_GH}.pr_view", return_value={"url": _PR, "number": 1}) as view,
+        patch(f"{_GH}._head_sha", return_value="abc123") as head,
     ):
-        github.wait_for_checks("https://github.com/pr/1")
-    mock_run.assert_called_once_with(
-        "pr", "checks", "https://github.com/pr/1", "--watch", "--fail-fast"
-    )
+        yield head
+    view.assert_called_once_with(_PR, "url", "number")
+    head.assert_called_with("o/r", 1)
+
+
+@pytest.fixture
+def no_jitter() -> Iterator[None]:
+    with patch(f"{_GH}.random.uniform", return_value=1.0):
+        yield
+
+
+@pytest.mark.parametrize(
+    ("status", "conclusion", "bucket"),
+    [
+        ("queued", None, "pending"),
+        ("completed", "success", "pass"),
+        ("completed", "skipped", "pass"),
+        ("completed", "neutral", "pass"),
+        ("completed", "failure", "fail"),
+        ("completed", "timed_out", "fail"),
+        ("completed", "error", "fail"),
+    ],
+)
+def test_check_state_bucket(status: str, conclusion: str | None, bucket: str) -> None:
+    assert github.CheckState("ci", status, conclusion).bucket == bucket
+
+
+def test_print_transition_reports_bucket_changes(capsys: pytest.CaptureFixture[str]) -> None:
+    queued = github.CheckState("ci", "queued", None)
+    running = github.CheckState("ci", "in_progress", None)
+    done = github.CheckState("ci", "completed", "success")
+    github.print_transition(None, queued)
+    github.print_transition(queued, running)
+    github.print_transition(running, done)
+    assert capsys.readouterr().out == "  ci: pending\n  ci: pass\n"
+
+
+def test_print_transition_prefix(capsys: pytest.CaptureFixture[str]) -> None:
+    github.print_transition(None, github.CheckState("ci", "queued", None), prefix="o/r#1: ")
+    assert capsys.readouterr().out == "  o/r#1: ci: pending\n"
+
+
+@pytest.mark.usefixtures("pr_head", "no_jitter")
+def test_wait_for_checks_reports_transitions_until_green() -> None:
+    polls = [
+        (_states(lint="pending", test="pending"), True),
+        (_states(lint="success", test="pending"), True),
+        (_states(lint="success", test="success"), True),
+    ]
+    seen: list[tuple[github.CheckState | None, github.CheckState]] = []
+    with (
+        patch(f"{_GH}._check_states", side_effect=polls) as states,
+        patch(f"{_GH}.time.sleep") as sleep,
+    ):
+        github.wait_for_checks(_PR, on_transition=lambda old, new: seen.append((old, new)))
+    states.assert_called_with("o/r", "abc123")
+    assert [c.args[0] for c in sleep.call_args_list] == [5, 5]
+    assert [(old and old.bucket, new.name, new.bucket) for old, new in seen] == [
+        (None, "lint", "pending"),
+        (None, "test", "pending"),
+        ("pending", "lint", "pass"),
+        ("pending", "test", "pass"),
+    ]
+
+
+@pytest.mark.usefixtures("pr_head", "no_jitter")
+def test_wait_for_checks_backs_off_while_unchanged() -> None:
+    pending = (_states(test="pending"), False)
+    polls = [pending] * 6 + [(_states(test="success"), True)]
+    with (
+        patch(f"{_GH}._check_states", side_effect=polls),
+        patch(f"{_GH}.time.sleep") as sleep,
+    ):
+        github.wait_for_checks(_PR, poll_interval=4, max_interval=15)
+    assert [c.args[0] for c in sleep.call_args_list] == [4, 6, 9, 13.5, 15, 15]
 
 
-def test_wait_for_checks_polls_until_registered() -> None:
+@pytest.mark.usefixtures("pr_head")
+def test_wait_for_checks_jitters_sleep() -> None:
+    polls = [(_states(test="pending"), True), (_states(test="success"), True)]
     with (
-        patch(
-            "standard_tooling.lib.github._checks_registered",
-            side_effect=[False, False, True],
-        ),
-        patch("standard_tooling.lib.github.time.sleep") as mock_sleep,
-        patch("standard_tooling.lib.github.run") as mock_run,
+        patch(f"{_GH}._check_states", side_effect=polls),
+        patch(f"{_GH}.random.uniform", return_value=1.2) as uniform,
+        patch(f"{_GH}.time.sleep") as sleep,
     ):
-        github.wait_for_checks("https://github.com/pr/1", poll_interval=5, poll_timeout=60)
-
-    assert mock_sleep.call_count == 2
-    mock_sleep.assert_called_with(5)
-    mock_run.assert_called_once_with(
-        "pr", "checks", "https://github.com/pr/1", "--watch", "--fail-fast"
-    )
+        github.wait_for_checks(_PR, poll_interval=10)
+    uniform.assert_called_once_with(0.8, 1.2)
+    sleep.assert_called_once_with(12.0)
 
 
-def test_wait_for_checks_proceeds_after_timeout() -> None:
-    # monotonic: [initial (deadline), loop iter1 check, loop iter2 check (expired)]
+@pytest.mark.usefixtures("pr_head", "no_jitter")
+def test_wait_for_checks_fails_fast() -> None:
+    polls = [(_states(lint="failure", test="pending", docs="cancelled"), True)]
     with (
-        patch("standard_tooling.lib.github._checks_registered", return_value=False),
-        patch(
-            "standard_tooling.lib.github.time.monotonic",
-            side_effect=[0.0, 0.0, 61.0],
-        ),
-        patch("standard_tooling.lib.github.time.sleep"),
-        patch("standard_tooling.lib.github.run") as mock_run,
+        patch(f"{_GH}._check_states", side_effect=polls),
+        patch(f"{_GH}.time.sleep") as sleep,
+        pytest.raises(subprocess.CalledProcessError) as excinfo,
     ):
-        github.wait_for_checks("https://github.com/pr/1", poll_interval=5, poll_timeout=60)
-
-    mock_run.assert_called_once_with(
-        "pr", "checks", "https://github.com/pr/1", "--watch", "--fail-fast"
-    )
+        github.wait_for_checks(_PR)
+    sleep.assert_not_called()
+    assert excinfo.value.stderr == f"Checks failed on {_PR}: docs, lint"
 
 
-def test_wait_for_checks_uses_poll_interval_for_sleep() -> None:
+@pytest.mark.usefixtures("pr_head", "no_jitter")
+def test_wait_for_checks_waits_for_registration() -> None:
+    polls = [({}, True), ({}, False), (_states(test="success"), True)]
     with (
-        patch(
-            "standard_tooling.lib.github._checks_registered",
-            side_effect=[False, True],
-        ),
-        patch("standard_tooling.lib.github.time.sleep") as mock_sleep,
-        patch("standard_tooling.lib.github.run"),
+        patch(f"{_GH}._check_states", side_effect=polls),
+        patch(f"{_GH}.time.sleep") as sleep,
     ):
-        github.wait_for_checks("https://github.com/pr/1", poll_interval=10, poll_timeout=60)
-
-    mock_sleep.assert_called_once_with(10)
+        github.wait_for_checks(_PR, poll_interval=5, poll_timeout=60)
+    assert sleep.call_count == 2
+
+
+@pytest.mark.usefixtures("no_jitter")
+def test_wait_for_checks_follows_a_new_head_commit(pr_head: MagicMock) -> None:
+    pr_head.side_effect = ["abc123", "def456", "def456"]
+    polls = [
+        (_states(test="pending"), True),
+        # The old commit's result no longer counts; the new one has no checks yet.
+        ({}, True),
+        (_states(test="success"), True),
+    ]
+    seen: list[tuple[github.CheckState | None, github.CheckState]] = []
+    with (
+        patch(f"{_GH}._check_states", side_effect=polls) as states,
+        patch(f"{_GH}.time.sleep"),
+    ):
+        github.wait_for_checks(_PR, on_transition=lambda old, new: seen.append((old, new)))
+    assert [c.args for c in states.call_args_list] == [
+        ("o/r", "abc123"),
+        ("o/r", "def456"),
+        ("o/r", "def456"),
+    ]
+    # The new commit's checks are reported as newly registered.
+    assert [(old, new.bucket) for old, new in seen] == [(None, "pending"), (None, "pass")]
+
+
+@pytest.mark.usefixtures("pr_head", "no_jitter")
+def test_wait_for_checks_gives_up_when_nothing_registers() -> None:
+    with (
+        patch(f"{_GH}._check_states", return_value=({}, False)),
+        patch(f"{_GH}.time.monotonic", side_effect=[0.0, 30.0, 61.0]),
+        patch(f"{_GH}.time.sleep"),
+        pytest.raises(subprocess.CalledProcessError) as excinfo,
+    ):
+        github.wait_for_checks(_PR, poll_interval=5, poll_timeout=60)
+    assert "no checks reported" in excinfo.value.stderr
+
+
+def _http(status: str, body: str = "", etag: str | None = None, link: str | None = None) -> str:
+    headers = [f"HTTP/2.0 {status}", "Content-Type: application/json"]
+    if etag:
+        headers.append(f'ETag: "{etag}"')
+    if link:
+        headers.append(f"Link: {link}")
+    return "\r\n".join(headers) + "\r\n\r\n" + body
+
+
+@pytest.fixture
+def empty_etags() -> Iterator[None]:
+    github._etags.clear()
+    yield
+    github._etags.clear()
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_get_page_revalidates_with_etag() -> None:
+    responses = [
+        _completed(stdout=_http("200 OK", '{"n": 1}', etag="v1")),
+        _completed(returncode=1, stdout=_http("304 Not Modified")),
+    ]
+    with patch(f"{_GH}.subprocess.run", side_effect=responses) as run:
+        assert github._get_page("repos/o/r/x") == ({"n": 1}, True, None)
+        assert github._get_page("repos/o/r/x") == ({"n": 1}, False, None)
+    assert run.call_args_list[0].args[0] == ["gh", "api", "--include", "repos/o/r/x"]
+    assert run.call_args_list[1].args[0][-2:] == ["-H", 'If-None-Match: "v1"']
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_get_page_without_etag_is_not_cached() -> None:
+    responses = [_completed(stdout=_http("200 OK", "[]")), _completed(stdout=_http("200 OK", "[]"))]
+    with patch(f"{_GH}.subprocess.run", side_effect=responses) as run:
+        github._get_page("e")
+        github._get_page("e")
+    assert "-H" not in run.call_args_list[1].args[0]
+
+
+@pytest.mark.usefixtures("empty_etags")
+@pytest.mark.parametrize(
+    "stdout", [_http("404 Not Found", '{"message": "Not Found"}'), "", _http("304 Not Modified")]
+)
+def test_get_page_raises_on_error(stdout: str) -> None:
+    with (
+        patch(f"{_GH}.subprocess.run", return_value=_completed(1, stdout, "gh: error")),
+        pytest.raises(subprocess.CalledProcessError) as excinfo,
+    ):
+        github._get_page("e")
+    assert excinfo.value.stderr == "gh: error"
+
+
+def test_check_states_merges_runs_and_statuses() -> None:
+    runs = {
+        "check_runs": [
+            {"id": 1, "name": "test", "status": "completed", "conclusion": "success"},
+            {"id": 2, "name": "lint", "status": "in_progress", "conclusion": None},
+        ]
+    }
+    combined = {
+        "statuses": [
+            {"context": "ci/legacy", "state": "pending"},
+            {"context": "ci/other", "state": "error"},
+        ]
+    }
+    pages = [(runs, False, None), (combined, True, None)]
+    with patch(f"{_GH}._get_page", side_effect=pages) as get:
+        states, changed = github._check_states("o/r", "abc")
+    assert changed is True
+    assert {s.name: s.bucket for s in states.values()} == {
+        "test": "pass",
+        "lint": "pending",
+        "ci/legacy": "pending",
+        "ci/other": "fail",
+    }
+    assert get.call_args_list[0].args[0] == "repos/o/r/commits/abc/check-runs?per_page=100"
+    assert get.call_args_list[1].args[0] == "repos/o/r/commits/abc/status?per_page=100"
+
+
+_NEXT = "<https://api.github.com/repositories/1/commits/abc/check-runs?per_page=100&page=2>"
+
+
+def _run(name: str, run_id: int = 1, conclusion: str = "success") -> dict[str, Any]:
+    return {"id": run_id, "name": name, "status": "completed", "conclusion": conclusion}
+
+
+def test_check_states_keeps_same_named_runs_apart() -> None:
+    # ``test`` in CI and ``test`` in a release workflow: neither may hide the other.
+    runs = {"check_runs": [_run("test", 1, "failure"), _run("test", 2)]}
+    pages = [
+        (runs, True, None),
+        ({"statuses": [{"context": "test", "state": "success"}]}, True, None),
+    ]
+    with patch(f"{_GH}._get_page", side_effect=pages):
+        states, _ = github._check_states("o/r", "abc")
+    assert sorted((s.name, s.bucket) for s in states.values()) == [
+        ("test", "fail"),
+        ("test", "pass"),
+        ("test", "pass"),
+    ]
+
+
+@pytest.mark.usefixtures("pr_head", "no_jitter")
+def test_wait_for_checks_fails_when_a_same_named_run_fails() -> None:
+    pages = [
+        ({"check_runs": [_run("test", 1, "failure"), _run("test", 2)]}, True, None),
+        ({"statuses": []}, True, None),
+    ]
+    with (
+        patch(f"{_GH}._get_page", side_effect=pages),
+        pytest.raises(subprocess.CalledProcessError) as excinfo,
+    ):
+        github.wait_for_checks(_PR)
+    assert excinfo.value.stderr == f"Checks failed on {_PR}: test"
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_check_states_follows_link_pagination() -> None:
+    responses = [
+        _completed(
+            stdout=_http(
+                "200 OK",
+                json.dumps({"check_runs": [_run("a")]}),
+                etag="p1",
+                link=f'{_NEXT}; rel="next", <https://api.github.com/x?page=2>; rel="last"',
+            )
+        ),
+        _completed(stdout=_http("200 OK", json.dumps({"check_runs": [_run("b", 2)]}), etag="p2")),
+        _completed(stdout=_http("200 OK", json.dumps({"statuses": []}), etag="s1")),
+    ]
+    with patch(f"{_GH}.subprocess.run", side_effect=responses) as run:
+        states, changed = github._check_states("o/r", "abc")
+    assert sorted(s.name for s in states.values()) == ["a", "b"]
+    assert changed is True
+    assert run.call_args_list[1].args[0] == [
+        "gh",
+        "api",
+        "--include",
+        "repositories/1/commits/abc/check-runs?per_page=100&page=2",
+    ]
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_unchanged_pages_replay_their_next_link() -> None:
+    link = f'{_NEXT}; rel="next"'
+    responses = [
+        _completed(stdout=_http("200 OK", '{"check_runs": [], "n": 1}', etag="p1", link=link)),
+        _completed(stdout=_http("200 OK", '{"check_runs": []}', etag="p2")),
+        _completed(returncode=1, stdout=_http("304 Not Modified")),
+        _completed(returncode=1, stdout=_http("304 Not Modified")),
+    ]
+    with patch(f"{_GH}.subprocess.run", side_effect=responses):
+        assert github._get_all_pages("e", "check_runs") == ([], True)
+        assert github._get_all_pages("e", "check_runs") == ([], False)
+
+
+@pytest.mark.parametrize(
+    ("link", "endpoint"),
+    [
+        ("", None),
+        ('<https://api.github.com/x?page=9>; rel="last"', None),
+        ('<https://api.github.com/repositories/1/x?page=2>; rel="next"', "repositories/1/x?page=2"),
+        ('<https://ghe.example.com/api/v3/repos/o/r/x>; rel="next"', "repos/o/r/x"),
+    ],
+)
+def test_next_endpoint(link: str, endpoint: str | None) -> None:
+    assert github._next_endpoint(link) == endpoint
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_head_sha_reads_the_pull_request() -> None:
+    pull = json.dumps({"head": {"sha": "def456"}})
+    with patch(
+        f"{_GH}.subprocess.run", return_value=_completed(stdout=_http("200 OK", pull))
+    ) as run:
+        assert github._head_sha("o/r", 7) == "def456"
+    assert run.call_args.args[0][-1] == "repos/o/r/pulls/7"
 
 
 def test_merge_delegates_to_gh() -> None:
@@ -109,36 +448,328 @@ def test_merge_squash_strategy() -> None:
     mock_run.assert_called_once_with("pr", "merge", "--squash", "https://github.com/pr/1")
 
 
-def test_list_project_repos() -> None:
+def _repos_page(names: list[str | None], cursor: str | None) -> dict[str, Any]:
+    return {
+        "repositoryOwner": {
+            "projectV2": {
+                "repositories": {
+                    "nodes": [None if n is None else {"nameWithOwner": n} for n in names],
+                    "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+                }
+            }
+        }
+    }
+
+
+@pytest.fixture
+def private_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+
+@pytest.mark.usefixtures("private_cache")
+def test_iter_project_repos_pages_and_streams() -> None:
+    pages = [
+        _repos_page(["acme/repo-b", "acme/repo-a"], "c1"),
+        _repos_page(["acme/repo-a", None, "acme/repo-c"], None),
+    ]
+    with patch("standard_tooling.lib.github.graphql", side_effect=pages) as gql:
+        stream = github.iter_project_repos("acme", "5")
+        assert next(stream) == "acme/repo-b"
+        assert gql.call_count == 1
+        assert list(stream) == ["acme/repo-a", "acme/repo-c"]
+    assert gql.call_args_list[0].kwargs == {"owner": "acme", "number": 5, "cursor": None}
+    assert gql.call_args_list[1].kwargs["cursor"] == "c1"
+
+
+@pytest.mark.usefixtures("private_cache")
+def test_iter_project_repos_served_from_cache() -> None:
     with patch(
-        "standard_tooling.lib.github.read_output",
-        return_value="acme/repo-b\nacme/repo-a\nacme/repo-a\n",
+        "standard_tooling.lib.github.graphql", return_value=_repos_page(["acme/x"], None)
+    ) as gql:
+        assert list(github.iter_project_repos("acme", "5")) == ["acme/x"]
+        assert list(github.iter_project_repos("acme", "5")) == ["acme/x"]
+        assert list(github.iter_project_repos("acme", "6")) == ["acme/x"]
+    assert gql.call_count == 2
+
+
+@pytest.mark.usefixtures("private_cache")
+def test_iter_project_repos_partial_read_not_cached() -> None:
+    first, last = _repos_page(["acme/a"], "c1"), _repos_page(["acme/b"], None)
+    with patch("standard_tooling.lib.github.graphql", side_effect=[first, first, last]) as gql:
+        next(github.iter_project_repos("acme", "5"))
+        assert list(github.iter_project_repos("acme", "5")) == ["acme/a", "acme/b"]
+    assert gql.call_count == 3
+
+
+@pytest.mark.usefixtures("private_cache")
+@pytest.mark.parametrize(
+    "data", [{"repositoryOwner": None}, {"repositoryOwner": {"projectV2": None}}]
+)
+def test_iter_project_repos_missing_owner_or_project(data: dict[str, Any]) -> None:
+    with (
+        patch("standard_tooling.lib.github.graphql", return_value=data),
+        pytest.raises(subprocess.CalledProcessError) as excinfo,
     ):
-        repos = github.list_project_repos("acme", "5")
-    assert repos == ["acme/repo-a", "acme/repo-b"]
+        list(github.iter_project_repos("ghost", "1"))
+    assert excinfo.value.stderr == "Could not resolve to a ProjectV2 with the number 1 for ghost."
+
 
+@pytest.mark.usefixtures("private_cache")
+def test_iter_project_repos_empty_listing_not_cached() -> None:
+    pages = [_repos_page([], None), _repos_page(["acme/new"], None)]
+    with patch("standard_tooling.lib.github.graphql", side_effect=pages) as gql:
+        assert list(github.iter_project_repos("acme", "5")) == []
+        assert list(github.iter_project_repos("acme", "5")) == ["acme/new"]
+    assert gql.call_count == 2
 
-def test_list_project_repos_empty() -> None:
+
+@pytest.mark.usefixtures("private_cache")
+def test_list_project_repos_sorted() -> None:
     with patch(
-        "standard_tooling.lib.github.read_output",
-        return_value="",
+        "standard_tooling.lib.github.graphql",
+        return_value=_repos_page(["acme/repo-b", "acme/repo-a"], None),
     ):
-        assert github.list_project_repos("acme", "5") == []
+        assert github.list_project_repos("acme", "5") == ["acme/repo-a", "acme/repo-b"]
+
+
+# -- native client transport --------------------------------------------------
+
+
+def test_http_client_is_built_once_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert github.http_client() is None
+    monkeypatch.setenv("GH_TOKEN", "t")
+    assert github.http_client() is None  # cached until reset
+    github.reset_http_client()
+    client = github.http_client()
+    assert client is not None
+    assert github.http_client() is client
+
+
+def test_graphql_uses_native_client(native: MagicMock) -> None:
+    native.graphql.return_value = {"viewer": {"login": "me"}}
+    with patch(f"{_GH}.subprocess.run") as run:
+        assert github.graphql("q", n=1) == {"viewer": {"login": "me"}}
+    native.graphql.assert_called_once_with("q", {"n": 1})
+    run.assert_not_called()
+
+
+def test_unreachable_api_falls_back_to_gh_for_good(native: MagicMock) -> None:
+    native.graphql.side_effect = OSError("unreachable")
+    with patch(f"{_GH}.subprocess.run", return_value=_completed(stdout='{"data": {"a": 1}}')):
+        assert github.graphql("q") == {"a": 1}
+        assert github.graphql("q") == {"a": 1}
+    native.graphql.assert_called_once()
+    native.close.assert_called_once()
+    assert github.http_client() is None
+
+
+def test_pr_view_uses_native_client_for_urls(native: MagicMock) -> None:
+    native.pull_request.return_value = {"url": _PR, "headRefOid": "abc", "headRefName": "x"}
+    assert github.pr_view(_PR, "url", "headRefOid") == {"url": _PR, "headRefOid": "abc"}
+    native.pull_request.assert_called_once_with("o/r", 1)
+
+
+@pytest.mark.parametrize(("pr", "fields"), [("42", ("url",)), (_PR, ("title",))])
+def test_pr_view_falls_back_to_gh(native: MagicMock, pr: str, fields: tuple[str, ...]) -> None:
+    with patch(f"{_GH}.read_output", return_value='{"url": "u"}') as read:
+        assert github.pr_view(pr, *fields) == {"url": "u"}
+    read.assert_called_once_with("pr", "view", pr, "--json", ",".join(fields))
+    native.pull_request.assert_not_called()
+
+
+def test_pr_view_falls_back_when_unreachable(native: MagicMock) -> None:
+    native.pull_request.side_effect = OSError
+    with patch(f"{_GH}.read_output", return_value='{"headRefName": "x"}'):
+        assert github.pr_view(_PR, "headRefName") == {"headRefName": "x"}
+    assert github.http_client() is None
+
+
+def test_create_label_uses_native_client(native: MagicMock) -> None:
+    with patch(f"{_GH}.run") as run:
+        github.create_label("o/r", "bug", color="d73a4a")
+    native.create_label.assert_called_once_with("o/r", "bug", color="d73a4a", description=None)
+    run.assert_not_called()
+
+
+def test_create_label_falls_back_when_unreachable(native: MagicMock) -> None:
+    native.create_label.side_effect = OSError
+    with patch(f"{_GH}.run") as run:
+        github.create_label("o/r", "bug", color="d73a4a", description="Broken")
+    run.assert_called_once_with(
+        "label",
+        "create",
+        "bug",
+        "--repo",
+        "o/r",
+        "--force",
+        "--color",
+        "d73a4a",
+        "--description",
+        "Broken",
+    )
 
 
-def test_checks_registered_returns_false_when_phrase_in_stdout() -> None:
-    cp = _completed(returncode=1, stdout="no checks reported on the 'main' branch\n")
-    with patch("standard_tooling.lib.github.subprocess.run", return_value=cp):
-        assert github._checks_registered("https://github.com/pr/1") is False
+def test_create_label_via_gh() -> None:
+    with patch(f"{_GH}.run") as run:
+        github.create_label("o/r", "bug")
+    run.assert_called_once_with("label", "create", "bug", "--repo", "o/r", "--force")
+
+
+def test_update_label_uses_native_client(native: MagicMock) -> None:
+    with patch(f"{_GH}.run") as run:
+        github.update_label("o/r", "Bug", new_name="bug", color="d73a4a")
+    native.update_label.assert_called_once_with(
+        "o/r", "Bug", new_name="bug", color="d73a4a", description=None
+    )
+    run.assert_not_called()
+
+
+def test_update_label_falls_back_when_unreachable(native: MagicMock) -> None:
+    native.update_label.side_effect = OSError
+    with patch(f"{_GH}.run") as run:
+        github.update_label("o/r", "Bug", new_name="bug", color="d73a4a", description="")
+    run.assert_called_once_with(
+        "label",
+        "edit",
+        "Bug",
+        "--repo",
+        "o/r",
+        "--name",
+        "bug",
+        "--color",
+        "d73a4a",
+        "--description",
+        "",
+    )
 
 
-def test_checks_registered_returns_false_when_phrase_in_stderr() -> None:
-    cp = _completed(returncode=1, stderr="no checks reported on the 'main' branch\n")
-    with patch("standard_tooling.lib.github.subprocess.run", return_value=cp):
-        assert github._checks_registered("https://github.com/pr/1") is False
+def test_update_label_via_gh() -> None:
+    with patch(f"{_GH}.run") as run:
+        github.update_label("o/r", "bug")
+    run.assert_called_once_with("label", "edit", "bug", "--repo", "o/r")
+
+
+def test_delete_label_uses_native_client(native: MagicMock) -> None:
+    with patch(f"{_GH}.run") as run:
+        github.delete_label("o/r", "wontfix")
+    native.delete_label.assert_called_once_with("o/r", "wontfix")
+    run.assert_not_called()
+
+
+def test_delete_label_falls_back_when_unreachable(native: MagicMock) -> None:
+    native.delete_label.side_effect = OSError
+    with patch(f"{_GH}.run") as run:
+        github.delete_label("o/r", "wontfix")
+    run.assert_called_once_with("label", "delete", "wontfix", "--repo", "o/r", "--yes")
+
+
+def test_delete_label_via_gh() -> None:
+    with patch(f"{_GH}.run") as run:
+        github.delete_label("o/r", "wontfix")
+    run.assert_called_once_with("label", "delete", "wontfix", "--repo", "o/r", "--yes")
+
+
+def test_list_runs_uses_native_client(native: MagicMock) -> None:
+    native.list_runs.return_value = [{"databaseId": 1}]
+    assert github.list_runs("o/r", branch="main") == [{"databaseId": 1}]
+    native.list_runs.assert_called_once_with("o/r", branch="main", workflow=None, limit=20)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://github.com/o/r.git",
+        "https://github.com/o/r",
+        "git@github.com:o/r.git",
+        "ssh://git@github.com/o/r/",
+    ],
+)
+def test_list_runs_resolves_origin(native: MagicMock, url: str) -> None:
+    native.list_runs.return_value = []
+    with patch("standard_tooling.lib.git.read_output", return_value=url) as read:
+        github.list_runs(workflow="Documentation", limit=1)
+    read.assert_called_once_with("remote", "get-url", "origin")
+    native.list_runs.assert_called_once_with("o/r", branch=None, workflow="Documentation", limit=1)
+
+
+@pytest.mark.parametrize(
+    "origin",
+    [
+        {"return_value": "https://gitlab.com/o/r.git"},
+        {"side_effect": subprocess.CalledProcessError(2, "git")},
+    ],
+)
+def test_list_runs_leaves_unknown_origins_to_gh(native: MagicMock, origin: dict[str, Any]) -> None:
+    with (
+        patch("standard_tooling.lib.git.read_output", **origin),
+        patch(f"{_GH}.read_output", return_value="[]") as read,
+    ):
+        assert github.list_runs(workflow="Documentation") == []
+    native.list_runs.assert_not_called()
+    assert "--repo" not in read.call_args.args
+
+
+def test_list_runs_falls_back_when_unreachable(native: MagicMock) -> None:
+    native.list_runs.side_effect = OSError
+    with patch(f"{_GH}.read_output", return_value='[{"databaseId": 1}]') as read:
+        assert github.list_runs("o/r", branch="main", workflow="CI", limit=5) == [{"databaseId": 1}]
+    read.assert_called_once_with(
+        "run",
+        "list",
+        "--limit",
+        "5",
+        "--repo",
+        "o/r",
+        "--branch",
+        "main",
+        "--workflow",
+        "CI",
+        "--json",
+        "databaseId,name,status,conclusion,headBranch,headSha,createdAt,url",
+    )
 
 
-def test_checks_registered_returns_true_when_checks_exist() -> None:
-    cp = _completed(stdout="ci/tests\tpass\nhttps://example.com\n")
-    with patch("standard_tooling.lib.github.subprocess.run", return_value=cp):
-        assert github._checks_registered("https://github.com/pr/1") is True
+def test_list_runs_via_gh() -> None:
+    with patch(f"{_GH}.read_output", return_value="[]") as read:
+        assert github.list_runs("o/r") == []
+    assert "--branch" not in read.call_args.args
+    assert "--workflow" not in read.call_args.args
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_get_page_uses_native_client(native: MagicMock) -> None:
+    from standard_tooling.lib.github_http import Response
+
+    native.get.side_effect = [
+        Response(200, {"etag": '"v1"'}, {"n": 1}),
+        Response(304, {"etag": '"v1"'}, None),
+        Response(200, {}, {"n": 2}),
+    ]
+    assert github._get_page("repos/o/r/x") == ({"n": 1}, True, None)
+    assert github._get_page("repos/o/r/x") == ({"n": 1}, False, None)
+    assert github._get_page("repos/o/r/y") == ({"n": 2}, True, None)
+    assert [c.args for c in native.get.call_args_list] == [
+        ("/repos/o/r/x",),
+        ("/repos/o/r/x",),
+        ("/repos/o/r/y",),
+    ]
+    assert [c.kwargs["etag"] for c in native.get.call_args_list] == [None, '"v1"', None]
+    assert "repos/o/r/y" not in github._etags
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_get_page_reads_the_native_link_header(native: MagicMock) -> None:
+    from standard_tooling.lib.github_http import Response
+
+    link = '<https://api.github.com/repositories/1/x?page=2>; rel="next"'
+    native.get.return_value = Response(200, {"etag": '"v1"', "link": link}, {"n": 1})
+    assert github._get_page("x") == ({"n": 1}, True, "repositories/1/x?page=2")
+    assert github._etags["x"] == ('"v1"', {"n": 1}, "repositories/1/x?page=2")
+
+
+@pytest.mark.usefixtures("empty_etags")
+def test_get_page_falls_back_when_unreachable(native: MagicMock) -> None:
+    native.get.side_effect = OSError
+    with patch(f"{_GH}.subprocess.run", return_value=_completed(stdout=_http("200 OK", "[]"))):
+        assert github._get_page("e") == ([], True, None)
+    assert github.http_client() is None
@@ -0,0 +1,369 @@
+"""Tests for standard_tooling.lib.github_http against a local fake GitHub."""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from standard_tooling.lib.github_http import Client
+from standard_tooling.lib.http_pool import ConnectionPool
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@dataclass
+class _Recorded:
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: Any
+    port: int
+
+
+@dataclass
+class FakeGitHub:
+    """Routes ``(method, path)`` to ``(status, body, headers)`` and records requests."""
+
+    url: str
+    routes: dict[tuple[str, str], tuple[int, Any, dict[str, str]]] = field(default_factory=dict)
+    requests: list[_Recorded] = field(default_factory=list)
+    # Drop the connection after this many responses without saying so.
+    drop_after: int | None = None
+
+    def route(self, method: str, path: str, body: Any, status: int = 200, **headers: str) -> None:
+        self.routes[(method, path)] = (status, body, headers)
+
+    @property
+    def connections(self) -> int:
+        return len({r.port for r in self.requests})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def _handle(self) -> None:
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        fake.requests.append(
+            _Recorded(
+                self.command,
+                self.path,
+                {k.lower(): v for k, v in self.headers.items()},
+                json.loads(raw) if raw else None,
+                self.client_address[1],
+            )
+        )
+        status, body, headers = fake.routes.get(
+            (self.command, self.path), (404, {"message": "Not Found"}, {})
+        )
+        if body is None:
+            payload = b""
+        elif isinstance(body, str):
+            payload = body.encode()
+        else:
+            payload = json.dumps(body).encode()
+        # Decide before answering: the client may change drop_after once it has the reply.
+        if fake.drop_after is not None and len(fake.requests) >= fake.drop_after:
+            self.close_connection = True
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle  # noqa: N815
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    fake: FakeGitHub
+
+
+@pytest.fixture
+def fake_github() -> Iterator[FakeGitHub]:
+    server = _Server(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.fake = FakeGitHub(f"http://127.0.0.1:{server.server_address[1]}/api")
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server.fake
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(fake_github: FakeGitHub) -> Iterator[Client]:
+    c = Client("tok", fake_github.url)
+    yield c
+    c.close()
+
+
+def test_request_sends_auth_and_reuses_connection(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("GET", "/api/repos/o/r", {"id": 1})
+    assert client.request("GET", "/repos/o/r").data == {"id": 1}
+    assert client.request("GET", "/repos/o/r").status == 200
+    assert fake_github.connections == 1
+    headers = fake_github.requests[0].headers
+    assert headers["authorization"] == "Bearer tok"
+    assert headers["accept"] == "application/vnd.github+json"
+
+
+def test_request_posts_json(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("POST", "/api/x", None, status=204)
+    resp = client.request("POST", "/x", {"a": 1})
+    assert resp.status == 204
+    assert resp.data is None
+    assert fake_github.requests[0].body == {"a": 1}
+    assert fake_github.requests[0].headers["content-type"] == "application/json"
+
+
+@pytest.mark.parametrize(
+    ("body", "stderr"),
+    [({"message": "Not Found"}, "HTTP 404: Not Found"), ("gone", "HTTP 404: gone")],
+)
+def test_request_raises_on_error_status(
+    client: Client, fake_github: FakeGitHub, body: Any, stderr: str
+) -> None:
+    fake_github.route("GET", "/api/missing", body, status=404)
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        client.request("GET", "/missing")
+    assert excinfo.value.stderr == stderr
+    assert excinfo.value.cmd == ("gh", "api", "-X", "GET", "/missing")
+
+
+def test_request_retries_a_dropped_keepalive_connection(
+    client: Client, fake_github: FakeGitHub
+) -> None:
+    fake_github.route("GET", "/api/a", {"ok": True})
+    fake_github.drop_after = 1
+    client.request("GET", "/a")
+    fake_github.drop_after = None
+    assert client.request("GET", "/a").data == {"ok": True}
+    assert fake_github.connections == 2
+
+
+def test_request_raises_connection_errors(fake_github: FakeGitHub) -> None:
+    client = Client("tok", "http://127.0.0.1:1")
+    with pytest.raises(OSError, match="refused"):
+        client.get("/a")
+    assert client._pool._idle == []
+
+
+def test_request_does_not_retry_a_fresh_connection(client: Client) -> None:
+    with (
+        pytest.raises(http.client.RemoteDisconnected),
+        patch.object(
+            ConnectionPool, "_exchange", side_effect=http.client.RemoteDisconnected("bye")
+        ) as send,
+    ):
+        client.get("/a")
+    assert send.call_count == 1
+
+
+def test_get_with_etag_returns_304(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("GET", "/api/s", None, status=304, ETag='"v1"')
+    resp = client.get("/s", etag='"v1"')
+    assert (resp.status, resp.headers["etag"], resp.data) == (304, '"v1"', None)
+    assert fake_github.requests[0].headers["if-none-match"] == '"v1"'
+
+
+def test_graphql(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("POST", "/api/graphql", {"data": {"viewer": {"login": "me"}}})
+    assert client.graphql("query { viewer { login } }", {"n": 1}) == {"viewer": {"login": "me"}}
+    assert fake_github.requests[0].body == {
+        "query": "query { viewer { login } }",
+        "variables": {"n": 1},
+    }
+
+
+def test_graphql_errors_raise(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route(
+        "POST", "/api/graphql", {"data": None, "errors": [{"message": "a"}, {"message": "b"}]}
+    )
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        client.graphql("q", {})
+    assert excinfo.value.stderr == "GraphQL: a; b"
+
+
+def test_pull_request(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route(
+        "GET",
+        "/api/repos/o/r/pulls/7",
+        {
+            "number": 7,
+            "html_url": "https://github.com/o/r/pull/7",
+            "state": "open",
+            "head": {"ref": "release/1.0", "sha": "abc"},
+            "base": {"ref": "main"},
+        },
+    )
+    assert client.pull_request("o/r", 7) == {
+        "number": 7,
+        "url": "https://github.com/o/r/pull/7",
+        "state": "OPEN",
+        "headRefName": "release/1.0",
+        "headRefOid": "abc",
+        "baseRefName": "main",
+    }
+
+
+def test_create_label_creates(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("POST", "/api/repos/o/r/labels", {"id": 1}, status=201)
+    client.create_label("o/r", "bug", color="d73a4a", description="Broken")
+    assert fake_github.requests[0].body == {
+        "name": "bug",
+        "color": "d73a4a",
+        "description": "Broken",
+    }
+
+
+def test_create_label_updates_existing(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("POST", "/api/repos/o/r/labels", {"message": "Validation Failed"}, 422)
+    fake_github.route("PATCH", "/api/repos/o/r/labels/needs%20review", {"id": 1})
+    client.create_label("o/r", "needs review", color="fbca04")
+    assert [(r.method, r.body) for r in fake_github.requests] == [
+        ("POST", {"name": "needs review", "color": "fbca04"}),
+        ("PATCH", {"color": "fbca04"}),
+    ]
+
+
+def test_create_label_raises_other_errors(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("POST", "/api/repos/o/r/labels", {"message": "Forbidden"}, 403)
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        client.create_label("o/r", "bug")
+    assert excinfo.value.stderr == "HTTP 403: Forbidden"
+    assert len(fake_github.requests) == 1
+
+
+def test_update_label_sends_only_given_fields(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("PATCH", "/api/repos/o/r/labels/Needs%20Review", {"id": 1})
+    client.update_label("o/r", "Needs Review", new_name="needs review", description="")
+    assert (fake_github.requests[0].method, fake_github.requests[0].body) == (
+        "PATCH",
+        {"new_name": "needs review", "description": ""},
+    )
+
+
+def test_delete_label(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("DELETE", "/api/repos/o/r/labels/won%27t%20fix", None, status=204)
+    client.delete_label("o/r", "won't fix")
+    assert fake_github.requests[0].method == "DELETE"
+
+
+def test_list_runs(client: Client, fake_github: FakeGitHub) -> None:
+    run = {
+        "id": 9,
+        "name": "CI",
+        "status": "completed",
+        "conclusion": "success",
+        "head_branch": "develop",
+        "head_sha": "abc123",
+        "created_at": "2026-04-26T18:00:00Z",
+        "html_url": "https://github.com/o/r/actions/runs/9",
+    }
+    fake_github.route(
+        "GET", "/api/repos/o/r/actions/runs?per_page=1&branch=develop", {"workflow_runs": [run]}
+    )
+    fake_github.route("GET", "/api/repos/o/r/actions/runs?per_page=20", {"workflow_runs": []})
+    assert client.list_runs("o/r", branch="develop", limit=1) == [
+        {
+            "databaseId": 9,
+            "name": "CI",
+            "status": "completed",
+            "conclusion": "success",
+            "headBranch": "develop",
+            "headSha": "abc123",
+            "createdAt": "2026-04-26T18:00:00Z",
+            "url": "https://github.com/o/r/actions/runs/9",
+        }
+    ]
+    assert client.list_runs("o/r") == []
+
+
+@pytest.mark.parametrize("workflow", ["Documentation", "docs.yml"])
+def test_list_runs_for_a_workflow(client: Client, fake_github: FakeGitHub, workflow: str) -> None:
+    workflows = [
+        {"id": 1, "name": "CI", "path": ".github/workflows/ci.yml"},
+        {"id": 7, "name": "Documentation", "path": ".github/workflows/docs.yml"},
+    ]
+    fake_github.route(
+        "GET", "/api/repos/o/r/actions/workflows?per_page=100", {"workflows": workflows}
+    )
+    fake_github.route(
+        "GET", "/api/repos/o/r/actions/workflows/7/runs?per_page=1", {"workflow_runs": []}
+    )
+    assert client.list_runs("o/r", workflow=workflow, limit=1) == []
+
+
+def test_list_runs_for_an_unknown_workflow(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("GET", "/api/repos/o/r/actions/workflows?per_page=100", {"workflows": []})
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        client.list_runs("o/r", workflow="Documentation")
+    assert excinfo.value.stderr == "could not find any workflows named Documentation"
+
+
+def test_async_calls_share_the_pool(client: Client, fake_github: FakeGitHub) -> None:
+    fake_github.route("GET", "/api/a", {"n": 1})
+    fake_github.route("POST", "/api/graphql", {"data": {"ok": True}})
+
+    async def gather() -> list[Any]:
+        return await asyncio.gather(
+            client.arequest("GET", "/a"),
+            client.arequest("GET", "/a"),
+            client.agraphql("q", {}),
+        )
+
+    first, second, data = asyncio.run(gather())
+    assert first.data == second.data == {"n": 1}
+    assert data == {"ok": True}
+    assert len(fake_github.requests) == 3
+
+
+@pytest.mark.parametrize(
+    ("env", "expected"),
+    [
+        ({}, None),
+        ({"GH_TOKEN": "t"}, "api.github.com"),
+        ({"GITHUB_TOKEN": "t"}, "api.github.com"),
+        ({"GH_TOKEN": "t", "ST_GITHUB_API_URL": "http://localhost:9/api"}, "localhost:9"),
+        ({"GH_TOKEN": "t", "ST_GITHUB_HTTP": "0"}, None),
+        ({"GH_TOKEN": "t", "GH_HOST": "github.com"}, "api.github.com"),
+        ({"GH_TOKEN": "t", "GH_HOST": "ghe.example.com"}, None),
+        (
+            {
+                "GH_TOKEN": "t",
+                "GH_HOST": "ghe.example.com",
+                "ST_GITHUB_API_URL": "https://ghe.example.com/api",
+            },
+            "ghe.example.com",
+        ),
+    ],
+)
+def test_from_env(
+    monkeypatch: pytest.MonkeyPatch, env: dict[str, str], expected: str | None
+) -> None:
+    for name in ("GH_TOKEN", "GITHUB_TOKEN", "GH_HOST", "ST_GITHUB_API_URL", "ST_GITHUB_HTTP"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    client = Client.from_env()
+    assert (client and client._host) == expected
+
+
+def test_default_api_is_https() -> None:
+    assert isinstance(Client("t")._connect(), http.client.HTTPSConnection)
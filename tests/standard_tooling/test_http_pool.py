@@ -0,0 +1,114 @@
+"""Tests for standard_tooling.lib.http_pool."""
+
+from __future__ import annotations
+
+import http.client
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from standard_tooling.lib.http_pool import ClientSlot, ConnectionPool
+
+
+def _connection(*outcomes: BaseException | tuple[int, bytes]) -> MagicMock:
+    """A connection whose responses (or errors) are *outcomes*, in order."""
+    conn = MagicMock()
+    responses = []
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            responses.append(outcome)
+        else:
+            status, body = outcome
+            responses.append(
+                MagicMock(status=status, read=lambda b=body: b, getheaders=lambda: [("ETag", "x")])
+            )
+    conn.getresponse.side_effect = responses
+    return conn
+
+
+def test_slot_builds_once_and_falls_back_for_good() -> None:
+    client = MagicMock()
+    load = MagicMock(return_value=client)
+    slot = ClientSlot(load)
+    assert slot.get() is client
+    assert slot.get() is client
+    load.assert_called_once()
+
+    slot.unreachable()
+    client.close.assert_called_once()
+    assert slot.get() is None
+    slot.reset()
+    assert slot.get() is client
+
+
+def test_slot_set_replaces_the_client() -> None:
+    slot = ClientSlot(MagicMock(return_value=None))
+    fake = MagicMock()
+    slot.set(fake)
+    assert slot.get() is fake
+
+
+def test_pool_reuses_a_released_connection() -> None:
+    conn = _connection((200, b"a"), (204, b""))
+    connect = MagicMock(return_value=conn)
+    pool = ConnectionPool(connect)
+    assert pool.send("GET", "/a") == (200, {"etag": "x"}, b"a")
+    assert pool.send("DELETE", "/b", headers={"X": "1"})[0] == 204
+    connect.assert_called_once()
+    conn.request.assert_called_with("DELETE", "/b", body=None, headers={"X": "1"})
+    pool.close()
+    conn.close.assert_called_once()
+
+
+def test_pool_retries_a_stale_connection_once() -> None:
+    stale = _connection((200, b""), http.client.RemoteDisconnected("bye"))
+    fresh = _connection((200, b"ok"))
+    pool = ConnectionPool(MagicMock(side_effect=[stale, fresh]))
+    pool.send("GET", "/a")
+    assert pool.send("GET", "/a")[2] == b"ok"
+    stale.close.assert_called_once()
+
+
+def test_pool_does_not_replay_a_post() -> None:
+    stale = _connection((200, b""), http.client.RemoteDisconnected("bye"))
+    connect = MagicMock(side_effect=[stale])
+    pool = ConnectionPool(connect)
+    pool.send("GET", "/a")
+    with pytest.raises(http.client.RemoteDisconnected):
+        pool.send("POST", "/graphql", body=b"{}")
+    connect.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "error", [http.client.IncompleteRead(b"par"), http.client.BadStatusLine("garbage")]
+)
+def test_pool_reports_unreadable_responses_as_connection_errors(
+    error: http.client.HTTPException,
+) -> None:
+    conn = _connection(error)
+    with pytest.raises(ConnectionError) as excinfo:
+        ConnectionPool(MagicMock(return_value=conn)).send("GET", "/a")
+    assert excinfo.value.__cause__ is error
+    conn.close.assert_called_once()
+
+
+def test_pool_does_not_retry_a_fresh_connection() -> None:
+    conn = _connection(ConnectionResetError())
+    connect = MagicMock(return_value=conn)
+    with pytest.raises(ConnectionResetError):
+        ConnectionPool(connect).send("GET", "/a")
+    connect.assert_called_once()
+    conn.close.assert_called_once()
+
+
+def test_import_leaves_http_client_unloaded() -> None:
+    code = (
+        "import sys, standard_tooling.lib.docker, standard_tooling.lib.github; "
+        "print('http.client' in sys.modules)"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
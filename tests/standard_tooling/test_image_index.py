@@ -0,0 +1,126 @@
+"""Tests for standard_tooling.lib.image_index."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+from standard_tooling.lib.image_index import (
+    ImageIndex,
+    ImageRecord,
+    format_size,
+    parse_age,
+    parse_size,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_MOD = "standard_tooling.lib.image_index"
+
+
+def test_index_lives_in_the_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert ImageIndex().path == tmp_path / "standard-tooling" / "docker-images.json"
+
+
+def test_touch_adds_then_refreshes(tmp_path: Path) -> None:
+    index = ImageIndex(tmp_path / "index.json")
+    with patch(f"{_MOD}.time.time", return_value=100.0):
+        index.touch("img:1--abcd1234", cache_hash="abcd1234", alias="repo:main")
+    with patch(f"{_MOD}.time.time", return_value=250.0):
+        index.touch("img:1--abcd1234", cache_hash="abcd1234", alias="repo:feature/1")
+    assert index.records() == {
+        "img:1--abcd1234": ImageRecord(
+            "img:1--abcd1234", "abcd1234", 100.0, 250.0, aliases=["repo:main", "repo:feature/1"]
+        )
+    }
+
+
+def test_touch_moves_the_alias(tmp_path: Path) -> None:
+    index = ImageIndex(tmp_path / "index.json")
+    index.touch("img:1--old", cache_hash="old", alias="repo:main")
+    index.touch("img:1--new", cache_hash="new", alias="repo:main")
+    index.touch("img:1--new", cache_hash="new", alias="repo:main")
+    records = index.records()
+    assert records["img:1--old"].aliases == []
+    assert records["img:1--new"].aliases == ["repo:main"]
+    assert index.find("repo:main") == records["img:1--new"]
+    assert index.find("repo:other") is None
+
+
+def test_drop_alias_keeps_the_image(tmp_path: Path) -> None:
+    index = ImageIndex(tmp_path / "index.json")
+    index.touch("img:1--abc", cache_hash="abc", alias="repo:main")
+    index.touch("img:1--abc", cache_hash="abc", alias="repo:feature/1")
+    assert index.drop_alias("repo:feature/1") is True
+    assert index.drop_alias("repo:feature/1") is False
+    assert index.records()["img:1--abc"].aliases == ["repo:main"]
+
+
+def test_forget(tmp_path: Path) -> None:
+    index = ImageIndex(tmp_path / "index.json")
+    index.touch("a", cache_hash="1", alias="r:x")
+    index.touch("b", cache_hash="2", alias="r:y")
+    index.forget(["a", "missing"])
+    assert list(index.records()) == ["b"]
+    with patch.object(ImageIndex, "write") as write:
+        index.forget(["missing"])
+    write.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "content", ["not json", "[]", '{"a": {"cache_hash": "1"}, "b": {"branch": "main"}}']
+)
+def test_unreadable_entries_are_dropped(tmp_path: Path, content: str) -> None:
+    (tmp_path / "index.json").write_text(content)
+    assert ImageIndex(tmp_path / "index.json").records() == {}
+
+
+def test_write_failure_is_ignored(tmp_path: Path) -> None:
+    (tmp_path / "file").write_text("")
+    index = ImageIndex(tmp_path / "file" / "index.json")
+    index.touch("a", cache_hash="1", alias="r:x")
+    assert index.records() == {}
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("20G", 20 * 10**9),
+        ("1.5GB", 1_500_000_000),
+        ("512mb", 512 * 10**6),
+        ("12.3kB", 12_300),
+        ("2T", 2 * 10**12),
+        ("0B", 0),
+        ("4096", 4096),
+    ],
+)
+def test_parse_size(text: str, expected: int) -> None:
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [("14d", 14 * 86400), ("12h", 43200), ("2w", 14 * 86400), ("30m", 1800), ("90s", 90)],
+)
+def test_parse_age(text: str, expected: float) -> None:
+    assert parse_age(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("parse", "text"), [(parse_size, "20X"), (parse_size, "G"), (parse_age, "14"), (parse_age, "")]
+)
+def test_parse_rejects(parse: object, text: str) -> None:
+    with pytest.raises(ValueError, match="invalid"):
+        parse(text)  # type: ignore[operator]
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [(0, "0B"), (999, "999B"), (12_300, "12.3kB"), (1_234_000_000, "1.2GB"), (3 * 10**12, "3.0TB")],
+)
+def test_format_size(size: int, expected: str) -> None:
+    assert format_size(size) == expected
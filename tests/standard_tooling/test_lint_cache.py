@@ -0,0 +1,105 @@
+"""Tests for standard_tooling.lib.lint_cache."""
+
+from __future__ import annotations
+
+import subprocess
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+from standard_tooling.lib import lint_cache
+from standard_tooling.lib.lint_cache import FileResult, LintCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_MOD = "standard_tooling.lib.lint_cache"
+
+
+def _tool(tmp_path: Path, script: str) -> Path:
+    tool = tmp_path / "bin" / "linter"
+    tool.parent.mkdir(exist_ok=True)
+    tool.write_text(f"#!/bin/sh\n{script}\n")
+    tool.chmod(0o755)
+    return tool
+
+
+def test_tool_version_is_asked_once_per_binary(tmp_path: Path) -> None:
+    tool = _tool(tmp_path, 'echo "linter 1.2.3"')
+    with patch(f"{_MOD}.shutil.which", return_value=str(tool)):
+        assert lint_cache.tool_version(tmp_path, "linter") == "linter 1.2.3"
+        with patch(f"{_MOD}.subprocess.run") as run:
+            assert lint_cache.tool_version(tmp_path, "linter") == "linter 1.2.3"
+        run.assert_not_called()
+
+
+def test_tool_version_unavailable(tmp_path: Path) -> None:
+    assert lint_cache.tool_version(tmp_path, "no-such-linter-anywhere") is None
+    failing = _tool(tmp_path, "exit 2")
+    with patch(f"{_MOD}.shutil.which", return_value=str(failing)):
+        assert lint_cache.tool_version(tmp_path, "linter") is None
+    with patch(f"{_MOD}.shutil.which", return_value=str(tmp_path / "vanished")):
+        assert lint_cache.tool_version(tmp_path, "linter") is None
+
+
+def test_tool_version_runs_the_resolved_binary(tmp_path: Path) -> None:
+    tool = _tool(tmp_path, "echo v1")
+    with (
+        patch(f"{_MOD}.shutil.which", return_value=str(tool)),
+        patch(f"{_MOD}.subprocess.run", wraps=subprocess.run) as run,
+    ):
+        lint_cache.tool_version(tmp_path, "linter")
+    assert run.call_args.args[0] == [str(tool), "--version"]
+
+
+def test_tool_version_with_another_flag(tmp_path: Path) -> None:
+    tool = _tool(tmp_path, 'echo "go version go1.26.0 $1"')
+    with patch(f"{_MOD}.shutil.which", return_value=str(tool)):
+        assert lint_cache.tool_version(tmp_path, "go", "version") == "go version go1.26.0 version"
+        # Asked with a different flag, the same binary is asked again.
+        assert lint_cache.tool_version(tmp_path, "go") == "go version go1.26.0 --version"
+
+
+def test_config_digest_tracks_presence_and_content(tmp_path: Path) -> None:
+    config = tmp_path / ".yamllint"
+    base = lint_cache.config_digest([config])
+    config.write_text("")
+    assert lint_cache.config_digest([config]) != base
+    empty = lint_cache.config_digest([config])
+    config.write_text("extends: default\n")
+    assert lint_cache.config_digest([config]) != empty
+
+
+def test_lookup_and_record(tmp_path: Path) -> None:
+    good, bad, gone = (str(tmp_path / name) for name in ("good.sh", "bad.sh", "gone.sh"))
+    (tmp_path / "good.sh").write_text("echo ok\n")
+    (tmp_path / "bad.sh").write_text("echo $x\n")
+    cache = LintCache(tmp_path, "shellcheck", "0.9", "cfg")
+    assert cache.lookup([good, bad, gone]) == ({}, [good, bad, gone])
+
+    cache.record(
+        {
+            good: FileResult(failed=False),
+            bad: FileResult(failed=True, lines=(f"{bad}:1:6: note: quote it",)),
+            gone: FileResult(failed=False),
+        }
+    )
+    hits, misses = LintCache(tmp_path, "shellcheck", "0.9", "cfg").lookup([good, bad, gone])
+    assert hits == {
+        good: FileResult(failed=False),
+        bad: FileResult(failed=True, lines=(f"{bad}:1:6: note: quote it",)),
+    }
+    assert misses == [gone]
+
+
+def test_results_are_per_linter_version_config_and_content(tmp_path: Path) -> None:
+    path = tmp_path / "a.sh"
+    path.write_text("true\n")
+    LintCache(tmp_path, "shellcheck", "0.9", "cfg").record({str(path): FileResult(False)})
+    for other in (
+        LintCache(tmp_path, "yamllint", "0.9", "cfg"),
+        LintCache(tmp_path, "shellcheck", "0.10", "cfg"),
+        LintCache(tmp_path, "shellcheck", "0.9", "cfg2"),
+    ):
+        assert other.lookup([str(path)])[1] == [str(path)]
+    path.write_text("false\n")
+    assert LintCache(tmp_path, "shellcheck", "0.9", "cfg").lookup([str(path)])[1] == [str(path)]
@@ -2,17 +2,24 @@
 
 from __future__ import annotations
 
+import json
 import subprocess
+import time
+from typing import TYPE_CHECKING
 from unittest.mock import patch
 
 import pytest
 
 from standard_tooling.bin.merge_when_green import main, parse_args
+from standard_tooling.lib import github
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 def test_parse_args_defaults() -> None:
     args = parse_args(["https://github.com/pr/1"])
-    assert args.pr == "https://github.com/pr/1"
+    assert args.prs == ["https://github.com/pr/1"]
     assert args.strategy == "merge"
 
 
@@ -21,6 +28,18 @@ def test_parse_args_strategy() -> None:
     assert args.strategy == "squash"
 
 
+def test_parse_args_requires_a_pr() -> None:
+    with pytest.raises(SystemExit):
+        parse_args([])
+
+
+def test_parse_args_multi(tmp_path: Path) -> None:
+    args = parse_args(["1", "2", "--after", "2=1", "--from-file", str(tmp_path / "prs")])
+    assert args.prs == ["1", "2"]
+    assert args.after == ["2=1"]
+    assert args.from_file == tmp_path / "prs"
+
+
 def test_parse_args_rejects_unknown_strategy() -> None:
     with pytest.raises(SystemExit):
         parse_args(["42", "--strategy", "ff-only"])
@@ -30,8 +49,8 @@ _MOD = "standard_tooling.bin.merge_when_green"
 
 
 def _mock_branch(branch: str = "release/1.0.0"):
-    """Return a patch that mocks github.read_output to return a branch name."""
-    return patch(f"{_MOD}.github.read_output", return_value=branch)
+    """Return a patch that mocks github.pr_view to return a branch name."""
+    return patch(f"{_MOD}.github.pr_view", return_value={"headRefName": branch})
 
 
 def test_main_happy_path() -> None:
@@ -42,7 +61,9 @@ def test_main_happy_path() -> None:
     ):
         result = main(["https://github.com/pr/1"])
     assert result == 0
-    mock_wait.assert_called_once_with("https://github.com/pr/1")
+    mock_wait.assert_called_once_with(
+        "https://github.com/pr/1", on_transition=github.print_transition
+    )
     mock_merge.assert_called_once_with("https://github.com/pr/1", strategy="merge")
 
 
@@ -116,3 +137,169 @@ def test_feature_branch_blocked(capsys: pytest.CaptureFixture[str]) -> None:
     mock_wait.assert_not_called()
     mock_merge.assert_not_called()
     assert "only for release-workflow PRs" in capsys.readouterr().err
+
+
+# -- multi-PR mode ------------------------------------------------------------
+
+
+def _checks(failing: dict[str, float | None]):
+    """Fake wait_for_checks: PRs in *failing* with None fail; others sleep, then pass."""
+
+    def wait(pr: str, *, on_transition) -> None:  # noqa: ANN001
+        delay = failing.get(pr, 0.0)
+        if delay is None:
+            raise subprocess.CalledProcessError(1, ["gh"], stderr=f"Checks failed on {pr}: lint\n")
+        time.sleep(delay)
+        on_transition(None, github.CheckState("ci", "completed", "success"))
+
+    return wait
+
+
+def test_multi_merges_all_and_writes_summary(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    summary = tmp_path / "summary.json"
+    with (
+        _mock_branch(),
+        patch(f"{_MOD}.github.wait_for_checks", side_effect=_checks({})),
+        patch(f"{_MOD}.github.merge") as mock_merge,
+    ):
+        result = main(["1", "2", "--strategy", "squash", "--summary", str(summary)])
+    assert result == 0
+    assert sorted(c.args[0] for c in mock_merge.call_args_list) == ["1", "2"]
+    assert all(c.kwargs == {"strategy": "squash"} for c in mock_merge.call_args_list)
+    data = json.loads(summary.read_text())
+    assert [(p["pr"], p["status"], p["error"]) for p in data["prs"]] == [
+        ("1", "merged", None),
+        ("2", "merged", None),
+    ]
+    assert all(p["time_to_green"] <= p["time_to_merge"] for p in data["prs"])
+    out = capsys.readouterr().out
+    assert "  1: ci: pass" in out
+    assert "PR  " in out
+
+
+def test_multi_respects_dependency_order() -> None:
+    order: list[str] = []
+    with (
+        _mock_branch(),
+        patch(f"{_MOD}.github.wait_for_checks", side_effect=_checks({"a": 0.05})),
+        patch(f"{_MOD}.github.merge", side_effect=lambda pr, strategy: order.append(pr)),
+    ):
+        result = main(["a", "b", "c", "--after", "b=a", "--after", "c=b"])
+    assert result == 0
+    assert order == ["a", "b", "c"]
+
+
+def test_multi_blocks_dependents_of_a_failed_pr(capsys: pytest.CaptureFixture[str]) -> None:
+    with (
+        _mock_branch(),
+        patch(f"{_MOD}.github.wait_for_checks", side_effect=_checks({"a": None})),
+        patch(f"{_MOD}.github.merge") as mock_merge,
+    ):
+        result = main(["a", "b", "c", "--after", "b=a", "--summary", "-"])
+    assert result == 1
+    mock_merge.assert_called_once_with("c", strategy="merge")
+    captured = capsys.readouterr()
+    # stdout carries only the JSON; progress and the table went to stderr.
+    data = json.loads(captured.out)
+    assert {p["pr"]: (p["status"], p["error"]) for p in data["prs"]} == {
+        "a": ("failed", "Checks failed on a: lint"),
+        "b": ("blocked", "dependency a was not merged"),
+        "c": ("merged", None),
+    }
+    assert "failed: Checks failed on a: lint" in captured.err
+    assert "c: merged." in captured.err
+
+
+def test_multi_rejects_non_release_branch(capsys: pytest.CaptureFixture[str]) -> None:
+    with (
+        _mock_branch("feature/1-x"),
+        patch(f"{_MOD}.github.wait_for_checks") as mock_wait,
+        patch(f"{_MOD}.github.merge") as mock_merge,
+    ):
+        result = main(["1", "2"])
+    assert result == 1
+    mock_wait.assert_not_called()
+    mock_merge.assert_not_called()
+    assert "rejected: st-merge-when-green is only for release-workflow PRs" in (
+        capsys.readouterr().out
+    )
+
+
+def test_multi_records_unexpected_errors_per_pr(capsys: pytest.CaptureFixture[str]) -> None:
+    def wait(pr: str, **_: object) -> None:
+        if pr == "1":
+            raise RuntimeError("boom")
+        if pr == "2":
+            raise KeyError
+
+    with (
+        _mock_branch(),
+        patch(f"{_MOD}.github.wait_for_checks", side_effect=wait),
+        patch(f"{_MOD}.github.merge") as mock_merge,
+    ):
+        result = main(["1", "2", "3", "--after", "3=1", "--summary", "-"])
+    assert result == 1
+    mock_merge.assert_not_called()
+    data = json.loads(capsys.readouterr().out)
+    assert {p["pr"]: (p["status"], p["error"]) for p in data["prs"]} == {
+        "1": ("failed", "RuntimeError: boom"),
+        "2": ("failed", "KeyError"),
+        "3": ("blocked", "dependency 1 was not merged"),
+    }
+
+
+def test_single_pr_with_summary_uses_scheduler(tmp_path: Path) -> None:
+    summary = tmp_path / "s.json"
+    with (
+        _mock_branch(),
+        patch(f"{_MOD}.github.wait_for_checks", side_effect=_checks({})),
+        patch(f"{_MOD}.github.merge"),
+    ):
+        assert main(["1", "--summary", str(summary)]) == 0
+    assert json.loads(summary.read_text())["prs"][0]["status"] == "merged"
+
+
+def test_from_file(tmp_path: Path) -> None:
+    prs = tmp_path / "prs.txt"
+    prs.write_text("# release train\na\n\nb after a  # needs a\nc after a b\n")
+    order: list[str] = []
+    with (
+        _mock_branch(),
+        patch(f"{_MOD}.github.wait_for_checks", side_effect=_checks({"a": 0.05})),
+        patch(f"{_MOD}.github.merge", side_effect=lambda pr, strategy: order.append(pr)),
+    ):
+        result = main(["--from-file", str(prs)])
+    assert result == 0
+    assert order[0] == "a"
+    assert order[-1] == "c"
+
+
+@pytest.mark.parametrize(
+    ("argv", "contents", "message"),
+    [
+        (["a", "--after", "a"], None, "expected PR=DEP"),
+        (["a", "--after", "z=a"], None, "expected PR=DEP"),
+        (["a", "--after", "a=z"], None, "a depends on z, which is not in the list"),
+        (["a", "b", "--after", "a=b", "--after", "b=a"], None, "dependency cycle"),
+        ([], "a before b\n", "expected '<pr> [after <pr> ...]'"),
+        ([], None, "No such file"),
+    ],
+)
+def test_multi_rejects_bad_plans(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    argv: list[str],
+    contents: str | None,
+    message: str,
+) -> None:
+    prs = tmp_path / "prs.txt"
+    if contents is not None:
+        prs.write_text(contents)
+    if not argv:
+        argv = ["--from-file", str(prs)]
+    with patch(f"{_MOD}.github.wait_for_checks") as mock_wait:
+        assert main(argv) == 2
+    mock_wait.assert_not_called()
+    assert message in capsys.readouterr().err
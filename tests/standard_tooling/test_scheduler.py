@@ -0,0 +1,257 @@
+"""Tests for standard_tooling.lib.scheduler."""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import time
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from standard_tooling.lib import scheduler
+from standard_tooling.lib.scheduler import Step, StepResult, run_steps, summary_line
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_MOD = "standard_tooling.lib.scheduler"
+
+
+def _sh(name: str, script: str, *after: str, cwd: Path | None = None) -> Step:
+    return Step(name, ("sh", "-c", script), after, cwd)
+
+
+def _statuses(results: list[StepResult]) -> dict[str, str]:
+    return {r.step.name: r.status for r in results}
+
+
+def test_independent_steps_run_concurrently(tmp_path: Path) -> None:
+    # Each step finishes only once the other has started.
+    wait_for = (
+        "touch {me}; for _ in $(seq 500); do [ -e {other} ] && exit 0; sleep 0.01; done; exit 1"
+    )
+    steps = [
+        _sh("a", wait_for.format(me="a", other="b"), cwd=tmp_path),
+        _sh("b", wait_for.format(me="b", other="a"), cwd=tmp_path),
+    ]
+    results = run_steps(steps, jobs=2)
+    assert _statuses(results) == {"a": "passed", "b": "passed"}
+    assert all(r.returncode == 0 and r.seconds > 0 for r in results)
+
+
+def test_output_is_buffered_and_prefixed(capsys: pytest.CaptureFixture[str]) -> None:
+    steps = [
+        _sh("one", "echo first; echo oops >&2; echo second"),
+        _sh("two", "sleep 0.1; echo other"),
+    ]
+    results = run_steps(steps, jobs=2)
+    assert results[0].output == "first\noops\nsecond\n"
+    out = capsys.readouterr().out.splitlines()
+    assert out[:2] == ["Running: one", "Running: two"]
+    block = out.index("[one] first")
+    assert out[block : block + 3] == ["[one] first", "[one] oops", "[one] second"]
+    assert "[two] other" in out
+
+
+def test_dependencies_run_in_order(tmp_path: Path) -> None:
+    steps = [
+        _sh("check", "test -e built", "build", cwd=tmp_path),
+        _sh("build", "sleep 0.1; touch built", cwd=tmp_path),
+    ]
+    assert _statuses(run_steps(steps, jobs=4)) == {"check": "passed", "build": "passed"}
+
+
+def test_failed_dependency_skips_dependents(capsys: pytest.CaptureFixture[str]) -> None:
+    steps = [
+        _sh("build", "exit 3"),
+        _sh("test", "true", "build"),
+        _sh("lint", "true"),
+    ]
+    results = run_steps(steps, fail_fast=False)
+    assert _statuses(results) == {"build": "failed", "test": "skipped", "lint": "passed"}
+    assert results[0].returncode == 3
+    out = capsys.readouterr().out
+    assert "[build] failed (exit 3)" in out
+    assert "[test] skipped" in out
+
+
+def test_fail_fast_cancels_running_and_skips_pending() -> None:
+    steps = [
+        _sh("quick", "exit 1"),
+        _sh("slow", "sleep 30"),
+        _sh("later", "true"),
+    ]
+    start = time.monotonic()
+    results = run_steps(steps, jobs=2)
+    assert time.monotonic() - start < 10
+    assert _statuses(results) == {"quick": "failed", "slow": "cancelled", "later": "skipped"}
+
+
+def test_serial_streams_output_in_declaration_order(capfd: pytest.CaptureFixture[str]) -> None:
+    steps = [
+        _sh("second", "echo two", "first"),
+        _sh("first", "echo one"),
+        _sh("third", "echo three"),
+    ]
+    results = run_steps(steps, serial=True)
+    assert [r.output for r in results] == ["", "", ""]
+    out = capfd.readouterr().out.splitlines()
+    assert out == [
+        "Running: first",
+        "one",
+        "Running: second",
+        "two",
+        "Running: third",
+        "three",
+    ]
+
+
+def test_ordered_output_follows_declaration_order(capsys: pytest.CaptureFixture[str]) -> None:
+    steps = [
+        _sh("slow", "sleep 0.3; echo slow"),
+        _sh("fast", "echo fast"),
+        _sh("failing", "exit 1"),
+        _sh("after", "true", "failing"),
+    ]
+    run_steps(steps, jobs=3, fail_fast=False, ordered=True)
+    out = capsys.readouterr().out.splitlines()
+    reports = [line for line in out if not line.startswith("Running:")]
+    assert reports == ["[slow] slow", "[fast] fast", "[failing] failed (exit 1)", "[after] skipped"]
+
+
+def test_ordered_fail_fast_reports_finished_steps() -> None:
+    steps = [_sh("slow", "sleep 30"), _sh("quick", "exit 1"), _sh("later", "true")]
+    results = run_steps(steps, jobs=2, ordered=True)
+    assert _statuses(results) == {"slow": "cancelled", "quick": "failed", "later": "skipped"}
+
+
+def test_unstartable_step_fails(capsys: pytest.CaptureFixture[str]) -> None:
+    results = run_steps([Step("ghost", ("/nonexistent/validator",))])
+    assert results[0].status == "failed"
+    assert results[0].returncode is None
+    assert "No such file" in results[0].output
+    assert "[ghost] failed\n" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    ("steps", "message"),
+    [
+        ([_sh("a", "true"), _sh("a", "true")], "duplicate step names"),
+        ([_sh("a", "true", "b")], "depends on unknown step b"),
+        ([_sh("a", "true", "b"), _sh("b", "true", "a"), _sh("c", "true")], "cycle"),
+    ],
+)
+def test_invalid_graphs_are_rejected(steps: list[Step], message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        run_steps(steps)
+
+
+def test_default_jobs_fall_back_to_one() -> None:
+    with (
+        patch(f"{_MOD}.os.cpu_count", return_value=None),
+        patch(f"{_MOD}.ThreadPoolExecutor", wraps=scheduler.ThreadPoolExecutor) as pool,
+    ):
+        run_steps([_sh("a", "true")])
+    pool.assert_called_once_with(max_workers=1)
+
+
+def test_interrupt_stops_running_steps(tmp_path: Path) -> None:
+    pid_file = tmp_path / "pid"
+
+    def interrupt(*_args: object, **_kwargs: object) -> None:
+        # Stand in for Ctrl-C arriving while the scheduler waits on the step.
+        deadline = time.monotonic() + 10
+        while not pid_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        raise KeyboardInterrupt
+
+    step = _sh("slow", f"echo $$ > {pid_file}.tmp; mv {pid_file}.tmp {pid_file}; exec sleep 30")
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt), patch(f"{_MOD}.wait", side_effect=interrupt):
+        run_steps([step])
+    assert time.monotonic() - start < 10
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+
+
+def test_only_captured_steps_leave_the_terminal_session() -> None:
+    with patch(f"{_MOD}.subprocess.Popen", wraps=subprocess.Popen) as popen:
+        run_steps([_sh("a", "true")], serial=True)
+        run_steps([_sh("b", "true")])
+    assert [c.kwargs["start_new_session"] for c in popen.call_args_list] == [False, True]
+
+
+def test_runner_refuses_to_start_after_stop() -> None:
+    runner = scheduler._Runner(capture=True)
+    runner.stop()
+    assert runner.run(_sh("a", "true")).status == "cancelled"
+
+
+def test_runner_stop_tolerates_exited_processes() -> None:
+    runner = scheduler._Runner(capture=True)
+    runner._procs["a"] = MagicMock(pid=123)
+    with patch(f"{_MOD}.os.killpg", side_effect=ProcessLookupError) as killpg:
+        runner.stop()
+    killpg.assert_called_once()
+
+
+def test_runner_stop_signals_streamed_steps_directly() -> None:
+    runner = scheduler._Runner(capture=False)
+    proc = runner._procs["a"] = MagicMock(pid=123)
+    with patch(f"{_MOD}.os.killpg") as killpg:
+        runner.stop()
+    killpg.assert_not_called()
+    proc.send_signal.assert_called_once_with(signal.SIGTERM)
+
+
+def test_summary_line() -> None:
+    step = _sh("a", "true")
+    results = [
+        StepResult(step, "skipped"),
+        StepResult(step, "passed"),
+        StepResult(step, "failed"),
+        StepResult(step, "passed"),
+    ]
+    assert summary_line(results) == "2 passed, 1 failed, 1 skipped"
+
+
+def test_results_report_cpu_time() -> None:
+    busy = "i=0; while [ $i -lt 30000 ]; do i=$((i+1)); done"
+    (result,) = run_steps([_sh("busy", busy)])
+    assert result.cpu_seconds > 0
+    assert result.as_dict() == {
+        "name": "busy",
+        "status": "passed",
+        "returncode": 0,
+        "wall_seconds": round(result.seconds, 3),
+        "cpu_seconds": round(result.cpu_seconds, 3),
+    }
+
+
+def test_print_summary(capsys: pytest.CaptureFixture[str]) -> None:
+    results = [
+        StepResult(_sh("scripts/dev/lint.sh", "true"), "passed", 0, 1.25, "", 0.5),
+        StepResult(_sh("test", "true"), "failed", 2, 10.0, "", 8.0),
+        StepResult(_sh("audit", "true"), "skipped"),
+    ]
+    scheduler.print_summary(results)
+    assert capsys.readouterr().out.splitlines() == [
+        "Step                 Status         Wall      CPU",
+        "scripts/dev/lint.sh  passed         1.2s     0.5s",
+        "test                 failed (2)    10.0s     8.0s",
+        "audit                skipped        0.0s     0.0s",
+    ]
+
+
+def test_step_env_extends_the_inherited_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ST_TEST_INHERITED", "kept")
+    step = Step(
+        "env",
+        ("sh", "-c", 'echo "$ST_TEST_INHERITED $ST_TEST_ADDED"'),
+        env={"ST_TEST_ADDED": "added"},
+    )
+    (result,) = run_steps([step])
+    assert result.output == "kept added\n"
@@ -0,0 +1,149 @@
+"""Tests for standard_tooling.lib.shell."""
+
+from __future__ import annotations
+
+import pytest
+
+from standard_tooling.lib.shell import split_commands
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("", []),
+        ("ls -la", [["ls", "-la"]]),
+        ("a && b || c; d | e & f |& g", [["a"], ["b"], ["c"], ["d"], ["e"], ["f"], ["g"]]),
+        ("a\nb", [["a"], ["b"]]),
+        ("case x in a) y;; esac", [["case", "x", "in", "a"], ["y"], ["esac"]]),
+        ("(a; b) && { c; }", [["a"], ["b"], ["{", "c"], ["}"]]),
+        ("a )", [["a"]]),
+    ],
+)
+def test_command_boundaries(source: str, expected: list[list[str]]) -> None:
+    assert split_commands(source) == expected
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("echo 'a; b'", ["echo", "a; b"]),
+        ('echo "a && b"', ["echo", "a && b"]),
+        ('echo ""', ["echo", ""]),
+        ('echo "it\'s \\"x\\" \\$y \\q"', ["echo", 'it\'s "x" $y \\q']),
+        ("echo a\\ b \\;", ["echo", "a b", ";"]),
+        ("echo a\\\nb", ["echo", "ab"]),
+        ("echo ${A:-x y}", ["echo", "${A:-x y}"]),
+        ("echo a#b # comment", ["echo", "a#b"]),
+        ("echo trailing\\", ["echo", "trailing"]),
+    ],
+)
+def test_word_quoting(source: str, expected: list[str]) -> None:
+    assert split_commands(source) == [expected]
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("echo $(a b)", [["a", "b"], ["echo", "$(a b)"]]),
+        ('echo "x $(a; b) y"', [["a"], ["b"], ["echo", "x $(a; b) y"]]),
+        ("echo $(a $(b) (c))", [["b"], ["a", "$(b)"], ["c"], ["echo", "$(a $(b) (c))"]]),
+        ("echo `a \\`b\\``", [["b"], ["a", "`b`"], ["echo", "`a \\`b\\``"]]),
+        ("diff <(a) >(b)", [["a"], ["b"], ["diff", "<(a)", ">(b)"]]),
+    ],
+)
+def test_substitutions(source: str, expected: list[list[str]]) -> None:
+    assert split_commands(source) == expected
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("a > out", ["a"]),
+        ("a >> out 2>&1", ["a"]),
+        ("a 2> err <in", ["a"]),
+        ("a &> all", ["a"]),
+        ("a >| f x", ["a", "x"]),
+        ("a x2>f", ["a", "x2"]),
+    ],
+)
+def test_redirections_dropped(source: str, expected: list[str]) -> None:
+    assert split_commands(source) == [expected]
+
+
+def test_heredoc_body_is_data() -> None:
+    source = "cat <<EOF > f\ngh pr merge 1\nEOF\nls"
+    assert split_commands(source) == [["cat"], ["ls"]]
+
+
+def test_heredoc_fed_to_shell() -> None:
+    source = "bash << 'EOF'\nx; y\nEOF"
+    assert split_commands(source) == [["bash"], ["x"], ["y"]]
+
+
+def test_heredoc_piped_to_shell_with_tab_strip() -> None:
+    source = 'cat <<-"END" | sh\n\tx\n\tEND\nz'
+    assert split_commands(source) == [["cat"], ["sh"], ["x"], ["z"]]
+
+
+def test_multiple_heredocs_on_one_line() -> None:
+    source = "a <<A && bash <<B\nnot\nA\nrun\nB\n"
+    assert split_commands(source) == [["a"], ["bash"], ["not"], ["run"]]
+
+
+def test_unterminated_heredoc_consumes_rest() -> None:
+    assert split_commands("bash <<EOF\nx") == [["bash"], ["x"]]
+
+
+def test_here_string() -> None:
+    assert split_commands("bash <<< 'x y'") == [["x", "y"], ["bash"]]
+    assert split_commands("cat <<< 'x y'") == [["cat"]]
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("xargs gh pr merge <<< 26", [["xargs", "gh", "pr", "merge", "26"]]),
+        ("<<< '1 2' xargs a", [["xargs", "a", "1", "2"]]),
+        ("env A=1 command xargs a <<< 1", [["env", "A=1", "command", "xargs", "a", "1"]]),
+        ("xargs a <<EOF\n1\n2\nEOF\nb", [["xargs", "a", "1", "2"], ["b"]]),
+        ("cat <<EOF | xargs a\n1\nEOF", [["cat"], ["xargs", "a", "1"]]),
+        ("xargs a && b <<< 1", [["xargs", "a"], ["b"]]),
+    ],
+)
+def test_xargs_reads_its_input_as_arguments(source: str, expected: list[list[str]]) -> None:
+    assert split_commands(source) == expected
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("bash -c 'a; b'", [["bash", "-c", "a; b"], ["a"], ["b"]]),
+        ("/bin/sh -ec 'a'", [["/bin/sh", "-ec", "a"], ["a"]]),
+        ("bash --login x", [["bash", "--login", "x"]]),
+        ("bash -c", [["bash", "-c"]]),
+        ("eval 'a b'", [["eval", "a b"], ["a", "b"]]),
+    ],
+)
+def test_command_strings(source: str, expected: list[list[str]]) -> None:
+    assert split_commands(source) == expected
+
+
+def test_nesting_depth_is_bounded() -> None:
+    source = "eval " * 20 + "x"
+    commands = split_commands(source)
+    assert len(commands) == 9
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "a 'open",
+        'a "open',
+        "a $(open",
+        "a ${open",
+        "a `open",
+        "a <(open",
+    ],
+)
+def test_unterminated_command_is_discarded(source: str) -> None:
+    assert split_commands(f"ok; {source}") == [["ok"]]
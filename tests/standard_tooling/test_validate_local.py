@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import subprocess
 from pathlib import Path
+from typing import TYPE_CHECKING
 from unittest.mock import patch
 
 import pytest
@@ -11,9 +12,25 @@ import pytest
 from standard_tooling.bin.validate_local import (
     _find_validator,
     _in_dev_container,
-    _run_validator,
+    _run_key,
     main,
+    parse_args,
 )
+from standard_tooling.lib import scheduler
+from standard_tooling.lib.context import RepoContext
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+def _context(root: Path) -> RepoContext:
+    return RepoContext(
+        root=root,
+        git_dir=root / ".git",
+        common_dir=root / ".git",
+        branch="feature/1-x",
+        head_sha=None,
+    )
 
 
 @pytest.fixture(autouse=True)
@@ -21,6 +38,16 @@ def _container_env(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("ST_IN_DEV_CONTAINER", "1")
 
 
+@pytest.fixture(autouse=True)
+def _uncached() -> Iterator[None]:
+    """Run without the result cache unless a test installs a run key."""
+    with patch(f"{_MOD}._run_key", return_value=None):
+        yield
+
+
+_MOD = "standard_tooling.bin.validate_local"
+
+
 def test_find_validator_entry_point() -> None:
     def which_side_effect(name: str) -> str | None:
         if name == "st-v":
@@ -73,39 +100,6 @@ def test_find_validator_local_not_executable(tmp_path: Path) -> None:
     assert result is None
 
 
-def test_run_validator_success(tmp_path: Path) -> None:
-    with (
-        patch(
-            "standard_tooling.bin.validate_local._find_validator",
-            return_value="/usr/bin/v",
-        ),
-        patch(
-            "standard_tooling.bin.validate_local.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=0),
-        ),
-    ):
-        assert _run_validator("v", tmp_path) is True
-
-
-def test_run_validator_failure(tmp_path: Path) -> None:
-    with (
-        patch(
-            "standard_tooling.bin.validate_local._find_validator",
-            return_value="/usr/bin/v",
-        ),
-        patch(
-            "standard_tooling.bin.validate_local.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=1),
-        ),
-    ):
-        assert _run_validator("v", tmp_path) is False
-
-
-def test_run_validator_not_found(tmp_path: Path) -> None:
-    with patch("standard_tooling.bin.validate_local._find_validator", return_value=None):
-        assert _run_validator("missing", tmp_path) is True
-
-
 def _write_config(tmp_path: Path, language: str) -> None:
     (tmp_path / "standard-tooling.toml").write_text(
         f'[project]\nrepository-type = "library"\nversioning-scheme = "semver"\n'
@@ -114,64 +108,62 @@ def _write_config(tmp_path: Path, language: str) -> None:
     )
 
 
-def test_main_all_pass(tmp_path: Path) -> None:
-    _write_config(tmp_path, "python")
-    scripts_bin = tmp_path / "scripts" / "bin"
-    scripts_bin.mkdir(parents=True)
+def _validators(tmp_path: Path, **exit_codes: int) -> Callable[[str, Path], str | None]:
+    """Fake _find_validator: ``validate_local_common=0`` makes a script exiting 0."""
+    found = {}
+    for key, code in exit_codes.items():
+        name = key.replace("_", "-")
+        script = tmp_path / name
+        script.write_text(f"#!/bin/sh\necho {name} ran\nexit {code}\n")
+        script.chmod(0o755)
+        found[name] = str(script)
+    return lambda name, scripts_bin: found.get(name)
+
+
+def _main(tmp_path: Path, argv: list[str], **exit_codes: int) -> int:
     with (
-        patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path),
-        patch("standard_tooling.bin.validate_local._find_validator", return_value=None),
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._find_validator", side_effect=_validators(tmp_path, **exit_codes)),
     ):
-        result = main([])
-    assert result == 0
+        return main(argv)
 
 
-def test_main_common_fails(tmp_path: Path) -> None:
+def test_main_all_pass(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
     _write_config(tmp_path, "python")
+    assert _main(tmp_path, [], validate_local_common=0, validate_local_python=0) == 0
+    out = capsys.readouterr().out
+    assert "[validate-local-common] validate-local-common ran" in out
+    assert "[validate-local-python] validate-local-python ran" in out
+    assert "st-validate-local: all checks passed" in out
 
-    def mock_run_validator(name: str, scripts_bin: Path) -> bool:
-        return name != "validate-local-common"
 
-    with (
-        patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path),
-        patch(
-            "standard_tooling.bin.validate_local._run_validator",
-            side_effect=mock_run_validator,
-        ),
-    ):
-        result = main([])
-    assert result == 1
+def test_main_no_validators_found(tmp_path: Path) -> None:
+    _write_config(tmp_path, "python")
+    assert _main(tmp_path, []) == 0
 
 
-def test_main_language_validator_fails(tmp_path: Path) -> None:
+def test_main_common_fails(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
     _write_config(tmp_path, "python")
+    assert _main(tmp_path, [], validate_local_common=1, validate_local_python=0) == 1
+    captured = capsys.readouterr()
+    assert "[validate-local-common] failed (exit 1)" in captured.out
+    assert "st-validate-local: " in captured.err
 
-    def mock_run_validator(name: str, scripts_bin: Path) -> bool:
-        return name != "validate-local-python"
 
-    with (
-        patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path),
-        patch(
-            "standard_tooling.bin.validate_local._run_validator",
-            side_effect=mock_run_validator,
-        ),
-    ):
-        result = main([])
-    assert result == 1
+def test_main_language_validator_fails(tmp_path: Path) -> None:
+    _write_config(tmp_path, "python")
+    assert _main(tmp_path, [], validate_local_common=0, validate_local_python=2) == 1
 
 
 def test_main_no_profile(tmp_path: Path) -> None:
-    with (
-        patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path),
-        patch("standard_tooling.bin.validate_local._find_validator", return_value=None),
-    ):
-        result = main([])
-    assert result == 0
+    assert _main(tmp_path, [], validate_local_common=0, validate_local_python=1) == 0
 
 
 def test_main_config_error(tmp_path: Path) -> None:
     (tmp_path / "standard-tooling.toml").write_text("[invalid\n")
-    with patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path):
+    with patch(
+        "standard_tooling.bin.validate_local.context.current", return_value=_context(tmp_path)
+    ):
         result = main([])
     assert result == 1
 
@@ -179,67 +171,74 @@ def test_main_config_error(tmp_path: Path) -> None:
 def test_main_language_none(tmp_path: Path) -> None:
     _write_config(tmp_path, "none")
     with (
-        patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path),
-        patch("standard_tooling.bin.validate_local._run_validator", return_value=True),
-        patch("standard_tooling.bin.validate_local._find_validator", return_value=None),
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._find_validator", return_value=None) as find,
     ):
-        result = main([])
-    assert result == 0
+        assert main([]) == 0
+    assert [c.args[0] for c in find.call_args_list] == [
+        "validate-local-common",
+        "validate-local-custom",
+    ]
 
 
-def test_main_custom_validator_exists(tmp_path: Path) -> None:
+def test_main_custom_validator_runs(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
     _write_config(tmp_path, "python")
-    call_count = 0
+    assert _main(tmp_path, [], validate_local_custom=0) == 0
+    assert "[validate-local-custom] validate-local-custom ran" in capsys.readouterr().out
 
-    def mock_find_validator(name: str, scripts_bin: Path) -> str | None:
-        if name == "validate-local-custom":
-            return "/path/to/custom"
-        return None
 
-    def mock_run_validator(name: str, scripts_bin: Path) -> bool:
-        nonlocal call_count
-        call_count += 1
-        return True
+def test_main_custom_validator_fails(tmp_path: Path) -> None:
+    _write_config(tmp_path, "python")
+    assert _main(tmp_path, [], validate_local_common=0, validate_local_custom=1) == 1
+
 
+def test_main_runs_validators_concurrently(tmp_path: Path) -> None:
+    _write_config(tmp_path, "python")
     with (
-        patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path),
-        patch(
-            "standard_tooling.bin.validate_local._run_validator",
-            side_effect=mock_run_validator,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local._find_validator",
-            side_effect=mock_find_validator,
-        ),
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._find_validator", side_effect=["/v/common", "/v/python", None]),
+        patch(f"{_MOD}.scheduler.run_steps", return_value=[]) as run_steps,
     ):
-        result = main([])
-    assert result == 0
-    assert call_count == 3
+        assert main([]) == 0
+    assert run_steps.call_args.args[0] == [
+        scheduler.Step("validate-local-common", ("/v/common",)),
+        scheduler.Step("validate-local-python", ("/v/python",)),
+    ]
+    assert run_steps.call_args.kwargs == {"serial": False}
 
 
-def test_main_custom_validator_fails(tmp_path: Path) -> None:
-    def mock_find_validator(name: str, scripts_bin: Path) -> str | None:
-        if name == "validate-local-custom":
-            return "/path/to/custom"
-        return None
+def test_main_runs_custom_validator_after_language_validator(tmp_path: Path) -> None:
+    _write_config(tmp_path, "python")
+    with (
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._find_validator", side_effect=["/v/common", "/v/python", "/v/custom"]),
+        patch(f"{_MOD}.scheduler.run_steps", return_value=[]) as run_steps,
+    ):
+        assert main([]) == 0
+    assert run_steps.call_args.args[0] == [
+        scheduler.Step("validate-local-common", ("/v/common",)),
+        scheduler.Step("validate-local-python", ("/v/python",)),
+        scheduler.Step("validate-local-custom", ("/v/custom",), after=("validate-local-python",)),
+    ]
 
-    def mock_run_validator(name: str, scripts_bin: Path) -> bool:
-        return name != "validate-local-custom"
 
+def test_main_custom_validator_without_language_validator(tmp_path: Path) -> None:
     _write_config(tmp_path, "python")
     with (
-        patch("standard_tooling.bin.validate_local.git.repo_root", return_value=tmp_path),
-        patch(
-            "standard_tooling.bin.validate_local._run_validator",
-            side_effect=mock_run_validator,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local._find_validator",
-            side_effect=mock_find_validator,
-        ),
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._find_validator", side_effect=["/v/common", None, "/v/custom"]),
+        patch(f"{_MOD}.scheduler.run_steps", return_value=[]) as run_steps,
     ):
-        result = main([])
-    assert result == 1
+        assert main([]) == 0
+    assert [step.after for step in run_steps.call_args.args[0]] == [(), ()]
+
+
+def test_main_serial(tmp_path: Path, capfd: pytest.CaptureFixture[str]) -> None:
+    _write_config(tmp_path, "python")
+    assert _main(tmp_path, ["--serial"], validate_local_common=0, validate_local_python=0) == 0
+    out = capfd.readouterr().out
+    assert "\nvalidate-local-common ran\n" in out
+    assert "[validate-local-common]" not in out
 
 
 # --- Container guard tests ---
@@ -274,3 +273,124 @@ def test_main_rejects_host_execution(
     captured = capsys.readouterr()
     assert "st-validate-local" in captured.err
     assert "st-docker-run" in captured.err
+
+
+# --- Result cache ---
+
+
+def test_parse_args() -> None:
+    assert parse_args([]).no_cache is False
+    assert parse_args([]).serial is False
+    assert parse_args(["--no-cache"]).no_cache is True
+    assert parse_args(["--serial"]).serial is True
+
+
+def test_run_key(tmp_path: Path) -> None:
+    ctx = _context(tmp_path)
+    with patch(f"{_MOD}.validation_cache.run_key", return_value=("t", "k")) as run_key:
+        assert _run_key(ctx, ["/bin/a", None]) == ("t", "k")
+    run_key.assert_called_once_with(ctx, ["/bin/a", None])
+
+
+def test_run_key_unavailable(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    err = subprocess.CalledProcessError(128, ["git", "add"])
+    with patch(f"{_MOD}.validation_cache.run_key", side_effect=err):
+        assert _run_key(_context(tmp_path), [None]) is None
+    assert "result cache unavailable" in capsys.readouterr().out
+
+
+def test_main_skips_validators_on_recorded_pass(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _write_config(tmp_path, "python")
+    with (
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._find_validator", side_effect=["/v/common", None, "/v/custom"]),
+        patch(f"{_MOD}._run_key", return_value=("abcdef1234567890", "k")) as run_key,
+        patch(
+            f"{_MOD}.validation_cache.recorded_pass",
+            return_value={"tree": "abcdef1234567890", "passed_at": 0.0},
+        ),
+        patch(f"{_MOD}.scheduler.run_steps") as run_steps,
+    ):
+        assert main([]) == 0
+    run_steps.assert_not_called()
+    assert run_key.call_args.args[1] == ["/v/common", None, "/v/custom"]
+    out = capsys.readouterr().out
+    assert "Tree abcdef123456 already passed" in out
+    assert "all checks passed (cached)" in out
+
+
+def test_main_records_pass(tmp_path: Path) -> None:
+    ctx = _context(tmp_path)
+    with (
+        patch(f"{_MOD}.context.current", return_value=ctx),
+        patch(f"{_MOD}._run_key", return_value=("tree", "k")),
+        patch(f"{_MOD}.validation_cache.recorded_pass", return_value=None),
+        patch(f"{_MOD}.validation_cache.record_pass") as record_pass,
+        patch(f"{_MOD}._find_validator", return_value=None),
+    ):
+        assert main([]) == 0
+    record_pass.assert_called_once_with(ctx, "k", "tree")
+
+
+def test_main_does_not_record_failure(tmp_path: Path) -> None:
+    with (
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._run_key", return_value=("tree", "k")),
+        patch(f"{_MOD}.validation_cache.recorded_pass", return_value=None),
+        patch(f"{_MOD}.validation_cache.record_pass") as record_pass,
+        patch(
+            f"{_MOD}._find_validator", side_effect=_validators(tmp_path, validate_local_common=1)
+        ),
+    ):
+        assert main([]) == 1
+    record_pass.assert_not_called()
+
+
+def test_main_no_cache_skips_lookup(tmp_path: Path) -> None:
+    with (
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}._run_key") as run_key,
+        patch(f"{_MOD}.validation_cache.record_pass") as record_pass,
+        patch(f"{_MOD}._find_validator", return_value=None),
+    ):
+        assert main(["--no-cache"]) == 0
+    run_key.assert_not_called()
+    record_pass.assert_not_called()
+
+
+# --- Changed-since scoping ---
+
+
+def test_main_changed_since_hands_files_to_validators(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    script = tmp_path / "validate-local-common"
+    script.write_text('#!/bin/sh\ntr "\\0" "\\n" < "$ST_CHANGED_FILES"; echo\n')
+    script.chmod(0o755)
+    with (
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}.git.changed_files", return_value=["a.py", "docs/b.md"]) as changed,
+        patch(f"{_MOD}._find_validator", side_effect=[str(script), None]),
+        patch(f"{_MOD}._run_key", return_value=("tree", "k")),
+        patch(f"{_MOD}.validation_cache.recorded_pass", return_value=None),
+        patch(f"{_MOD}.validation_cache.record_pass") as record_pass,
+    ):
+        assert main(["--changed-since", "origin/develop"]) == 0
+    changed.assert_called_once_with(tmp_path, "origin/develop")
+    out = capsys.readouterr().out
+    assert "changed since origin/develop: 2 file(s)" in out
+    assert "[validate-local-common] a.py\n[validate-local-common] docs/b.md\n" in out
+    # A scoped pass says nothing about the whole tree.
+    record_pass.assert_not_called()
+
+
+def test_main_changed_since_unknown_ref(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    err = subprocess.CalledProcessError(128, ["git"], stderr=b"fatal: Not a valid object name\n")
+    with (
+        patch(f"{_MOD}.context.current", return_value=_context(tmp_path)),
+        patch(f"{_MOD}.git.changed_files", side_effect=err),
+    ):
+        assert main(["--changed-since", "nope"]) == 1
+    assert "cannot diff against nope: fatal: Not a valid object name" in capsys.readouterr().err
@@ -2,33 +2,53 @@
 
 from __future__ import annotations
 
+import os
+import shutil
 import subprocess
+from pathlib import Path
 from typing import TYPE_CHECKING
 from unittest.mock import patch
 
+import pytest
+
+import standard_tooling
 from standard_tooling.bin.validate_local_common_container import (
+    _attribute,
     _find_markdown_files,
     _find_shell_files,
     _find_yaml_files,
+    _shards,
+    _shellcheckrcs,
     main,
 )
+from standard_tooling.lib import changed_files, git
+from standard_tooling.lib.context import RepoContext
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from collections.abc import Iterator
+
+_MOD = "standard_tooling.bin.validate_local_common_container"
+
+
+def _listed(root: Path) -> list[str]:
+    """Return what ``git ls-files`` lists for *root*, making it a repo first."""
+    if not (root / ".git").exists():
+        subprocess.run(("git", "init", "-q", str(root)), check=True)  # noqa: S603, S607
+    return git.list_files(root)
 
 
 # -- _find_shell_files --------------------------------------------------------
 
 
 def test_find_shell_files_none(tmp_path: Path) -> None:
-    assert _find_shell_files(tmp_path) == []
+    assert _find_shell_files(tmp_path, _listed(tmp_path)) == []
 
 
 def test_find_shell_files_discovers_sh(tmp_path: Path) -> None:
     scripts = tmp_path / "scripts" / "dev"
     scripts.mkdir(parents=True)
     (scripts / "lint.sh").write_text("#!/bin/bash\n")
-    result = _find_shell_files(tmp_path)
+    result = _find_shell_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert result[0].endswith("lint.sh")
 
@@ -37,7 +57,7 @@ def test_find_shell_files_discovers_bin(tmp_path: Path) -> None:
     scripts_bin = tmp_path / "scripts" / "bin"
     scripts_bin.mkdir(parents=True)
     (scripts_bin / "my-script").write_text("#!/bin/bash\n")
-    result = _find_shell_files(tmp_path)
+    result = _find_shell_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert "my-script" in result[0]
 
@@ -46,7 +66,7 @@ def test_find_shell_files_discovers_git_hooks(tmp_path: Path) -> None:
     hooks = tmp_path / "scripts" / "lib" / "git-hooks"
     hooks.mkdir(parents=True)
     (hooks / "pre-commit").write_text("#!/bin/bash\n")
-    result = _find_shell_files(tmp_path)
+    result = _find_shell_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert "pre-commit" in result[0]
 
@@ -55,7 +75,7 @@ def test_find_shell_files_skips_non_matching(tmp_path: Path) -> None:
     lib = tmp_path / "scripts" / "lib"
     lib.mkdir(parents=True)
     (lib / "README.md").write_text("# Not a shell file\n")
-    result = _find_shell_files(tmp_path)
+    result = _find_shell_files(tmp_path, _listed(tmp_path))
     assert result == []
 
 
@@ -64,29 +84,60 @@ def test_find_shell_files_sorted(tmp_path: Path) -> None:
     scripts.mkdir(parents=True)
     (scripts / "b.sh").write_text("#!/bin/bash\n")
     (scripts / "a.sh").write_text("#!/bin/bash\n")
-    result = _find_shell_files(tmp_path)
+    result = _find_shell_files(tmp_path, _listed(tmp_path))
     assert result[0] < result[1]
 
 
+def test_find_shell_files_ignores_repo_location(tmp_path: Path) -> None:
+    # "bin" above the repository root does not make every script a shell file.
+    root = tmp_path / "bin" / "repo"
+    (root / "scripts" / "lib").mkdir(parents=True)
+    (root / "scripts" / "lib" / "helper.py").write_text("")
+    assert _find_shell_files(root, _listed(root)) == []
+
+
+def test_find_files_skip_ignored_and_deleted(tmp_path: Path) -> None:
+    (tmp_path / ".gitignore").write_text("docs/site/build/\n")
+    for rel in ("docs/site/build/page.md", "docs/site/gone.md", "docs/site/index.md"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("# Page\n")
+    _listed(tmp_path)
+    subprocess.run(("git", "-C", str(tmp_path), "add", "-A"), check=True)  # noqa: S603, S607
+    (tmp_path / "docs" / "site" / "gone.md").unlink()
+    listed = git.list_files(tmp_path)
+    assert "docs/site/gone.md" in listed
+    assert _find_markdown_files(tmp_path, listed) == [str(tmp_path / "docs/site/index.md")]
+
+
+def test_shellcheckrcs_cover_every_parent_dir(tmp_path: Path) -> None:
+    files = [str(tmp_path / "scripts/lib/git-hooks/pre-commit"), str(tmp_path / "scripts/a.sh")]
+    assert _shellcheckrcs(tmp_path, files) == (
+        tmp_path / ".shellcheckrc",
+        tmp_path / "scripts/.shellcheckrc",
+        tmp_path / "scripts/lib/.shellcheckrc",
+        tmp_path / "scripts/lib/git-hooks/.shellcheckrc",
+    )
+
+
 # -- _find_markdown_files ----------------------------------------------------
 
 
 def test_find_markdown_files_none(tmp_path: Path) -> None:
-    assert _find_markdown_files(tmp_path) == []
+    assert _find_markdown_files(tmp_path, _listed(tmp_path)) == []
 
 
 def test_find_markdown_files_site(tmp_path: Path) -> None:
     site = tmp_path / "docs" / "site"
     site.mkdir(parents=True)
     (site / "index.md").write_text("# Hello\n")
-    result = _find_markdown_files(tmp_path)
+    result = _find_markdown_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert result[0].endswith("index.md")
 
 
 def test_find_markdown_files_readme(tmp_path: Path) -> None:
     (tmp_path / "README.md").write_text("# Hello\n")
-    result = _find_markdown_files(tmp_path)
+    result = _find_markdown_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert result[0].endswith("README.md")
 
@@ -96,7 +147,7 @@ def test_find_markdown_files_both(tmp_path: Path) -> None:
     site.mkdir(parents=True)
     (site / "index.md").write_text("# Hello\n")
     (tmp_path / "README.md").write_text("# Project\n")
-    result = _find_markdown_files(tmp_path)
+    result = _find_markdown_files(tmp_path, _listed(tmp_path))
     assert len(result) == 2
 
 
@@ -105,175 +156,347 @@ def test_find_markdown_files_sorted(tmp_path: Path) -> None:
     site.mkdir(parents=True)
     (site / "b.md").write_text("# B\n")
     (site / "a.md").write_text("# A\n")
-    result = _find_markdown_files(tmp_path)
+    result = _find_markdown_files(tmp_path, _listed(tmp_path))
     assert result == sorted(result)
 
 
 # -- main --------------------------------------------------------------------
 
-
-def test_main_all_pass(tmp_path: Path) -> None:
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-    ):
-        assert main() == 0
-
-
-def test_main_repo_profile_fails(tmp_path: Path) -> None:
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=1,
-        ),
-    ):
-        assert main() == 1
-
-
-def test_main_markdownlint_uses_bundled_config(tmp_path: Path) -> None:
-    site = tmp_path / "docs" / "site"
-    site.mkdir(parents=True)
-    (site / "index.md").write_text("# Hello\n")
-
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=0),
-        ) as mock_run,
-    ):
-        assert main() == 0
-    mock_run.assert_called_once()
-    call_args = mock_run.call_args[0][0]
-    assert call_args[0] == "markdownlint"
-    assert call_args[1] == "--config"
-    assert call_args[2].endswith("markdownlint.yaml")
-    assert "standard_tooling" in call_args[2]
-
-
-def test_main_markdownlint_ignores_repo_local_config(tmp_path: Path) -> None:
-    site = tmp_path / "docs" / "site"
-    site.mkdir(parents=True)
-    (site / "index.md").write_text("# Hello\n")
-    (tmp_path / ".markdownlint.yaml").write_text("default: true\n")
-
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=0),
-        ) as mock_run,
-    ):
-        assert main() == 0
-    ml_call = mock_run.call_args_list[0][0][0]
-    assert ml_call[0] == "markdownlint"
-    assert ml_call[1] == "--config"
-    assert str(tmp_path) not in ml_call[2]
+_VALID_TOML = """\
+[project]
+repository-type = "library"
+versioning-scheme = "semver"
+branching-model = "library-release"
+release-model = "tagged-release"
+primary-language = "python"
+
+[project.co-authors]
+claude = "Co-Authored-By: user-claude <111+user-claude@users.noreply.github.com>"
+
+[dependencies]
+standard-tooling = "v1.4"
+"""
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """A repo with a valid profile, and fake linters on PATH.
+
+    Each fake linter logs its arguments to ``calls.log`` and reports an
+    error for every file containing ``BAD`` and a warning for every file
+    containing ``WARN``, one ``path:line:col:`` line each. ``<tool>.say``
+    is printed as extra output and ``<tool>.rc`` overrides the exit code.
+    """
+    root = tmp_path / "repo"
+    root.mkdir()
+    subprocess.run(("git", "init", "-q", str(root)), check=True)  # noqa: S603, S607
+    (root / "standard-tooling.toml").write_text(_VALID_TOML)
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for tool in ("markdownlint", "shellcheck", "yamllint"):
+        _fake_tool(bin_dir / tool, tmp_path, "1.0")
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    # repo-profile runs as ``python -m``; make the package importable from the repo.
+    package_parent = Path(standard_tooling.__file__).parents[1]
+    monkeypatch.setenv("PYTHONPATH", str(package_parent))
+    ctx = RepoContext(root, root / ".git", root / ".git", "feature/1-x", None)
+    with patch(f"{_MOD}.context.current", return_value=ctx):
+        yield root
+
+
+def _fake_tool(path: Path, state: Path, version: str) -> None:
+    tool = path.name
+    path.write_text(
+        "#!/bin/sh\n"
+        f'[ "$1" = --version ] && {{ echo "{tool} {version}"; exit 0; }}\n'
+        f'echo "{tool} $*" >> {state}/calls.log\n'
+        "rc=0\n"
+        'for f in "$@"; do\n'
+        '  [ -f "$f" ] || continue\n'
+        '  if grep -q BAD "$f"; then echo "$f:1:1: [error] bad"; rc=1; fi\n'
+        '  if grep -q WARN "$f"; then echo "$f:2:1: [warning] meh"; fi\n'
+        "done\n"
+        f"[ -f {state}/{tool}.say ] && cat {state}/{tool}.say\n"
+        f"[ -f {state}/{tool}.rc ] && exit $(cat {state}/{tool}.rc)\n"
+        "exit $rc\n"
+    )
+    path.chmod(0o755)
+
+
+def _calls(repo: Path) -> list[list[str]]:
+    """Return each linter invocation's arguments, then clear the log."""
+    log = repo.parent / "calls.log"
+    if not log.exists():
+        return []
+    calls = sorted(line.split() for line in log.read_text().splitlines())
+    log.unlink()
+    return calls
+
+
+def _files(repo: Path) -> list[str]:
+    """Return the repo-relative files linted since the last call, in order."""
+    prefix = f"{repo}/"
+    return sorted(
+        arg.removeprefix(prefix) for call in _calls(repo) for arg in call if arg.startswith(prefix)
+    )
+
+
+def _fail(repo: Path, tool: str, rc: int) -> None:
+    (repo.parent / f"{tool}.rc").write_text(f"{rc}\n")
+
+
+def _touch(repo: Path, *paths: str, content: str = "x\n") -> None:
+    for rel in paths:
+        path = repo / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def test_main_all_pass(repo: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    assert main([]) == 0
+    assert _calls(repo) == []
+    assert "Running: repo-profile" in capsys.readouterr().out
+
+
+def test_main_repo_profile_fails(repo: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (repo / "standard-tooling.toml").unlink()
+    _touch(repo, "scripts/dev/lint.sh")
+    assert main([]) == 2
+    assert "[repo-profile] ERROR: standard-tooling.toml not found" in capsys.readouterr().out
+    # The other checks still run.
+    assert _files(repo) == ["scripts/dev/lint.sh"]
+
+
+def test_main_markdownlint_uses_bundled_config(repo: Path) -> None:
+    _touch(repo, "docs/site/index.md", ".markdownlint.yaml")
+    assert main([]) == 0
+    (ml_call, _) = _calls(repo)
+    assert ml_call[:2] == ["markdownlint", "--config"]
+    assert ml_call[2].endswith("markdownlint.yaml")
     assert "standard_tooling" in ml_call[2]
-
-
-def test_main_markdownlint_fails(tmp_path: Path) -> None:
-    (tmp_path / "README.md").write_text("# Hello\n")
-
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=1),
-        ),
-    ):
-        assert main() == 1
-
-
-def test_main_shellcheck_runs(tmp_path: Path) -> None:
-    scripts = tmp_path / "scripts" / "dev"
-    scripts.mkdir(parents=True)
-    (scripts / "lint.sh").write_text("#!/bin/bash\n")
-
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=0),
-        ) as mock_run,
-    ):
-        assert main() == 0
-    mock_run.assert_called_once()
-    call_args = mock_run.call_args[0][0]
-    assert call_args[0] == "shellcheck"
-
-
-def test_main_shellcheck_fails(tmp_path: Path) -> None:
-    scripts = tmp_path / "scripts" / "dev"
-    scripts.mkdir(parents=True)
-    (scripts / "lint.sh").write_text("#!/bin/bash\n")
-
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=1),
-        ),
-    ):
-        assert main() == 1
+    assert str(repo) not in ml_call[2]
+    assert ml_call[3:] == [str(repo / "docs" / "site" / "index.md")]
+
+
+def test_main_markdownlint_fails(repo: Path) -> None:
+    _touch(repo, "docs/site/index.md")
+    _fail(repo, "markdownlint", 4)
+    assert main([]) == 4
+
+
+def test_main_shellcheck_runs(repo: Path) -> None:
+    _touch(repo, "scripts/dev/lint.sh")
+    assert main([]) == 0
+    script = str(repo / "scripts" / "dev" / "lint.sh")
+    assert _calls(repo) == [["shellcheck", "--format", "gcc", script]]
+
+
+def test_main_shellcheck_fails(repo: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    _touch(repo, "scripts/dev/lint.sh", content="BAD\n")
+    assert main([]) == 1
+    script = repo / "scripts" / "dev" / "lint.sh"
+    assert f"[shellcheck] {script}:1:1: [error] bad" in capsys.readouterr().out
+
+
+def test_main_exit_code_is_first_failure_in_check_order(repo: Path) -> None:
+    _touch(repo, "docs/site/index.md", "scripts/dev/lint.sh", ".github/workflows/ci.yml")
+    _fail(repo, "shellcheck", 3)
+    _fail(repo, "yamllint", 1)
+    assert main([]) == 3
+
+
+def test_main_missing_tool_fails(repo: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _touch(repo, "scripts/dev/lint.sh")
+    (repo.parent / "bin" / "shellcheck").unlink()
+    git_dir = Path(shutil.which("git") or "git").parent
+    monkeypatch.setenv("PATH", f"{repo.parent / 'bin'}{os.pathsep}{git_dir}")
+    assert main([]) == 1
+
+
+def test_main_shards_large_file_lists(repo: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    scripts = [f"scripts/dev/s{n:02}.sh" for n in range(20)]
+    _touch(repo, *scripts, content="BAD\n")
+    with patch(f"{_MOD}.os.cpu_count", return_value=4):
+        assert main([]) == 1
+    calls = _calls(repo)
+    assert [len(call) - 3 for call in calls] == [7, 7, 6]
+    assert sorted(f for call in calls for f in call[3:]) == [str(repo / s) for s in scripts]
+    out = capsys.readouterr().out.splitlines()
+    # Printed in shard order however the shards finished.
+    assert [line for line in out if "bad" in line] == [
+        f"[shellcheck {(n // 7) + 1}/3] {repo / s}:1:1: [error] bad" for n, s in enumerate(scripts)
+    ]
+
+
+# -- main: changed-since scoping ---------------------------------------------
+
+
+def test_main_scoped_to_changed_files(
+    repo: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _touch(repo, "scripts/a.sh", "scripts/b.sh", ".github/ci.yml", "docs/site/index.md")
+    with changed_files.exported(["scripts/a.sh", "scripts/deleted.sh"]) as env:
+        monkeypatch.setenv(changed_files.ENV_VAR, env[changed_files.ENV_VAR])
+        assert main(["--no-cache"]) == 0
+    assert _files(repo) == ["scripts/a.sh"]
+    out = capsys.readouterr().out
+    assert "Scoped to 2 changed file(s)." in out
+    assert "repo-profile: standard-tooling.toml and README.md unchanged; skipped." in out
+    assert "Running: repo-profile" not in out
+
+
+def test_main_scoped_config_change_checks_everything_it_covers(
+    repo: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _touch(repo, "scripts/a.sh", ".github/ci.yml", ".github/other.yml")
+    (repo / ".yamllint").write_text("extends: default\n")
+    with changed_files.exported([".yamllint", "standard-tooling.toml"]) as env:
+        monkeypatch.setenv(changed_files.ENV_VAR, env[changed_files.ENV_VAR])
+        assert main(["--no-cache"]) == 0
+    assert _files(repo) == [".github/ci.yml", ".github/other.yml"]
+    assert "Running: repo-profile" in capsys.readouterr().out
+
+
+# -- main: lint cache ---------------------------------------------------------
+
+
+def test_main_relints_only_changed_files(repo: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    _touch(repo, "scripts/a.sh", "scripts/b.sh", "docs/site/index.md", ".github/ci.yml")
+    _touch(repo, "scripts/bad.sh", content="BAD\n")
+    assert main([]) == 1
+    assert _files(repo) == [
+        ".github/ci.yml",
+        "docs/site/index.md",
+        "scripts/a.sh",
+        "scripts/b.sh",
+        "scripts/bad.sh",
+    ]
+    capsys.readouterr()
+
+    # Nothing changed: nothing is linted, the failure is replayed.
+    assert main([]) == 1
+    assert _files(repo) == []
+    out = capsys.readouterr().out
+    assert f"[shellcheck, cached] {repo}/scripts/bad.sh:1:1: [error] bad" in out
+    assert "shellcheck: 3 unchanged file(s) not relinted" in out
+    assert "Running: shellcheck" not in out
+
+    # Fixing the failing file relints just that file.
+    _touch(repo, "scripts/bad.sh")
+    assert main([]) == 0
+    assert _files(repo) == ["scripts/bad.sh"]
+    assert main([]) == 0
+    assert _files(repo) == []
+
+
+def test_main_tracked_only(repo: Path) -> None:
+    _touch(repo, "scripts/tracked.sh", "scripts/new.sh")
+    subprocess.run(("git", "-C", str(repo), "add", "scripts/tracked.sh"), check=True)  # noqa: S603, S607
+    assert main(["--tracked-only", "--no-cache"]) == 0
+    assert _files(repo) == ["scripts/tracked.sh"]
+    assert main(["--no-cache"]) == 0
+    assert _files(repo) == ["scripts/new.sh", "scripts/tracked.sh"]
+
+
+def test_main_no_cache_lints_everything(repo: Path) -> None:
+    _touch(repo, "scripts/a.sh")
+    assert main([]) == 0
+    assert main(["--no-cache"]) == 0
+    assert _files(repo) == ["scripts/a.sh", "scripts/a.sh"]
+
+
+def test_main_relints_after_linter_upgrade(repo: Path) -> None:
+    _touch(repo, "scripts/a.sh", ".github/ci.yml")
+    assert main([]) == 0
+    _calls(repo)
+    shellcheck = repo.parent / "bin" / "shellcheck"
+    _fake_tool(shellcheck, repo.parent, "2.0")
+    os.utime(shellcheck, ns=(0, 0))
+    assert main([]) == 0
+    assert _files(repo) == ["scripts/a.sh"]
+
+
+def test_main_relints_after_config_change(repo: Path) -> None:
+    _touch(repo, "scripts/a.sh", ".github/ci.yml")
+    assert main([]) == 0
+    _calls(repo)
+    (repo / ".yamllint").write_text("extends: default\n")
+    assert main([]) == 0
+    assert _files(repo) == [".github/ci.yml"]
+
+
+def test_main_relints_after_nested_shellcheckrc_change(repo: Path) -> None:
+    _touch(repo, "scripts/dev/a.sh", ".github/ci.yml")
+    assert main([]) == 0
+    _calls(repo)
+    (repo / "scripts" / "dev" / ".shellcheckrc").write_text("disable=SC2034\n")
+    assert main([]) == 0
+    assert _files(repo) == ["scripts/dev/a.sh"]
+
+
+def test_main_warnings_are_replayed_without_failing(
+    repo: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _touch(repo, ".github/ci.yml", content="WARN\n")
+    assert main([]) == 0
+    assert main([]) == 0
+    assert _files(repo) == [".github/ci.yml"]
+    out = capsys.readouterr().out
+    assert f"[yamllint, cached] {repo}/.github/ci.yml:2:1: [warning] meh" in out
+
+
+@pytest.mark.parametrize(
+    ("say", "rc", "content"),
+    [
+        ("config error\n", None, "BAD\n"),  # output not tied to a file
+        ("", "2", "x\n"),  # crashed
+        ("", "1", "WARN\n"),  # failed, but only warnings to show for it
+    ],
+)
+def test_main_does_not_record_unexplained_results(
+    repo: Path, say: str, rc: str | None, content: str
+) -> None:
+    _touch(repo, ".github/ci.yml", content=content)
+    (repo.parent / "yamllint.say").write_text(say)
+    if rc is not None:
+        (repo.parent / "yamllint.rc").write_text(rc)
+    assert main([]) != 0
+    assert main([]) != 0
+    assert _files(repo) == [".github/ci.yml", ".github/ci.yml"]
+
+
+# -- _shards ------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    ("count", "jobs", "sizes"),
+    [
+        (1, 8, [1]),
+        (8, 8, [8]),
+        (9, 8, [5, 4]),
+        (20, 4, [7, 7, 6]),
+        (100, 4, [25, 25, 25, 25]),
+        (10, 1, [10]),
+    ],
+)
+def test_shards(count: int, jobs: int, sizes: list[int]) -> None:
+    files = [f"f{n:03}" for n in range(count)]
+    shards = _shards(files, jobs)
+    assert [len(shard) for shard in shards] == sizes
+    assert [f for shard in shards for f in shard] == files
 
 
 # -- _find_yaml_files --------------------------------------------------------
 
 
 def test_find_yaml_files_none(tmp_path: Path) -> None:
-    assert _find_yaml_files(tmp_path) == []
+    assert _find_yaml_files(tmp_path, _listed(tmp_path)) == []
 
 
 def test_find_yaml_files_repo_root(tmp_path: Path) -> None:
     (tmp_path / ".markdownlint.yaml").write_text("default: true\n")
     (tmp_path / ".yamllint").write_text("extends: default\n")  # no .yml/.yaml suffix
-    result = _find_yaml_files(tmp_path)
+    result = _find_yaml_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert result[0].endswith(".markdownlint.yaml")
 
@@ -283,7 +506,7 @@ def test_find_yaml_files_github_workflows(tmp_path: Path) -> None:
     workflows.mkdir(parents=True)
     (workflows / "ci.yml").write_text("name: CI\n")
     (workflows / "release.yaml").write_text("name: Release\n")
-    result = _find_yaml_files(tmp_path)
+    result = _find_yaml_files(tmp_path, _listed(tmp_path))
     assert len(result) == 2
 
 
@@ -291,7 +514,7 @@ def test_find_yaml_files_github_issue_templates(tmp_path: Path) -> None:
     templates = tmp_path / ".github" / "ISSUE_TEMPLATE"
     templates.mkdir(parents=True)
     (templates / "issue.yml").write_text("name: Issue\n")
-    result = _find_yaml_files(tmp_path)
+    result = _find_yaml_files(tmp_path, _listed(tmp_path))
     assert any(p.endswith("issue.yml") for p in result)
 
 
@@ -299,7 +522,7 @@ def test_find_yaml_files_mkdocs(tmp_path: Path) -> None:
     docs_site = tmp_path / "docs" / "site"
     docs_site.mkdir(parents=True)
     (docs_site / "mkdocs.yml").write_text("site_name: docs\n")
-    result = _find_yaml_files(tmp_path)
+    result = _find_yaml_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert result[0].endswith("mkdocs.yml")
 
@@ -312,7 +535,7 @@ def test_find_yaml_files_skips_worktrees_and_venv(tmp_path: Path) -> None:
     real = tmp_path / ".github" / "workflows"
     real.mkdir(parents=True)
     (real / "ci.yml").write_text("name: CI\n")
-    result = _find_yaml_files(tmp_path)
+    result = _find_yaml_files(tmp_path, _listed(tmp_path))
     assert len(result) == 1
     assert ".worktrees" not in result[0]
     assert ".venv" not in result[0]
@@ -323,7 +546,7 @@ def test_find_yaml_files_sorted_and_deduped(tmp_path: Path) -> None:
     workflows.mkdir(parents=True)
     (workflows / "b.yml").write_text("name: b\n")
     (workflows / "a.yml").write_text("name: a\n")
-    result = _find_yaml_files(tmp_path)
+    result = _find_yaml_files(tmp_path, _listed(tmp_path))
     assert result == sorted(result)
     assert len(result) == len(set(result))
 
@@ -331,48 +554,26 @@ def test_find_yaml_files_sorted_and_deduped(tmp_path: Path) -> None:
 # -- main: yamllint path -----------------------------------------------------
 
 
-def test_main_yamllint_runs(tmp_path: Path) -> None:
-    workflows = tmp_path / ".github" / "workflows"
-    workflows.mkdir(parents=True)
-    (workflows / "ci.yml").write_text("name: CI\n")
+def test_main_yamllint_runs(repo: Path) -> None:
+    _touch(repo, ".github/workflows/ci.yml")
+    assert main([]) == 0
+    workflow = str(repo / ".github" / "workflows" / "ci.yml")
+    assert _calls(repo) == [["yamllint", "--format", "parsable", workflow]]
+
+
+def test_main_yamllint_fails(repo: Path) -> None:
+    _touch(repo, ".github/workflows/ci.yml", content="BAD\n")
+    assert main([]) == 1
+
+
+# -- _attribute --------------------------------------------------------------
 
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=0),
-        ) as mock_run,
-    ):
-        assert main() == 0
-    mock_run.assert_called_once()
-    call_args = mock_run.call_args[0][0]
-    assert call_args[0] == "yamllint"
-
-
-def test_main_yamllint_fails(tmp_path: Path) -> None:
-    workflows = tmp_path / ".github" / "workflows"
-    workflows.mkdir(parents=True)
-    (workflows / "ci.yml").write_text("name: CI\n")
 
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_common_container.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.repo_profile_cli.main",
-            return_value=0,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_common_container.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=1),
-        ),
-    ):
-        assert main() == 1
+def test_attribute_groups_lines_by_file() -> None:
+    output = "a.sh:1:1: x\n\nab.sh:2:1: y\na.sh:3:1: z\n"
+    assert _attribute(output, ["a.sh", "ab.sh", "c.sh"]) == {
+        "a.sh": ["a.sh:1:1: x", "a.sh:3:1: z"],
+        "ab.sh": ["ab.sh:2:1: y"],
+        "c.sh": [],
+    }
+    assert _attribute("a.sh:1:1: x\nsomething else\n", ["a.sh"]) is None
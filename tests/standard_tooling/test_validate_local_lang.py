@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
-import subprocess
+import json
 from typing import TYPE_CHECKING
 from unittest.mock import patch
 
-from standard_tooling.bin.validate_local_lang import _detect_language, main
+import pytest
+
+from standard_tooling.bin.validate_local_lang import _detect_language, main, parse_args
+from standard_tooling.lib import changed_files
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+_MOD = "standard_tooling.bin.validate_local_lang"
+
 
 # -- _detect_language ---------------------------------------------------------
 
@@ -57,45 +62,67 @@ def test_main_no_language() -> None:
         assert main([]) == 1
 
 
-def test_main_all_scripts_pass(tmp_path: Path) -> None:
+def _scripts(tmp_path: Path, **exit_codes: int) -> None:
     dev = tmp_path / "scripts" / "dev"
     dev.mkdir(parents=True)
-    for name in ("lint.sh", "typecheck.sh", "test.sh", "audit.sh"):
-        script = dev / name
-        script.write_text("#!/bin/bash\nexit 0\n")
+    for name, code in exit_codes.items():
+        script = dev / f"{name}.sh"
+        script.write_text(f"#!/bin/sh\necho {name} output\nexit {code}\n")
         script.chmod(0o755)
 
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_lang.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_lang.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=0),
-        ),
-    ):
+
+def test_main_all_scripts_pass(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    _scripts(tmp_path, lint=0, typecheck=0, test=0, audit=0)
+    with patch(f"{_MOD}.git.repo_root", return_value=tmp_path):
         assert main(["--language", "python"]) == 0
+    out = capsys.readouterr().out
+    for name in ("lint", "typecheck", "test", "audit"):
+        assert f"[scripts/dev/{name}.sh] {name} output" in out
 
 
-def test_main_script_fails(tmp_path: Path) -> None:
+def test_main_script_fails_but_others_still_run(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _scripts(tmp_path, lint=1, test=0)
+    with patch(f"{_MOD}.git.repo_root", return_value=tmp_path):
+        assert main(["--language", "python"]) == 1
+    out = capsys.readouterr().out
+    assert "[scripts/dev/lint.sh] failed (exit 1)" in out
+    assert "[scripts/dev/test.sh] test output" in out
+
+
+def test_main_serial(tmp_path: Path, capfd: pytest.CaptureFixture[str]) -> None:
+    _scripts(tmp_path, lint=0, test=0)
+    with patch(f"{_MOD}.git.repo_root", return_value=tmp_path):
+        assert main(["--language", "python", "--serial"]) == 0
+    out = capfd.readouterr().out.splitlines()
+    assert out[:5] == [
+        "Running: scripts/dev/lint.sh",
+        "lint output",
+        "Running: scripts/dev/test.sh",
+        "test output",
+        "",
+    ]
+    assert out[5].split() == ["Step", "Status", "Wall", "CPU"]
+    assert [line.split()[:2] for line in out[6:]] == [
+        ["scripts/dev/lint.sh", "passed"],
+        ["scripts/dev/test.sh", "passed"],
+    ]
+
+
+def test_main_scripts_never_overlap(tmp_path: Path) -> None:
+    # Each script holds a shared lock file while it runs, as a build tool would.
     dev = tmp_path / "scripts" / "dev"
     dev.mkdir(parents=True)
-    lint = dev / "lint.sh"
-    lint.write_text("#!/bin/bash\nexit 1\n")
-    lint.chmod(0o755)
-
-    with (
-        patch(
-            "standard_tooling.bin.validate_local_lang.git.repo_root",
-            return_value=tmp_path,
-        ),
-        patch(
-            "standard_tooling.bin.validate_local_lang.subprocess.run",
-            return_value=subprocess.CompletedProcess(args=[], returncode=1),
-        ),
-    ):
-        assert main(["--language", "python"]) == 1
+    lock = tmp_path / "lock"
+    for name in ("lint", "typecheck", "test", "audit"):
+        script = dev / f"{name}.sh"
+        script.write_text(
+            f"#!/bin/sh\n[ -e {lock} ] && exit 3\ntouch {lock}\nsleep 0.2\nrm {lock}\n"
+        )
+        script.chmod(0o755)
+    with patch(f"{_MOD}.git.repo_root", return_value=tmp_path):
+        assert main(["--language", "rust"]) == 0
 
 
 def test_main_no_scripts(tmp_path: Path) -> None:
@@ -118,3 +145,105 @@ def test_main_skips_non_executable(tmp_path: Path) -> None:
         return_value=tmp_path,
     ):
         assert main(["--language", "python"]) == 0
+
+
+def test_parse_args_modes() -> None:
+    assert parse_args([]).fail_fast is False
+    assert parse_args(["--fail-fast"]).fail_fast is True
+    assert parse_args(["--keep-going"]).fail_fast is False
+    assert parse_args(["--unknown", "--serial"]).serial is True
+
+
+def test_parse_args_modes_are_exclusive() -> None:
+    with pytest.raises(SystemExit):
+        parse_args(["--fail-fast", "--keep-going"])
+
+
+def test_main_fail_fast_cancels_remaining(tmp_path: Path) -> None:
+    _scripts(tmp_path, lint=1)
+    slow = tmp_path / "scripts" / "dev" / "test.sh"
+    slow.write_text("#!/bin/sh\nsleep 30\n")
+    slow.chmod(0o755)
+    report = tmp_path / "report.json"
+    with patch(f"{_MOD}.git.repo_root", return_value=tmp_path):
+        assert main(["--language", "go", "--fail-fast", "--report", str(report)]) == 1
+    data = json.loads(report.read_text())
+    assert data["mode"] == "fail-fast"
+    assert data["passed"] is False
+    lint, test = data["steps"]
+    assert (lint["name"], lint["status"], lint["returncode"]) == (
+        "scripts/dev/lint.sh",
+        "failed",
+        1,
+    )
+    assert test["status"] == "skipped"
+    assert data["wall_seconds"] < 10
+
+
+def test_main_keep_going_report_and_summary(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _scripts(tmp_path, lint=1, typecheck=0, test=0, audit=0)
+    report = tmp_path / "report.json"
+    with patch(f"{_MOD}.git.repo_root", return_value=tmp_path):
+        assert main(["--language", "python", "--keep-going", "--report", str(report)]) == 1
+    data = json.loads(report.read_text())
+    assert data["language"] == "python"
+    assert data["mode"] == "keep-going"
+    assert data["finished_at"].endswith("+00:00")
+    assert [s["status"] for s in data["steps"]] == ["failed", "passed", "passed", "passed"]
+    assert set(data["steps"][0]) == {
+        "name",
+        "status",
+        "returncode",
+        "wall_seconds",
+        "cpu_seconds",
+    }
+    out = capsys.readouterr().out
+    assert "scripts/dev/lint.sh       failed (1)" in out
+    assert "Step " in out
+
+
+def test_main_report_without_scripts(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    report = tmp_path / "report.json"
+    with patch(f"{_MOD}.git.repo_root", return_value=tmp_path):
+        assert main(["--language", "go", "--report", str(report)]) == 0
+    assert json.loads(report.read_text())["steps"] == []
+    assert "Step" not in capsys.readouterr().out
+
+
+def test_main_changed_files_go_to_scripts_that_accept_them(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _scripts(tmp_path, test=0)
+    dev = tmp_path / "scripts" / "dev"
+    lint = dev / "lint.sh"
+    lint.write_text('#!/bin/sh\n# st-validate-local: accepts-files\npwd; echo "args: $*"\n')
+    lint.chmod(0o755)
+    with (
+        changed_files.exported(["src/b.py", "src/a.py"]) as env,
+        patch(f"{_MOD}.git.repo_root", return_value=tmp_path),
+    ):
+        monkeypatch.setenv(changed_files.ENV_VAR, env[changed_files.ENV_VAR])
+        assert main(["--language", "python"]) == 0
+    out = capsys.readouterr().out
+    assert f"[scripts/dev/lint.sh] {tmp_path}" in out
+    assert "[scripts/dev/lint.sh] args: src/a.py src/b.py" in out
+    assert "[scripts/dev/test.sh] test output" in out
+
+
+def test_main_skips_file_scripts_when_nothing_changed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    dev = tmp_path / "scripts" / "dev"
+    dev.mkdir(parents=True)
+    lint = dev / "lint.sh"
+    lint.write_text("#!/bin/sh\n# st-validate-local: accepts-files\nexit 1\n")
+    lint.chmod(0o755)
+    with (
+        changed_files.exported([]) as env,
+        patch(f"{_MOD}.git.repo_root", return_value=tmp_path),
+    ):
+        monkeypatch.setenv(changed_files.ENV_VAR, env[changed_files.ENV_VAR])
+        assert main(["--language", "python"]) == 0
+    assert "scripts/dev/lint.sh: no changed files; skipped." in capsys.readouterr().out
@@ -0,0 +1,116 @@
+"""Tests for standard_tooling.lib.validation_cache."""
+
+from __future__ import annotations
+
+from importlib import metadata
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+from standard_tooling.lib import validation_cache
+from standard_tooling.lib.context import RepoContext
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_MOD = "standard_tooling.lib.validation_cache"
+
+
+@pytest.fixture
+def ctx(tmp_path: Path) -> RepoContext:
+    (tmp_path / ".git").mkdir()
+    return RepoContext(
+        root=tmp_path,
+        git_dir=tmp_path / ".git",
+        common_dir=tmp_path / ".git",
+        branch="feature/1-x",
+        head_sha=None,
+    )
+
+
+def _key(ctx: RepoContext, validators: list[str | None], tree: str = "t1") -> str:
+    with patch(f"{_MOD}.git.worktree_tree", return_value=tree) as worktree_tree:
+        got_tree, key = validation_cache.run_key(ctx, validators)
+    worktree_tree.assert_called_once_with(ctx.root, ctx.git_dir)
+    assert got_tree == tree
+    return key
+
+
+def test_run_key_tracks_tree_and_validators(ctx: RepoContext, tmp_path: Path) -> None:
+    script = tmp_path / "validate-local-custom"
+    script.write_text("#!/bin/sh\nexit 0\n")
+    base = _key(ctx, ["/usr/bin/st-validate-local-common", str(script)])
+    assert _key(ctx, ["/usr/bin/st-validate-local-common", str(script)]) == base
+    assert _key(ctx, ["/usr/bin/st-validate-local-common", str(script)], tree="t2") != base
+    assert _key(ctx, ["/usr/bin/st-validate-local-common", None]) != base
+    script.write_text("#!/bin/sh\nexit 1\n")
+    assert _key(ctx, ["/usr/bin/st-validate-local-common", str(script)]) != base
+
+
+def test_run_key_tracks_tool_versions(ctx: RepoContext) -> None:
+    with patch(f"{_MOD}.metadata.version", return_value="1.0.0"):
+        base = _key(ctx, [None])
+        with patch(f"{_MOD}.platform.python_version", return_value="3.0.0"):
+            assert _key(ctx, [None]) != base
+    with patch(f"{_MOD}.metadata.version", return_value="1.1.0"):
+        assert _key(ctx, [None]) != base
+    with patch(f"{_MOD}.metadata.version", side_effect=metadata.PackageNotFoundError):
+        assert _key(ctx, [None]) != base
+
+
+@pytest.mark.parametrize("tool", ["shellcheck", "rustc", "go", "java"])
+def test_run_key_tracks_image_tool_versions(ctx: RepoContext, tool: str) -> None:
+    versions: dict[str, str | None] = {
+        "markdownlint": "0.39.0",
+        "shellcheck": "0.9.0",
+        "yamllint": "yamllint 1.35",
+        "rustc": "rustc 1.93.0",
+        "go": "go version go1.26.0 linux/amd64",
+        "java": "openjdk 21.0.5",
+    }
+
+    def key() -> str:
+        with patch(
+            f"{_MOD}.lint_cache.tool_version", side_effect=lambda _d, t, _f: versions.get(t)
+        ):
+            return _key(ctx, [None])
+
+    base = key()
+    assert key() == base
+    versions[tool] = f"{versions[tool]} (new)"
+    assert key() != base
+    versions[tool] = None
+    assert key() != base
+
+
+def test_run_key_asks_image_tools_from_the_common_dir(ctx: RepoContext) -> None:
+    with patch(f"{_MOD}.lint_cache.tool_version", return_value=None) as tool_version:
+        _key(ctx, [None])
+    calls = [c.args for c in tool_version.call_args_list]
+    assert calls[:3] == [
+        (ctx.common_dir, "markdownlint", "--version"),
+        (ctx.common_dir, "shellcheck", "--version"),
+        (ctx.common_dir, "yamllint", "--version"),
+    ]
+    assert (ctx.common_dir, "cargo", "--version") in calls
+    assert (ctx.common_dir, "go", "version") in calls
+
+
+def test_record_and_lookup(ctx: RepoContext) -> None:
+    assert validation_cache.recorded_pass(ctx, "k") is None
+    validation_cache.record_pass(ctx, "k", "t1")
+    record = validation_cache.recorded_pass(ctx, "k")
+    assert record is not None
+    assert record["tree"] == "t1"
+    assert record["passed_at"] > 0
+    assert (ctx.common_dir / "st-validate-local.json").is_file()
+
+
+def test_lookup_ignores_malformed_entries(ctx: RepoContext) -> None:
+    validation_cache._cache(ctx).put("k", "not a record", 60)
+    assert validation_cache.recorded_pass(ctx, "k") is None
+
+
+def test_cache_is_bounded(ctx: RepoContext) -> None:
+    assert validation_cache._cache(ctx).max_entries == validation_cache._MAX_ENTRIES
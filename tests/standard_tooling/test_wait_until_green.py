@@ -8,6 +8,7 @@ from unittest.mock import patch
 import pytest
 
 from standard_tooling.bin.wait_until_green import main, parse_args
+from standard_tooling.lib import github
 
 _MOD = "standard_tooling.bin.wait_until_green"
 
@@ -21,7 +22,9 @@ def test_main_happy_path() -> None:
     with patch(f"{_MOD}.github.wait_for_checks") as mock_wait:
         result = main(["https://github.com/pr/1"])
     assert result == 0
-    mock_wait.assert_called_once_with("https://github.com/pr/1")
+    mock_wait.assert_called_once_with(
+        "https://github.com/pr/1", on_transition=github.print_transition
+    )
 
 
 def test_main_surfaces_check_failure() -> None: